@@ -74,6 +74,26 @@ DDL = [
         pdf_bytes_len INTEGER,
         created_at TIMESTAMPTZ DEFAULT NOW()
     )"""),
+    # analysis_jobs (Queue für Analyse-Worker)
+    text("""    CREATE TABLE IF NOT EXISTS analysis_jobs (
+        id SERIAL PRIMARY KEY,
+        briefing_id INTEGER NOT NULL,
+        email VARCHAR(320),
+        source VARCHAR(40) DEFAULT 'api' NOT NULL,
+        status VARCHAR(16) DEFAULT 'queued' NOT NULL,
+        attempts INTEGER DEFAULT 0 NOT NULL,
+        max_attempts INTEGER DEFAULT 3 NOT NULL,
+        run_after TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+        lease_owner VARCHAR(128),
+        lease_until TIMESTAMPTZ,
+        heartbeat_at TIMESTAMPTZ,
+        last_error TEXT,
+        created_at TIMESTAMPTZ DEFAULT NOW() NOT NULL,
+        started_at TIMESTAMPTZ,
+        finished_at TIMESTAMPTZ
+    )"""),
+    text("CREATE INDEX IF NOT EXISTS ix_analysis_jobs_status_run_after ON analysis_jobs(status, run_after)"),
+    text("CREATE INDEX IF NOT EXISTS ix_analysis_jobs_briefing_id ON analysis_jobs(briefing_id)"),
 ]
 
 def migrate_all(engine: Engine) -> None:
@@ -18,6 +18,7 @@ Version History:
 from __future__ import annotations
 
 # === IMPORTS FIRST ===
+import asyncio
 import json
 import logging
 import os
@@ -25,9 +26,8 @@ import re
 import uuid
 import html
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
 from sqlalchemy.orm import Session
@@ -47,6 +47,14 @@ from field_registry import fields  # added by Patch03
 from models import Analysis, Briefing, Report, User
 from services.report_renderer import render
 from services.pdf_client import render_pdf_from_html
+from services.pdf_cache import get_pdf_cache
+from services.html_repair import markdown_to_html, repair_html_local
+from services.llm_cache import cache_key as llm_cache_key, get_llm_cache
+from services.llm_client import call_llm, call_llm_sync, llm_run_key, run_sync
+from services.run_trace import RunTrace, current_trace, span as trace_span, use_trace
+from services.keyword_matcher import KeywordMatcher
+from services.placeholder_engine import PlaceholderEngine
+from services.dag import DagExecutor
 from services.email_templates import render_report_ready_email
 from settings import settings
 from services.coverage_guard import analyze_coverage, build_html_report
@@ -147,10 +155,14 @@ def ksj_fix_placeholders_in_sections(sections: dict, answers: dict, scores: dict
             "score_sicherheit": scores.get("security") or scores.get("sicherheit") or "",
             "score_nutzen": scores.get("value") or scores.get("nutzen") or "",
         })
-    # render string values
-    for k,v in list(sections.items()):
-        if isinstance(v, str) and "{{" in v and "}}" in v:
-            sections[k] = ksj_render_string(v, numeric)
+    # render string values (ein Scan je Section, services/placeholder_engine.py);
+    # Ausdrücke, die die Engine nicht kennt (Filter wie "| round(2)"), wertet Jinja aus
+    def _jinja_expr(expr: str) -> Optional[str]:
+        tpl = "{{ " + expr + " }}"
+        out = ksj_render_string(tpl, numeric)
+        return None if out == tpl else out
+
+    PlaceholderEngine(numeric, fallback=_jinja_expr).apply_all(sections)
     # append extra sections if missing but available via builders
     if callable(build_benchmarks_section) and "BENCHMARKS_SECTION_HTML" not in sections:
         try:
@@ -311,6 +323,8 @@ ENABLE_NSFW_FILTER = (os.getenv("ENABLE_NSFW_FILTER", "1") in ("1", "true", "TRU
 ENABLE_REALISTIC_SCORES = (os.getenv("ENABLE_REALISTIC_SCORES", "1") in ("1", "true", "TRUE", "yes", "YES"))
 ENABLE_LLM_CONTENT = (os.getenv("ENABLE_LLM_CONTENT", "1") in ("1", "true", "TRUE", "yes", "YES"))
 ENABLE_REPAIR_HTML = (os.getenv("ENABLE_REPAIR_HTML", "1") in ("1", "true", "TRUE", "yes", "YES"))
+# LLM-Reparatur nur als letzter Ausweg, wenn die lokale Konvertierung kein Block-HTML liefert
+ENABLE_LLM_REPAIR_HTML = (os.getenv("ENABLE_LLM_REPAIR_HTML", "0") in ("1", "true", "TRUE", "yes", "YES"))
 USE_INTERNAL_RESEARCH = (os.getenv("RESEARCH_PROVIDER", "hybrid") != "disabled")
 ENABLE_AI_ACT_SECTION = (os.getenv("ENABLE_AI_ACT_SECTION", "1") in ("1", "true", "TRUE", "yes", "YES"))
 USE_PROMPT_SYSTEM = (os.getenv("USE_PROMPT_SYSTEM", "1") in ("1", "true", "TRUE", "yes", "YES"))
@@ -397,14 +411,14 @@ _LABEL_MAX = int(os.getenv("LABEL_MAX_LEN", "80"))
 NSFW_KEYWORDS = {"porn","xxx","sex","nude","naked","adult","nsfw","erotic","escort","dating","porno","nackt","fick","titten","onlyfans","torrent","crack"}
 NSFW_DOMAINS = {"xvideos.com","pornhub.com","xnxx.com","redtube.com","youporn.com","onlyfans.com"}
 
+_NSFW_MATCHER = KeywordMatcher({"keyword": (NSFW_KEYWORDS, "prefix"), "domain": (NSFW_DOMAINS, "substring")})
+
 def _is_nsfw_content(url: str, title: str, description: str) -> bool:
     if not ENABLE_NSFW_FILTER:
         return False
-    url_lower = (url or "").lower()
-    if any(domain in url_lower for domain in NSFW_DOMAINS):
+    if _NSFW_MATCHER.matches(url, "domain"):
         return True
-    text = f"{title} {description}".lower()
-    return any(k in text for k in NSFW_KEYWORDS)
+    return _NSFW_MATCHER.matches(f"{title} {description}", "keyword")
 
 def _filter_nsfw(research_data: Dict[str, Any]) -> Dict[str, Any]:
     if not ENABLE_NSFW_FILTER:
@@ -521,44 +535,55 @@ def _calculate_realistic_score(answers: Dict[str, Any]) -> Dict[str, Any]:
     return {"scores": scores, "details": details, "total": scores["overall"]}
 
 # -------------------- OpenAI client ----------------
-def _call_openai(prompt: str, system_prompt: str = "Du bist ein KI-Berater.",
-                 temperature: Optional[float] = None, max_tokens: Optional[int] = None) -> Optional[str]:
+# Transport: gemeinsamer httpx-Pool in services/llm_client.py (Keep-Alive, HTTP/2).
+def _llm_kwargs(temperature: Optional[float], max_tokens: Optional[int]) -> Optional[Dict[str, Any]]:
     if not OPENAI_API_KEY:
         log.error("❌ OPENAI_API_KEY not set"); return None
-    if temperature is None: temperature = OPENAI_TEMPERATURE
-    if max_tokens is None: max_tokens = OPENAI_MAX_TOKENS
-    api_base = (OPENAI_API_BASE or "https://api.openai.com").rstrip("/")
-    url = f"{api_base}/v1/chat/completions"
-    headers = {"Content-Type": "application/json"}
-    if "openai.azure.com" in api_base: headers["api-key"] = OPENAI_API_KEY
-    else: headers["Authorization"] = f"Bearer {OPENAI_API_KEY}"
-    try:
-        # Sanitize headers for logging (remove API keys)
-        safe_headers = {k: '***' if k.lower() in ['authorization', 'api-key'] else v for k, v in headers.items()}
-        log.debug("OpenAI request headers: %s", safe_headers)
-
-        r = requests.post(url, headers=headers, json={
-            "model": OPENAI_MODEL,
-            "messages": [{"role": "system","content": system_prompt},{"role": "user","content": prompt}],
-            "temperature": float(temperature), "max_tokens": int(max_tokens),
-        }, timeout=OPENAI_TIMEOUT)
-        r.raise_for_status()
-
-        # Validate response structure
-        try:
-            data = r.json()
-            content = data["choices"][0]["message"]["content"]
-            return str(content)
-        except (KeyError, IndexError, TypeError) as e:
-            log.error("Unexpected OpenAI response structure: %s. Response: %s", e, str(data)[:500])
-            return None
+    return {
+        "temperature": OPENAI_TEMPERATURE if temperature is None else temperature,
+        "max_tokens": OPENAI_MAX_TOKENS if max_tokens is None else max_tokens,
+        "model": OPENAI_MODEL,
+        "api_key": OPENAI_API_KEY,
+        "api_base": OPENAI_API_BASE,
+        "timeout": float(OPENAI_TIMEOUT),
+    }
 
-    except requests.exceptions.RequestException as exc:
-        log.error("❌ OpenAI request error: %s", str(exc)[:200])
-        return None
-    except Exception as exc:
-        log.error("❌ OpenAI unexpected error: %s", str(exc)[:200])
-        return None
+def _cache_slot(kw: Dict[str, Any], prompt: str, system_prompt: str,
+                section: Optional[str]) -> tuple[Optional[Any], Optional[str], Optional[str]]:
+    """(cache, key, treffer) für den LLM-Antwort-Cache; cache=None → ohne Cache."""
+    cache = get_llm_cache()
+    if cache is None or not cache.enabled_for(section):
+        return None, None, None
+    key = llm_cache_key(kw["model"], system_prompt, prompt, kw["temperature"], kw["max_tokens"])
+    hit = cache.get(key)
+    trace = current_trace()
+    if hit is not None and trace is not None:
+        trace.llm_call(section, cached=True)
+    return cache, key, hit
+
+def _call_openai(prompt: str, system_prompt: str = "Du bist ein KI-Berater.",
+                 temperature: Optional[float] = None, max_tokens: Optional[int] = None,
+                 section: Optional[str] = None) -> Optional[str]:
+    """Sync-Shim; blockiert nur den aufrufenden Thread. ``section`` steuert das Cache-Opt-out."""
+    kw = _llm_kwargs(temperature, max_tokens)
+    if kw is None: return None
+    cache, key, hit = _cache_slot(kw, prompt, system_prompt, section)
+    if hit is not None: return hit
+    out = call_llm_sync(prompt, system_prompt, label=section, **kw)
+    if cache is not None and key and out: cache.put(key, out, section)
+    return out
+
+async def _acall_openai(prompt: str, system_prompt: str = "Du bist ein KI-Berater.",
+                        temperature: Optional[float] = None, max_tokens: Optional[int] = None,
+                        section: Optional[str] = None) -> Optional[str]:
+    kw = _llm_kwargs(temperature, max_tokens)
+    if kw is None: return None
+    # SQLite-I/O des Caches im Worker-Thread, damit der DAG-Loop die übrigen Sektionen weiterbedient
+    cache, key, hit = await asyncio.to_thread(_cache_slot, kw, prompt, system_prompt, section)
+    if hit is not None: return hit
+    out = await call_llm(prompt, system_prompt, label=section, **kw)
+    if cache is not None and key and out: await asyncio.to_thread(cache.put, key, out, section)
+    return out
 
 # -------------------- HTML repair ----------------
 def _clean_html(s: str) -> str:
@@ -570,9 +595,14 @@ def _needs_repair(s: str) -> bool:
     sl = s.lower()
     return ("<" not in sl) or not any(t in sl for t in ("<p","<ul","<table","<div","<h4","<ol"))
 
-def _repair_html(section: str, s: str) -> str:
+async def _arepair_html(section: str, s: str) -> str:
+    """Repariert Markdown/Fließtext lokal (services/html_repair); LLM nur als Opt-in-Fallback."""
     if not ENABLE_REPAIR_HTML: return _clean_html(s)
-    fixed = _call_openai(
+    fixed = repair_html_local(_clean_html(s))
+    if not _needs_repair(fixed) or not ENABLE_LLM_REPAIR_HTML:
+        return fixed or _clean_html(s)
+    log.info("Local HTML repair insufficient for %s – falling back to LLM repair", section)
+    fixed_llm = await _acall_openai(
         f"""Konvertiere folgenden Text in **valides HTML** ohne Markdown‑Fences.
 Erlaube nur: <p>, <ul>, <ol>, <li>, <table>, <thead>, <tbody>, <tr>, <th>, <td>, <div>, <h4>, <em>, <strong>, <br>.
 Abschnitt: {section}. Antworte ausschließlich mit HTML.
@@ -580,9 +610,12 @@ Abschnitt: {section}. Antworte ausschließlich mit HTML.
 {s}
 """,
         system_prompt="Du bist ein strenger HTML‑Sanitizer. Gib nur validen HTML‑Code aus.",
-        temperature=0.0, max_tokens=1200,
+        temperature=0.0, max_tokens=1200, section=section,
     )
-    return _clean_html(fixed or s)
+    return _clean_html(fixed_llm or fixed or s)
+
+def _repair_html(section: str, s: str) -> str:
+    return run_sync(_arepair_html(section, s))
 
 # -------------------- Quick‑Wins sum ----------------
 _QW_RE = re.compile(r"(?:Ersparnis\s*[:=]\s*)(\d+(?:[.,]\d{1,2})?)\s*(?:h|std\.?|stunden?)\s*(?:[/\s]*(?:pro|/)?\s*Monat)", re.IGNORECASE)
@@ -1280,6 +1313,9 @@ def _build_prompt_vars(briefing: Dict[str, Any], scores: Dict[str, Any]) -> Dict
 # -------------------- 🎯 NEW: Better fallbacks when GPT fails ----------------
 def _get_fallback_content(section_key: str, briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
     """Provide meaningful fallback content if GPT fails or returns too little"""
+    _trace = current_trace()
+    if _trace is not None:
+        _trace.fallback(section_key)
     branche = briefing.get("BRANCHE_LABEL") or briefing.get("branche", "Ihr Unternehmen")
     size = briefing.get("UNTERNEHMENSGROESSE_LABEL") or briefing.get("unternehmensgroesse", "")
     
@@ -1355,7 +1391,7 @@ def _get_fallback_content(section_key: str, briefing: Dict[str, Any], scores: Di
     return fallbacks.get(section_key, f"<p><em>[{section_key} – Content wird erstellt]</em></p>")
 
 # -------------------- 🎯 NEW: Use prompt system instead of hardcoded prompts ----------------
-def _generate_content_section(section_name: str, briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
+async def _agenerate_content_section(section_name: str, briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
     """🎯 UPDATED: Now uses prompt_loader system with variable interpolation!"""
     if not ENABLE_LLM_CONTENT:
         return f"<p><em>[{section_name} – LLM disabled]</em></p>"
@@ -1375,7 +1411,7 @@ def _generate_content_section(section_name: str, briefing: Dict[str, Any], score
         "risks": "risks",
         "gamechanger": "gamechanger",
         "recommendations": "recommendations",
-        "reifegrad_sowhat": "executive_summary",  # fallback to exec summary prompt
+        # reifegrad_sowhat: kein eigenes Prompt-File → eigener Inline-Prompt (nicht den Exec-Summary-Prompt doppelt)
         # ✅ NEW: Previously unused prompts - now activated
         "ai_act_summary": "ai_act_summary",
         "strategie_governance": "strategie_governance",
@@ -1412,16 +1448,17 @@ def _generate_content_section(section_name: str, briefing: Dict[str, Any], score
             
             # 4. Call GPT with enhanced prompt
             _temp = float(os.getenv("GAMECHANGER_TEMPERATURE", "0.4")) if section_name == "gamechanger" else 0.2
-            result = _call_openai(
+            result = await _acall_openai(
                 prompt=prompt_text,
                 system_prompt="Du bist ein Senior‑KI‑Berater. Antworte nur mit validem HTML.",
                 temperature=_temp,
-                max_tokens=OPENAI_MAX_TOKENS
+                max_tokens=OPENAI_MAX_TOKENS,
+                section=section_name,
             ) or ""
             
             result = _clean_html(result)
             if _needs_repair(result):
-                result = _repair_html(section_name, result)
+                result = await _arepair_html(section_name, result)
             
             # Check if result is substantial enough
             if not result or len(result.strip()) < 50:
@@ -1488,9 +1525,9 @@ Gesamt {overall}/100 • Governance {governance}/100 • Sicherheit {security}/1
 {tone} {only_html} Gib 4–6 Bullet‑Points (<ul>) aus.""",
     }
     
-    out = _call_openai(prompt=prompts.get(section_name, ""), system_prompt="Du bist ein Senior‑KI‑Berater. Antworte nur mit validem HTML.", temperature=_section_temperature(section_name), max_tokens=OPENAI_MAX_TOKENS) or ""
+    out = await _acall_openai(prompt=prompts.get(section_name, ""), system_prompt="Du bist ein Senior‑KI‑Berater. Antworte nur mit validem HTML.", temperature=_section_temperature(section_name), max_tokens=OPENAI_MAX_TOKENS, section=section_name) or ""
     out = _clean_html(out)
-    if _needs_repair(out): out = _repair_html(section_name, out)
+    if _needs_repair(out): out = await _arepair_html(section_name, out)
     
     # If still empty or too short, use fallback
     if not out or len(out.strip()) < 50:
@@ -1498,11 +1535,83 @@ Gesamt {overall}/100 • Governance {governance}/100 • Sicherheit {security}/1
     
     return out
 
-def _one_liner(title: str, section_html: str, briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
+def _generate_content_section(section_name: str, briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
+    return run_sync(_agenerate_content_section(section_name, briefing, scores))
+
+async def _aone_liner(title: str, section_html: str, briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
     base = f'Erzeuge einen prägnanten One‑liner unter der H2‑Überschrift "{title}". Formel: "Kernaussage; Konsequenz → nächster Schritt". Nur 1 Zeile.'
-    text = _call_openai(base + "\n---\n" + re.sub(r"<[^>]+>", " ", section_html)[:1800], system_prompt="Du formulierst prägnante One‑liner auf Deutsch.", temperature=0.1, max_tokens=80)
+    text = await _acall_openai(base + "\n---\n" + re.sub(r"<[^>]+>", " ", section_html)[:1800], system_prompt="Du formulierst prägnante One‑liner auf Deutsch.", temperature=0.1, max_tokens=80, section="one_liner")
     return (text or "").strip()
 
+def _one_liner(title: str, section_html: str, briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
+    return run_sync(_aone_liner(title, section_html, briefing, scores))
+
+# -------------------- One‑liner (Batch) ----------------
+# Alle One-liner in einem JSON-Call statt ~24 Einzel-Roundtrips; fehlende Keys → Einzel-Call.
+ONE_LINER_BATCH = (os.getenv("ONE_LINER_BATCH", "1") in ("1", "true", "TRUE", "yes", "YES"))
+ONE_LINER_BATCH_SIZE = max(1, _env_int("ONE_LINER_BATCH_SIZE", 24))
+ONE_LINER_DIGEST_CHARS = max(200, _env_int("ONE_LINER_DIGEST_CHARS", 700))
+
+def _parse_one_liner_map(text: Optional[str], keys: List[str]) -> Dict[str, str]:
+    """Validiert die JSON-Antwort: nur erwartete Keys, nicht-leere einzeilige Strings."""
+    if not text:
+        return {}
+    raw = _clean_html(text).replace("```json", "")
+    m = re.search(r"\{.*\}", raw, re.S)
+    if not m:
+        return {}
+    try:
+        data = json.loads(m.group(0))
+    except ValueError:
+        return {}
+    if not isinstance(data, dict):
+        return {}
+    out: Dict[str, str] = {}
+    for k in keys:
+        v = data.get(k)
+        if isinstance(v, str):
+            line = v.strip().splitlines()[0].strip() if v.strip() else ""
+            if line:
+                out[k] = line[:300]
+    return out
+
+async def _aone_liners_batch(items: List[Tuple[str, str, str]], briefing: Dict[str, Any],
+                             scores: Dict[str, Any],
+                             bound: Optional[Callable[[Awaitable[Any]], Awaitable[Any]]] = None) -> Dict[str, str]:
+    """items = [(LEAD-Key, Titel, Sektions-HTML)] → {LEAD-Key: One-liner}.
+
+    ``bound`` begrenzt jeden einzelnen LLM-Call (Batch-Chunk wie Einzel-Fallback), z. B. über den
+    ``GPT_PARALLEL_WORKERS``-Semaphor des DAGs.
+    """
+    if bound is None:
+        async def bound(coro: Awaitable[Any]) -> Any:
+            return await coro
+    async def _chunk(chunk: List[Tuple[str, str, str]]) -> Dict[str, str]:
+        keys = [k for k, _, _ in chunk]
+        digests = "\n\n".join(
+            f'### {k} – "{t}"\n' + re.sub(r"\s+", " ", re.sub(r"<[^>]+>", " ", html or ""))[:ONE_LINER_DIGEST_CHARS].strip()
+            for k, t, html in chunk
+        )
+        prompt = (
+            "Erzeuge für jeden Abschnitt einen prägnanten One‑liner unter seiner H2‑Überschrift. "
+            'Formel: "Kernaussage; Konsequenz → nächster Schritt". Je Abschnitt genau 1 Zeile.\n'
+            "Antworte ausschließlich mit einem JSON-Objekt, Keys exakt: " + ", ".join(keys) + "\n---\n" + digests
+        )
+        text = await _acall_openai(prompt, system_prompt="Du formulierst prägnante One‑liner auf Deutsch und antwortest nur mit JSON.",
+                                   temperature=0.1, max_tokens=90 * len(chunk) + 50, section="one_liner_batch")
+        return _parse_one_liner_map(text, keys)
+
+    chunks = [items[i:i + ONE_LINER_BATCH_SIZE] for i in range(0, len(items), ONE_LINER_BATCH_SIZE)]
+    leads: Dict[str, str] = {}
+    for part in await asyncio.gather(*(bound(_chunk(c)) for c in chunks)):
+        leads.update(part)
+    missing = [(k, t, html) for k, t, html in items if k not in leads]
+    if missing:
+        log.info("One-liner batch: %d/%d keys missing, falling back to single calls", len(missing), len(items))
+        singles = await asyncio.gather(*(bound(_aone_liner(t, html, briefing, scores)) for _, t, html in missing))
+        leads.update({k: v for (k, _, _), v in zip(missing, singles)})
+    return leads
+
 def _split_li_list_to_columns(html_list: str) -> Tuple[str, str]:
     if not html_list: return "<ul></ul>", "<ul></ul>"
     items = re.findall(r"<li[\s>].*?</li>", html_list, flags=re.DOTALL | re.IGNORECASE)
@@ -1516,31 +1625,8 @@ def _split_li_list_to_columns(html_list: str) -> Tuple[str, str]:
 # _try_read is now an alias for _read_file_with_fallback (defined above)
 
 def _md_to_simple_html(md: str) -> str:
-    if not md: return ""
-    out: List[str] = []; in_ul = False
-    for raw in md.splitlines():
-        line = raw.strip()
-        if not line:
-            if in_ul: out.append("</ul>"); in_ul = False
-            continue
-        if line.startswith("!["):
-            continue
-        if re.match(r"^\[\d+\]:\s*https?://", line):
-            continue
-        if line.startswith("#### "):  # type: ignore[unreachable]
-            if in_ul: out.append("</ul>"); in_ul = False
-            out.append(f"<h4>{html.escape(line[5:].strip())}</h4>")
-            continue
-        if line.startswith("### "):
-            if in_ul: out.append("</ul>"); in_ul = False
-            out.append(f"<h3>{html.escape(line[4:].strip())}</h3>"); continue
-        if line.startswith(("* ", "- ")):
-            if not in_ul: in_ul = True; out.append("<ul>")
-            out.append(f"<li>{html.escape(line[2:].strip())}</li>"); continue
-        if in_ul: out.append("</ul>"); in_ul = False
-        out.append(f"<p>{html.escape(line)}</p>")
-    if in_ul: out.append("</ul>")
-    return "\n".join(out)
+    """Markdown-Dateien (AI-Act-Info, Glossar) → einfaches HTML; ``###`` bleibt ``<h3>``, ein ``<p>`` je Zeile."""
+    return markdown_to_html(md, heading_tag="h3", paragraph_per_line=True)
 
 def _build_ai_act_blocks() -> Dict[str, str]:
     if not ENABLE_AI_ACT_SECTION: return {}
@@ -1645,74 +1731,214 @@ def _build_freetext_snippets_html(ans: Dict[str, Any]) -> str:
         "</section>"
     )
 # -------------------- 🎯 UPDATED: Main composer with prompt system ----------------
-def _generate_content_sections(briefing: Dict[str, Any], scores: Dict[str, Any]) -> Dict[str, Any]:
-    """Generate all content sections - now using PARALLEL execution for performance!"""
-    sections: Dict[str, Any] = {}
-
-    # Define all sections to generate in parallel
-    parallel_sections = [
-        ("executive_summary", "EXECUTIVE_SUMMARY_HTML"),
-        ("quick_wins", "_QUICK_WINS_RAW"),  # Special handling after
-        ("roadmap", "PILOT_PLAN_HTML"),
-        ("roadmap_12m", "ROADMAP_12M_HTML"),
-        ("business_roi", "ROI_HTML"),
-        ("business_costs", "COSTS_OVERVIEW_HTML"),
-        ("business_case", "BUSINESS_CASE_HTML"),
-        ("data_readiness", "DATA_READINESS_HTML"),
-        ("org_change", "ORG_CHANGE_HTML"),
-        ("risks", "RISKS_HTML"),
-        ("gamechanger", "GAMECHANGER_HTML"),
-        ("recommendations", "RECOMMENDATIONS_HTML"),
-        ("reifegrad_sowhat", "REIFEGRAD_SOWHAT_HTML"),
-        ("ai_act_summary", "AI_ACT_SUMMARY_HTML"),
-        ("strategie_governance", "STRATEGIE_GOVERNANCE_HTML"),
-        ("wettbewerb_benchmark", "WETTBEWERB_BENCHMARK_HTML"),
-        ("technologie_prozesse", "TECHNOLOGIE_PROZESSE_HTML"),
-        ("unternehmensprofil_markt", "UNTERNEHMENSPROFIL_MARKT_HTML"),
-        ("tools_empfehlungen", "TOOLS_EMPFEHLUNGEN_HTML"),
-        ("foerderpotenzial", "FOERDERPOTENZIAL_HTML"),
-        ("transparency_box", "TRANSPARENCY_BOX_HTML"),
-        ("ki_aktivitaeten_ziele", "KI_AKTIVITAETEN_ZIELE_HTML"),
-    ]
-
+# LLM-Sektionen: (prompt_name, Zielschlüssel)
+_CONTENT_SECTIONS: List[Tuple[str, str]] = [
+    ("executive_summary", "EXECUTIVE_SUMMARY_HTML"),
+    ("quick_wins", "_QUICK_WINS_RAW"),  # Special handling after
+    ("roadmap", "PILOT_PLAN_HTML"),
+    ("roadmap_12m", "ROADMAP_12M_HTML"),
+    ("business_roi", "ROI_HTML"),
+    ("business_costs", "COSTS_OVERVIEW_HTML"),
+    ("business_case", "BUSINESS_CASE_HTML"),
+    ("data_readiness", "DATA_READINESS_HTML"),
+    ("org_change", "ORG_CHANGE_HTML"),
+    ("risks", "RISKS_HTML"),
+    ("gamechanger", "GAMECHANGER_HTML"),
+    ("recommendations", "RECOMMENDATIONS_HTML"),
+    ("reifegrad_sowhat", "REIFEGRAD_SOWHAT_HTML"),
+    ("ai_act_summary", "AI_ACT_SUMMARY_HTML"),
+    ("strategie_governance", "STRATEGIE_GOVERNANCE_HTML"),
+    ("wettbewerb_benchmark", "WETTBEWERB_BENCHMARK_HTML"),
+    ("technologie_prozesse", "TECHNOLOGIE_PROZESSE_HTML"),
+    ("unternehmensprofil_markt", "UNTERNEHMENSPROFIL_MARKT_HTML"),
+    ("tools_empfehlungen", "TOOLS_EMPFEHLUNGEN_HTML"),
+    ("foerderpotenzial", "FOERDERPOTENZIAL_HTML"),
+    ("transparency_box", "TRANSPARENCY_BOX_HTML"),
+    ("ki_aktivitaeten_ziele", "KI_AKTIVITAETEN_ZIELE_HTML"),
+]
+
+# Finale Schlüssel aus Nicht-LLM-Report-Knoten (Zielschlüssel → Knoten mit Dict-Ergebnis): die LLM-Sektion
+# wartet auf den Knoten und läuft nur, wenn dieser den Schlüssel nicht liefert (sonst würde sie überschrieben).
+_SECTION_PROVIDERS: Dict[str, str] = {
+    "AI_ACT_SUMMARY_HTML": "ai_act",  # _build_ai_act_blocks()
+}
+
+# One-liner: (LEAD-Key, Überschrift, Eingabe). Eingabe = DAG-Knoten oder ``knoten.KEY`` (Schlüssel aus dem
+# Dict-Ergebnis eines Report-Knotens). Ist die Eingabe leer (oder der Knoten nicht registriert) → kein LLM-Call.
+_ONE_LINERS: List[Tuple[str, str, str]] = [
+    ("LEAD_EXEC", "Executive Summary", "exec_summary"),
+    ("LEAD_KPI", "KPI‑Dashboard & Monitoring", "kpi_digest"),
+    ("LEAD_QW", "Quick Wins (0–90 Tage)", "quick_wins"),
+    ("LEAD_ROADMAP_90", "Roadmap (90 Tage – Test → Pilot → Rollout)", "sec:PILOT_PLAN_HTML"),
+    ("LEAD_ROADMAP_12", "Roadmap (12 Monate)", "sec:ROADMAP_12M_HTML"),
+    ("LEAD_BUSINESS", "Business Case & Kostenübersicht", "sec:ROI_HTML"),
+    ("LEAD_BUSINESS_DETAIL", "Business Case (detailliert)", "sec:BUSINESS_CASE_HTML"),
+    ("LEAD_TOOLS", "Empfohlene Tools (Pro & Open‑Source)", "research.TOOLS_TABLE_HTML"),
+    ("LEAD_DATA", "Dateninventar & ‑Qualität", "sec:DATA_READINESS_HTML"),
+    ("LEAD_ORG", "Organisation & Change", "sec:ORG_CHANGE_HTML"),
+    ("LEAD_RISKS", "Risiko‑Assessment & Compliance", "sec:RISKS_HTML"),
+    ("LEAD_GC", "Gamechanger‑Use Case", "sec:GAMECHANGER_HTML"),
+    ("LEAD_FUNDING", "Aktuelle Förderprogramme & Quellen", "research.FUNDING_TABLE_HTML"),
+    ("LEAD_NEXT_ACTIONS", "Nächste Schritte (30 Tage)", "next_actions"),
+    ("LEAD_AI_ACT", "EU AI Act – Zusammenfassung & Compliance", "sec:AI_ACT_SUMMARY_HTML"),
+    ("LEAD_STRATEGIE", "Strategie & Governance", "sec:STRATEGIE_GOVERNANCE_HTML"),
+    ("LEAD_WETTBEWERB", "Wettbewerb & Benchmarking", "sec:WETTBEWERB_BENCHMARK_HTML"),
+    ("LEAD_TECH", "Technologie & Prozesse", "sec:TECHNOLOGIE_PROZESSE_HTML"),
+    ("LEAD_UNTERNEHMEN", "Unternehmensprofil & Markt", "sec:UNTERNEHMENSPROFIL_MARKT_HTML"),
+    ("LEAD_TOOLS_EMPF", "Tool‑Empfehlungen & Einführungsreihenfolge", "sec:TOOLS_EMPFEHLUNGEN_HTML"),
+    ("LEAD_FOERDER", "Förderpotenzial", "sec:FOERDERPOTENZIAL_HTML"),
+    ("LEAD_TRANSPARENCY", "Transparenz & Methodik", "sec:TRANSPARENCY_BOX_HTML"),
+    ("LEAD_KI_AKTIVITAETEN", "KI-Aktivitäten & Ziele", "sec:KI_AKTIVITAETEN_ZIELE_HTML"),
+    ("LEAD_ROADMAP", "Roadmap", "sec:PILOT_PLAN_HTML"),
+]
+
+async def _anext_actions(briefing: Dict[str, Any], scores: Dict[str, Any]) -> str:
+    """🎯 Next Actions with DYNAMIC DATES via prompt system (hängt nur von Briefing/Scores ab)."""
+    if USE_PROMPT_SYSTEM:
+        try:
+            vars_dict = _build_prompt_vars(briefing, scores)
+            prompt_text = load_prompt("next_actions", lang="de", vars_dict=vars_dict)
+            nxt = await _acall_openai(
+                prompt=prompt_text,
+                system_prompt="Du bist PMO‑Lead. Antworte nur mit HTML.",
+                temperature=0.2,
+                max_tokens=600,
+                section="next_actions",
+            ) or ""
+            return _clean_html(nxt) if nxt else _get_fallback_content("next_actions", briefing, scores)
+        except Exception as e:
+            log.warning("⚠️ Next actions prompt system failed: %s, using fallback", e)
+            return _get_fallback_content("next_actions", briefing, scores)
+    # Legacy fallback with dynamic dates
+    now = datetime.now()
+    nxt = await _acall_openai(
+        f"""Erstelle 3–7 **Next Actions (30 Tage)** in <ol>. Jede Zeile: 👤 Rolle (kein Name), ⏱ Aufwand (z. B. ½ Tag), 
+        🎯 Impact (hoch/mittel/niedrig), 📆 Deadline (zwischen {now.strftime('%d.%m.%Y')} und {(now + timedelta(days=30)).strftime('%d.%m.%Y')}) — Maßnahme. 
+        Antwort NUR als <ol>…</ol>.""",
+        system_prompt="Du bist PMO‑Lead. Antworte nur mit HTML.",
+        temperature=0.2,
+        max_tokens=600,
+        section="next_actions",
+    ) or ""
+    return _clean_html(nxt) if nxt else _get_fallback_content("next_actions", briefing, scores)
+
+def _has_text(html_text: Optional[str]) -> bool:
+    return bool(re.sub(r"<[^>]+>|&nbsp;|\s", "", html_text or ""))
+
+def _skip_llm(section: str, reason: str) -> None:
+    """Eingesparter LLM-Call: im Trace zählen (``llm.skipped``) und loggen."""
+    trace = current_trace()
+    if trace is not None:
+        trace.llm_skipped(section)
+    log.info("⏭️ LLM call skipped for %s (%s)", section, reason)
+
+def _kpi_digest(scores: Dict[str, Any]) -> str:
+    """Eingabe für den KPI-One-liner (die KPI-Tabelle selbst entsteht erst beim Zusammenbauen)."""
+    return (f"Gesamt {scores.get('overall', 0)}/100 · Governance {scores.get('governance', 0)}/100 · "
+            f"Sicherheit {scores.get('security', 0)}/100 · Nutzen {scores.get('value', 0)}/100 · "
+            f"Befähigung {scores.get('enablement', 0)}/100")
+
+def _add_content_nodes(dag: DagExecutor, briefing: Dict[str, Any], scores: Dict[str, Any]) -> None:
+    """Registriert alle LLM-Knoten: Sektionen, Nachbearbeitung, Next Actions und One-liner.
+
+    One-liner: per Default ein Batch-JSON-Call über alle Quell-Sektionen (``ONE_LINER_BATCH``);
+    sonst hängt jeder One-liner nur an seiner Quell-Sektion und startet, sobald diese fertig ist.
+    Report-Knoten (``_add_report_nodes``) vorher registrieren: Sektionen aus ``_SECTION_PROVIDERS`` und
+    One-liner mit ``knoten.KEY``-Eingabe warten dann auf deren Ergebnis statt blind zu generieren.
+    """
     # Get max workers from env (default: 10 for good parallelization without overwhelming API)
-    max_workers = int(os.getenv("GPT_PARALLEL_WORKERS", "10"))
-
-    log.info("🚀 Generating %d sections in PARALLEL (max_workers=%d)...", len(parallel_sections), max_workers)
-    start_time = datetime.now()
-
-    # Execute all GPT calls in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_section = {
-            executor.submit(_generate_content_section, section_name, briefing, scores): (section_name, key)
-            for section_name, key in parallel_sections
-        }
-
-        # Collect results as they complete
-        for future in as_completed(future_to_section):
-            section_name, key = future_to_section[future]
-            try:
-                result = future.result()
-                sections[key] = result
-            except Exception as exc:
-                log.error("❌ Section %s failed: %s", section_name, exc)
-                sections[key] = f"<p><em>[{section_name} – Error: {exc}]</em></p>"
-
-    elapsed = (datetime.now() - start_time).total_seconds()
-    log.info("✅ Parallel generation completed in %.1fs (vs ~%ds sequential)", elapsed, len(parallel_sections) * 15)
+    sem = asyncio.Semaphore(max(1, int(os.getenv("GPT_PARALLEL_WORKERS", "10"))))
+
+    async def _bounded(coro):
+        async with sem:
+            return await coro
+
+    async def _provided_or_generate(blocks: Any, section_name: str, key: str, provider: str) -> str:
+        if isinstance(blocks, dict) and blocks.get(key):
+            _skip_llm(section_name, f"{key} kommt aus {provider}")
+            return blocks[key]
+        return await _bounded(_agenerate_content_section(section_name, briefing, scores))
+
+    for section_name, key in _CONTENT_SECTIONS:
+        provider = _SECTION_PROVIDERS.get(key)
+        if provider in dag.nodes:
+            dag.add(
+                f"sec:{key}",
+                lambda blocks, n=section_name, k=key, p=provider: _provided_or_generate(blocks, n, k, p),
+                deps=[provider],
+                default=f"<p><em>[{section_name} – Error]</em></p>",
+            )
+            continue
+        dag.add(
+            f"sec:{key}",
+            lambda n=section_name: _bounded(_agenerate_content_section(n, briefing, scores)),
+            default=f"<p><em>[{section_name} – Error]</em></p>",
+        )
 
     # Post-processing: Executive Summary placeholder fix
-    sections["EXECUTIVE_SUMMARY_HTML"] = _fix_exec_placeholders(
-        sections["EXECUTIVE_SUMMARY_HTML"], scores, sections, sections.get("report_date", "")
-    )
+    dag.add("exec_summary", lambda h: _fix_exec_placeholders(h, scores, {}, ""),
+            deps=["sec:EXECUTIVE_SUMMARY_HTML"], default="")
 
-    # Post-processing: Quick Wins - repair and split into columns
-    qw_html = sections.pop("_QUICK_WINS_RAW", "")
-    if _needs_repair(qw_html):
-        qw_html = _repair_html("quick_wins", qw_html)
+    # Post-processing: Quick Wins repair (Split/Stunden beim Zusammenbauen)
+    async def _quick_wins(qw_html: str) -> str:
+        if _needs_repair(qw_html):
+            qw_html = await _bounded(_arepair_html("quick_wins", qw_html))
+        return qw_html
+    dag.add("quick_wins", _quick_wins, deps=["sec:_QUICK_WINS_RAW"], default="")
 
-    # Split into columns
+    async def _next_actions() -> str:
+        try:
+            return await _bounded(_anext_actions(briefing, scores))
+        except Exception as exc:
+            log.warning("⚠️ Next actions failed: %s, using fallback", exc)
+            return _get_fallback_content("next_actions", briefing, scores)
+    dag.add("next_actions", _next_actions, default="")
+
+    # Eingaben der One-liner: Scores-Digest und Selektoren auf Dict-Ergebnisse (z. B. research.TOOLS_TABLE_HTML)
+    dag.add("kpi_digest", lambda: _kpi_digest(scores), default="")
+    for _key, _title, source in _ONE_LINERS:
+        node, _, field_key = source.partition(".")
+        if field_key and source not in dag.nodes:
+            if node in dag.nodes:
+                dag.add(source, lambda r, k=field_key: str((r or {}).get(k) or ""), deps=[node], default="")
+            else:
+                dag.add(source, lambda: "", default="")
+
+    if ONE_LINER_BATCH:
+        # Ein Batch-Knoten wartet auf alle Quellen; die lead:*-Knoten picken ihren Key heraus.
+        sources = list(dict.fromkeys(s for _, _, s in _ONE_LINERS))
+
+        async def _leads(*htmls: str) -> Dict[str, str]:
+            by_src = dict(zip(sources, htmls))
+            items = [(k, t, by_src.get(s) or "") for k, t, s in _ONE_LINERS]
+            empty = [k for k, _, h in items if not _has_text(h)]
+            if empty:
+                log.info("One-liner batch: %d keys without input skipped (%s)", len(empty), ", ".join(empty))
+            items = [it for it in items if it[0] not in empty]
+            return await _aone_liners_batch(items, briefing, scores, bound=_bounded) if items else {}
+
+        dag.add("leads", _leads, deps=sources, default={})
+        for key, _title, _source in _ONE_LINERS:
+            dag.add(f"lead:{key}", lambda m, k=key: (m or {}).get(k, ""), deps=["leads"], default="")
+        return
+
+    async def _lead(src: str, title: str) -> str:
+        if not _has_text(src):
+            _skip_llm("one_liner", f"leere Eingabe für {title}")
+            return ""
+        return await _bounded(_aone_liner(title, src, briefing, scores))
+
+    for key, title, source in _ONE_LINERS:
+        dag.add(f"lead:{key}", lambda src, t=title: _lead(src, t), deps=[source], default="")
+
+def _assemble_content_sections(results: Dict[str, Any], briefing: Dict[str, Any], scores: Dict[str, Any]) -> Dict[str, Any]:
+    """Baut aus den DAG-Ergebnissen das Sektionen-Dict (gleiche Keys wie bisher)."""
+    sections: Dict[str, Any] = {key: results[f"sec:{key}"] for _, key in _CONTENT_SECTIONS}
+    sections["EXECUTIVE_SUMMARY_HTML"] = results["exec_summary"]
+
+    # Quick Wins - split into columns
+    sections.pop("_QUICK_WINS_RAW", None)
+    qw_html = results["quick_wins"]
     left, right = _split_li_list_to_columns(qw_html)
     sections["QUICK_WINS_HTML_LEFT"] = left
     sections["QUICK_WINS_HTML_RIGHT"] = right
@@ -1758,80 +1984,12 @@ def _generate_content_sections(briefing: Dict[str, Any], scores: Dict[str, Any])
         "<tr><td>60%</td><td>Konservativ – nur Kernmaßnahmen; Payback länger.</td></tr></tbody></table>"
     )
 
-    # 🎯 NEW: Next Actions with DYNAMIC DATES via prompt system
-    if USE_PROMPT_SYSTEM:
-        try:
-            vars_dict = _build_prompt_vars(briefing, scores)
-            prompt_text = load_prompt("next_actions", lang="de", vars_dict=vars_dict)
-            nxt = _call_openai(
-                prompt=prompt_text,
-                system_prompt="Du bist PMO‑Lead. Antworte nur mit HTML.",
-                temperature=0.2,
-                max_tokens=600
-            ) or ""
-            sections["NEXT_ACTIONS_HTML"] = _clean_html(nxt) if nxt else _get_fallback_content("next_actions", briefing, scores)
-        except Exception as e:
-            log.warning("⚠️ Next actions prompt system failed: %s, using fallback", e)
-            sections["NEXT_ACTIONS_HTML"] = _get_fallback_content("next_actions", briefing, scores)
-    else:
-        # Legacy fallback with dynamic dates
-        now = datetime.now()
-        nxt = _call_openai(
-            f"""Erstelle 3–7 **Next Actions (30 Tage)** in <ol>. Jede Zeile: 👤 Rolle (kein Name), ⏱ Aufwand (z. B. ½ Tag), 
-            🎯 Impact (hoch/mittel/niedrig), 📆 Deadline (zwischen {now.strftime('%d.%m.%Y')} und {(now + timedelta(days=30)).strftime('%d.%m.%Y')}) — Maßnahme. 
-            Antwort NUR als <ol>…</ol>.""",
-            system_prompt="Du bist PMO‑Lead. Antworte nur mit HTML.",
-            temperature=0.2,
-            max_tokens=600
-        ) or ""
-        sections["NEXT_ACTIONS_HTML"] = _clean_html(nxt) if nxt else _get_fallback_content("next_actions", briefing, scores)
-    
-    # Generate one-liners for all sections - PARALLELIZED for performance
-    one_liner_tasks = [
-        ("LEAD_EXEC", "Executive Summary", sections["EXECUTIVE_SUMMARY_HTML"]),
-        ("LEAD_KPI", "KPI‑Dashboard & Monitoring", ""),
-        ("LEAD_QW", "Quick Wins (0–90 Tage)", qw_html),
-        ("LEAD_ROADMAP_90", "Roadmap (90 Tage – Test → Pilot → Rollout)", sections["PILOT_PLAN_HTML"]),
-        ("LEAD_ROADMAP_12", "Roadmap (12 Monate)", sections["ROADMAP_12M_HTML"]),
-        ("LEAD_BUSINESS", "Business Case & Kostenübersicht", sections["ROI_HTML"]),
-        ("LEAD_BUSINESS_DETAIL", "Business Case (detailliert)", sections["BUSINESS_CASE_HTML"]),
-        ("LEAD_TOOLS", "Empfohlene Tools (Pro & Open‑Source)", sections.get("TOOLS_HTML", "")),
-        ("LEAD_DATA", "Dateninventar & ‑Qualität", sections["DATA_READINESS_HTML"]),
-        ("LEAD_ORG", "Organisation & Change", sections["ORG_CHANGE_HTML"]),
-        ("LEAD_RISKS", "Risiko‑Assessment & Compliance", sections["RISKS_HTML"]),
-        ("LEAD_GC", "Gamechanger‑Use Case", sections["GAMECHANGER_HTML"]),
-        ("LEAD_FUNDING", "Aktuelle Förderprogramme & Quellen", sections.get("FOERDERPROGRAMME_HTML", "")),
-        ("LEAD_NEXT_ACTIONS", "Nächste Schritte (30 Tage)", sections["NEXT_ACTIONS_HTML"]),
-        ("LEAD_AI_ACT", "EU AI Act – Zusammenfassung & Compliance", sections["AI_ACT_SUMMARY_HTML"]),
-        ("LEAD_STRATEGIE", "Strategie & Governance", sections["STRATEGIE_GOVERNANCE_HTML"]),
-        ("LEAD_WETTBEWERB", "Wettbewerb & Benchmarking", sections["WETTBEWERB_BENCHMARK_HTML"]),
-        ("LEAD_TECH", "Technologie & Prozesse", sections["TECHNOLOGIE_PROZESSE_HTML"]),
-        ("LEAD_UNTERNEHMEN", "Unternehmensprofil & Markt", sections["UNTERNEHMENSPROFIL_MARKT_HTML"]),
-        ("LEAD_TOOLS_EMPF", "Tool‑Empfehlungen & Einführungsreihenfolge", sections["TOOLS_EMPFEHLUNGEN_HTML"]),
-        ("LEAD_FOERDER", "Förderpotenzial", sections["FOERDERPOTENZIAL_HTML"]),
-        ("LEAD_TRANSPARENCY", "Transparenz & Methodik", sections["TRANSPARENCY_BOX_HTML"]),
-        ("LEAD_KI_AKTIVITAETEN", "KI-Aktivitäten & Ziele", sections["KI_AKTIVITAETEN_ZIELE_HTML"]),
-    ]
+    sections["NEXT_ACTIONS_HTML"] = results["next_actions"]
 
-    log.info("🚀 Generating %d one-liners in PARALLEL...", len(one_liner_tasks))
-    oneliner_start = datetime.now()
+    # One-liners for all sections
+    for key, _, _ in _ONE_LINERS:
+        sections[key] = results[f"lead:{key}"]
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_key = {
-            executor.submit(_one_liner, title, html_content, briefing, scores): key
-            for key, title, html_content in one_liner_tasks
-        }
-        for future in as_completed(future_to_key):
-            key = future_to_key[future]
-            try:
-                sections[key] = future.result()
-            except Exception as exc:
-                log.warning("One-liner %s failed: %s", key, exc)
-                sections[key] = ""
-
-    oneliner_elapsed = (datetime.now() - oneliner_start).total_seconds()
-    log.info("✅ One-liners completed in %.1fs (vs ~%ds sequential)", oneliner_elapsed, len(one_liner_tasks) * 3)
-    
     # Benchmark table
     sections["BENCHMARK_HTML"] = _build_benchmark_html(briefing)
     
@@ -1885,23 +2043,87 @@ def _generate_content_sections(briefing: Dict[str, Any], scores: Dict[str, Any])
     sections["LEAD_ZIM_ALERT"] = "Wichtige Änderung ab 2025"
     sections["LEAD_ZIM_WORKFLOW"] = "Schritt-für-Schritt-Anleitung zur volldigitalen Antragstellung"
     sections["LEAD_CREATIV"] = "Kuratierte Tools für kreative Branchen"
-    sections.setdefault("LEAD_ROADMAP", _one_liner("Roadmap", sections.get("PILOT_PLAN_HTML", ""), briefing, scores))
 
     return sections
 
+async def _agenerate_content_sections(briefing: Dict[str, Any], scores: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate all content sections via the dependency graph (no phase barriers)."""
+    dag = DagExecutor()
+    _add_content_nodes(dag, briefing, scores)
+    log.info("🚀 Generating %d sections + %d one-liners via DAG...", len(_CONTENT_SECTIONS), len(_ONE_LINERS))
+    results = await dag.run()
+    path, total = dag.critical_path()
+    log.info("✅ Content DAG completed in %.1fs (critical path: %s)", total, " → ".join(path))
+    return _assemble_content_sections(results, briefing, scores)
+
+def _generate_content_sections(briefing: Dict[str, Any], scores: Dict[str, Any]) -> Dict[str, Any]:
+    """Sync-Einstieg; die eigentliche Fan-out-Logik läuft async im DAG."""
+    return run_sync(_agenerate_content_sections(briefing, scores))
+
 # -------------------- pipeline (kept from original with minor logging updates) ----------------
+def _run_research_node(answers: Dict[str, Any], run_id: str) -> Dict[str, Any]:
+    if not USE_INTERNAL_RESEARCH:
+        return {}
+    try:
+        from services.research_pipeline import run_research
+        log.info("[%s] 🔬 Running internal research...", run_id)
+        research_blocks = run_research(answers)
+        return research_blocks if isinstance(research_blocks, dict) else {}
+    except Exception as exc:
+        log.warning("[%s] ⚠️ Internal research failed: %s", run_id, exc)
+        return {}
+
+def _build_glossar_html() -> str:
+    gloss_raw = _try_read(GLOSSAR_PATH) or ""
+    if gloss_raw and GLOSSAR_PATH.lower().endswith(".md"):
+        return _md_to_simple_html(gloss_raw)
+    return gloss_raw
+
+def _add_report_nodes(dag: DagExecutor, answers: Dict[str, Any], scores: Dict[str, Any], run_id: str) -> None:
+    """Nicht-LLM-Knoten: Research (I/O), Business Case und statische Blöcke – ohne Abhängigkeiten,
+    damit sie parallel zu den LLM-Sektionen laufen."""
+    dag.add("research", lambda: _run_research_node(answers, run_id), default={}, blocking=True)
+    dag.add("business_case",
+            lambda: calc_business_case(answers, dict(os.environ)) if calc_business_case else None,
+            blocking=True)
+    dag.add("freetext", lambda: _build_freetext_snippets_html(answers), default="")
+    dag.add("glossar", _build_glossar_html, default="", blocking=True)
+    dag.add("werkbank", lambda: _build_werkbank_html_dynamic(answers), default="")
+    dag.add("ai_act", _build_ai_act_blocks, default={}, blocking=True)
+    dag.add("extra_sections", lambda: build_extra_sections(answers, scores), default={}, blocking=True)
+    dag.add("benchmarks", lambda: build_benchmarks_section(scores) if build_benchmarks_section else "",
+            default="", blocking=True)
+    dag.add("starter_stacks", lambda: build_starter_stacks(answers) if build_starter_stacks else "",
+            default="", blocking=True)
+    dag.add("responsible_ai", lambda: build_responsible_ai_section({
+        "four_pillars": "knowledge/four_pillars.html",
+        "legal_pitfalls": "knowledge/legal_pitfalls.html",
+        "ten_20_70": "knowledge/ten_20_70.html",
+        "kmu_keypoints": "knowledge/kmu_keypoints.html"
+    }) if build_responsible_ai_section else "", default="", blocking=True)
+
 def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, str, Dict[str, Any]]:
-    """Analyze briefing and generate AI report."""
+    """Analyze briefing and generate AI report (Timings → ``meta["timings"]``)."""
+    trace = current_trace()
+    if trace is not None:
+        return _analyze_briefing(db, briefing_id, run_id, trace)
+    with use_trace(RunTrace(run_id)) as trace:
+        return _analyze_briefing(db, briefing_id, run_id, trace)
+
+def _analyze_briefing(db: Session, briefing_id: int, run_id: str, trace: RunTrace) -> tuple[int, str, Dict[str, Any]]:
     # Validate briefing_id
     if not isinstance(briefing_id, int):
         raise ValueError(f"briefing_id must be an integer, got {type(briefing_id)}")
     if briefing_id <= 0:
         raise ValueError(f"briefing_id must be positive, got {briefing_id}")
 
+    trace.stage("load_briefing")
     br = db.get(Briefing, briefing_id)
     if not br: raise ValueError("Briefing not found")
     raw_answers: Dict[str, Any] = getattr(br, "answers", {}) or {}
 
+    trace.stage("normalize_answers")
+
     # Double-check encoding (safety net for old DB data)
     log.info("[%s] [ENCODING-FIX] Double-check on briefing %s", run_id, briefing_id)
     raw_answers = clean_briefing_data(raw_answers)  # type: ignore[assignment]
@@ -1913,12 +2135,27 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
     except Exception:
         pass
     
+    trace.stage("scores")
     log.info("[%s] 📊 Calculating realistic scores (v4.14.0-GOLD-PLUS)...", run_id)
     score_wrap = _calculate_realistic_score(answers)
     scores = score_wrap["scores"]
     
     log.info("[%s] 🎨 Generating content sections with %s...", run_id, "PROMPT SYSTEM" if USE_PROMPT_SYSTEM else "legacy prompts")
-    sections = _generate_content_sections(briefing=answers, scores=scores)
+    # Ein DAG für LLM-Sektionen, One-liner, Research, Business Case und statische Blöcke:
+    # Research & Dateizugriffe laufen parallel zur LLM-Generierung.
+    dag = DagExecutor()
+    _add_report_nodes(dag, answers, scores, run_id)
+    _add_content_nodes(dag, answers, scores)
+    trace.stage("dag")
+    dag_offset = trace.elapsed_ms()
+    with llm_run_key(run_id):  # fairer Anteil am globalen LLM-Rate-Governor je Report
+        results = run_sync(dag.run())
+    trace.add_dag(dag, dag_offset)
+    path, total = dag.critical_path()
+    log.info("[%s] ✅ Report DAG completed in %.1fs (critical path: %s, LLM calls saved: %d)",
+             run_id, total, " → ".join(path), sum(trace.llm_skips.values()))
+    trace.stage("assemble")
+    sections = _assemble_content_sections(results, answers, scores)
     
     now = datetime.now()
     # Core metadata
@@ -2006,18 +2243,11 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
     
     # Research integration
     research_last_updated = ""
-    try:
-        from services.research_pipeline import run_research
-        if USE_INTERNAL_RESEARCH and run_research:
-            log.info("[%s] 🔬 Running internal research...", run_id)
-            research_blocks = run_research(answers)
-            if isinstance(research_blocks, dict):
-                for k, v in research_blocks.items():
-                    if isinstance(v, str): 
-                        sections[k] = v
-                research_last_updated = str(research_blocks.get("last_updated") or "")
-    except Exception as exc:
-        log.warning("[%s] ⚠️ Internal research failed: %s", run_id, exc)
+    research_blocks = results.get("research") or {}
+    for k, v in research_blocks.items():
+        if isinstance(v, str): 
+            sections[k] = v
+    research_last_updated = str(research_blocks.get("last_updated") or "")
     
     sections["research_last_updated"] = research_last_updated or sections["report_date"]
     
@@ -2036,15 +2266,11 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
     sections["SOURCES_BOX_HTML"] = _build_sources_box_html(sections, sections["research_last_updated"])
 
     # Freitext snippets
-    sections['FREITEXT_SNIPPETS_HTML'] = _build_freetext_snippets_html(answers)
+    sections['FREITEXT_SNIPPETS_HTML'] = results["freetext"]
     
     # Glossar
-    gloss_raw = _try_read(GLOSSAR_PATH) or ""
-    if gloss_raw:
-        if GLOSSAR_PATH.lower().endswith(".md"):
-            sections["GLOSSAR_HTML"] = _md_to_simple_html(gloss_raw)
-        else:
-            sections["GLOSSAR_HTML"] = gloss_raw
+    if results["glossar"]:
+        sections["GLOSSAR_HTML"] = results["glossar"]
         # Replace {LAST_UPDATED} placeholder in glossar
         if "{LAST_UPDATED}" in sections["GLOSSAR_HTML"]:
             last_updated = sections.get("research_last_updated") or sections.get("report_date", "")
@@ -2074,11 +2300,10 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
     sections["BUILD_ID"] = f"{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M')}"
     
     # Werkbank
-    sections["WERKBANK_HTML"] = _build_werkbank_html_dynamic(answers)
+    sections["WERKBANK_HTML"] = results["werkbank"]
     
     # AI Act blocks
-    ai_act_blocks = _build_ai_act_blocks()
-    sections.update(ai_act_blocks)
+    sections.update(results["ai_act"])
     # News/Änderungen box (AI Act phase + research timestamp)
     sections["NEWS_BOX_HTML"] = (
         "<div class='callout'><strong>EU AI Act – Phase:</strong> "
@@ -2093,6 +2318,7 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
         sections["FUNDING_HTML"] = sections["FOERDERPROGRAMME_HTML"]
 
     log.info("[%s] 🎨 Rendering final HTML...", run_id)
+    trace.stage("sanitize")
     # --- Sanitize dynamic sections to prevent HTML leaks (z. B. eingebettetes <html> im Pilot-Plan) ---
     try:
         if os.getenv("ENABLE_REPAIR_HTML", "1") in ("1","true","TRUE","yes","YES"):
@@ -2103,8 +2329,10 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
         log.warning("[%s] ⚠️ Sanitizer skipped: %s", run_id, _exc)
 
     # === Business Case ZUERST berechnen (muss vor Placeholder-Fix!) ===
-    if calc_business_case:
-        bc = calc_business_case(answers, dict(os.environ))
+    trace.stage("business_case_placeholders")
+    bc = results["business_case"]
+    bc_placeholders: Dict[str, str] = {}
+    if bc is not None:
         sections["business_case_table_html"] = bc.get("BUSINESS_CASE_TABLE_HTML", "")
         sections.update(bc)  # CAPEX_REALISTISCH_EUR, OPEX_REALISTISCH_EUR, PAYBACK_MONTHS, ROI_12M, etc.
         log.info("[%s] 💰 Business Case calculated: CAPEX=%s, OPEX=%s, Payback=%sm, ROI=%s%%",
@@ -2144,76 +2372,38 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
         except (ValueError, ZeroDivisionError) as e:
             log.warning("[%s] ⚠️ Sensitivity calculation failed: %s", run_id, e)
 
-        # FIX: Apply calculated values to HTML sections
-        sections_to_fix = [
-            'BUSINESS_CASE_HTML',
-            'LEAD_BUSINESS_DETAIL',
-            'EXECUTIVE_SUMMARY_HTML',
-            'QUICK_WINS_HTML',
-            'PILOT_PLAN_HTML',
-            'ORG_CHANGE_HTML',
-            'ROADMAP_12M_HTML',
-            'GAMECHANGER_HTML',
-            'REIFEGRAD_SOWHAT_HTML',
-            'RECOMMENDATIONS_HTML',
-            'BUSINESS_ROI_HTML',
-            'BUSINESS_COSTS_HTML',
-        ]
-
-        # Get qw_hours_total from sections or calculate fallback
-        qw_hours = sections.get('qw_hours_total', 36)
-
-        replacements = {
-            # Single-brace patterns (GPT sometimes generates these)
-            '{CAPEX_REALISTISCH_EUR}': str(int(bc.get('CAPEX_REALISTISCH_EUR', 6000))),
-            '{OPEX_REALISTISCH_EUR}': str(int(bc.get('OPEX_REALISTISCH_EUR', 120))),
-            '{EINSPARUNG_MONAT_EUR}': str(int(bc.get('EINSPARUNG_MONAT_EUR', 4500))),
-            '{PAYBACK_MONTHS}': str(round(bc.get('PAYBACK_MONTHS', 2.9), 1)),
-            '{ROI_12M}': f"{bc.get('ROI_12M', 0) * 100:.1f}" if bc.get('ROI_12M') else "0",
-            '{ROI_12M_EUR}': str(int(bc.get('ROI_12M_EUR', 0))),
-            '{COMPANY_SIZE}': answers.get('unternehmensgroesse', 'solo'),
-            '{qw_hours_total}': str(qw_hours),
-            # Double-brace patterns (Jinja2-style that GPT may use)
-            '{{CAPEX_REALISTISCH_EUR}}': str(int(bc.get('CAPEX_REALISTISCH_EUR', 6000))),
-            '{{OPEX_REALISTISCH_EUR}}': str(int(bc.get('OPEX_REALISTISCH_EUR', 120))),
-            '{{EINSPARUNG_MONAT_EUR}}': str(int(bc.get('EINSPARUNG_MONAT_EUR', 4500))),
-            '{{PAYBACK_MONTHS}}': str(round(bc.get('PAYBACK_MONTHS', 2.9), 1)),
-            '{{ROI_12M}}': f"{bc.get('ROI_12M', 0) * 100:.1f}" if bc.get('ROI_12M') else "0",
-            '{{qw_hours_total}}': str(qw_hours),
-            '{{ qw_hours_total }}': str(qw_hours),
+        # Business-Case-Platzhalter, die nur hier bekannt sind (Rest: _exec_placeholder_values)
+        roi = bc.get('ROI_12M')
+        bc_placeholders = {
+            'CAPEX_REALISTISCH_EUR': str(int(bc.get('CAPEX_REALISTISCH_EUR', 6000))),
+            'OPEX_REALISTISCH_EUR': str(int(bc.get('OPEX_REALISTISCH_EUR', 120))),
+            'EINSPARUNG_MONAT_EUR': str(int(bc.get('EINSPARUNG_MONAT_EUR', 4500))),
+            'PAYBACK_MONTHS': str(round(bc.get('PAYBACK_MONTHS', 2.9), 1)),
+            'ROI_12M': f"{roi * 100:.1f}" if roi else "0",
+            'ROI_12M_EUR': str(int(bc.get('ROI_12M_EUR', 0))),
+            'COMPANY_SIZE': answers.get('unternehmensgroesse', 'solo'),
         }
 
-        replaced_count = 0
-        for section_key in sections_to_fix:
-            if section_key in sections and isinstance(sections[section_key], str):
-                original = sections[section_key]
-                for old_val, new_val in replacements.items():
-                    sections[section_key] = sections[section_key].replace(old_val, new_val)
-                if original != sections[section_key]:
-                    replaced_count += 1
-
-        if replaced_count > 0:
-            log.info("[%s] 🔧 Business Case variables replaced in %s sections", run_id, replaced_count)
-
-    sections.update(build_extra_sections(answers, scores))
+    sections.update(results["extra_sections"])
 
     # === Placeholder-Fix (jetzt mit Business Case Variablen verfügbar!) ===
+    # Ein Scan je Section für alle Platzhalter ({X}, {{X}}, {{ X }}) statt Keys × Sections Ersetzungen
     try:
-        placeholder_fix_count = 0
-        for key, value in sections.items():
-            if isinstance(value, str) and ("{" in value):
-                fixed_value = _fix_exec_placeholders(value, scores, sections, sections.get("report_date", ""))
-                if fixed_value != value:
-                    sections[key] = fixed_value
-                    placeholder_fix_count += 1
+        unresolved: set = set()
+        engine = PlaceholderEngine({**_exec_placeholder_values(scores, sections, sections.get("report_date", "")),
+                                    **bc_placeholders})
+        placeholder_fix_count = engine.apply_all(sections, unresolved=unresolved)
         if placeholder_fix_count > 0:
             log.info("[%s] 🔧 Fixed placeholders in %s sections", run_id, placeholder_fix_count)
+        if unresolved:
+            log.info("[%s] ℹ️ Unresolved placeholders in sections: %s", run_id, sorted(unresolved)[:5])
     except Exception as _exc:
         log.warning("[%s] ⚠️ Placeholder fix failed: %s", run_id, _exc)
 
     # === CONTENT FILTER - Apply size-appropriate replacements ===
     from services.report_validator import validate_report, filter_all_sections
 
+    trace.stage("validation")
     log.info(f"[{run_id}] 🔍 Applying size-inappropriate content filter...")
     sections = filter_all_sections(sections, answers)
 
@@ -2231,22 +2421,18 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
 
     # Benchmarks / Starter-Stacks / Responsible AI
     if build_benchmarks_section:
-        sections["benchmarks_html"] = build_benchmarks_section(scores)
+        sections["benchmarks_html"] = results["benchmarks"]
         sections["BENCHMARKS_HTML"] = sections["benchmarks_html"]  # Uppercase alias für Kompatibilität
 
     if build_starter_stacks:
-        sections["starter_stacks_html"] = build_starter_stacks(answers)
+        sections["starter_stacks_html"] = results["starter_stacks"]
         sections["STARTER_STACKS_HTML"] = sections["starter_stacks_html"]  # Uppercase alias für Kompatibilität
 
     if build_responsible_ai_section:
-        sections["responsible_ai_html"] = build_responsible_ai_section({
-            "four_pillars": "knowledge/four_pillars.html",
-            "legal_pitfalls": "knowledge/legal_pitfalls.html",
-            "ten_20_70": "knowledge/ten_20_70.html",
-            "kmu_keypoints": "knowledge/kmu_keypoints.html"
-        })
+        sections["responsible_ai_html"] = results["responsible_ai"]
         sections["RESPONSIBLE_AI_HTML"] = sections["responsible_ai_html"]  # Uppercase alias für Kompatibilität
 
+    trace.stage("render")
     result = render(
         br,
         run_id=run_id,
@@ -2260,16 +2446,20 @@ def analyze_briefing(db: Session, briefing_id: int, run_id: str) -> tuple[int, s
         }
     )
     
+    trace.stage("persist_analysis")
+    an_meta = dict(result.get("meta", {}) or {})
+    an_meta["timings"] = trace.to_dict()
     an = Analysis(
         user_id=br.user_id, 
         briefing_id=briefing_id, 
         html=result["html"], 
-        meta=result.get("meta", {}), 
+        meta=an_meta, 
         created_at=datetime.now(timezone.utc)
     )
     db.add(an)
     db.commit()
     db.refresh(an)
+    trace.stage(None)
     
     log.info("[%s] ✅ Analysis created (v4.14.0-GOLD-PLUS): id=%s", run_id, an.id)
     return an.id, result["html"], result.get("meta", {})
@@ -2345,8 +2535,15 @@ def _build_briefing_summary_html(br: Briefing, rep: Report, user_email: str) ->
     return metrics + scores_html + answers_html
 
 # -------------------- runner (kept from original) ----------------
-def _fetch_pdf_if_needed(pdf_url: Optional[str], pdf_bytes: Optional[bytes]) -> Optional[bytes]:
+def _fetch_pdf_if_needed(pdf_url: Optional[str], pdf_bytes: Optional[bytes],
+                         cache_key: Optional[str] = None) -> Optional[bytes]:
     if pdf_bytes: return pdf_bytes
+    # PDF-Cache (services/pdf_cache.py): schon einmal geladene URL-Antwort für dasselbe HTML
+    cache = get_pdf_cache() if cache_key else None
+    if cache is not None:
+        cached = cache.get(cache_key)
+        if cached:
+            return cached
     if not pdf_url: return None
 
     # SECURITY: Validate URL to prevent SSRF attacks
@@ -2357,15 +2554,19 @@ def _fetch_pdf_if_needed(pdf_url: Optional[str], pdf_bytes: Optional[bytes]) ->
     try:
         r = requests.get(pdf_url, timeout=30)
         if r.ok:
+            if cache is not None:
+                cache.put(cache_key, bytes(r.content))
             return bytes(r.content)
     except Exception as e:
         log.warning("Failed to fetch PDF from URL: %s", str(e)[:100])
         return None
     return None
 
-def _send_emails(db: Session, rep: Report, br: Briefing, pdf_url: Optional[str], pdf_bytes: Optional[bytes], run_id: str) -> None:
+def _send_emails(db: Session, rep: Report, br: Briefing, pdf_url: Optional[str], pdf_bytes: Optional[bytes], run_id: str,
+                 pdf_cache_key: Optional[str] = None) -> None:
     """Send emails via Resend API"""
-    best_pdf = _fetch_pdf_if_needed(pdf_url, pdf_bytes)
+    with trace_span("fetch_pdf"):
+        best_pdf = _fetch_pdf_if_needed(pdf_url, pdf_bytes, pdf_cache_key)
     attachments_admin: List[Dict[str, Any]] = []
     if best_pdf:
         attachments_admin.append({
@@ -2413,12 +2614,14 @@ def _send_emails(db: Session, rep: Report, br: Briefing, pdf_url: Optional[str],
         
         if user_email:
             user_attachments = [] if pdf_url else attachments_admin[:1]
-            ok, err = _send_email_via_resend(
-                user_email, 
-                "Ihr KI‑Status‑Report ist fertig", 
-                render_report_ready_email(recipient="user", pdf_url=pdf_url),
-                attachments=user_attachments
-            )
+            with trace_span("email:user") as sp:
+                ok, err = _send_email_via_resend(
+                    user_email, 
+                    "Ihr KI‑Status‑Report ist fertig", 
+                    render_report_ready_email(recipient="user", pdf_url=pdf_url),
+                    attachments=user_attachments
+                )
+                sp["ok"] = ok
             if ok: 
                 log.info("[%s] 📧 Mail sent to user %s via Resend", run_id, _mask_email(user_email))
             else: 
@@ -2438,16 +2641,18 @@ def _send_emails(db: Session, rep: Report, br: Briefing, pdf_url: Optional[str],
                 log.warning("[%s] ⚠️ Could not generate briefing summary HTML: %s", run_id, str(e))
 
             for addr in _admin_recipients():
-                ok, err = _send_email_via_resend(
-                    addr,
-                    f"Neuer KI‑Status‑Report – Analysis #{rep.analysis_id} / Briefing #{rep.briefing_id}",
-                    render_report_ready_email(
-                        recipient="admin",
-                        pdf_url=pdf_url,
-                        briefing_summary_html=briefing_summary_html
-                    ),
-                    attachments=attachments_admin
-                )
+                with trace_span("email:admin", to=_mask_email(addr)) as sp:
+                    ok, err = _send_email_via_resend(
+                        addr,
+                        f"Neuer KI‑Status‑Report – Analysis #{rep.analysis_id} / Briefing #{rep.briefing_id}",
+                        render_report_ready_email(
+                            recipient="admin",
+                            pdf_url=pdf_url,
+                            briefing_summary_html=briefing_summary_html
+                        ),
+                        attachments=attachments_admin
+                    )
+                    sp["ok"] = ok
                 if ok:
                     log.info("[%s] 📧 Admin notify sent to %s via Resend", run_id, _mask_email(addr))
                 else:
@@ -2463,11 +2668,31 @@ def run_async(briefing_id: int, email: Optional[str] = None) -> None:
     run_id = f"run-{uuid.uuid4().hex[:8]}"
     if core.db is None or not hasattr(core.db, 'SessionLocal'):
         raise RuntimeError("database_unavailable")
+    with use_trace(RunTrace(run_id)) as trace:
+        _run_traced(briefing_id, email, run_id, trace)
+
+def _persist_timings(db: Session, an_id: Optional[int], trace: RunTrace) -> None:
+    """Schreibt die vollständigen Timings (inkl. PDF/E-Mail) nachträglich in ``Analysis.meta``."""
+    if not an_id:
+        return
+    try:
+        an = db.get(Analysis, an_id)
+        if an is not None:
+            an.meta = {**(an.meta or {}), "timings": trace.to_dict()}
+            db.add(an)
+            db.commit()
+    except Exception as exc:
+        db.rollback()
+        log.warning("[%s] ⚠️ Could not persist timings: %s", trace.run_id, exc)
+
+def _run_traced(briefing_id: int, email: Optional[str], run_id: str, trace: RunTrace) -> None:
     db = core.db.SessionLocal()
     rep: Optional[Report] = None
+    an_id: Optional[int] = None
     try:
         log.info("[%s] 🚀 Starting analysis v4.14.0-GOLD-PLUS for briefing_id=%s", run_id, briefing_id)
-        an_id, html, meta = analyze_briefing(db, briefing_id, run_id=run_id)
+        with trace.span("analyze_briefing"):
+            an_id, html, meta = analyze_briefing(db, briefing_id, run_id=run_id)
         br = db.get(Briefing, briefing_id)
         rep = Report(
             user_id=br.user_id if br else None, 
@@ -2487,7 +2712,11 @@ def run_async(briefing_id: int, email: Optional[str] = None) -> None:
         
         if DBG_PDF: 
             log.debug("[%s] 📄 pdf_render start", run_id)
-        pdf_info = render_pdf_from_html(html, meta={"analysis_id": an_id, "briefing_id": briefing_id, "run_id": run_id})
+        with trace.span("pdf_service") as sp:
+            pdf_info = render_pdf_from_html(html, meta={"analysis_id": an_id, "briefing_id": briefing_id, "run_id": run_id})
+            sp["bytes"] = len(pdf_info.get("pdf_bytes") or b"") or None
+            sp["error"] = pdf_info.get("error") or None
+            sp["cached"] = bool(pdf_info.get("cached")) or None
         pdf_url = pdf_info.get("pdf_url")
         pdf_bytes = pdf_info.get("pdf_bytes")
         pdf_error = pdf_info.get("error")
@@ -2519,7 +2748,7 @@ def run_async(briefing_id: int, email: Optional[str] = None) -> None:
         db.commit()
         db.refresh(rep)
         
-        _send_emails(db, rep, br, pdf_url, pdf_bytes, run_id)
+        _send_emails(db, rep, br, pdf_url, pdf_bytes, run_id, pdf_info.get("cache_key"))
         
     except Exception as exc:
         log.error("[%s] ❌ Analysis failed: %s", run_id, exc, exc_info=True)
@@ -2533,6 +2762,7 @@ def run_async(briefing_id: int, email: Optional[str] = None) -> None:
             db.commit()
         raise
     finally:
+        _persist_timings(db, an_id, trace)
         db.close()
 
 def _section_temperature(section_name: str) -> float:
@@ -2549,23 +2779,9 @@ def _section_temperature(section_name: str) -> float:
         return 0.2
 
 
-def _fix_exec_placeholders(html_block: str, scores: Dict[str, Any], sections: Dict[str, Any], report_date: str) -> str:
-    """Ersetzt eventuell mit-ausgegebenen Prompt-Platzhalter in der Executive Summary (Robustheits-Fix).
-
-    FIX: Ersetzt BEIDE Varianten - mit doppelten {{}} UND einfachen {} geschweiften Klammern,
-    da GPT manchmal einfache Klammern zurückgibt.
-
-    Args:
-        html_block: HTML-String zum Fixen
-        scores: Score-Dictionary
-        sections: Sections-Dictionary mit allen verfügbaren Werten
-        report_date: Berichtsdatum
-    """
-    if not html_block:
-        return html_block
-
-    # Mapping: Platzhalter -> Wert (aus sections oder scores)
-    replacements = {
+def _exec_placeholder_values(scores: Dict[str, Any], sections: Dict[str, Any], report_date: str) -> Dict[str, str]:
+    """Mapping Platzhalter → Wert (aus sections oder scores) für ``_fix_exec_placeholders``."""
+    values = {
         "heute_iso": report_date,
         "report_date": report_date,
         "score_gov": str(scores.get("governance", 0)),
@@ -2604,20 +2820,25 @@ def _fix_exec_placeholders(html_block: str, scores: Dict[str, Any], sections: Di
         "ROI_12M": f"{float(sections.get('ROI_12M', 0) or 0) * 100:.1f}",
         "qw_hours_total": str(sections.get("qw_hours_total", 36)),
     }
+    # Entferne fälschlich von GPT kopierte Template-Platzhalter (sollten nie im Output sein!)
+    for tpl in ("TOOLS_TABLE_HTML", "FUNDING_TABLE_HTML", "NEWS_BOX_HTML",
+                "TOOLS_HTML", "FUNDING_HTML", "FOERDERPROGRAMME_HTML"):
+        values[tpl] = ""
+    return values
 
-    fixed = html_block
-    for placeholder, value in replacements.items():
-        # Ersetze BEIDE Varianten: {{placeholder}} UND {placeholder}
-        fixed = fixed.replace(f"{{{{{placeholder}}}}}", str(value))  # Doppelte {{}}
-        fixed = fixed.replace(f"{{{placeholder}}}", str(value))       # Einfache {}
 
-    # Entferne fälschlich von GPT kopierte Template-Platzhalter (sollten nie im Output sein!)
-    template_placeholders = [
-        "TOOLS_TABLE_HTML", "FUNDING_TABLE_HTML", "NEWS_BOX_HTML",
-        "TOOLS_HTML", "FUNDING_HTML", "FOERDERPROGRAMME_HTML"
-    ]
-    for tpl in template_placeholders:
-        fixed = fixed.replace(f"{{{{{tpl}}}}}", "")  # Doppelte {{}}
-        fixed = fixed.replace(f"{{{tpl}}}", "")       # Einfache {}
+def _fix_exec_placeholders(html_block: str, scores: Dict[str, Any], sections: Dict[str, Any], report_date: str) -> str:
+    """Ersetzt eventuell mit-ausgegebenen Prompt-Platzhalter in der Executive Summary (Robustheits-Fix).
+
+    FIX: Ersetzt BEIDE Varianten - mit doppelten {{}} UND einfachen {} geschweiften Klammern,
+    da GPT manchmal einfache Klammern zurückgibt (ein Durchlauf, services/placeholder_engine.py).
 
-    return fixed
\ No newline at end of file
+    Args:
+        html_block: HTML-String zum Fixen
+        scores: Score-Dictionary
+        sections: Sections-Dictionary mit allen verfügbaren Werten
+        report_date: Berichtsdatum
+    """
+    if not html_block:
+        return html_block
+    return PlaceholderEngine(_exec_placeholder_values(scores, sections, report_date)).apply(html_block)
\ No newline at end of file
@@ -26,7 +26,7 @@ from typing import List, Tuple, Dict, Any
 
 from fastapi import FastAPI, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, RedirectResponse, FileResponse
+from fastapi.responses import JSONResponse, RedirectResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 
@@ -73,8 +73,45 @@ async def lifespan(app: FastAPI):
         log.error("✗ Auth setup failed: %s", exc)
         log.error("⚠️  LOGIN WILL NOT WORK - Check database connection")
 
+    # Analyse-Queue: Tabelle sicherstellen + Worker-Pool (ANALYSIS_WORKERS=0 → externer Worker)
+    job_queue = None
+    pool = None
+    try:
+        from services import job_queue
+        job_queue.ensure_jobs_table()
+        log.info("✓ Analysis job table ready")
+        pool = job_queue.start_worker_pool()
+        if pool is not None:
+            log.info("✓ Analysis worker pool started (%d workers)", pool.size)
+    except Exception as exc:
+        log.error("✗ Analysis queue setup failed: %s", exc)
+
+    # Report-Template einmal kompilieren + validieren (statt pro Report); Reload: POST /admin/templates/reload
+    try:
+        from services.report_renderer import get_renderer
+        from utils.logo_embedder import get_asset_registry
+        get_renderer().validate()
+        log.info("✓ Report template compiled, %d logo assets registered", len(get_asset_registry().assets))
+    except Exception as exc:
+        log.error("✗ Report template validation failed: %s", exc)
+
+    # Research-Prefetcher: RSS-Feeds + Förder-/Tool-Seiten im Hintergrund (RESEARCH_PREFETCH=0 → aus).
+    # Läuft dort, wo die Reports laufen: hier nur mit In-Process-Workern, sonst in scripts/analysis_worker.py.
+    research_prefetch = None
+    if pool is not None:
+        try:
+            from services import research_prefetch
+            if research_prefetch.start_prefetcher() is not None:
+                log.info("✓ Research prefetcher started (every %ss)", os.getenv("RESEARCH_PREFETCH_INTERVAL_SEC", "900"))
+        except Exception as exc:
+            log.error("✗ Research prefetcher setup failed: %s", exc)
+
     yield
 
+    if research_prefetch is not None:
+        research_prefetch.stop_prefetcher()
+    if job_queue is not None:
+        job_queue.stop_worker_pool()
     log.info("Shutting down KI-Backend...")
 
 
@@ -428,6 +465,19 @@ if os.path.exists("public"):
 else:
     log.debug("ℹ️  Public directory not found - Test-Dashboard not available")
 
+# ---------------------------------------------------------------------------
+# Report-Logos (gespeicherte/Admin-HTML referenziert /report-assets/<name>?v=<hash>)
+# ---------------------------------------------------------------------------
+@app.get("/report-assets/{name}", include_in_schema=False)
+def serve_report_asset(name: str):
+    from utils.logo_embedder import get_asset_registry
+    asset = get_asset_registry().assets.get(name)
+    if asset is None:
+        return JSONResponse(content={"error": "asset_not_found"}, status_code=404)
+    # URL trägt den Content-Hash → unbegrenzt cachebar
+    return Response(asset.data, media_type=asset.mime,
+                    headers={"Cache-Control": "public, max-age=31536000, immutable", "ETag": f'"{asset.sha}"'})
+
 # Prüfen & ggf. Alias anlegen (nur wenn Doppel-Prefix erkannt)
 _check_and_alias_submit_path()
 
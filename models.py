@@ -132,6 +132,44 @@ class Report(Base):
         return f"<Report id={self.id} status={self.status!r}>"
 
 
+class AnalysisJob(Base):
+    """Persistierter Analyse-Job (Queue). Worker claimen per Lease; abgelaufene Leases werden neu vergeben."""
+    __tablename__ = "analysis_jobs"
+    __table_args__ = (
+        Index("ix_analysis_jobs_status_run_after", "status", "run_after"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    briefing_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("briefings.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    email: Mapped[Optional[str]] = mapped_column(String(320), nullable=True)
+    source: Mapped[str] = mapped_column(String(40), default="api", nullable=False)
+    # queued | running | done | failed
+    status: Mapped[str] = mapped_column(String(16), default="queued", nullable=False)
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    max_attempts: Mapped[int] = mapped_column(Integer, default=3, nullable=False)
+    run_after: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    lease_owner: Mapped[Optional[str]] = mapped_column(String(128), nullable=True)
+    lease_until: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
+    def __repr__(self) -> str:  # pragma: no cover
+        return f"<AnalysisJob id={self.id} briefing_id={self.briefing_id} status={self.status!r}>"
+
+
 class LoginCode(Base):
     __tablename__ = "login_codes"
     __table_args__ = (
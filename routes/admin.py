@@ -4,7 +4,7 @@ routes.admin – gehärtet gegen fehlende DB/Module
 - Keine harten DB/Model‑Imports beim Modul‑Load
 - get_db als Dependency liefert 503, wenn DB nicht bereit
 - Models werden pro Endpoint lazy importiert
-- gpt_analyze nur im betroffenen Endpoint importieren
+- gpt_analyze wird hier nicht importiert; Reruns laufen über die Job-Queue
 """
 from __future__ import annotations
 
@@ -13,7 +13,7 @@ import logging
 import os
 from typing import Any, Dict, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse, HTMLResponse
 
 log = logging.getLogger("routes.admin")
@@ -204,6 +204,20 @@ def list_analyses(
     ]
     return {"ok": True, "total": total, "rows": items}
 
+@router.get("/timings", response_model=None)
+def timings_summary(
+    limit: int = Query(200, ge=1, le=1000),
+    db = Depends(get_db),
+    user = Depends(get_current_user()),
+):
+    """p50/p95 je Stage, DAG-Knoten, Research-Provider und LLM-Label über die letzten Runs."""
+    _require_admin(user)
+    User, Briefing, Analysis, Report = _models()
+    from services.run_trace import summarize
+    rows = db.query(Analysis.meta).order_by(Analysis.id.desc()).limit(limit).all()
+    timings = [(m or {}).get("timings") for (m,) in rows if isinstance(m, dict) and m.get("timings")]
+    return {"ok": True, "summary": summarize(timings)}
+
 @router.get("/analyses/{analysis_id}", response_model=None)
 def get_analysis(
     analysis_id: int,
@@ -222,6 +236,7 @@ def get_analysis(
             "briefing_id": a.briefing_id,
             "user_id": a.user_id,
             "meta": getattr(a, "meta", {}),
+            "timings": (getattr(a, "meta", None) or {}).get("timings"),
             "html_len": len(getattr(a, "html", "") or ""),
             "created_at": _iso(getattr(a, "created_at", None)),
         },
@@ -294,18 +309,127 @@ def list_reports_for_briefing(
 @router.post("/briefings/{briefing_id}/rerun", response_model=None)
 def rerun_generation(
     briefing_id: int,
-    background: BackgroundTasks,
     db = Depends(get_db),
     user = Depends(get_current_user()),
 ):
     _require_admin(user)
-    # gpt_analyze nur hier importieren (nicht beim Modul-Load)
+    User, Briefing, Analysis, Report = _models()
+    if not db.get(Briefing, briefing_id):
+        raise HTTPException(status_code=404, detail="briefing_not_found")
     try:
-        from gpt_analyze import run_async
+        from services.job_queue import enqueue_analysis
     except (ImportError, RuntimeError) as exc:
-        raise HTTPException(status_code=503, detail=f"analyzer_unavailable: {exc}")
-    background.add_task(run_async, briefing_id, None)
-    return {"ok": True, "queued": True}
+        raise HTTPException(status_code=503, detail=f"queue_unavailable: {exc}")
+    job = enqueue_analysis(db, briefing_id, None, source="admin.rerun")
+    return {"ok": True, "queued": True, "job_id": job.id}
+
+@router.get("/jobs", response_model=None)
+def list_jobs(
+    status: Optional[str] = Query(None, description="queued|running|done|failed"),
+    limit: int = Query(50, ge=1, le=200),
+    db = Depends(get_db),
+    user = Depends(get_current_user()),
+):
+    _require_admin(user)
+    try:
+        from models import AnalysisJob
+        from services.job_queue import queue_stats
+    except (ImportError, RuntimeError) as exc:
+        raise HTTPException(status_code=503, detail=f"queue_unavailable: {exc}")
+    qry = db.query(AnalysisJob).order_by(AnalysisJob.id.desc())
+    if status:
+        qry = qry.filter(AnalysisJob.status == status)
+    items = [
+        {
+            "id": j.id,
+            "briefing_id": j.briefing_id,
+            "source": j.source,
+            "status": j.status,
+            "attempts": j.attempts,
+            "max_attempts": j.max_attempts,
+            "run_after": _iso(j.run_after),
+            "lease_owner": j.lease_owner,
+            "heartbeat_at": _iso(j.heartbeat_at),
+            "last_error": j.last_error,
+            "created_at": _iso(j.created_at),
+            "finished_at": _iso(j.finished_at),
+        }
+        for j in qry.limit(limit).all()
+    ]
+    return {"ok": True, "stats": queue_stats(db), "rows": items}
+
+@router.get("/llm/governor", response_model=None)
+def llm_governor_stats(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.llm_client import governor_stats
+    return {"ok": True, "governor": governor_stats()}
+
+@router.get("/llm/cache", response_model=None)
+def llm_cache_stats(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.llm_cache import get_llm_cache
+    cache = get_llm_cache()
+    return {"ok": True, "cache": cache.stats() if cache else {"enabled": False}}
+
+@router.post("/llm/cache/clear", response_model=None)
+def llm_cache_clear(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.llm_cache import get_llm_cache
+    cache = get_llm_cache()
+    return {"ok": True, "deleted": cache.clear() if cache else 0}
+
+@router.get("/pdf/cache", response_model=None)
+def pdf_cache_stats(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.pdf_cache import get_pdf_cache
+    cache = get_pdf_cache()
+    return {"ok": True, "cache": cache.stats() if cache else {"enabled": False}}
+
+@router.post("/pdf/cache/clear", response_model=None)
+def pdf_cache_clear(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.pdf_cache import get_pdf_cache
+    cache = get_pdf_cache()
+    return {"ok": True, "deleted": cache.clear() if cache else 0}
+
+@router.get("/research/cache", response_model=None)
+def research_cache_stats(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.research_cache import get_research_cache
+    from services.research_clients import conditional_stats
+    return {"ok": True, "cache": get_research_cache().stats(), "conditional_get": conditional_stats()}
+
+@router.get("/research/sources", response_model=None)
+def research_sources_status(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.research_fetch import fetch_stats
+    from services.research_prefetch import get_prefetcher
+    pf = get_prefetcher()
+    if pf is None:
+        return {"ok": True, "running": False, "sources": {}, "fetch": fetch_stats()}
+    return {"ok": True, "running": pf.running, "cycles": pf.cycles, "interval_sec": pf.interval_sec,
+            "sources": pf.snapshot(), "fetch": fetch_stats()}
+
+@router.post("/research/cache/clear", response_model=None)
+def research_cache_clear(namespace: Optional[str] = None, user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.research_cache import get_research_cache
+    return {"ok": True, "namespace": namespace, "deleted": get_research_cache().clear(namespace)}
+
+@router.get("/templates", response_model=None)
+def report_templates_status(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.report_renderer import get_renderer
+    return {"ok": True, "renderer": get_renderer().stats()}
+
+@router.post("/templates/reload", response_model=None)
+def report_templates_reload(user = Depends(get_current_user())):
+    _require_admin(user)
+    from services.report_renderer import get_renderer
+    try:
+        return {"ok": True, **get_renderer().reload()}
+    except Exception as exc:
+        raise HTTPException(status_code=422, detail=f"template_invalid: {exc}")
 
 @router.get("/briefings/{briefing_id}/export.zip", response_model=None)
 def export_briefing_zip(
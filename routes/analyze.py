@@ -26,7 +26,7 @@ def run(body: RunAnalyze, request: Request, db = Depends(get_db)) -> dict:
     """
     Manually trigger GPT analysis for a briefing.
 
-    Starts the asynchronous analysis process for the specified briefing.
+    Enqueues an analysis job for the specified briefing; a worker runs it.
     Supports dry-run mode for CI/smoke tests via x-dry-run header.
 
     Args:
@@ -35,11 +35,11 @@ def run(body: RunAnalyze, request: Request, db = Depends(get_db)) -> dict:
         db: Database session
 
     Returns:
-        dict: Acceptance status with briefing_id
+        dict: Acceptance status with briefing_id and job_id
 
     Raises:
         HTTPException 404: Briefing not found
-        HTTPException 503: Models or analyzer unavailable
+        HTTPException 503: Models or job queue unavailable
     """
     # CI/Smoke: kein echtes LLM, nur Importprobe
     if (request.headers.get("x-dry-run", "").lower() in {"1", "true", "yes"}):
@@ -55,8 +55,8 @@ def run(body: RunAnalyze, request: Request, db = Depends(get_db)) -> dict:
     if not br:
         raise HTTPException(status_code=404, detail="Briefing not found")
     try:
-        from gpt_analyze import run_async
+        from services.job_queue import enqueue_analysis
     except (ImportError, RuntimeError) as exc:
-        raise HTTPException(status_code=503, detail=f"analyzer_unavailable: {exc}")
-    run_async(body.briefing_id, body.email_override)
-    return {"accepted": True, "briefing_id": body.briefing_id}
\ No newline at end of file
+        raise HTTPException(status_code=503, detail=f"queue_unavailable: {exc}")
+    job = enqueue_analysis(db, body.briefing_id, body.email_override, source="analyze.run")
+    return {"accepted": True, "briefing_id": body.briefing_id, "job_id": job.id}
\ No newline at end of file
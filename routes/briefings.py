@@ -44,8 +44,8 @@ async def submit_briefing(
     """
     Submit a briefing for KI-Readiness assessment.
 
-    Saves the briefing answers to the database and optionally triggers
-    GPT analysis. Authentication is optional but recommended.
+    Saves the briefing answers to the database and optionally enqueues
+    a GPT analysis job. Authentication is optional but recommended.
 
     Args:
         payload: Briefing data with language, answers, and analysis flag
@@ -53,7 +53,7 @@ async def submit_briefing(
         db: Database session
 
     Returns:
-        dict: Status with briefing_id and analysis_queued flag
+        dict: Status with briefing_id, analysis_queued flag and job_id
 
     Raises:
         HTTPException 401: Invalid or expired token (if provided)
@@ -140,22 +140,23 @@ async def submit_briefing(
         log.info("✅ Briefing saved to database: ID=%s, user_id=%s, len=%s",
                  briefing.id, user_id, len(json.dumps(payload.answers)))
 
-        # Analyse triggern wenn gewünscht
+        # Analyse nur einreihen – Worker (services/job_queue.py) führen sie aus
+        job_id = None
         if payload.queue_analysis:
             try:
-                from gpt_analyze import run_async
-                log.info("🚀 Triggering analysis for briefing_id=%s", briefing.id)
-                run_async(briefing.id, authenticated_user)
-                log.info("✅ Analysis queued for briefing_id=%s", briefing.id)
+                from services.job_queue import enqueue_analysis
+                job = enqueue_analysis(db, briefing.id, authenticated_user, source="briefings.submit")
+                job_id = job.id
             except Exception as e:
-                log.error("❌ Failed to trigger analysis: %s", str(e), exc_info=True)
+                log.error("❌ Failed to enqueue analysis: %s", str(e), exc_info=True)
                 # Nicht abbrechen - Briefing ist gespeichert, Analyse kann später manuell getriggert werden
 
         return {
             "status": "queued",
             "lang": payload.lang,
             "briefing_id": briefing.id,
-            "analysis_queued": payload.queue_analysis
+            "analysis_queued": job_id is not None,
+            "job_id": job_id,
         }
 
     except Exception as e:
@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 from datetime import datetime, timezone
-import asyncio
 from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
 
+from routes._bootstrap import get_db
+
 router = APIRouter(prefix="/report", tags=["report"])
 
 
@@ -32,49 +33,39 @@ async def fetch_report(id: int) -> Dict[str, Any]:
     return {"id": id, "status": "lookup-not-implemented"}
 
 
-@router.post("/generate")
-async def generate(payload: Dict[str, Any]) -> Dict[str, Any]:
+@router.post("/generate", status_code=202)
+async def generate(payload: Dict[str, Any], db=Depends(get_db)) -> Dict[str, Any]:
     """
-    Generate a report by triggering GPT analysis.
+    Generate a report by enqueueing a GPT analysis job.
 
-    Thin wrapper that defers heavy imports until the endpoint is called.
-    Avoids router import failures when optional modules are temporarily broken.
+    The request only persists a job; the analysis worker pool picks it up.
+    Heavy imports stay deferred until the endpoint is called.
 
     Args:
         payload: Flexible dict containing briefing_id and optional parameters
                  (answers, lang, email, etc.)
 
     Returns:
-        dict: {"ok": True} on successful queue
+        dict: {"ok": True, "queued": True, "job_id": ...}
 
     Raises:
-        HTTPException 503: Analyzer module unavailable
+        HTTPException 422: briefing_id missing or invalid
+        HTTPException 503: Job queue unavailable
     """
     try:
-        from gpt_analyze import run_async  # lazy import to prevent router mount failures
+        from services.job_queue import enqueue_analysis  # lazy import to prevent router mount failures
     except Exception as exc:  # pragma: no cover
         raise HTTPException(
             status_code=503,
-            detail=f"Analyzer unavailable: {exc.__class__.__name__}: {exc}",
+            detail=f"Queue unavailable: {exc.__class__.__name__}: {exc}",
         ) from exc
 
-    # Support sync/async implementations transparently
-    # Note: run_async returns None, it's a fire-and-forget operation
-    # It expects briefing_id as int, not a dict
     try:
-        briefing_id = payload.get("briefing_id", 0)
-        if asyncio.iscoroutinefunction(run_async):
-            await run_async(briefing_id)  # type: ignore[func-returns-value]
-        else:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, lambda: run_async(briefing_id))
-    except (TypeError, KeyError):
-        # Fall back - try with payload directly if it's already an int
-        fallback_id = payload if isinstance(payload, int) else 0  # type: ignore[unreachable]
-        if asyncio.iscoroutinefunction(run_async):
-            await run_async(fallback_id)  # type: ignore[func-returns-value]
-        else:
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(None, lambda: run_async(fallback_id))
-
-    return {"ok": True}
+        briefing_id = int(payload.get("briefing_id") or 0)
+    except (TypeError, ValueError):
+        briefing_id = 0
+    if briefing_id <= 0:
+        raise HTTPException(status_code=422, detail="briefing_id_required")
+
+    job = enqueue_analysis(db, briefing_id, payload.get("email") or None, source="report.generate")
+    return {"ok": True, "queued": True, "job_id": job.id}
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""
+scripts/analysis_worker.py – eigenständiger Worker-Prozess für die Analyse-Queue
+Arbeitet Jobs aus ``analysis_jobs`` ab (LLM + PDF + Mail), unabhängig vom Web-Prozess.
+Startet auch den Research-Prefetcher, da die Reports (und damit ``run_research``) hier laufen.
+ENV:
+  DATABASE_URL (Pflicht), ANALYSIS_WORKERS (Threads in diesem Prozess, Default 2)
+  RESEARCH_PREFETCH (Default 1) – siehe services/research_prefetch.py
+  Web-Pods mit ANALYSIS_WORKERS=0 starten, damit nur dieser Prozess Jobs zieht.
+Start:
+  python -m scripts.analysis_worker
+"""
+import logging
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+logging.basicConfig(
+    level=(os.getenv("LOG_LEVEL") or "INFO").upper(),
+    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+log = logging.getLogger("analysis-worker")
+
+
+def main() -> int:
+    from services import research_prefetch
+    from services.job_queue import WorkerPool, ensure_jobs_table
+
+    ensure_jobs_table()
+    size = max(1, int(os.getenv("ANALYSIS_WORKERS", "2") or "2"))
+    pool = WorkerPool(size).start()
+    log.info("✓ Analysis worker process running (%d threads)", size)
+    try:
+        if research_prefetch.start_prefetcher() is not None:
+            log.info("✓ Research prefetcher started (every %ss)", os.getenv("RESEARCH_PREFETCH_INTERVAL_SEC", "900"))
+    except Exception as exc:
+        log.error("✗ Research prefetcher setup failed: %s", exc)
+
+    stop = threading.Event()
+
+    def _shutdown(signum, _frame):
+        log.info("Signal %s received – draining workers...", signum)
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+    stop.wait()
+    # laufende Jobs dürfen fertig werden; nicht abgeschlossene fallen per Lease-Ablauf zurück in die Queue
+    research_prefetch.stop_prefetcher()
+    pool.stop(timeout=float(os.getenv("ANALYSIS_WORKER_DRAIN_SEC", "30")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""
+scripts/bench_pipeline.py – Offline-Benchmark der kompletten Report-Pipeline
+- Fährt ``analyze_briefing`` + PDF-Aufruf end-to-end gegen aufgezeichnete (``reports/briefing-*.json``)
+  oder synthetische Briefings – ohne einen einzigen externen Request.
+- Alle Fremddienste laufen als Stand-ins in einem lokalen Fake-Server (eigener Prozess, zählt also
+  nicht zur CPU-Zeit): OpenAI Chat Completions, Tavily, Perplexity, RSS-Feeds, Link-Seiten, PDF-Service.
+- Das Fake-LLM hat konfigurierbare Latenz/Jitter sowie Fehler- (HTTP 500) und 429-Raten.
+- Ergebnis: p50/p95 Wall-Zeit, CPU-Zeit, Peak-RSS, Calls je Dienst sowie Dauer/Calls je Stage und
+  LLM-Label (aus ``RunTrace``) als JSON inkl. Git-Commit → Regressionen über Commits via ``--compare``.
+
+Aufruf:
+  python -m scripts.bench_pipeline --iterations 5 --llm-latency-ms 400 --llm-jitter-ms 200
+  python -m scripts.bench_pipeline --synthetic 3 --llm-error-rate 0.05 --llm-429-rate 0.05
+  python -m scripts.bench_pipeline --compare bench_results/<älterer-lauf>.json
+
+ENV (optional, wird an die Pipeline durchgereicht): LLM_RPM, LLM_TPM, ONE_LINER_BATCH, ...
+"""
+import argparse
+import copy
+import hashlib
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Varianten für synthetische Briefings (gültige Werte aus dem Fragebogen)
+_SYN_BRANCHEN = ["marketing", "beratung", "it", "handel", "industrie", "gesundheit"]
+_SYN_GROESSEN = ["solo", "team", "kmu"]
+_SYN_LAENDER = ["be", "by", "nw", "hh", "sn"]
+
+# Pipeline-Schalter, die ins Ergebnis-JSON übernommen werden (Vergleichbarkeit)
+_ENV_PREFIXES = ("LLM_", "ONE_LINER_", "ENABLE_", "OPENAI_MODEL", "RESEARCH_", "PDF_CACHE_")
+
+_RSS_FEEDS = 6      # entspricht AI_ACT_NEWS_RSS + DEFAULT_NEWS_RSS
+_TOOL_PAGES = 1     # TOOLS_PAGES
+_FUNDING_PAGES = 4  # FUNDING_HINT_PAGES
+
+
+# ------------------------------------------------------------------ fake server
+def _fake_section_html(rnd: random.Random, chars: int) -> str:
+    items = "".join(
+        f"<li><strong>Maßnahme {i}</strong>: KI-gestützte Automatisierung im Tagesgeschäft – "
+        f"Ersparnis: {rnd.randint(2, 12)} h/Monat</li>"
+        for i in range(1, 4)
+    )
+    body = ["<h4>Einordnung</h4>", f"<ul>{items}</ul>"]
+    filler = ("Die Umsetzung erfolgt schrittweise mit klaren Verantwortlichkeiten, "
+              "DSGVO-konformer Datenhaltung und messbaren Zielen für die ersten 90 Tage. ")
+    while sum(len(b) for b in body) < chars:
+        body.append(f"<p>{filler * 2}</p>")
+    return "\n".join(body)
+
+
+def _fake_completion(prompt: str, rnd: random.Random, chars: int) -> str:
+    if "Keys exakt:" in prompt:  # One-liner-Batch erwartet ein JSON-Objekt
+        keys = [k.strip() for k in prompt.split("Keys exakt:", 1)[1].split("\n", 1)[0].split(",") if k.strip()]
+        return json.dumps({k: f"Kernaussage {i}; Konsequenz → nächster Schritt" for i, k in enumerate(keys, 1)},
+                          ensure_ascii=False)
+    return _fake_section_html(rnd, chars)
+
+
+def _rss_xml(n: int) -> str:
+    items = "".join(
+        f"<item><title>KI-Förderung und EU AI Act Compliance für KMU – Meldung {n}.{i}</title>"
+        f"<link>https://news{n}.example.org/artikel/{i}</link>"
+        f"<description>&lt;p&gt;Neue Leitlinien zur künstlichen Intelligenz ({i}).&lt;/p&gt;</description>"
+        f"<pubDate>Mon, 06 Jan 2025 10:0{i % 10}:00 GMT</pubDate></item>"
+        for i in range(12)
+    )
+    return ('<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f"<title>Feed {n}</title><link>https://news{n}.example.org/</link>{items}</channel></rss>")
+
+
+def _link_page(n: int) -> str:
+    links = "".join(
+        f'<a href="https://portal{n}.example.org/ki-foerderung-digital-{i}">KI Förderprogramm Digital {n}.{i}</a>'
+        for i in range(60)
+    )
+    return f"<html><head><title>Seite {n}</title></head><body><nav>{links}</nav></body></html>"
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    cfg: Dict[str, Any] = {}
+    counts: Dict[str, int] = {}
+    lock = threading.Lock()
+    rnd = random.Random(0)
+
+    def log_message(self, *args: Any) -> None:  # kein Access-Log
+        pass
+
+    def _count(self, name: str) -> None:
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+    def _sleep(self, base_ms: float, jitter_ms: float = 0.0) -> None:
+        with self.lock:
+            ms = base_ms + (self.rnd.uniform(-jitter_ms, jitter_ms) if jitter_ms else 0.0)
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def _send(self, code: int, body: bytes, ctype: str = "application/json", headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(code)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _static(self, name: str, body: bytes, ctype: str) -> None:
+        # Statische Inhalte mit ETag; If-None-Match-Treffer → 304 ohne Body (gezählt als "<name>_304")
+        etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self._count(f"{name}_304")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self._send(200, body, ctype, headers={"ETag": etag})
+
+    def _json(self, obj: Any, code: int = 200, headers: Optional[Dict[str, str]] = None) -> None:
+        self._send(code, json.dumps(obj, ensure_ascii=False).encode("utf-8"), headers=headers)
+
+    def _body(self) -> bytes:
+        n = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(n) if n else b""
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        cfg = self.cfg
+        if path == "/__stats":
+            with self.lock:
+                return self._json(dict(self.counts))
+        if path == "/__reset":
+            with self.lock:
+                self.counts.clear()
+            return self._json({"ok": True})
+        if path.startswith("/rss/"):
+            self._count("rss")
+            self._sleep(cfg["fetch_latency_ms"])
+            return self._static("rss", _rss_xml(int(path.rsplit("/", 1)[1])).encode("utf-8"), "application/rss+xml")
+        if path.startswith("/page/"):
+            self._count("page")
+            self._sleep(cfg["fetch_latency_ms"])
+            return self._static("page", _link_page(int(path.rsplit("/", 1)[1])).encode("utf-8"), "text/html; charset=utf-8")
+        self._send(404, b"{}")
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        cfg = self.cfg
+        raw = self._body()
+        if path == "/v1/chat/completions":
+            self._count("openai")
+            with self.lock:
+                roll = self.rnd.random()
+            self._sleep(cfg["llm_latency_ms"], cfg["llm_jitter_ms"])
+            if roll < cfg["llm_429_rate"]:
+                self._count("openai_429")
+                return self._json({"error": {"message": "rate limited"}}, 429, {"retry-after-ms": "200"})
+            if roll < cfg["llm_429_rate"] + cfg["llm_error_rate"]:
+                self._count("openai_500")
+                return self._json({"error": {"message": "server error"}}, 500)
+            req = json.loads(raw or b"{}")
+            prompt = "\n".join(str(m.get("content") or "") for m in req.get("messages") or [])
+            with self.lock:
+                content = _fake_completion(prompt, self.rnd, cfg["llm_chars"])
+            pt, ct = len(prompt) // 4 + 1, len(content) // 4 + 1
+            return self._json({
+                "id": "chatcmpl-bench", "object": "chat.completion", "model": req.get("model"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": pt, "completion_tokens": ct, "total_tokens": pt + ct},
+            })
+        if path == "/tavily/search":
+            self._count("tavily")
+            self._sleep(cfg["research_latency_ms"])
+            q = json.loads(raw or b"{}").get("query", "")
+            return self._json({"results": [
+                {"title": f"{q[:40]} – Treffer {i}", "url": f"https://tavily{i}.example.org/{len(q)}", "content": "Kurzbeschreibung"}
+                for i in range(int(json.loads(raw or b"{}").get("max_results") or 6))
+            ]})
+        if path == "/pplx/chat/completions":
+            self._count("perplexity")
+            self._sleep(cfg["research_latency_ms"])
+            items = [{"title": f"Marktentwicklung {i}", "url": f"https://pplx{i}.example.org/insight", "summary": "KI-Trend im Mittelstand."}
+                     for i in range(6)]
+            return self._json({"choices": [{"message": {"content": json.dumps(items)}}]})
+        if path == "/generate-pdf":
+            self._count("pdf")
+            self._sleep(cfg["pdf_latency_ms"])
+            return self._send(200, b"%PDF-1.4\n" + b"0" * max(1024, len(raw) // 8) + b"\n%%EOF", "application/pdf")
+        self._send(404, b"{}")
+
+
+def _serve(cfg: Dict[str, Any], port_q: "mp.Queue[int]") -> None:
+    _FakeHandler.cfg = cfg
+    _FakeHandler.rnd = random.Random(cfg["seed"])
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeHandler)
+    server.daemon_threads = True
+    port_q.put(server.server_address[1])
+    server.serve_forever()
+
+
+def _server_call(base: str, path: str) -> Dict[str, int]:
+    import requests
+    return requests.get(f"{base}{path}", timeout=5).json()
+
+
+# ------------------------------------------------------------------ helpers
+def _pct(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    vals = sorted(values)
+    return round(vals[min(len(vals) - 1, max(0, int(round(q * (len(vals) - 1)))))], 1)
+
+
+def _peak_rss_mb() -> float:
+    kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # Linux: KiB, macOS: Bytes
+    return round(kb / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _git_rev() -> Dict[str, Any]:
+    def _git(*args: str) -> str:
+        try:
+            return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, timeout=10).stdout.strip()
+        except Exception:
+            return ""
+    return {"commit": _git("rev-parse", "--short", "HEAD") or None, "dirty": bool(_git("status", "--porcelain", "-uno"))}
+
+
+def _load_briefings(paths: List[str], synthetic: int, seed: int) -> List[Dict[str, Any]]:
+    out: List[Dict[str, Any]] = []
+    for p in paths:
+        data = json.loads(Path(p).read_text(encoding="utf-8"))
+        answers = data.get("answers") if isinstance(data.get("answers"), dict) else data
+        out.append({"name": Path(p).stem, "lang": data.get("lang") or "de", "answers": answers})
+    rnd = random.Random(seed)
+    for i in range(synthetic):
+        base = copy.deepcopy(out[i % len(out)]["answers"]) if out else {}
+        base.update(branche=rnd.choice(_SYN_BRANCHEN), unternehmensgroesse=rnd.choice(_SYN_GROESSEN),
+                    bundesland=rnd.choice(_SYN_LAENDER))
+        base["hauptleistung"] = f"{base.get('hauptleistung') or 'Dienstleistung'} (Variante {i + 1})"
+        out.append({"name": f"synthetic-{i + 1}", "lang": "de", "answers": base})
+    return out
+
+
+def _configure_env(base: str, tmp: str, args: argparse.Namespace) -> None:
+    """Alle Endpunkte auf den Fake-Server biegen – vor dem Import der Pipeline."""
+    os.environ.update({
+        "OPENAI_API_BASE": base,
+        "OPENAI_API_KEY": "bench",
+        "TAVILY_API_KEY": "bench",
+        "TAVILY_ENDPOINT": f"{base}/tavily/search",
+        "PERPLEXITY_API_KEY": "bench",
+        "PPLX_ENDPOINT": f"{base}/pplx/chat/completions",
+        "PDF_SERVICE_URL": base,
+        "DATABASE_URL": f"sqlite:///{tmp}/bench.sqlite3",
+        "RESEARCH_PROVIDER": "hybrid",
+        "LLM_CACHE_ENABLED": "1" if args.with_cache else "0",
+        "LLM_CACHE_PATH": f"{tmp}/llm_cache.sqlite3",
+        "PDF_CACHE_ENABLED": "1" if args.with_cache else "0",
+        "PDF_CACHE_PATH": f"{tmp}/pdf_cache.sqlite3",
+        "RESEARCH_STORE_PATH": f"{tmp}/research_store.sqlite3",
+        "LLM_GOVERNOR_SHARED": "0",
+    })
+    os.environ.setdefault("JWT_SECRET", "bench-only-secret")
+
+
+def _point_research_at(base: str) -> None:
+    from services import research_pipeline as rp
+    news = [f"{base}/rss/{i}" for i in range(_RSS_FEEDS)]
+    rp.AI_ACT_NEWS_RSS, rp.DEFAULT_NEWS_RSS = news[:2], news[2:]
+    rp.TOOLS_PAGES = [f"{base}/page/{i}" for i in range(_TOOL_PAGES)]
+    rp.FUNDING_HINT_PAGES = [f"{base}/page/{100 + i}" for i in range(_FUNDING_PAGES)]
+
+
+def _drain_research_refreshes() -> None:
+    # Stale-while-revalidate-Refreshes des Vorlaufs dürfen nicht in die nächste Messung zählen
+    from services.research_cache import get_research_cache
+    get_research_cache().wait_refreshes(timeout=60)
+
+
+def _prefetch_research() -> None:
+    from services.research_prefetch import ResearchPrefetcher
+    ResearchPrefetcher().run_once()
+
+
+def _reset_research_cache() -> None:
+    from services.research_cache import get_research_cache
+    get_research_cache().clear()
+
+
+# ------------------------------------------------------------------ benchmark
+def _run_once(briefing_id: int, run_id: str) -> Dict[str, Any]:
+    from core.db import SessionLocal
+    from gpt_analyze import analyze_briefing
+    from services.pdf_client import render_pdf_from_html
+    from services.run_trace import RunTrace, use_trace
+
+    trace = RunTrace(run_id)
+    db = SessionLocal()
+    w0, c0 = time.perf_counter(), time.process_time()
+    error = None
+    try:
+        with use_trace(trace):
+            with trace.span("analyze_briefing"):
+                _, html, _ = analyze_briefing(db, briefing_id, run_id)
+            with trace.span("pdf_service") as attrs:
+                res = render_pdf_from_html(html, {"run_id": run_id})
+                attrs["bytes"] = len(res.get("pdf_bytes") or b"")
+                if res.get("error"):
+                    error = attrs["error"] = str(res["error"])[:200]
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"[:200]
+    finally:
+        db.close()
+    return {
+        "wall_ms": round((time.perf_counter() - w0) * 1000.0, 1),
+        "cpu_ms": round((time.process_time() - c0) * 1000.0, 1),
+        "peak_rss_mb": _peak_rss_mb(),
+        "error": error,
+        "timings": trace.to_dict(),
+    }
+
+
+def _aggregate(runs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    from services.run_trace import summarize
+
+    ok = [r for r in runs if not r["error"]]
+    wall = [r["wall_ms"] for r in ok]
+    cpu = [r["cpu_ms"] for r in ok]
+    calls: Dict[str, List[int]] = {}
+    for r in runs:
+        for k, v in r["calls"].items():
+            calls.setdefault(k, []).append(v)
+    stages = summarize([r["timings"] for r in ok])
+    return {
+        "runs": len(runs),
+        "errors": len(runs) - len(ok),
+        "wall_ms": {"p50": _pct(wall, 0.5), "p95": _pct(wall, 0.95), "max": max(wall) if wall else None},
+        "cpu_ms": {"p50": _pct(cpu, 0.5), "p95": _pct(cpu, 0.95), "max": max(cpu) if cpu else None},
+        "peak_rss_mb": max((r["peak_rss_mb"] for r in runs), default=None),
+        "calls_per_run": {k: round(sum(v) / len(runs), 1) for k, v in sorted(calls.items())},
+        "stages": stages["spans"],
+        "llm": stages["llm"],
+        "fallbacks": stages["fallbacks"],
+        "llm_skipped": stages["llm_skipped"],
+    }
+
+
+def _print_summary(s: Dict[str, Any]) -> None:
+    print(f"\n📊 {s['runs']} Runs ({s['errors']} Fehler) – wall p50/p95 {s['wall_ms']['p50']}/{s['wall_ms']['p95']} ms, "
+          f"cpu p50/p95 {s['cpu_ms']['p50']}/{s['cpu_ms']['p95']} ms, peak RSS {s['peak_rss_mb']} MB")
+    print("   Calls/Run: " + ", ".join(f"{k}={v}" for k, v in s["calls_per_run"].items()))
+    if s["llm_skipped"]:
+        print("   LLM-Calls gespart (gesamt): " + ", ".join(f"{k}={v}" for k, v in s["llm_skipped"].items()))
+    print(f"   {'Stage':<40}{'n':>5}{'p50 ms':>10}{'p95 ms':>10}")
+    for row in s["stages"][:25]:
+        print(f"   {row['name']:<40}{row['count']:>5}{row['p50_ms']:>10}{row['p95_ms']:>10}")
+    if s["llm"]:
+        print(f"   {'LLM-Label':<40}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}")
+        for row in s["llm"]:
+            print(f"   {row['label']:<40}{row['calls']:>7}{row['p50_ms']:>10}{row['p95_ms']:>10}")
+
+
+def _compare(old_path: str, new: Dict[str, Any], threshold_pct: float) -> int:
+    """Vergleicht p50/p95 mit einem älteren Ergebnis; Exit-Code 1 bei Regression über ``threshold_pct``."""
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))
+    o, n = old["summary"], new["summary"]
+    print(f"\n🔁 Vergleich mit {old_path} (Commit {old['meta'].get('commit')} → {new['meta'].get('commit')})")
+    regressions = 0
+    for metric in ("wall_ms", "cpu_ms"):
+        for q in ("p50", "p95"):
+            a, b = (o.get(metric) or {}).get(q), (n.get(metric) or {}).get(q)
+            if not a or b is None:
+                continue
+            delta = (b - a) / a * 100.0
+            flag = "❌" if delta > threshold_pct else "✅"
+            regressions += delta > threshold_pct
+            print(f"   {flag} {metric} {q}: {a} → {b} ms ({delta:+.1f}%)")
+    old_stages = {r["name"]: r for r in o.get("stages") or []}
+    for row in n.get("stages") or []:
+        prev = old_stages.get(row["name"])
+        if prev and prev["p95_ms"] >= 5 and (row["p95_ms"] - prev["p95_ms"]) / prev["p95_ms"] * 100.0 > threshold_pct:
+            print(f"   ⚠️ Stage {row['name']}: p95 {prev['p95_ms']} → {row['p95_ms']} ms")
+    return 1 if regressions else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Offline-Benchmark der Report-Pipeline (alle Fremddienste gefakt)")
+    ap.add_argument("--briefing", action="append", help="Briefing-JSON (mehrfach möglich; Default reports/briefing-117-full.json)")
+    ap.add_argument("--synthetic", type=int, default=0, help="zusätzliche synthetische Varianten")
+    ap.add_argument("--iterations", type=int, default=3, help="Messläufe je Briefing")
+    ap.add_argument("--warmup", type=int, default=1, help="ungemessene Aufwärmläufe (Imports, Pools, Templates)")
+    ap.add_argument("--llm-latency-ms", type=float, default=300.0)
+    ap.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    ap.add_argument("--llm-error-rate", type=float, default=0.0, help="Anteil HTTP 500")
+    ap.add_argument("--llm-429-rate", type=float, default=0.0, help="Anteil HTTP 429 (retry-after-ms 200)")
+    ap.add_argument("--llm-chars", type=int, default=1800, help="Länge der Fake-Antworten")
+    ap.add_argument("--research-latency-ms", type=float, default=400.0, help="Tavily/Perplexity")
+    ap.add_argument("--fetch-latency-ms", type=float, default=150.0, help="RSS-Feeds und Link-Seiten")
+    ap.add_argument("--pdf-latency-ms", type=float, default=800.0)
+    ap.add_argument("--warm-research", action="store_true", help="Research-Cache zwischen Runs behalten")
+    ap.add_argument("--prefetch", action="store_true",
+                    help="Vor jedem Run einen Prefetch-Durchlauf (RSS/Seiten) ausführen, nicht gemessen")
+    ap.add_argument("--with-cache", action="store_true", help="LLM-Antwort- und PDF-Cache aktiv lassen")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--out", default=None, help="Ergebnis-JSON (Default bench_results/bench-<commit>-<zeit>.json)")
+    ap.add_argument("--keep-traces", action="store_true", help="vollständige Spans je Run ins JSON schreiben")
+    ap.add_argument("--compare", default=None, help="älteres Ergebnis-JSON zum Vergleich")
+    ap.add_argument("--fail-threshold", type=float, default=15.0, help="Regression in %% für Exit-Code 1")
+    ap.add_argument("--log-level", default="WARNING")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=getattr(logging, args.log_level.upper(), logging.WARNING),
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    cfg = {k: getattr(args, k) for k in ("llm_latency_ms", "llm_jitter_ms", "llm_error_rate", "llm_429_rate",
+                                         "llm_chars", "research_latency_ms", "fetch_latency_ms", "pdf_latency_ms", "seed")}
+
+    ctx = mp.get_context("spawn")  # Server-Prozess ohne geerbten Zustand
+    port_q: "mp.Queue[int]" = ctx.Queue()
+    server = ctx.Process(target=_serve, args=(cfg, port_q), daemon=True, name="bench-fake-server")
+    server.start()
+    base = f"http://127.0.0.1:{port_q.get(timeout=15)}"
+
+    tmp = tempfile.mkdtemp(prefix="ksj_bench_")
+    _configure_env(base, tmp, args)
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)  # Templates/Prompts/Daten werden relativ geladen
+
+    try:
+        from core.db import Base, SessionLocal, engine
+        from models import Briefing
+
+        Base.metadata.create_all(bind=engine)
+        _point_research_at(base)
+
+        briefings = _load_briefings(args.briefing or [str(ROOT / "reports" / "briefing-117-full.json")],
+                                    args.synthetic, args.seed)
+        with SessionLocal() as db:
+            for b in briefings:
+                row = Briefing(lang=b["lang"], answers=b["answers"])
+                db.add(row)
+                db.commit()
+                b["id"] = row.id
+
+        runs: List[Dict[str, Any]] = []
+        _reset_research_cache()
+        for it in range(args.warmup + args.iterations):
+            measured = it >= args.warmup
+            for b in briefings:
+                _drain_research_refreshes()
+                if not args.warm_research:
+                    _reset_research_cache()
+                if args.prefetch:
+                    _prefetch_research()
+                _server_call(base, "/__reset")
+                res = _run_once(b["id"], f"bench-{it}-{b['name']}")
+                res["calls"] = _server_call(base, "/__stats")
+                tag = "run" if measured else "warmup"
+                print(f"   {tag} {it + 1 - (args.warmup if measured else 0)} {b['name']}: "
+                      f"{res['wall_ms']} ms wall, {res['cpu_ms']} ms cpu{' – ' + res['error'] if res['error'] else ''}")
+                if measured:
+                    res.update(briefing=b["name"], iteration=it - args.warmup)
+                    runs.append(res)
+
+        summary = _aggregate(runs)
+        if not args.keep_traces:
+            for r in runs:
+                r["timings"] = {"total_ms": r["timings"]["total_ms"], "llm": r["timings"]["llm"]["totals"],
+                                "llm_skipped": r["timings"]["llm"]["skipped"],
+                                "fallbacks": r["timings"]["fallbacks"]}
+        meta = {
+            **_git_rev(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "briefings": [b["name"] for b in briefings],
+            "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+            "env": {k: v for k, v in sorted(os.environ.items()) if k.startswith(_ENV_PREFIXES) and "KEY" not in k},
+        }
+        result = {"meta": meta, "summary": summary, "runs": runs}
+        _print_summary(summary)
+
+        out = Path(args.out) if args.out else ROOT / "bench_results" / (
+            f"bench-{meta['commit'] or 'nogit'}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n💾 Ergebnis: {out}")
+        return _compare(args.compare, result, args.fail_threshold) if args.compare else 0
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
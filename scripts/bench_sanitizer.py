@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""
+scripts/bench_sanitizer.py – Gleichheits- und Laufzeit-Benchmark für services/html_sanitizer.py
+- Vergleicht den Tokenizer-Sanitizer mit der bisherigen Regex-Kaskade (hier als Referenz konserviert)
+  String für String auf den vorhandenen Fixtures: Templates/Partials/Knowledge/Admin-HTML, Prompts,
+  aufgezeichnete Briefings (``reports/briefing-*.json``), Fake-Sections aus scripts/bench_pipeline.py
+  und einigen feindseligen Snippets; optional echte Section-Dicts (``--sections dump.json``).
+- Misst je Variante ms pro Sections-Dict: Referenz, Tokenizer ohne Cache, ``sanitize_sections_dict``
+  mit Klartext-Skip + Cache (warm).
+- Exit-Code 1, sobald eine Ausgabe abweicht.
+
+Aufruf:
+  python -m scripts.bench_sanitizer
+  python -m scripts.bench_sanitizer --repeat 50 --sections /tmp/sections.json
+"""
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_FIXTURE_GLOBS = ("templates/**/*.html", "knowledge/*.html", "admin/*.html", "public/*.html", "prompts/**/*.md")
+
+_HOSTILE = [
+    "<!DOCTYPE html><html lang='de'><head><meta charset='utf-8'><title>x</title></head>"
+    "<body onload=\"init()\"><h3>Pilot</h3><p>Text</p></body></html>",
+    "<p>a</p><script type='text/javascript'>alert(1)</script><p>b</p><SCRIPT>x</SCRIPT>",
+    "<iframe src='https://evil'></iframe><object data='x'></object><embed src='y'></embed>",
+    "<link rel='stylesheet' href='x.css'><meta http-equiv='refresh' content='0'>",
+    "<a href=\"javascript:alert(1)\" onclick='steal()'>x</a> <img src=' javascript:void(0)' onerror=\"x\">",
+    "<div   class='a'>\t\tviel   Luft  \n\n\n\n  <span>x</span>   \n</div>",
+    "FragebÃ¶gen für MarktfÃ¼hrer – Ã¼berall",
+    "<p>Umsatz < 100 T€ & Kosten > 5 T€</p>",
+]
+
+
+# ------------------------------------------------------------------ Referenz (bisherige Kaskade)
+_RE_DOCTYPES = re.compile(r"(?is)<!DOCTYPE.*?>")
+_RE_HTML_TAGS = re.compile(r"(?is)</?\s*html\b.*?>")
+_RE_HEAD_BLOCK = re.compile(r"(?is)<\s*head\b.*?>.*?</\s*head\s*>")
+_RE_BODY_TAGS = re.compile(r"(?is)</?\s*body\b.*?>")
+_RE_BLOCKS = [re.compile(rf"(?is)<\s*{t}\b.*?>.*?</\s*{t}\s*>") for t in ("script", "iframe", "object", "embed")]
+_RE_LINK_TAG = re.compile(r"(?is)<\s*link\b.*?/?>")
+_RE_META_TAG = re.compile(r"(?is)<\s*meta\b.*?/?>")
+_RE_ON_EVENT_ATTR = re.compile(r"(?i)\s+on[a-z]+\s*=\s*(\"[^\"]*\"|'[^']*')")
+_RE_JS_PROTOCOL = re.compile(r"(?is)(\s(?:href|src)\s*=\s*['\"])\s*javascript:[^'\"]*(['\"])")
+
+
+def reference_sanitize(html_content: Optional[str], compress_ws: bool = True) -> str:
+    from services.html_sanitizer import _fix_utf8_mojibake
+    if not html_content:
+        return ""
+    s = _fix_utf8_mojibake(html_content)
+    s = _RE_DOCTYPES.sub("", s)
+    s = _RE_HEAD_BLOCK.sub("", s)
+    s = _RE_HTML_TAGS.sub("", s)
+    s = _RE_BODY_TAGS.sub("", s)
+    for rx in _RE_BLOCKS:
+        s = rx.sub("", s)
+    s = _RE_LINK_TAG.sub("", s)
+    s = _RE_META_TAG.sub("", s)
+    s = _RE_ON_EVENT_ATTR.sub("", s)
+    s = _RE_JS_PROTOCOL.sub(r"\1#\2", s)
+    if compress_ws:
+        s = re.sub(r"[ \t]+\n", "\n", s)
+        s = re.sub(r"\n{3,}", "\n\n", s)
+        s = re.sub(r"[ \t]{2,}", " ", s)
+    return s
+
+
+def reference_sections_dict(sections: dict) -> dict:
+    return {k: reference_sanitize(v) if isinstance(v, str) else v for k, v in sections.items()}
+
+
+# ------------------------------------------------------------------ Korpus
+def _strings(obj) -> List[str]:
+    if isinstance(obj, str):
+        return [obj]
+    if isinstance(obj, dict):
+        return [s for v in obj.values() for s in _strings(v)]
+    if isinstance(obj, list):
+        return [s for v in obj for s in _strings(v)]
+    return []
+
+
+def load_corpus(extra_sections: List[str]) -> Dict[str, str]:
+    from scripts.bench_pipeline import _fake_section_html
+
+    corpus: Dict[str, str] = {}
+    for pattern in _FIXTURE_GLOBS:
+        for p in sorted(ROOT.glob(pattern)):
+            corpus[str(p.relative_to(ROOT))] = p.read_text(encoding="utf-8", errors="replace")
+    for p in sorted((ROOT / "reports").glob("briefing-*.json")):
+        for i, s in enumerate(_strings(json.loads(p.read_text(encoding="utf-8")))):
+            corpus[f"{p.name}#{i}"] = s
+    rnd = random.Random(42)
+    for i in range(20):
+        corpus[f"fake-section-{i}"] = _fake_section_html(rnd, 1800)
+    for i, s in enumerate(_HOSTILE):
+        corpus[f"hostile-{i}"] = s
+    for path in extra_sections:
+        for k, v in json.loads(Path(path).read_text(encoding="utf-8")).items():
+            if isinstance(v, str):
+                corpus[f"{Path(path).name}:{k}"] = v
+    return corpus
+
+
+def _sections_like(corpus: Dict[str, str], extra_sections: List[str]) -> List[dict]:
+    """Section-Dicts für den Dict-Vergleich: echte Dumps oder ein Report-ähnlicher Mix aus dem Korpus."""
+    dicts = [json.loads(Path(p).read_text(encoding="utf-8")) for p in extra_sections]
+    if not dicts:
+        fake = [v for k, v in corpus.items() if k.startswith(("fake-section", "hostile"))]
+        plain = [v for k, v in corpus.items() if k.startswith("briefing-") and "<" not in v][:60]
+        d = {f"SECTION_{i}_HTML": v for i, v in enumerate(fake)}
+        d.update({f"ANSWER_{i}_LABEL": v for i, v in enumerate(plain)})
+        d.update(report_date="17.10.2026", report_year="2026", qw_hours_total=36)
+        dicts.append(d)
+    return dicts
+
+
+def _ms_per(fn: Callable[[], object], repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) * 1000.0 / repeat
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Sanitizer: Ausgabegleichheit + Laufzeit gegen die Regex-Kaskade")
+    ap.add_argument("--sections", action="append", default=[], help="JSON-Dump eines Sections-Dicts (mehrfach möglich)")
+    ap.add_argument("--repeat", type=int, default=20, help="Wiederholungen je Messung")
+    args = ap.parse_args(argv)
+    sys.path.insert(0, str(ROOT))
+
+    from services import html_sanitizer as hs
+
+    corpus = load_corpus(args.sections)
+    diffs = [name for name, s in corpus.items()
+             for ws in (True, False) if hs.sanitize_section_html(s, compress_ws=ws) != reference_sanitize(s, ws)]
+    dicts = _sections_like(corpus, args.sections)
+    dict_diffs = [i for i, d in enumerate(dicts) if hs.sanitize_sections_dict(d) != reference_sections_dict(d)]
+
+    print(f"📚 Korpus: {len(corpus)} Strings, {sum(len(s) for s in corpus.values()) / 1024:.0f} KB; "
+          f"{len(dicts)} Sections-Dict(s)")
+    for name in diffs:
+        print(f"   ❌ Abweichung: {name}")
+    for i in dict_diffs:
+        print(f"   ❌ Abweichung im Sections-Dict #{i}")
+    if not diffs and not dict_diffs:
+        print("   ✅ Ausgabe identisch zur Regex-Kaskade")
+
+    texts = list(corpus.values())
+    ref_ms = _ms_per(lambda: [reference_sanitize(s) for s in texts], args.repeat)
+    new_ms = _ms_per(lambda: [hs.sanitize_section_html(s) for s in texts], args.repeat)
+    print(f"\n⏱  Korpus je Durchlauf: Kaskade {ref_ms:.2f} ms · Tokenizer {new_ms:.2f} ms "
+          f"({ref_ms / max(new_ms, 1e-9):.1f}×)")
+    for i, d in enumerate(dicts):
+        ref_ms = _ms_per(lambda: reference_sections_dict(d), args.repeat)
+        hs.clear_sanitizer_cache()
+        cold_ms = _ms_per(lambda: (hs.clear_sanitizer_cache(), hs.sanitize_sections_dict(d)), args.repeat)
+        warm_ms = _ms_per(lambda: hs.sanitize_sections_dict(d), args.repeat)
+        print(f"⏱  Sections-Dict #{i} ({sum(isinstance(v, str) for v in d.values())} Strings): "
+              f"Kaskade {ref_ms:.2f} ms · sanitize_sections_dict kalt {cold_ms:.2f} ms · warm {warm_ms:.2f} ms")
+    return 1 if diffs or dict_diffs else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
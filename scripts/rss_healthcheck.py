@@ -20,11 +20,22 @@ def check_feed(url: str, timeout: int = 10) -> dict:
     except Exception as e:
         return {"url": url, "status": 0, "ok": False, "error": repr(e)}
 
+def check_research_sources() -> list:
+    """One prefetch pass over the sources run_research uses (same status as /admin/research/sources)."""
+    from services.research_prefetch import ResearchPrefetcher
+    return list(ResearchPrefetcher().run_once().values())
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--json", help="Path to JSON with list of feeds", default="data/rss_sources_extra.json")
     ap.add_argument("--timeout", type=int, default=10)
+    ap.add_argument("--research", action="store_true",
+                    help="Check the configured research feeds/pages via the prefetcher (fills the prefetch cache)")
     args = ap.parse_args()
+    if args.research:
+        results = check_research_sources()
+        print(json.dumps(results, indent=2))
+        sys.exit(0 if all(r.get("ok") for r in results) else 1)
     feeds = []
     with open(args.json, "r", encoding="utf-8") as f:
         obj = json.load(f)
@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session
 from zipfile import ZipFile, ZIP_DEFLATED
 
 from models import Briefing, Analysis, Report
+from services.pdf_cache import lookup_pdf
+from utils.logo_embedder import inline_assets
 
 log = logging.getLogger(__name__)
 
@@ -32,7 +34,8 @@ def build_briefing_export_zip(db: Session, briefing_id: int, include_pdf: bool =
 
         if a:
             z.writestr("analysis/meta.json", json.dumps(getattr(a, "meta", {}) or {}, ensure_ascii=False, indent=2))
-            z.writestr("analysis/report.html", getattr(a, "html", "") or "")
+            # Offline lesbar: Logo-Referenzen (/report-assets/...) als data URIs
+            z.writestr("analysis/report.html", inline_assets(getattr(a, "html", "") or ""))
 
         if r:
             z.writestr("report/info.json", json.dumps({
@@ -41,8 +44,11 @@ def build_briefing_export_zip(db: Session, briefing_id: int, include_pdf: bool =
                 "pdf_bytes_len": getattr(r, "pdf_bytes_len", None),
                 "created_at": getattr(r, "created_at", None).isoformat() if getattr(r, "created_at", None) else None,
             }, ensure_ascii=False, indent=2))
-            if include_pdf and getattr(r, "pdf_bytes_len", None) and hasattr(r, "pdf_bytes"):
-                # Falls euer Modell pdf_bytes als LargeBinary hält
+            # PDF aus dem PDF-Cache (gleiches HTML → gleiches PDF), sonst falls das Modell pdf_bytes hält
+            cached_pdf = lookup_pdf(getattr(a, "html", "") or "") if include_pdf and a else None
+            if cached_pdf:
+                z.writestr("report/report.pdf", cached_pdf)
+            elif include_pdf and getattr(r, "pdf_bytes_len", None) and hasattr(r, "pdf_bytes"):
                 try:
                     z.writestr("report/report.pdf", getattr(r, "pdf_bytes"))
                 except Exception:
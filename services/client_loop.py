@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Event-Loop-Thread mit gemeinsamem ``httpx.AsyncClient``
+- ``ClientLoop`` startet einen Daemon-Thread mit eigenem Event-Loop; der Client wird *auf* diesem Loop
+  erzeugt (Keep-Alive-Pool, HTTP/2) und von allen Coroutinen geteilt, die per ``submit()`` dort laufen.
+- ``lazy_client_loop()`` liefert einen thread-sicheren Getter, der den Loop beim ersten Aufruf startet.
+- Genutzt vom LLM-Client (services/llm_client.py) und den Research-Abrufen (services/research_fetch.py).
+"""
+import asyncio
+import importlib.util
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, List, Optional, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+HAS_H2 = importlib.util.find_spec("h2") is not None
+
+
+class ClientLoop:
+    """Event-Loop-Thread, der einen gemeinsamen AsyncClient besitzt."""
+
+    def __init__(self, name: str, client_factory: Callable[[], httpx.AsyncClient]) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.client: Optional[httpx.AsyncClient] = None
+        self._factory = client_factory
+        self._error: Optional[BaseException] = None
+        self._ready = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.client = self._factory()
+        except BaseException as exc:
+            self._error = exc
+            self._ready.set()
+            return
+        self._ready.set()
+        self.loop.run_forever()
+
+    def submit(self, coro: Awaitable[T]) -> "Future[T]":
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)  # type: ignore[arg-type]
+
+
+def lazy_client_loop(name: str, client_factory: Callable[[], httpx.AsyncClient]) -> Callable[[], ClientLoop]:
+    """Getter für einen prozessweiten ``ClientLoop``, der erst beim ersten Aufruf gestartet wird."""
+    holder: List[ClientLoop] = []
+    lock = threading.Lock()
+
+    def get() -> ClientLoop:
+        if not holder:
+            with lock:
+                if not holder:
+                    holder.append(ClientLoop(name, client_factory))
+        return holder[0]
+
+    return get
+
+
+__all__ = ["ClientLoop", "HAS_H2", "lazy_client_loop"]
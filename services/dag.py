@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Kleiner DAG-Executor (asyncio)
+- Knoten = benannte Aufgabe mit expliziten Eingängen (``deps``).
+- Jeder Knoten startet, sobald alle Eingänge fertig sind – keine Phasen-Barrieren.
+- ``blocking=True`` → Sync-Funktion läuft per ``asyncio.to_thread`` (z. B. Research mit requests).
+- Fehler eines Knotens werden geloggt; Ergebnis ist dann ``default`` (Report läuft weiter).
+- ``timings`` enthält pro Knoten (start, ende) in Sekunden relativ zum Start von ``run()``.
+"""
+import asyncio
+import inspect
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class DagNode:
+    name: str
+    fn: Callable[..., Any]
+    deps: Tuple[str, ...] = ()
+    default: Any = None
+    blocking: bool = False
+
+
+@dataclass
+class DagExecutor:
+    nodes: Dict[str, DagNode] = field(default_factory=dict)
+    timings: Dict[str, Tuple[float, float]] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def add(
+        self,
+        name: str,
+        fn: Callable[..., Any],
+        deps: Sequence[str] = (),
+        *,
+        default: Any = None,
+        blocking: bool = False,
+    ) -> "DagExecutor":
+        """Registriert einen Knoten. ``fn`` bekommt die Ergebnisse von ``deps`` positionsweise."""
+        if name in self.nodes:
+            raise ValueError(f"duplicate dag node: {name}")
+        self.nodes[name] = DagNode(name, fn, tuple(deps), default, blocking)
+        return self
+
+    def _check(self) -> None:
+        for node in self.nodes.values():
+            for d in node.deps:
+                if d not in self.nodes:
+                    raise ValueError(f"dag node {node.name!r} depends on unknown node {d!r}")
+        # Zyklen erkennen (Kahn)
+        indeg = {n: len(node.deps) for n, node in self.nodes.items()}
+        children: Dict[str, List[str]] = {n: [] for n in self.nodes}
+        for node in self.nodes.values():
+            for d in node.deps:
+                children[d].append(node.name)
+        ready = [n for n, k in indeg.items() if k == 0]
+        seen = 0
+        while ready:
+            n = ready.pop()
+            seen += 1
+            for c in children[n]:
+                indeg[c] -= 1
+                if indeg[c] == 0:
+                    ready.append(c)
+        if seen != len(self.nodes):
+            raise ValueError("dag contains a cycle")
+
+    async def run(self) -> Dict[str, Any]:
+        """Führt alle Knoten aus und liefert ``{name: ergebnis}``."""
+        self._check()
+        t0 = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        done: Dict[str, asyncio.Future] = {n: loop.create_future() for n in self.nodes}
+
+        async def _run_node(node: DagNode) -> None:
+            args = [await done[d] for d in node.deps]
+            start = time.perf_counter() - t0
+            try:
+                if node.blocking:
+                    value = await asyncio.to_thread(node.fn, *args)
+                else:
+                    value = node.fn(*args)
+                    if inspect.isawaitable(value):
+                        value = await value
+            except Exception as exc:
+                log.error("❌ DAG node %s failed: %s", node.name, exc)
+                self.errors[node.name] = f"{type(exc).__name__}: {exc}"
+                value = node.default
+            self.timings[node.name] = (round(start, 4), round(time.perf_counter() - t0, 4))
+            done[node.name].set_result(value)
+
+        await asyncio.gather(*(_run_node(n) for n in self.nodes.values()))
+        return {n: f.result() for n, f in done.items()}
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """Längste Kette nach Endzeit (nach ``run()``), nützlich für Logging/Profiling."""
+        if not self.timings:
+            return [], 0.0
+        last = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [last]
+        while True:
+            deps = self.nodes[path[-1]].deps
+            if not deps:
+                break
+            path.append(max(deps, key=lambda d: self.timings.get(d, (0.0, 0.0))[1]))
+        return list(reversed(path)), self.timings[last][1]
+
+
+__all__ = ["DagExecutor", "DagNode"]
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Lokale, deterministische HTML-Reparatur (ersetzt den LLM-Roundtrip in ``_repair_html``)
+- Markdown-artiger Text → Whitelist-HTML: Überschriften, Listen (ul/ol), **fett**/*kursiv*,
+  Pipe-Tabellen und Absätze.
+- Bereits vorhandene Whitelist-Tags bleiben erhalten (Attribute außer ``class`` entfallen), alles andere
+  wird escaped; ``<b>``/``<i>`` werden zu ``<strong>``/``<em>``. Auch in Zeilen, die mit einem Block-Tag
+  beginnen, wird der Text dazwischen escaped und Markdown-Betonung umgesetzt (``<li>**x**</li>``).
+- Eingabe läuft vorher durch ``sanitize_section_html`` (Script/Iframe & Co. samt Inhalt weg).
+- Zeilenlogik wie ``gpt_analyze._md_to_simple_html`` (Bild-Zeilen und Referenz-Links entfallen);
+  ``paragraph_per_line=True`` behält dessen Layout (ein ``<p>`` je Zeile statt ``<br>``-verbundener Absätze).
+  Abweichend vom alten ``_md_to_simple_html`` werden ``#``/``##`` zu Überschriften (vorher wörtlich
+  ``<p># …</p>``) und ``**fett**``/``*kursiv*`` umgesetzt (vorher escaped).
+"""
+import html
+import re
+from typing import List, Optional
+
+from services.html_sanitizer import sanitize_section_html
+
+ALLOWED_TAGS = frozenset({
+    "p", "ul", "ol", "li", "table", "thead", "tbody", "tr", "th", "td",
+    "div", "h3", "h4", "em", "strong", "br",
+})
+_TAG_ALIASES = {"b": "strong", "i": "em"}
+_INLINE_TAGS = frozenset({"em", "strong", "br"})
+
+_RE_TAG = re.compile(r"<\s*(/?)\s*([a-zA-Z][a-zA-Z0-9]*)\b[^>]*?(/?)\s*>")
+_RE_FENCE = re.compile(r"^```[a-zA-Z]*\s*$")
+_RE_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RE_UL = re.compile(r"^[-*+•]\s+(.*)$")
+_RE_OL = re.compile(r"^\d{1,3}[.)]\s+(.*)$")
+_RE_TABLE_SEP = re.compile(r"^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$")
+_RE_BOLD = re.compile(r"(\*\*|__)(?=\S)(.+?)(?<=\S)\1")
+_RE_ITALIC = re.compile(r"(?<![\w*])([*_])(?=\S)(.+?)(?<=\S)\1(?![\w*])")
+_RE_LINK = re.compile(r"\[([^\]]+)\]\((?:https?://|/)[^)]*\)")
+_RE_REF_LINK = re.compile(r"\s*\(\[([^\]]+)\]\[\d+\]\)")
+_RE_RULE = re.compile(r"^(?:-{3,}|\*{3,}|_{3,})$")
+_RE_CODE = re.compile(r"`([^`]+)`")
+
+
+def _inline(text: str) -> str:
+    """Escaped Text + erlaubte Inline-Tags + Markdown-Betonung."""
+    out: List[str] = []
+    pos = 0
+    for m in _RE_TAG.finditer(text):
+        out.append(html.escape(html.unescape(text[pos:m.start()]), quote=False))
+        closing, name = m.group(1), _TAG_ALIASES.get(m.group(2).lower(), m.group(2).lower())
+        if name in ("strong", "em"):
+            out.append(f"<{closing}{name}>")
+        elif name == "br":
+            out.append("<br>")
+        pos = m.end()
+    out.append(html.escape(html.unescape(text[pos:]), quote=False))
+    s = "".join(out)
+    s = _RE_LINK.sub(r"\1", s)
+    s = _RE_REF_LINK.sub("", s)
+    s = _RE_CODE.sub(r"\1", s)
+    s = _RE_BOLD.sub(r"<strong>\2</strong>", s)
+    s = _RE_ITALIC.sub(r"<em>\2</em>", s)
+    return s
+
+
+def _cells(line: str) -> List[str]:
+    return [c.strip() for c in line.strip().strip("|").split("|")]
+
+
+def markdown_to_html(text: str, *, heading_tag: str = "h4", paragraph_per_line: bool = False) -> str:
+    """Konvertiert Markdown-artigen Text in Whitelist-HTML (zeilenbasiert, deterministisch).
+
+    ``heading_tag`` gilt für ``#``–``###``; ``####`` und tiefer werden immer ``<h4>``.
+    ``paragraph_per_line``: jede Textzeile ein eigenes ``<p>`` (sonst Folgezeilen per ``<br>`` in einem Absatz).
+    """
+    if not text:
+        return ""
+    out: List[str] = []
+    para: List[str] = []
+    lst: Optional[str] = None
+    lines = [ln.rstrip() for ln in text.replace("\r\n", "\n").split("\n")]
+
+    def _flush_para() -> None:
+        if para:
+            if paragraph_per_line:
+                out.extend(f"<p>{_inline(p)}</p>" for p in para)
+            else:
+                out.append("<p>" + "<br>".join(_inline(p) for p in para) + "</p>")
+            para.clear()
+
+    def _close_list() -> None:
+        nonlocal lst
+        if lst:
+            out.append(f"</{lst}>")
+            lst = None
+
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        i += 1
+        if not line or _RE_FENCE.match(line) or _RE_RULE.match(line):
+            _flush_para(); _close_list()
+            continue
+        if line.startswith("![") or re.match(r"^\[\d+\]:\s*https?://", line):
+            continue
+        # Block-Tags, die das Modell bereits korrekt geliefert hat, unverändert übernehmen
+        mtag = _RE_TAG.match(line)
+        if mtag and mtag.group(2).lower() in ALLOWED_TAGS - _INLINE_TAGS:
+            _flush_para(); _close_list()
+            out.append(_keep_allowed_tags(line))
+            continue
+        m = _RE_HEADING.match(line)
+        if m:
+            _flush_para(); _close_list()
+            tag = "h4" if len(m.group(1)) >= 4 else heading_tag
+            out.append(f"<{tag}>{_inline(m.group(2))}</{tag}>")
+            continue
+        if "|" in line and i < len(lines) and _RE_TABLE_SEP.match(lines[i].strip()):
+            _flush_para(); _close_list()
+            head = _cells(line)
+            i += 1
+            rows: List[List[str]] = []
+            while i < len(lines) and "|" in lines[i]:
+                rows.append(_cells(lines[i]))
+                i += 1
+            out.append("<table><thead><tr>" + "".join(f"<th>{_inline(c)}</th>" for c in head) + "</tr></thead><tbody>"
+                       + "".join("<tr>" + "".join(f"<td>{_inline(c)}</td>" for c in r) + "</tr>" for r in rows)
+                       + "</tbody></table>")
+            continue
+        m_ul, m_ol = _RE_UL.match(line), _RE_OL.match(line)
+        if m_ul or m_ol:
+            _flush_para()
+            kind = "ul" if m_ul else "ol"
+            if lst != kind:
+                _close_list()
+                out.append(f"<{kind}>")
+                lst = kind
+            out.append(f"<li>{_inline((m_ul or m_ol).group(1))}</li>")  # type: ignore[union-attr]
+            continue
+        _close_list()
+        para.append(line)
+    _flush_para(); _close_list()
+    return "\n".join(out)
+
+
+def _keep_allowed_tags(line: str) -> str:
+    """Lässt erlaubte Block-Tags (inkl. ``class``) durch; Text dazwischen läuft durch ``_inline``
+    (escaped, Inline-Tags/Markdown-Betonung), alle übrigen Tags entfallen."""
+    out: List[str] = []
+    pos = 0
+    for m in _RE_TAG.finditer(line):
+        name = _TAG_ALIASES.get(m.group(2).lower(), m.group(2).lower())
+        if name not in ALLOWED_TAGS or name in _INLINE_TAGS:
+            continue  # Inline-/fremde Tags behandelt _inline im Textsegment
+        out.append(_inline(line[pos:m.start()]))
+        if m.group(1):
+            out.append(f"</{name}>")
+        else:
+            cls = re.search(r"""\bclass\s*=\s*(["'])([\w\s-]*)\1""", m.group(0))
+            out.append(f'<{name} class="{cls.group(2)}">' if cls else f"<{name}>")
+        pos = m.end()
+    out.append(_inline(line[pos:]))
+    return "".join(out)
+
+
+def repair_html_local(text: str) -> str:
+    """Markdown/Fließtext → sanitisiertes Whitelist-HTML (ohne LLM)."""
+    if not text:
+        return ""
+    return markdown_to_html(sanitize_section_html(text.replace("```html", "```"), compress_ws=False))
+
+
+__all__ = ["ALLOWED_TAGS", "markdown_to_html", "repair_html_local"]
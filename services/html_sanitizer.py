@@ -11,15 +11,43 @@ Ziele:
 - Optional: komprimiert Whitespace
 - Erhält valide Teil‑HTML (Listen, Tabellen, Divs, etc.) unverändert
 
+Umsetzung: *ein* Tokenizer-Durchlauf (eine kompilierte Alternation, Dispatch je Token-Art) statt
+einer Regex-Kaskade je Tag-Typ, plus ein kombinierter Whitespace-Durchlauf. Entstehen durch das
+Entfernen neue gefährliche Tags (``<scr<script></script>ipt>``), wird erneut gescannt.
+``sanitize_sections_dict`` überspringt den Tag-Scan für bekannte Klartext-Keys (werden im Template
+ohnehin escaped) und merkt sich Ergebnisse größerer Abschnitte per SHA-256 des Inhalts (LRU).
+
 Hinweis: bewusst konservativ, um Layout nicht zu zerstören.
+
+ENV:
+  HTML_SANITIZER_CACHE_SIZE  Max. gemerkte Abschnitte (Default 512, 0 = aus)
 """
 from __future__ import annotations
-import re
+import hashlib
 import html
-from typing import Optional
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
 
 _TRUTHY = {"1","true","TRUE","yes","YES","on","y"}
 
+HTML_SANITIZER_CACHE_SIZE = int(os.getenv("HTML_SANITIZER_CACHE_SIZE", "512"))
+_CACHE_MIN_CHARS = 256  # kürzere Strings sind schneller saniert als gehasht
+
+# Klartext-Keys der Report-Sections: kein HTML-Scan, nur Mojibake/Whitespace
+PLAIN_TEXT_KEYS = frozenset({
+    "report_date", "report_year", "report_id", "report_version", "last_updated", "research_last_updated",
+    "kundencode", "user_email", "ki_kompetenz", "transparency_text", "ai_act_phase_label",
+    "HAUPTLEISTUNG", "STRATEGISCHE_ZIELE", "GESCHAEFTSMODELL_EVOLUTION", "ZEITERSPARNIS_PRIORITAET",
+    "KI_PROJEKTE", "VISION_3_JAHRE", "REALITY_NOTE_QW", "WATERMARK_TEXT", "BUILD_STAMP", "BUILD_ID",
+    "CHANGELOG_SHORT", "AUDITOR_INITIALS", "OWNER_NAME", "CONTACT_EMAIL",
+})
+_PLAIN_TEXT_PREFIXES = ("LEAD_",)
+_PLAIN_TEXT_SUFFIXES = ("_LABEL", "_LABELS")
+
+
 def _fix_utf8_mojibake(text: str) -> str:
     """Behebt falsch encodierte UTF-8 Zeichen (Mojibake).
 
@@ -40,67 +68,141 @@ def _fix_utf8_mojibake(text: str) -> str:
         except Exception:
             return text
 
-RE_DOCTYPES = re.compile(r"(?is)<!DOCTYPE.*?>")
-RE_HTML_TAGS = re.compile(r"(?is)</?\s*html\b.*?>")
-RE_HEAD_BLOCK = re.compile(r"(?is)<\s*head\b.*?>.*?</\s*head\s*>")
-RE_BODY_TAGS = re.compile(r"(?is)</?\s*body\b.*?>")
+# Token-Arten (Reihenfolge = Priorität bei gleichem Startpunkt):
+#   drop  Dokument-Wrapper, <head>…</head>, Script/Iframe/Object/Embed samt Inhalt, <link>, <meta>
+#   on    Inline-Eventhandler (onload=, onclick=, …)
+#   js    javascript:-URI in href/src → "#"
+# Öffnende Tags enden am ersten ">" ([^>]*) – gleiche Treffer wie ".*?>", aber ohne quadratisches
+# Backtracking bei ungeschlossenem <head> (Prompt-Texte wie "KEIN <html>, <head> oder <body>").
+_DROP = (r"(?P<drop><!DOCTYPE[^>]*>"
+         r"|<\s*head\b[^>]*>.*?</\s*head\s*>"
+         r"|<\s*(?P<block>script|iframe|object|embed)\b[^>]*>.*?</\s*(?P=block)\s*>"
+         r"|</?\s*(?:html|body)\b[^>]*>"
+         r"|<\s*(?:link|meta)\b[^>]*>)")
+_ATTRS = (r"|(?P<on>\s+on[a-z]+\s*=\s*(?:\"[^\"]*\"|'[^']*'))"
+          r"|(?P<js>\s(?:href|src)\s*=\s*['\"])\s*javascript:[^'\"]*(?P<jsq>['\"])")
+_TOKEN_RX = re.compile(_DROP + _ATTRS, re.I | re.S)
+# Ohne Attribut-Kandidaten reicht die "<"-verankerte Variante (schneller Präfix-Scan)
+_TAG_TOKEN_RX = re.compile(_DROP, re.I | re.S)
+_ON_HINT_RX = re.compile(r"on\w+\s*=")
+# Öffner, die nach einem Entfernen neu zusammengesetzt sein könnten → weiterer Durchlauf
+_REOPEN_RX = re.compile(r"(?i)<\s*(?:script|iframe|object|embed|head|link|meta|html|body)\b|<!DOCTYPE|\son[a-z]+\s*=|javascript:")
+_MAX_PASSES = 4
+
+# Whitespace: Leerzeichen vor Zeilenumbrüchen weg, ≥3 Umbrüche → 2, Mehrfach-Leerzeichen → 1
+_WS_RX = re.compile(r"(?:[ \t]*\n)+|[ \t]{2,}")
+
+
+def _token(m: "re.Match[str]") -> str:
+    if m.group("jsq") is not None:
+        return m.group("js") + "#" + m.group("jsq")
+    return ""
+
+
+def _ws(m: "re.Match[str]") -> str:
+    s = m.group(0)
+    if "\n" not in s:
+        return " "
+    n = s.count("\n")
+    return "\n\n" if n >= 3 else "\n" * n
+
+
+def _strip_tags(s: str) -> str:
+    for _ in range(_MAX_PASSES):
+        # casefold statt lower: deckt auch die Sonderfälle von re.IGNORECASE ab (ſ → s, K → k)
+        folded = s.casefold()
+        if "javascript:" in folded or _ON_HINT_RX.search(folded):
+            out = _TOKEN_RX.sub(_token, s)
+        elif "<" in s:
+            out = _TAG_TOKEN_RX.sub("", s)
+        else:
+            return s
+        if out == s or not _REOPEN_RX.search(out):
+            return out
+        s = out
+    return s
 
-# Tags, die komplett entfernt werden (inkl. Inhalt bei head)
-RE_SCRIPT_BLOCK = re.compile(r"(?is)<\s*script\b.*?>.*?</\s*script\s*>")
-RE_IFRAME_BLOCK = re.compile(r"(?is)<\s*iframe\b.*?>.*?</\s*iframe\s*>")
-RE_OBJECT_BLOCK = re.compile(r"(?is)<\s*object\b.*?>.*?</\s*object\s*>")
-RE_EMBED_BLOCK  = re.compile(r"(?is)<\s*embed\b.*?>.*?</\s*embed\s*>")
-RE_LINK_TAG     = re.compile(r"(?is)<\s*link\b.*?/?>")
-RE_META_TAG     = re.compile(r"(?is)<\s*meta\b.*?/?>")
 
-# Inline‑Eventhandler (onload=, onclick=, …)
-RE_ON_EVENT_ATTR = re.compile(r"(?i)\s+on[a-z]+\s*=\s*(\"[^\"]*\"|'[^']*')")
+def _compress_ws(s: str) -> str:
+    if "\t" not in s and "  " not in s and " \n" not in s and "\n\n\n" not in s:
+        return s
+    return _WS_RX.sub(_ws, s)
 
-# Daten‑/Sicherheitsfilter: Entferne javascript: URIs in href/src
-RE_JS_PROTOCOL = re.compile(r"(?is)(\s(?:href|src)\s*=\s*['\"])\s*javascript:[^'\"]*(['\"])")
 
 def sanitize_section_html(html_content: Optional[str], compress_ws: bool = True) -> str:
     if not html_content:
         return ""
-    s = html_content
-
     # ZUERST: Behebe UTF-8 Mojibake (Ã¶ → ö)
-    s = _fix_utf8_mojibake(s)
-
-    # Entferne Dokument‑Wrapper & kritische Blöcke
-    s = RE_DOCTYPES.sub("", s)
-    s = RE_HEAD_BLOCK.sub("", s)
-    s = RE_HTML_TAGS.sub("", s)
-    s = RE_BODY_TAGS.sub("", s)
-
-    # Entferne gefährliche Tags
-    s = RE_SCRIPT_BLOCK.sub("", s)
-    s = RE_IFRAME_BLOCK.sub("", s)
-    s = RE_OBJECT_BLOCK.sub("", s)
-    s = RE_EMBED_BLOCK.sub("", s)
-    s = RE_LINK_TAG.sub("", s)
-    s = RE_META_TAG.sub("", s)
-
-    # Entferne Inline‑Events & javascript: URLs
-    s = RE_ON_EVENT_ATTR.sub("", s)
-    s = RE_JS_PROTOCOL.sub(r"\1#\2", s)
-
+    s = _fix_utf8_mojibake(html_content)
+    # Ohne "<" bzw. "=" kann keine der Token-Arten treffen
+    if "<" in s or "=" in s:
+        s = _strip_tags(s)
     if compress_ws:
         # Normiere Whitespace etwas, ohne HTML zu zerstören
-        s = re.sub(r"[ \t]+\n", "\n", s)
-        s = re.sub(r"\n{3,}", "\n\n", s)
-        s = re.sub(r"[ \t]{2,}", " ", s)
-
+        s = _compress_ws(s)
     return s
 
+
+def _sanitize_plain_text(text: str) -> str:
+    return _compress_ws(_fix_utf8_mojibake(text)) if text else ""
+
+
+def is_plain_text_key(key: Any) -> bool:
+    """Keys, deren Werte im Template als Text (autoescaped) landen – kein Tag-Scan nötig."""
+    if not isinstance(key, str) or "HTML" in key:
+        return False
+    return key in PLAIN_TEXT_KEYS or key.startswith(_PLAIN_TEXT_PREFIXES) or key.endswith(_PLAIN_TEXT_SUFFIXES)
+
+
+_cache: "OrderedDict[Tuple[bool, bytes], str]" = OrderedDict()
+_cache_lock = threading.Lock()
+_stats: Dict[str, int] = {"sanitized": 0, "plain": 0, "cache_hits": 0}
+
+
+def _sanitize_cached(text: str, compress_ws: bool = True) -> str:
+    if HTML_SANITIZER_CACHE_SIZE <= 0 or len(text) < _CACHE_MIN_CHARS:
+        return sanitize_section_html(text, compress_ws=compress_ws)
+    key = (compress_ws, hashlib.sha256(text.encode("utf-8", "surrogatepass")).digest())
+    with _cache_lock:
+        hit = _cache.get(key)
+        if hit is not None:
+            _cache.move_to_end(key)
+            _stats["cache_hits"] += 1
+            return hit
+    out = sanitize_section_html(text, compress_ws=compress_ws)
+    with _cache_lock:
+        _cache[key] = out
+        while len(_cache) > HTML_SANITIZER_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return out
+
+
+def sanitizer_stats() -> Dict[str, int]:
+    with _cache_lock:
+        return {**_stats, "cache_size": len(_cache)}
+
+
+def clear_sanitizer_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
+
+
 def sanitize_sections_dict(sections: dict, truthy_env: Optional[bool] = True) -> dict:
-    """Sanitisiert alle string‑Werte in einem Sections‑Dict."""
+    """Sanitisiert alle string‑Werte in einem Sections‑Dict (Klartext-Keys ohne Tag-Scan)."""
     if not isinstance(sections, dict):
         return sections  # type: ignore[unreachable]
     out = {}
+    plain = sanitized = 0
     for k, v in sections.items():
-        if isinstance(v, str):
-            out[k] = sanitize_section_html(v, compress_ws=True)
-        else:
+        if not isinstance(v, str):
             out[k] = v
+        elif is_plain_text_key(k):
+            out[k] = _sanitize_plain_text(v)
+            plain += 1
+        else:
+            out[k] = _sanitize_cached(v, compress_ws=True)
+            sanitized += 1
+    with _cache_lock:
+        _stats["plain"] += plain
+        _stats["sanitized"] += sanitized
     return out
@@ -0,0 +1,352 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Persistente Analyse-Queue + Worker-Pool
+- Routen legen nur einen Job an (``enqueue_analysis``) und antworten sofort mit 202.
+- Worker claimen Jobs per Lease (optimistisches UPDATE, funktioniert mit Postgres & SQLite).
+- Heartbeat verlängert die Lease während ``gpt_analyze.run_async`` läuft.
+- Fehler → Retry mit Exponential-Backoff + Jitter bis ``max_attempts``.
+- Crash-Recovery: Jobs mit abgelaufener Lease werden von anderen Workern übernommen.
+
+ENV:
+  ANALYSIS_WORKERS            Anzahl Worker-Threads im Web-Prozess (Default 2; 0 = nur externer Worker)
+  ANALYSIS_JOB_LEASE_SEC      Lease-Dauer in Sekunden (Default 120)
+  ANALYSIS_JOB_POLL_SEC       Poll-Intervall bei leerer Queue (Default 2)
+  ANALYSIS_JOB_MAX_ATTEMPTS   Max. Versuche pro Job (Default 3)
+  ANALYSIS_JOB_RETRY_BASE_SEC Basis für Backoff (Default 30), Deckel ANALYSIS_JOB_RETRY_MAX_SEC (Default 900)
+"""
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import Session
+
+import core.db as core_db
+from models import AnalysisJob
+
+log = logging.getLogger(__name__)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+LEASE_SEC = _env_int("ANALYSIS_JOB_LEASE_SEC", 120)
+POLL_SEC = _env_int("ANALYSIS_JOB_POLL_SEC", 2)
+MAX_ATTEMPTS = _env_int("ANALYSIS_JOB_MAX_ATTEMPTS", 3)
+RETRY_BASE_SEC = _env_int("ANALYSIS_JOB_RETRY_BASE_SEC", 30)
+RETRY_MAX_SEC = _env_int("ANALYSIS_JOB_RETRY_MAX_SEC", 900)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def ensure_jobs_table(engine: Any = None) -> None:
+    """Legt ``analysis_jobs`` an, falls nicht vorhanden (idempotent)."""
+    AnalysisJob.__table__.create(bind=engine or core_db.engine, checkfirst=True)
+
+
+# ---------------------------------------------------------------------------
+# Queue-Operationen
+# ---------------------------------------------------------------------------
+def enqueue_analysis(
+    db: Session,
+    briefing_id: int,
+    email: Optional[str] = None,
+    *,
+    source: str = "api",
+    max_attempts: Optional[int] = None,
+) -> AnalysisJob:
+    """Legt einen Analyse-Job an und committet. Kein LLM/PDF-Aufruf im Request-Pfad."""
+    job = AnalysisJob(
+        briefing_id=int(briefing_id),
+        email=email,
+        source=source,
+        status="queued",
+        attempts=0,
+        max_attempts=max_attempts or MAX_ATTEMPTS,
+        run_after=_utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    log.info("📥 Analysis job queued: job_id=%s briefing_id=%s source=%s", job.id, briefing_id, source)
+    return job
+
+
+def _claimable(now: datetime):
+    return or_(
+        and_(AnalysisJob.status == "queued", AnalysisJob.run_after <= now),
+        and_(
+            AnalysisJob.status == "running",
+            AnalysisJob.lease_until < now,
+            AnalysisJob.attempts < AnalysisJob.max_attempts,
+        ),
+    )
+
+
+def claim_next(db: Session, worker_id: str, lease_sec: Optional[int] = None) -> Optional[AnalysisJob]:
+    """Claimt den nächsten fälligen Job. Race-sicher über bedingtes UPDATE (rowcount == 1)."""
+    now = _utcnow()
+    lease = timedelta(seconds=lease_sec or LEASE_SEC)
+    candidates = db.execute(
+        select(AnalysisJob.id)
+        .where(_claimable(now))
+        .order_by(AnalysisJob.run_after, AnalysisJob.id)
+        .limit(5)
+    ).scalars().all()
+    for job_id in candidates:
+        res = db.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.id == job_id, _claimable(now))
+            .values(
+                status="running",
+                lease_owner=worker_id,
+                lease_until=now + lease,
+                heartbeat_at=now,
+                started_at=now,
+                attempts=AnalysisJob.attempts + 1,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        if res.rowcount == 1:
+            job = db.get(AnalysisJob, job_id)
+            if job is not None:
+                db.refresh(job)
+            return job
+    return None
+
+
+def heartbeat(db: Session, job_id: int, worker_id: str, lease_sec: Optional[int] = None) -> bool:
+    """Verlängert die Lease. False = Lease verloren (anderer Worker hat übernommen)."""
+    now = _utcnow()
+    res = db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id, AnalysisJob.lease_owner == worker_id, AnalysisJob.status == "running")
+        .values(lease_until=now + timedelta(seconds=lease_sec or LEASE_SEC), heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return res.rowcount == 1
+
+
+def complete(db: Session, job_id: int, worker_id: str) -> None:
+    now = _utcnow()
+    db.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.id == job_id, AnalysisJob.lease_owner == worker_id)
+        .values(status="done", lease_until=None, finished_at=now, last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def _backoff_seconds(attempts: int) -> float:
+    base = min(RETRY_MAX_SEC, RETRY_BASE_SEC * (2 ** max(0, attempts - 1)))
+    return base * (0.8 + random.random() * 0.4)
+
+
+def fail(db: Session, job_id: int, worker_id: str, error: str) -> str:
+    """Markiert einen Fehlversuch. Gibt den neuen Status zurück (``queued`` oder ``failed``)."""
+    job = db.get(AnalysisJob, job_id)
+    if job is None:
+        return "missing"
+    db.refresh(job)
+    if job.lease_owner != worker_id:
+        log.warning("⚠️  Job %s: lease lost before fail() – ignoring", job_id)
+        return job.status
+    now = _utcnow()
+    job.last_error = (error or "")[:4000]
+    job.lease_until = None
+    if job.attempts >= job.max_attempts:
+        job.status = "failed"
+        job.finished_at = now
+    else:
+        job.status = "queued"
+        job.run_after = now + timedelta(seconds=_backoff_seconds(job.attempts))
+    db.commit()
+    return job.status
+
+
+def reap_expired(db: Session) -> int:
+    """Jobs mit abgelaufener Lease und ohne Restversuche endgültig auf ``failed`` setzen."""
+    now = _utcnow()
+    res = db.execute(
+        update(AnalysisJob)
+        .where(
+            AnalysisJob.status == "running",
+            AnalysisJob.lease_until < now,
+            AnalysisJob.attempts >= AnalysisJob.max_attempts,
+        )
+        .values(status="failed", finished_at=now, lease_until=None, last_error="lease_expired")
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return int(res.rowcount or 0)
+
+
+def queue_stats(db: Session) -> Dict[str, int]:
+    rows = db.execute(
+        select(AnalysisJob.status, func.count(AnalysisJob.id)).group_by(AnalysisJob.status)
+    ).all()
+    stats = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+    for status, count in rows:
+        stats[str(status)] = int(count)
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+def _default_runner(briefing_id: int, email: Optional[str]) -> Any:
+    from gpt_analyze import run_async  # lazy: schwerer Import nur im Worker
+    return run_async(briefing_id, email)
+
+
+class AnalysisWorker(threading.Thread):
+    """Ein Worker-Thread: claim → run (mit Heartbeat) → complete/fail."""
+
+    def __init__(
+        self,
+        stop_event: threading.Event,
+        runner: Optional[Callable[[int, Optional[str]], Any]] = None,
+        name: Optional[str] = None,
+    ) -> None:
+        self.worker_id = name or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        super().__init__(name=f"analysis-worker-{self.worker_id}", daemon=True)
+        self.stop_event = stop_event
+        self.runner = runner or _default_runner
+
+    def _heartbeat_loop(self, job_id: int, done: threading.Event) -> None:
+        interval = max(1.0, LEASE_SEC / 3.0)
+        while not done.wait(interval):
+            db = core_db.SessionLocal()
+            try:
+                if not heartbeat(db, job_id, self.worker_id):
+                    log.warning("⚠️  Job %s: lease lost (worker=%s)", job_id, self.worker_id)
+                    return
+            except Exception as exc:
+                log.warning("Heartbeat failed for job %s: %s", job_id, exc)
+            finally:
+                db.close()
+
+    def run_once(self) -> bool:
+        """Verarbeitet höchstens einen Job. True, wenn ein Job bearbeitet wurde."""
+        db = core_db.SessionLocal()
+        try:
+            reap_expired(db)
+            job = claim_next(db, self.worker_id)
+            if job is None:
+                return False
+            job_id, briefing_id, email, attempt = job.id, job.briefing_id, job.email, job.attempts
+        finally:
+            db.close()
+
+        log.info("🚀 Worker %s: job_id=%s briefing_id=%s attempt=%s", self.worker_id, job_id, briefing_id, attempt)
+        done = threading.Event()
+        hb = threading.Thread(target=self._heartbeat_loop, args=(job_id, done), daemon=True)
+        hb.start()
+        error: Optional[str] = None
+        try:
+            self.runner(briefing_id, email)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            log.error("❌ Job %s failed (attempt %s): %s", job_id, attempt, error, exc_info=True)
+        finally:
+            done.set()
+            hb.join(timeout=5)
+
+        db = core_db.SessionLocal()
+        try:
+            if error is None:
+                complete(db, job_id, self.worker_id)
+                log.info("✅ Job %s done", job_id)
+            else:
+                status = fail(db, job_id, self.worker_id, error)
+                log.info("↻ Job %s -> %s", job_id, status)
+        finally:
+            db.close()
+        return True
+
+    def run(self) -> None:
+        log.info("✓ Analysis worker started: %s", self.worker_id)
+        while not self.stop_event.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as exc:
+                log.error("Worker loop error (%s): %s", self.worker_id, exc)
+                worked = False
+            if not worked:
+                self.stop_event.wait(POLL_SEC)
+        log.info("Analysis worker stopped: %s", self.worker_id)
+
+
+class WorkerPool:
+    """Startet/stoppt N Worker-Threads (im Web-Prozess oder in scripts/analysis_worker.py)."""
+
+    def __init__(self, size: int, runner: Optional[Callable[[int, Optional[str]], Any]] = None) -> None:
+        self.size = max(0, int(size))
+        self.runner = runner
+        self.stop_event = threading.Event()
+        self.workers: List[AnalysisWorker] = []
+
+    def start(self) -> "WorkerPool":
+        for _ in range(self.size):
+            w = AnalysisWorker(self.stop_event, runner=self.runner)
+            w.start()
+            self.workers.append(w)
+        return self
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self.stop_event.set()
+        for w in self.workers:
+            w.join(timeout=timeout)
+        self.workers.clear()
+
+
+_pool: Optional[WorkerPool] = None
+
+
+def start_worker_pool(size: Optional[int] = None) -> Optional[WorkerPool]:
+    """Startet den prozessweiten Worker-Pool (idempotent). ``size`` <= 0 → kein Pool."""
+    global _pool
+    n = _env_int("ANALYSIS_WORKERS", 2) if size is None else size
+    if n <= 0:
+        log.info("ℹ️  ANALYSIS_WORKERS=0 – no in-process workers (external worker expected)")
+        return None
+    if _pool is None:
+        _pool = WorkerPool(n).start()
+    return _pool
+
+
+def stop_worker_pool(timeout: float = 10.0) -> None:
+    global _pool
+    if _pool is not None:
+        _pool.stop(timeout=timeout)
+        _pool = None
+
+
+__all__ = [
+    "AnalysisWorker",
+    "WorkerPool",
+    "claim_next",
+    "complete",
+    "enqueue_analysis",
+    "ensure_jobs_table",
+    "fail",
+    "heartbeat",
+    "queue_stats",
+    "reap_expired",
+    "start_worker_pool",
+    "stop_worker_pool",
+]
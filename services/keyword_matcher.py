@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Vorkompilierter Multi-Pattern-Matcher für Schlagwortlisten (NSFW/Spam-Filter, Relevanz)
+- Alle Schlagworte aller Kategorien landen einmalig in *einer* Regex, als Präfixbaum kompiliert
+  (``p(?:orn(?:o|star)?|rostitute)``) → ein Durchlauf je (kleingeschriebenem) Text liefert alle
+  getroffenen Kategorien; die Kosten bleiben flach, auch wenn die Listen wachsen.
+- Am Trefferpunkt werden auch kürzere Schlagworte mit gleichem Anfang gewertet („pornhub“ trifft
+  ``spam`` und das ``nsfw``-Wort „porn“). Die Regex steht in einem Lookahead ``(?=(…))`` und
+  verbraucht keinen Text → auch Treffer, die *innerhalb* eines anderen beginnen, werden gesehen
+  („sexvideos“ trifft „sex“ *und* „xvideos“).
+- Modus je Kategorie: ``substring`` (wie ``in``), ``prefix`` (Wortanfang, „dating“ trifft nicht
+  „updating“) oder ``word`` (ganzes Wort).
+- ``matcher_for()`` cached Matcher für dynamische Listen (z. B. Profil-Schlagworte im Research).
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+MODES = ("substring", "prefix", "word")
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Alternation als Präfixbaum; optionale Fortsetzungen sind gierig → längster Treffer zuerst."""
+    root: Dict[str, dict] = {}
+    for w in words:
+        node = root
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        subs = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not subs:
+            return ""
+        body = subs[0] if len(subs) == 1 else "(?:" + "|".join(subs) + ")"
+        return "(?:" + body + ")?" if "" in node else body
+
+    return build(root)
+
+
+class KeywordMatcher:
+    """``KeywordMatcher({"nsfw": (NSFW_KEYWORDS, "prefix"), "spam": (SPAM_DOMAINS, "substring")})``"""
+
+    def __init__(self, categories: Mapping[str, Union[Iterable[str], Tuple[Iterable[str], str]]]) -> None:
+        # Schlagwort → [(kategorie, modus)]
+        owners: Dict[str, List[Tuple[str, str]]] = {}
+        for cat, spec in categories.items():
+            words, mode = spec if isinstance(spec, tuple) else (spec, "substring")
+            if mode not in MODES:
+                raise ValueError(f"unknown match mode {mode!r} for category {cat!r}")
+            for w in words:
+                w = str(w).strip().lower()
+                if w:
+                    owners.setdefault(w, []).append((cat, mode))
+        self.categories: Set[str] = set(categories)
+        self._owners = owners
+        # Kürzere Schlagworte, die Präfix eines längeren sind, werden am selben Startpunkt mitgeprüft
+        self._prefixes: Dict[str, List[str]] = {
+            w: [p for p in owners if len(p) <= len(w) and w.startswith(p)] for w in owners
+        }
+        # Lookahead: jede Startposition wird geprüft, überlappende Treffer gehen nicht verloren
+        self._rx: Optional[re.Pattern[str]] = re.compile("(?=(" + _trie_pattern(owners) + "))") if owners else None
+
+    def _cats_at(self, text: str, pos: int, hit: str, found: Set[str]) -> None:
+        left_ok = pos == 0 or not _is_word(text[pos - 1])
+        for w in self._prefixes.get(hit, ()):
+            end = pos + len(w)
+            right_ok = end >= len(text) or not _is_word(text[end])
+            for cat, mode in self._owners[w]:
+                if mode == "substring" or (left_ok and (mode == "prefix" or right_ok)):
+                    found.add(cat)
+
+    def scan(self, text: Optional[str], only: Optional[Iterable[str]] = None) -> Set[str]:
+        """Alle getroffenen Kategorien (ein Durchlauf; stoppt, sobald alle gesuchten gefunden sind)."""
+        found: Set[str] = set()
+        if not text or self._rx is None:
+            return found
+        wanted = set(only) if only is not None else self.categories
+        low = text.lower()
+        for m in self._rx.finditer(low):
+            self._cats_at(low, m.start(), m.group(1), found)
+            if wanted <= found:
+                break
+        return found & wanted
+
+    def matches(self, text: Optional[str], category: Optional[str] = None) -> bool:
+        return bool(self.scan(text, None if category is None else (category,)))
+
+
+@lru_cache(maxsize=256)
+def _cached(keywords: Tuple[str, ...], mode: str) -> KeywordMatcher:
+    return KeywordMatcher({"match": (keywords, mode)})
+
+
+def matcher_for(keywords: Iterable[str], mode: str = "substring") -> KeywordMatcher:
+    """Gecachter Ein-Kategorien-Matcher (Kategorie ``match``) für eine Schlagwortliste."""
+    return _cached(tuple(sorted({str(k).lower() for k in keywords if k})), mode)
+
+
+__all__ = ["KeywordMatcher", "matcher_for"]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Content-adressierter LLM-Antwort-Cache (SQLite, persistent)
+- Schlüssel = SHA-256 über (Modell, System-Prompt, User-Prompt, Temperatur, max_tokens).
+- Identische Reruns/Einreichungen kosten keine API-Calls mehr.
+- Eviction: TTL + LRU (``last_access``) nach Eintragszahl und Gesamtgröße (``SqliteCache``).
+- Pro Sektion abschaltbar (Default: ``gamechanger`` – bewusst kreativ, Temperatur 0.4).
+- Treffer/Fehlschläge werden gezählt (``stats()`` → Admin).
+- Fehler im Cache führen nie zu Report-Fehlern (Cache wird dann einfach umgangen).
+
+ENV:
+  LLM_CACHE_ENABLED        1/0 (Default: ENABLE_LLM_CACHE bzw. 1)
+  LLM_CACHE_PATH           SQLite-Datei (Default /tmp/ksj_llm_cache.sqlite3)
+  LLM_CACHE_TTL_SEC        Lebensdauer eines Eintrags (Default 7 Tage)
+  LLM_CACHE_MAX_ENTRIES    Max. Einträge (Default 5000)
+  LLM_CACHE_MAX_MB         Max. Gesamtgröße der Antworten in MB (Default 64)
+  LLM_CACHE_SKIP_SECTIONS  Kommagetrennte Sektionen ohne Cache (Default "gamechanger")
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from .sqlite_store import SqliteCache
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", os.getenv("ENABLE_LLM_CACHE", "1")) in ("1", "true", "TRUE", "yes", "YES")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "/tmp/ksj_llm_cache.sqlite3")
+LLM_CACHE_TTL_SEC = int(os.getenv("LLM_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "64"))
+LLM_CACHE_SKIP_SECTIONS = {
+    s.strip() for s in os.getenv("LLM_CACHE_SKIP_SECTIONS", "gamechanger").split(",") if s.strip()
+}
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    section TEXT,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache(last_access);
+"""
+
+
+def cache_key(model: str, system_prompt: str, prompt: str, temperature: float, max_tokens: int) -> str:
+    raw = json.dumps([model, system_prompt, prompt, round(float(temperature), 4), int(max_tokens)],
+                     ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMCache(SqliteCache):
+    """Thread-sicherer SQLite-Cache (eine Verbindung, WAL, Lock; services/sqlite_store.py)."""
+
+    table = "llm_cache"
+    ddl = _DDL
+    label = "LLM cache"
+    tag_column = "section"
+
+    def __init__(self, path: str = LLM_CACHE_PATH, *, ttl_sec: int = LLM_CACHE_TTL_SEC,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, max_bytes: int = int(LLM_CACHE_MAX_MB * 1024 * 1024),
+                 skip_sections: Optional[set] = None) -> None:
+        super().__init__(path, max_age_sec=ttl_sec, max_bytes=max_bytes, max_entries=max_entries,
+                         counters=("hits", "misses", "stores", "evictions", "bypass", "errors"))
+        self.skip_sections = set(LLM_CACHE_SKIP_SECTIONS if skip_sections is None else skip_sections)
+
+    def enabled_for(self, section: Optional[str]) -> bool:
+        if section and section in self.skip_sections:
+            self.counters["bypass"] += 1
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[str]:
+        return self._get(key)
+
+    def put(self, key: str, value: str, section: Optional[str] = None) -> None:
+        if not value:
+            return
+        self._put(key, value, len(value.encode("utf-8")), section)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": LLM_CACHE_ENABLED, "skip_sections": sorted(self.skip_sections), **self._base_stats()}
+
+
+_cache: Optional[LLMCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMCache]:
+    """Prozessweite Instanz oder ``None``, wenn per ENV deaktiviert."""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache()
+    return _cache
+
+
+__all__ = ["LLMCache", "cache_key", "get_llm_cache"]
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Gepoolter, asynchroner LLM-Client (Chat Completions)
+- Ein prozessweiter ``httpx.AsyncClient`` (Keep-Alive-Pool, HTTP/2 falls ``h2`` installiert)
+  auf einem eigenen Event-Loop-Thread (services/client_loop.py) → kein TCP/TLS-Handshake pro Aufruf.
+- ``call_llm()`` ist aus jedem Event-Loop awaitbar, ``call_llm_sync()`` ist der Shim für Sync-Code.
+- Fehler werden geloggt und als ``None`` zurückgegeben (wie bisher ``_call_openai``).
+- ``run_sync()`` führt eine Coroutine aus Sync-Code aus (auch wenn bereits ein Loop läuft).
+- Jeder Call läuft durch den globalen Rate-Governor (services/llm_governor.py); ``llm_run_key()``
+  ordnet Calls einem Report-Run zu (faire Vergabe), 429 + ``Retry-After`` wird dort behandelt.
+- Ist ein ``RunTrace`` aktiv (services/run_trace.py), wird jeder Call mit ``label`` verbucht
+  (Wall-Zeit, Queue-Wartezeit, Retries, Prompt/Completion-Tokens).
+
+ENV:
+  LLM_MAX_CONNECTIONS    Max. offene Verbindungen im Pool (Default 20)
+  LLM_MAX_KEEPALIVE      Max. Keep-Alive-Verbindungen (Default 10)
+  LLM_HTTP2              HTTP/2 aktivieren, falls verfügbar (Default 1)
+  LLM_RATE_RETRIES       Wiederholungen nach HTTP 429 (Default 3)
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+
+import httpx
+
+from services.client_loop import HAS_H2, lazy_client_loop
+from services.llm_governor import estimate_tokens, get_governor, parse_retry_after
+from services.run_trace import RunTrace, current_trace
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE = int(os.getenv("LLM_MAX_KEEPALIVE", "10"))
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "1") in ("1", "true", "TRUE", "yes", "YES") and HAS_H2
+LLM_RATE_RETRIES = int(os.getenv("LLM_RATE_RETRIES", "3"))
+
+_run_key: contextvars.ContextVar[str] = contextvars.ContextVar("llm_run_key", default="-")
+
+
+@contextmanager
+def llm_run_key(key: str) -> Iterator[None]:
+    """Ordnet alle LLM-Calls im Block einem Run zu (Fairness im Governor)."""
+    token = _run_key.set(str(key or "-"))
+    try:
+        yield
+    finally:
+        _run_key.reset(token)
+
+
+def _new_client() -> httpx.AsyncClient:
+    # Limits gelten für den ganzen Pool (nicht pro Host); im Betrieb geht (fast) alles an die OpenAI-API.
+    client = httpx.AsyncClient(
+        http2=LLM_HTTP2,
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE,
+            keepalive_expiry=60.0,
+        ),
+    )
+    log.info("✓ LLM client pool ready (http2=%s, max_connections=%d)", LLM_HTTP2, LLM_MAX_CONNECTIONS)
+    return client
+
+
+_get_client_loop = lazy_client_loop("llm-client-loop", _new_client)
+
+
+def _headers(api_base: str, api_key: str) -> Dict[str, str]:
+    headers = {"Content-Type": "application/json"}
+    if "openai.azure.com" in api_base:
+        headers["api-key"] = api_key
+    else:
+        headers["Authorization"] = f"Bearer {api_key}"
+    return headers
+
+
+async def _post_chat(url: str, headers: Dict[str, str], body: Dict[str, Any], timeout: float,
+                     run_key: str = "-", trace: Optional[RunTrace] = None, label: Optional[str] = None) -> Optional[str]:
+    """Läuft auf dem Client-Loop: Governor-Slot holen, senden, bei 429 pausieren und erneut anstellen."""
+    client = _get_client_loop().client
+    assert client is not None
+    governor = get_governor()
+    msgs = body.get("messages") or []
+    est = estimate_tokens(*(str(m.get("content") or "") for m in msgs)) + int(body.get("max_tokens") or 0)
+    t0 = time.perf_counter()
+    acct: Dict[str, Any] = {"queue_ms": 0.0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0, "ok": False}
+    try:
+        for attempt in range(LLM_RATE_RETRIES + 1):
+            acct["queue_ms"] += await governor.acquire(run_key, est) * 1000.0
+            r = await client.post(url, headers=headers, json=body, timeout=httpx.Timeout(timeout, connect=10.0))
+            if r.status_code == 429 and attempt < LLM_RATE_RETRIES:
+                governor.on_rate_limited(parse_retry_after(r.headers))
+                acct["retries"] += 1
+                continue
+            r.raise_for_status()
+            try:
+                data = r.json()
+                usage = data.get("usage") or {}
+                governor.record_usage(usage.get("total_tokens") or 0)
+                acct["prompt_tokens"] = int(usage.get("prompt_tokens") or 0)
+                acct["completion_tokens"] = int(usage.get("completion_tokens") or 0)
+                content = str(data["choices"][0]["message"]["content"])
+                acct["ok"] = True
+                return content
+            except (KeyError, IndexError, TypeError, ValueError, AttributeError) as e:
+                log.error("Unexpected OpenAI response structure: %s. Response: %s", e, r.text[:500])
+                return None
+        return None
+    except httpx.HTTPError as exc:
+        log.error("❌ OpenAI request error: %s", str(exc)[:200])
+        return None
+    except Exception as exc:
+        log.error("❌ OpenAI unexpected error: %s", str(exc)[:200])
+        return None
+    finally:
+        if trace is not None:
+            trace.llm_call(label, wall_ms=(time.perf_counter() - t0) * 1000.0, **acct)
+
+
+def _prepare(prompt: str, system_prompt: str, temperature: float, max_tokens: int,
+             model: str, api_key: str, api_base: Optional[str]) -> tuple[str, Dict[str, str], Dict[str, Any]]:
+    base = (api_base or "https://api.openai.com").rstrip("/")
+    body = {
+        "model": model,
+        "messages": [{"role": "system", "content": system_prompt}, {"role": "user", "content": prompt}],
+        "temperature": float(temperature),
+        "max_tokens": int(max_tokens),
+    }
+    return f"{base}/v1/chat/completions", _headers(base, api_key), body
+
+
+async def call_llm(
+    prompt: str,
+    system_prompt: str,
+    *,
+    temperature: float,
+    max_tokens: int,
+    model: str,
+    api_key: str,
+    api_base: Optional[str] = None,
+    timeout: float = 120.0,
+    label: Optional[str] = None,
+) -> Optional[str]:
+    """Chat Completion über den gemeinsamen Pool; awaitbar aus jedem Event-Loop."""
+    url, headers, body = _prepare(prompt, system_prompt, temperature, max_tokens, model, api_key, api_base)
+    cl = _get_client_loop()
+    coro = _post_chat(url, headers, body, timeout, _run_key.get(), current_trace(), label)
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is cl.loop:
+        return await coro
+    return await asyncio.wrap_future(cl.submit(coro))  # type: ignore[arg-type]
+
+
+def call_llm_sync(
+    prompt: str,
+    system_prompt: str,
+    *,
+    temperature: float,
+    max_tokens: int,
+    model: str,
+    api_key: str,
+    api_base: Optional[str] = None,
+    timeout: float = 120.0,
+    label: Optional[str] = None,
+) -> Optional[str]:
+    """Sync-Shim für bestehende Aufrufer (blockiert nur den aufrufenden Thread)."""
+    url, headers, body = _prepare(prompt, system_prompt, temperature, max_tokens, model, api_key, api_base)
+    fut = _get_client_loop().submit(_post_chat(url, headers, body, timeout, _run_key.get(), current_trace(), label))
+    try:
+        # Wartezeit im Governor (Drosselung/Retry-After) kommt zur reinen Request-Dauer hinzu
+        return fut.result(timeout=timeout * (LLM_RATE_RETRIES + 1) + 60)
+    except Exception as exc:
+        fut.cancel()
+        log.error("❌ OpenAI call aborted: %s", str(exc)[:200])
+        return None
+
+
+def run_sync(coro: Awaitable[T]) -> T:
+    """Führt eine Coroutine aus Sync-Code aus; läuft bereits ein Loop, dann in einem Hilfs-Thread."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)  # type: ignore[arg-type]
+    ctx = contextvars.copy_context()  # Run-Key u. ä. in den Hilfs-Thread mitnehmen
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(ctx.run, asyncio.run, coro).result()  # type: ignore[arg-type]
+
+
+def governor_stats() -> Dict[str, Any]:
+    """Momentaufnahme des Rate-Governors (für Admin/Monitoring)."""
+    return get_governor().snapshot()
+
+
+__all__ = ["call_llm", "call_llm_sync", "governor_stats", "llm_run_key", "run_sync"]
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Globaler LLM-Rate-Governor (prozessweit, optional prozessübergreifend via Redis)
+- Zwei Token-Buckets: Requests/Minute (RPM) und Tokens/Minute (TPM).
+- Kosten pro Call = geschätzte Prompt-Tokens + max_tokens (so zählt auch OpenAI).
+- Faire Warteschlange: Round-Robin über Runs (``run_key``), damit ein großer Report
+  parallele Reports nicht aushungert.
+- 429/``Retry-After`` pausiert den Governor für alle Runs statt Retry-Stürme zu erzeugen.
+- Läuft ausschließlich auf dem Event-Loop des LLM-Clients (services/llm_client.py) → keine Locks.
+
+ENV:
+  LLM_RPM                 Requests pro Minute (Default 500; 0 = unbegrenzt)
+  LLM_TPM                 Tokens pro Minute (Default 300000; 0 = unbegrenzt)
+  LLM_BURST_SEC           Bucket-Größe in Sekunden Kontingent (Default 10)
+  LLM_GOVERNOR_SHARED     1 = zusätzlich Minuten-Zähler in Redis (REDIS_URL) für mehrere Pods/Worker
+"""
+import asyncio
+import logging
+import math
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+LLM_RPM = int(os.getenv("LLM_RPM", "500"))
+LLM_TPM = int(os.getenv("LLM_TPM", "300000"))
+LLM_BURST_SEC = float(os.getenv("LLM_BURST_SEC", "10"))
+LLM_GOVERNOR_SHARED = os.getenv("LLM_GOVERNOR_SHARED", "0") in ("1", "true", "TRUE", "yes", "YES")
+
+
+def estimate_tokens(*texts: str) -> int:
+    """Grobe Token-Schätzung ohne Tokenizer (~4 Zeichen/Token, +4 Overhead je Message)."""
+    return sum(int(math.ceil(len(t or "") / 4.0)) + 4 for t in texts)
+
+
+def parse_retry_after(headers: Any) -> Optional[float]:
+    """Liest ``retry-after-ms`` bzw. ``retry-after`` (Sekunden) aus Response-Headern."""
+    try:
+        ms = headers.get("retry-after-ms")
+        if ms:
+            return max(0.0, float(ms) / 1000.0)
+        sec = headers.get("retry-after")
+        if sec:
+            return max(0.0, float(sec))
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+class _Bucket:
+    def __init__(self, per_minute: int, burst_sec: float) -> None:
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_sec)
+        self.level = self.capacity
+        self.ts = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def refill(self, now: float) -> None:
+        if self.unlimited:
+            return
+        self.level = min(self.capacity, self.level + (now - self.ts) * self.rate)
+        self.ts = now
+
+    def wait_for(self, cost: float) -> float:
+        if self.unlimited:
+            return 0.0
+        cost = min(cost, self.capacity)
+        return 0.0 if self.level >= cost else (cost - self.level) / self.rate
+
+    def take(self, cost: float) -> None:
+        if not self.unlimited:
+            self.level -= min(cost, self.capacity)
+
+    def drain(self) -> None:
+        if not self.unlimited:
+            self.level = min(self.level, 0.0)
+
+
+class LLMGovernor:
+    """Token-Bucket-Governor mit fairer Round-Robin-Vergabe je Run."""
+
+    def __init__(self, rpm: int = LLM_RPM, tpm: int = LLM_TPM, burst_sec: float = LLM_BURST_SEC,
+                 shared: bool = LLM_GOVERNOR_SHARED) -> None:
+        self.req = _Bucket(rpm, burst_sec)
+        self.tok = _Bucket(tpm, burst_sec)
+        self.rpm, self.tpm, self.shared = rpm, tpm, shared
+        self.paused_until = 0.0
+        self._queues: "OrderedDict[str, Deque[Tuple[int, asyncio.Future]]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._pump_task: Optional[asyncio.Task] = None
+        self.stats: Dict[str, float] = {
+            "granted": 0, "throttled_waits": 0, "wait_sec_total": 0.0,
+            "rate_limited": 0, "est_tokens": 0, "used_tokens": 0,
+        }
+
+    # ------------------------------------------------------------------ API
+    async def acquire(self, run_key: str, est_tokens: int) -> float:
+        """Wartet fair, bis RPM/TPM-Kontingent für diesen Call frei ist; liefert die Wartezeit (s)."""
+        if self.req.unlimited and self.tok.unlimited and not self.shared and time.monotonic() >= self.paused_until:
+            self.stats["granted"] += 1
+            self.stats["est_tokens"] += est_tokens
+            return 0.0
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        self._queues.setdefault(run_key or "-", deque()).append((est_tokens, fut))
+        self._ensure_pump()
+        assert self._wakeup is not None
+        self._wakeup.set()
+        t0 = time.monotonic()
+        await fut
+        waited = time.monotonic() - t0
+        if waited > 0.05:
+            self.stats["throttled_waits"] += 1
+            self.stats["wait_sec_total"] += waited
+        return waited
+
+    def on_rate_limited(self, retry_after: Optional[float]) -> float:
+        """429 vom Provider: alle Runs pausieren (Retry-After oder 2 s) und Buckets leeren."""
+        delay = retry_after if retry_after is not None else 2.0
+        self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        self.req.drain()
+        self.tok.drain()
+        self.stats["rate_limited"] += 1
+        log.warning("⏳ LLM rate limited – pausing governor for %.1fs", delay)
+        return delay
+
+    def record_usage(self, tokens: int) -> None:
+        self.stats["used_tokens"] += max(0, int(tokens or 0))
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        self.req.refill(now)
+        self.tok.refill(now)
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "shared": self.shared,
+            "paused_for_sec": round(max(0.0, self.paused_until - now), 2),
+            "queued": sum(len(q) for q in self._queues.values()),
+            "runs_waiting": len(self._queues),
+            "req_level": None if self.req.unlimited else round(self.req.level, 2),
+            "tok_level": None if self.tok.unlimited else round(self.tok.level, 1),
+            **{k: (round(v, 2) if isinstance(v, float) else v) for k, v in self.stats.items()},
+        }
+
+    # ------------------------------------------------------------ internals
+    def _ensure_pump(self) -> None:
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.get_running_loop().create_task(self._pump())
+
+    async def _shared_wait(self, cost: int) -> float:
+        """Redis-Minutenfenster (prozessübergreifend). 0 = zugelassen, sonst Wartezeit."""
+        from services.redis_utils import RedisBox
+        c = RedisBox.client()
+        if c is None:
+            return 0.0
+        minute = int(time.time() // 60)
+
+        def _admit() -> float:
+            pipe = c.pipeline()
+            pipe.incrby(f"llmgov:req:{minute}", 1)
+            pipe.incrby(f"llmgov:tok:{minute}", cost)
+            pipe.expire(f"llmgov:req:{minute}", 120)
+            pipe.expire(f"llmgov:tok:{minute}", 120)
+            n_req, n_tok, _, _ = pipe.execute()
+            if (self.rpm and n_req > self.rpm) or (self.tpm and n_tok > self.tpm):
+                c.decrby(f"llmgov:req:{minute}", 1)
+                c.decrby(f"llmgov:tok:{minute}", cost)
+                return 60.0 - (time.time() % 60) + 0.05
+            return 0.0
+
+        try:
+            return await asyncio.to_thread(_admit)
+        except Exception as exc:  # Redis-Ausfall darf LLM-Calls nicht blockieren
+            log.warning("LLM governor: shared limiter unavailable: %s", exc)
+            return 0.0
+
+    async def _pump(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            # Leere Queues entfernen
+            for k in [k for k, q in self._queues.items() if not q or q[0][1].cancelled()]:
+                q = self._queues[k]
+                while q and q[0][1].cancelled():
+                    q.popleft()
+                if not q:
+                    del self._queues[k]
+            if not self._queues:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            if now < self.paused_until:
+                await asyncio.sleep(self.paused_until - now)
+                continue
+            self.req.refill(now)
+            self.tok.refill(now)
+
+            run_key, q = next(iter(self._queues.items()))
+            cost, fut = q[0]
+            wait = max(self.req.wait_for(1), self.tok.wait_for(cost))
+            if wait > 0:
+                await asyncio.sleep(min(wait, 1.0))
+                continue
+            if self.shared:
+                shared_wait = await self._shared_wait(cost)
+                if shared_wait > 0:
+                    await asyncio.sleep(shared_wait)
+                    continue
+
+            q.popleft()
+            self.req.take(1)
+            self.tok.take(cost)
+            self.stats["granted"] += 1
+            self.stats["est_tokens"] += cost
+            if not fut.done():
+                fut.set_result(None)
+            # Round-Robin: Run ans Ende
+            self._queues.move_to_end(run_key)
+
+
+_governor: Optional[LLMGovernor] = None
+
+
+def get_governor() -> LLMGovernor:
+    global _governor
+    if _governor is None:
+        _governor = LLMGovernor()
+    return _governor
+
+
+__all__ = ["LLMGovernor", "estimate_tokens", "get_governor", "parse_retry_after"]
@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Content-adressierter PDF-Ergebnis-Cache (SQLite-Blobs, persistent)
+- Schlüssel = SHA-256 über (Template-Version, finales Report-HTML) – so, wie es ``render_pdf_from_html``
+  erhält (Logo-Referenzen, noch ohne data URIs; das Inlining ist deterministisch).
+- Byte-identische Reruns, E-Mail-Resends und Admin-Exporte werden zum Lookup statt zum 10–90 s-Render.
+- Template-Version = Inhalts-Hash des Haupt-Templates (bzw. ``PDF_TEMPLATE_VERSION``) → Template-Updates
+  invalidieren alte PDFs, auch wenn das HTML zufällig gleich bleibt.
+- Eviction: TTL + LRU (``last_access``) nach Eintragszahl und Gesamtgröße (``SqliteCache``).
+- Fehler im Cache führen nie zu Report-Fehlern (Cache wird dann einfach umgangen).
+
+ENV:
+  PDF_CACHE_ENABLED      1/0 (Default 1)
+  PDF_CACHE_PATH         SQLite-Datei (Default /tmp/ksj_pdf_cache.sqlite3)
+  PDF_CACHE_TTL_SEC      Lebensdauer eines Eintrags (Default 30 Tage)
+  PDF_CACHE_MAX_ENTRIES  Max. Einträge (Default 500)
+  PDF_CACHE_MAX_MB       Max. Gesamtgröße der PDFs in MB (Default 256)
+  PDF_TEMPLATE_VERSION   Feste Template-Version (Default: Hash von REPORT_TEMPLATE_PATH)
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .sqlite_store import SqliteCache
+
+PDF_CACHE_ENABLED = os.getenv("PDF_CACHE_ENABLED", "1") in ("1", "true", "TRUE", "yes", "YES")
+PDF_CACHE_PATH = os.getenv("PDF_CACHE_PATH", "/tmp/ksj_pdf_cache.sqlite3")
+PDF_CACHE_TTL_SEC = int(os.getenv("PDF_CACHE_TTL_SEC", str(30 * 24 * 3600)))
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "500"))
+PDF_CACHE_MAX_MB = float(os.getenv("PDF_CACHE_MAX_MB", "256"))
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS pdf_cache (
+    key TEXT PRIMARY KEY,
+    pdf BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    template_version TEXT,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS ix_pdf_cache_last_access ON pdf_cache(last_access);
+"""
+
+_version_lock = threading.Lock()
+_version: Optional[Tuple[str, int, str]] = None  # (pfad, mtime_ns, hash)
+
+
+def template_version() -> str:
+    """Kurzer Inhalts-Hash des Haupt-Templates (neu berechnet nur bei geänderter mtime)."""
+    global _version
+    fixed = os.getenv("PDF_TEMPLATE_VERSION")
+    if fixed:
+        return fixed
+    path = os.getenv("REPORT_TEMPLATE_PATH", "templates/pdf_template.html")
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return "unknown"
+    with _version_lock:
+        if _version is None or _version[:2] != (path, mtime):
+            with open(path, "rb") as fh:
+                _version = (path, mtime, hashlib.sha256(fh.read()).hexdigest()[:16])
+        return _version[2]
+
+
+def pdf_cache_key(html: str, version: Optional[str] = None) -> str:
+    h = hashlib.sha256()
+    h.update((version if version is not None else template_version()).encode("utf-8"))
+    h.update(b"\0")
+    h.update((html or "").encode("utf-8", "surrogatepass"))
+    return h.hexdigest()
+
+
+class PdfCache(SqliteCache):
+    """Thread-sicherer SQLite-Blob-Cache (eine Verbindung, WAL, Lock; services/sqlite_store.py)."""
+
+    table = "pdf_cache"
+    ddl = _DDL
+    label = "PDF cache"
+    value_column = "pdf"
+    tag_column = "template_version"
+
+    def __init__(self, path: str = PDF_CACHE_PATH, *, ttl_sec: int = PDF_CACHE_TTL_SEC,
+                 max_entries: int = PDF_CACHE_MAX_ENTRIES, max_bytes: int = int(PDF_CACHE_MAX_MB * 1024 * 1024)) -> None:
+        super().__init__(path, max_age_sec=ttl_sec, max_bytes=max_bytes, max_entries=max_entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        pdf = self._get(key)
+        return bytes(pdf) if pdf is not None else None
+
+    def put(self, key: str, pdf: Optional[bytes], version: Optional[str] = None) -> None:
+        if not pdf:
+            return
+        if len(pdf) > self.max_bytes:
+            return  # einzelnes PDF größer als der ganze Cache
+        self._put(key, sqlite3.Binary(pdf), len(pdf), version)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": PDF_CACHE_ENABLED, "template_version": template_version(), **self._base_stats()}
+
+
+_cache: Optional[PdfCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_pdf_cache() -> Optional[PdfCache]:
+    """Prozessweite Instanz oder ``None``, wenn per ENV deaktiviert."""
+    global _cache
+    if not PDF_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = PdfCache()
+    return _cache
+
+
+def lookup_pdf(html: str) -> Optional[bytes]:
+    """PDF-Bytes zum finalen Report-HTML, falls schon einmal gerendert (sonst ``None``)."""
+    cache = get_pdf_cache()
+    return cache.get(pdf_cache_key(html)) if cache is not None and html else None
+
+
+__all__ = ["PdfCache", "get_pdf_cache", "lookup_pdf", "pdf_cache_key", "template_version"]
@@ -4,6 +4,9 @@ from __future__ import annotations
 - Fix: Header‑Typen strikt String (X‑Request‑Id etc.)
 - Retries mit Exponential‑Backoff + Jitter; 429 berücksichtigt `Retry-After`.
 - Liefert entweder PDF‑Bytes oder eine URL, plus klare Fehlertexte.
+- Logo-Referenzen (``/report-assets/...``) werden erst hier, in einem Durchlauf, zu data URIs.
+- PDF-Ergebnis-Cache (services/pdf_cache.py): byte-identisches HTML → PDF aus dem Cache statt Remote-Render;
+  ``cache_key`` im Ergebnis, damit URL-Antworten nach dem Download nachgetragen werden können.
 """
 import json
 import logging
@@ -15,6 +18,9 @@ from uuid import uuid4
 
 import requests
 
+from services.pdf_cache import get_pdf_cache, pdf_cache_key, template_version
+from utils.logo_embedder import inline_assets
+
 log = logging.getLogger(__name__)
 
 PDF_SERVICE_URL = (os.getenv("PDF_SERVICE_URL") or "").rstrip("/")
@@ -50,7 +56,16 @@ def render_pdf_from_html(html: str, meta: Optional[Dict[str, Any]] = None) -> Di
     rid = _as_str(rid)
     url = f"{PDF_SERVICE_URL}/generate-pdf"
 
-    payload = {"html": html, "meta": meta}
+    cache = get_pdf_cache()
+    version = template_version()
+    key = pdf_cache_key(html, version)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached:
+            log.info("services.pdf_client: PDF cache hit: %s bytes (rid=%s)", len(cached), rid)
+            return {"pdf_bytes": cached, "pdf_url": None, "cached": True, "cache_key": key}
+
+    payload = {"html": inline_assets(html), "meta": meta}
     headers = {
         "Content-Type": "application/json",
         "Accept": "application/pdf, application/json",
@@ -68,14 +83,16 @@ def render_pdf_from_html(html: str, meta: Optional[Dict[str, Any]] = None) -> Di
                 ct = (r.headers.get("content-type") or "").lower()
                 if "application/pdf" in ct:
                     log.info("services.pdf_client: PDF generated successfully: %s bytes", len(r.content))
-                    return {"pdf_bytes": r.content, "pdf_url": None}
+                    if cache is not None:
+                        cache.put(key, r.content, version)
+                    return {"pdf_bytes": r.content, "pdf_url": None, "cache_key": key}
                 # Fallback: JSON mit URL
                 try:
                     data = r.json()
                 except Exception:
                     data = {}
                 log.info("services.pdf_client: PDF service returned URL response (rid=%s)", rid)
-                return {"pdf_bytes": None, "pdf_url": data.get("url"), "meta": data}
+                return {"pdf_bytes": None, "pdf_url": data.get("url"), "meta": data, "cache_key": key}
             # Fehlerfall
             last_err = f"{r.status_code} {r.text[:200]}"
             if r.status_code in (429, 500, 502, 503, 504):
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Single-Pass-Platzhalter-Ersetzung für Report-Sections und finales HTML
+- *Eine* vorkompilierte Regex erkennt ``{X}``, ``{{X}}``, ``{{ X }}`` und Ausdrücke wie ``{{ X * 0.8 }}``;
+  aufgelöst wird per Dict-Lookup auf den whitespace-normalisierten Inhalt → ein Scan je String,
+  unabhängig von der Anzahl der Variablen (statt Keys × Sections × Länge).
+- Ohne eigenen Eintrag wird ``{{ X * k }}`` (bekannte Zahl × Zahl-Literal) direkt ausgerechnet; danach
+  greift ein optionaler ``fallback(expr)`` (z. B. Jinja für Filter wie ``| round(2)``).
+- Nicht auflösbare ``{{ … }}`` bleiben stehen und werden gemeldet (``unresolved``); einfache ``{…}``
+  nicht, da sie auch in CSS/JSON vorkommen.
+- Optional: ``{123}`` → ``123`` (GPT setzt Zahlen gelegentlich in Klammern).
+"""
+import re
+from typing import Any, Callable, Iterable, Mapping, Optional, Set
+
+_TOKEN_RX = re.compile(r"\{\{\s*([^{}]*?)\s*\}\}|\{([A-Za-z_]\w*|\d+(?:\.\d+)?)\}")
+_WS_RX = re.compile(r"\s+")
+# normalisierter Ausdruck "X*k" bzw. "k*X"
+_PRODUCT_RX = re.compile(r"([A-Za-z_]\w*)\*(\d+(?:\.\d+)?)|(\d+(?:\.\d+)?)\*([A-Za-z_]\w*)")
+
+
+def normalize(expr: str) -> str:
+    """Schlüssel eines Platzhalters: ohne Whitespace (``ROI_12M * 0.8`` → ``ROI_12M*0.8``)."""
+    return _WS_RX.sub("", expr)
+
+
+def _format_number(x: float) -> str:
+    """Ganze Zahlen ohne Nachkommastellen, sonst auf zwei Stellen (``7200``, ``0.6``, ``2.35``)."""
+    r = round(x, 2)
+    return str(int(r)) if r == int(r) else f"{r:.2f}".rstrip("0")
+
+
+class PlaceholderEngine:
+    """``PlaceholderEngine({"ROI_12M": "250.0", "ROI_12M*0.8": "200.0"}).apply(text)``"""
+
+    def __init__(self, values: Mapping[str, Any], strip_numeric: bool = False, skip_empty: bool = False,
+                 fallback: Optional[Callable[[str], Optional[str]]] = None) -> None:
+        self.values = {normalize(k): str(v) for k, v in values.items()
+                       if v is not None and not (skip_empty and str(v) == "")}
+        self.strip_numeric = strip_numeric
+        self.fallback = fallback
+
+    def _product(self, key: str) -> Optional[str]:
+        m = _PRODUCT_RX.fullmatch(key)
+        if m is None:
+            return None
+        name, factor = (m.group(1), m.group(2)) if m.group(1) else (m.group(4), m.group(3))
+        try:
+            return _format_number(float(self.values[name]) * float(factor))
+        except (KeyError, ValueError):
+            return None
+
+    def resolve(self, expr: str) -> Optional[str]:
+        """Wert eines ``{{ … }}``-Ausdrucks: Eintrag, ``X * k`` oder Fallback (``None`` = unbekannt)."""
+        key = normalize(expr)
+        value = self.values.get(key)
+        if value is None:
+            value = self._product(key)
+        if value is None and self.fallback is not None:
+            value = self.fallback(expr.strip())
+        return value
+
+    def apply(self, text: str, unresolved: Optional[Set[str]] = None) -> str:
+        """Ersetzt alle bekannten Platzhalter in einem Durchlauf; unbekannte ``{{ … }}`` → ``unresolved``."""
+        if not text or "{" not in text:
+            return text
+
+        def _sub(m: "re.Match[str]") -> str:
+            expr, single = m.group(1), m.group(2)
+            if single is not None:
+                value = self.values.get(single)
+                if value is not None:
+                    return value
+                if self.strip_numeric and single[0].isdigit():
+                    return single
+                return m.group(0)
+            value = self.resolve(expr)
+            if value is None:
+                if unresolved is not None:
+                    unresolved.add(expr.strip())
+                return m.group(0)
+            return value
+
+        return _TOKEN_RX.sub(_sub, text)
+
+    def apply_all(self, sections: dict, keys: Optional[Iterable[str]] = None,
+                  unresolved: Optional[Set[str]] = None) -> int:
+        """Wendet ``apply`` auf alle (bzw. die angegebenen) String-Sections an; Rückgabe: geänderte Sections."""
+        changed = 0
+        for key in list(keys if keys is not None else sections.keys()):
+            value = sections.get(key)
+            if isinstance(value, str) and "{" in value:
+                fixed = self.apply(value, unresolved)
+                if fixed != value:
+                    sections[key] = fixed
+                    changed += 1
+        return changed
+
+
+__all__ = ["PlaceholderEngine", "normalize"]
@@ -1,40 +1,170 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
-import os, logging, re
+"""Report-Renderer (Jinja2) mit prozessweitem Template-Cache
+- ``ReportRenderer`` hält *ein* Environment; kompilierte Templates liegen je ``(Pfad, mtime)`` im Speicher,
+  geänderte Dateien werden beim nächsten Render automatisch neu kompiliert.
+- Optionaler ``FileSystemBytecodeCache`` (``REPORT_TEMPLATE_BYTECODE_DIR``): kalte Worker überspringen das
+  Parsen des Templates.
+- Validierung (Kompilieren + Warnung bei ``|de``) läuft einmal je Template-Stand – beim Boot über
+  ``validate()`` im Lifespan von ``main.py``, nicht mehr pro Report; ``reload()`` für ``/admin/templates/reload``.
+
+ENV:
+  REPORT_TEMPLATE_PATH          Haupt-Template (Default templates/pdf_template.html)
+  REPORT_TEMPLATE_DIR           Template-Verzeichnis (Default templates)
+  REPORT_TEMPLATE_BYTECODE_DIR  Verzeichnis für den Jinja-Bytecode-Cache (leer = aus)
+"""
+import os, logging, re, threading
 from pathlib import Path
-from typing import Any, Dict, Optional
-from jinja2 import Environment, FileSystemLoader, select_autoescape, Undefined
+from typing import Any, Dict, List, Optional, Tuple
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape, Undefined
 from markupsafe import Markup
 
-from utils.logo_embedder import embed_logos_in_html
+from utils.logo_embedder import get_asset_registry, reference_logos_in_html
+from services.placeholder_engine import PlaceholderEngine
+from services.run_trace import span as trace_span
 
 log = logging.getLogger(__name__)
 
-def _env() -> Environment:
+def _template_path() -> str:
+    return os.getenv("REPORT_TEMPLATE_PATH", "templates/pdf_template.html")
+
+def _env(bytecode_dir: Optional[str] = None) -> Environment:
     tpl_dir = Path(os.getenv("REPORT_TEMPLATE_DIR", "templates"))
+    search = [str(tpl_dir)]
+    main_dir = str(Path(_template_path()).parent)
+    if main_dir not in search:
+        search.append(main_dir)
+    bcc = None
+    if bytecode_dir:
+        Path(bytecode_dir).mkdir(parents=True, exist_ok=True)
+        bcc = FileSystemBytecodeCache(bytecode_dir, "ksj_tpl_%s.cache")
     env = Environment(
-        loader=FileSystemLoader(str(tpl_dir)),
+        loader=FileSystemLoader(search),
         autoescape=select_autoescape(["html","xml"]),
         undefined=Undefined,  # ✅ Fixed: Use Undefined class instead of None
         trim_blocks=True, lstrip_blocks=True,
+        auto_reload=False,  # Aktualität prüft ReportRenderer über die mtime
+        bytecode_cache=bcc,
     )
     # Backwards-compat filter for old templates using {{LANG|de}}
     env.filters["de"] = lambda v=None: (v or "de")
+    # Logos als leichte Referenz; Data-URIs erst beim Versand an den PDF-Service (utils/logo_embedder.py)
+    env.globals["asset"] = lambda name: get_asset_registry(main_dir).url(name)
     return env
 
-def _self_check(env: Environment, template_name: str) -> None:
-    """Validate template at startup to avoid runtime surprises."""
+def _self_check(env: Environment, template_name: str) -> Template:
+    """Validate template (once per compiled version) to avoid runtime surprises."""
     try:
         src = env.loader.get_source(env, template_name)[0]
         if "{{LANG|de}}" in src or "{{ LANG|de }}" in src:
             log.warning("⚠️ Template uses deprecated '|de' filter. Please switch to '|default(\"de\")'.")
         # Try compile (will raise if invalid)
-        env.get_template(template_name)
+        tpl = env.get_template(template_name)
         log.info("✔ Template validated: %s", template_name)
+        return tpl
     except Exception as exc:
         log.error("❌ Template validation failed: %s", exc)
         raise
 
+
+class ReportRenderer:
+    """Prozessweites Environment + kompilierte Templates je ``(Pfad, mtime)``."""
+
+    def __init__(self, bytecode_dir: Optional[str] = None) -> None:
+        self.bytecode_dir = bytecode_dir if bytecode_dir is not None else os.getenv("REPORT_TEMPLATE_BYTECODE_DIR", "")
+        self.env = _env(self.bytecode_dir or None)
+        self._compiled: Dict[str, Tuple[str, int, Template]] = {}
+        self._lock = threading.Lock()
+        self.compiles = 0
+        self.hits = 0
+
+    def _stat(self, name: str) -> Tuple[str, int]:
+        _, filename, _ = self.env.loader.get_source(self.env, name)
+        return filename, os.stat(filename).st_mtime_ns
+
+    def template(self, name: str) -> Template:
+        """Kompiliertes Template; neu kompiliert (und validiert), wenn sich die Datei geändert hat."""
+        path, mtime = self._stat(name)
+        with self._lock:
+            cached = self._compiled.get(name)
+            if cached and cached[:2] == (path, mtime):
+                self.hits += 1
+                return cached[2]
+            if cached:
+                log.info("🔄 Template changed on disk, recompiling: %s", path)
+                self.env.cache.clear()
+            tpl = _self_check(self.env, name)
+            self._compiled[name] = (path, mtime, tpl)
+            self.compiles += 1
+            return tpl
+
+    def validate(self, names: Optional[List[str]] = None) -> List[str]:
+        """Kompiliert + prüft die angegebenen (Default: Haupt-)Templates; wirft bei Fehlern."""
+        names = names or [Path(_template_path()).name]
+        for name in names:
+            self.template(name)
+        return names
+
+    def reload(self) -> Dict[str, Any]:
+        """Verwirft alle kompilierten Templates (+ Logo-Registry) und validiert die bisher genutzten neu."""
+        get_asset_registry(reload=True)
+        with self._lock:
+            names = sorted(self._compiled) or [Path(_template_path()).name]
+            self._compiled.clear()
+            self.env.cache.clear()
+        return {"reloaded": self.validate(names), **self.stats()}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"templates": {n: {"path": p, "mtime_ns": m} for n, (p, m, _) in self._compiled.items()},
+                    "compiles": self.compiles, "hits": self.hits, "bytecode_dir": self.bytecode_dir or None}
+
+
+_renderer: Optional[ReportRenderer] = None
+_renderer_lock = threading.Lock()
+
+def get_renderer() -> ReportRenderer:
+    global _renderer
+    if _renderer is None:
+        with _renderer_lock:
+            if _renderer is None:
+                _renderer = ReportRenderer()
+    return _renderer
+
+def _fixup_engine(sections: Dict[str, Any]) -> PlaceholderEngine:
+    """Vorberechnete Werte für Ausdrücke, die in Sections unausgewertet stehen geblieben sind."""
+    def num(key: str) -> float:
+        return float(sections.get(key, 0) or 0)
+
+    values: Dict[str, Any] = {
+        key: sections.get(key, "") for key in ("qw_hours_total", "CAPEX_REALISTISCH_EUR", "OPEX_REALISTISCH_EUR",
+                                               "EINSPARUNG_MONAT_EUR", "PAYBACK_MONTHS", "ROI_12M")
+    }
+    values.update({
+        "EINSPARUNG_MONAT_EUR * 0.8": sections.get("EINSPARUNG_MONAT_EUR_LOW", ""),
+        "EINSPARUNG_MONAT_EUR * 1.2": sections.get("EINSPARUNG_MONAT_EUR_HIGH", ""),
+        "ROI_12M * 0.8": sections.get("ROI_12M_LOW", ""),
+        "ROI_12M * 1.2": sections.get("ROI_12M_HIGH", ""),
+        "ROI_12M * 0.8 * 100": sections.get("ROI_12M_LOW", ""),
+        "ROI_12M * 1.2 * 100": sections.get("ROI_12M_HIGH", ""),
+        # ROI percentage expression
+        "(ROI_12M * 100) | round(1)": round(num("ROI_12M") * 100, 1),
+        # OPEX calculations - various multipliers GPT might generate
+        "OPEX_REALISTISCH_EUR * 1.2": sections.get("OPEX_REALISTISCH_EUR_HIGH", ""),
+        "OPEX_REALISTISCH_EUR * 0.8": sections.get("OPEX_REALISTISCH_EUR_LOW", ""),
+        **{f"OPEX_REALISTISCH_EUR * {k}": int(num("OPEX_REALISTISCH_EUR") * float(k))
+           for k in ("0.5", "0.2", "0.4", "2.4", "12")},
+        # Payback calculations
+        "CAPEX_REALISTISCH_EUR / (EINSPARUNG_MONAT_EUR * 0.8 - OPEX_REALISTISCH_EUR)":
+            sections.get("PAYBACK_MONTHS_PESSIMISTIC", ""),
+        "CAPEX_REALISTISCH_EUR / (EINSPARUNG_MONAT_EUR - OPEX_REALISTISCH_EUR * 1.2)":
+            sections.get("PAYBACK_MONTHS_PESSIMISTIC", ""),
+        "CAPEX_REALISTISCH_EUR / (EINSPARUNG_MONAT_EUR * 1.2 - OPEX_REALISTISCH_EUR)":
+            sections.get("PAYBACK_MONTHS_OPTIMISTIC", ""),
+    })
+    # Only replace if we have a value; {123} → 123 (GPT wraps numbers in braces)
+    return PlaceholderEngine(values, strip_numeric=True, skip_empty=True)
+
 def render(briefing_obj: Any,
            run_id: str,
            generated_sections: Dict[str, Any],
@@ -49,12 +179,9 @@ def render(briefing_obj: Any,
     - Clean variable replacement
     - Consistent score handling
     """
-    tpl_path = os.getenv("REPORT_TEMPLATE_PATH", "templates/pdf_template.html")
-    tpl_dir = Path(tpl_path).parent
+    tpl_path = _template_path()
     tpl_name = Path(tpl_path).name
-
-    env = _env()
-    _self_check(env, tpl_name)
+    template = get_renderer().template(tpl_name)
 
     # Context
     sections = dict(generated_sections or {})
@@ -97,7 +224,8 @@ def render(briefing_obj: Any,
     log.info(f"🎨 Rendering report {run_id} with {len(sections)} sections")
     log.debug(f"Sections available: {list(sections.keys())}")
 
-    html = env.get_template(tpl_name).render(**ctx)
+    with trace_span("render:jinja"):
+        html = template.render(**ctx)
 
     # Save debug HTML for troubleshooting
     report_id = sections.get('report_id', run_id)
@@ -112,79 +240,16 @@ def render(briefing_obj: Any,
     # Post-processing: Replace unevaluated Jinja2 math expressions with pre-calculated values
     # This handles cases where Jinja2 fails to evaluate expressions like {{ EINSPARUNG_MONAT_EUR * 0.8 }}
     # Also handles single-brace placeholders that GPT may generate incorrectly
-    if "{{" in html or "{" in html:
-        import re
-
-        # Map of common unevaluated expressions to their pre-calculated section keys
-        expr_replacements = {
-            r'\{\{\s*EINSPARUNG_MONAT_EUR\s*\*\s*0\.8\s*\}\}': str(sections.get('EINSPARUNG_MONAT_EUR_LOW', '')),
-            r'\{\{\s*EINSPARUNG_MONAT_EUR\s*\*\s*1\.2\s*\}\}': str(sections.get('EINSPARUNG_MONAT_EUR_HIGH', '')),
-            r'\{\{\s*ROI_12M\s*\*\s*0\.8\s*\}\}': str(sections.get('ROI_12M_LOW', '')),
-            r'\{\{\s*ROI_12M\s*\*\s*1\.2\s*\}\}': str(sections.get('ROI_12M_HIGH', '')),
-            r'\{\{\s*ROI_12M\s*\*\s*0\.8\s*\*\s*100\s*\}\}': str(sections.get('ROI_12M_LOW', '')),
-            r'\{\{\s*ROI_12M\s*\*\s*1\.2\s*\*\s*100\s*\}\}': str(sections.get('ROI_12M_HIGH', '')),
-            # ROI percentage expression
-            r'\{\{\s*\(ROI_12M\s*\*\s*100\)\s*\|\s*round\s*\(\s*1\s*\)\s*\}\}': str(round(float(sections.get('ROI_12M', 0) or 0) * 100, 1)),
-            # OPEX calculations - various multipliers GPT might generate
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\*\s*1\.2\s*\}\}': str(sections.get('OPEX_REALISTISCH_EUR_HIGH', '')),
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\*\s*0\.8\s*\}\}': str(sections.get('OPEX_REALISTISCH_EUR_LOW', '')),
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\*\s*0\.5\s*\}\}': str(int(float(sections.get('OPEX_REALISTISCH_EUR', 0) or 0) * 0.5)),
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\*\s*0\.2\s*\}\}': str(int(float(sections.get('OPEX_REALISTISCH_EUR', 0) or 0) * 0.2)),
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\*\s*0\.4\s*\}\}': str(int(float(sections.get('OPEX_REALISTISCH_EUR', 0) or 0) * 0.4)),
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\*\s*2\.4\s*\}\}': str(int(float(sections.get('OPEX_REALISTISCH_EUR', 0) or 0) * 2.4)),
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\*\s*12\s*\}\}': str(int(float(sections.get('OPEX_REALISTISCH_EUR', 0) or 0) * 12)),
-            # Payback calculations
-            r'\{\{\s*CAPEX_REALISTISCH_EUR\s*/\s*\(\s*EINSPARUNG_MONAT_EUR\s*\*\s*0\.8\s*-\s*OPEX_REALISTISCH_EUR\s*\)\s*\}\}': str(sections.get('PAYBACK_MONTHS_PESSIMISTIC', '')),
-            r'\{\{\s*CAPEX_REALISTISCH_EUR\s*/\s*\(\s*EINSPARUNG_MONAT_EUR\s*-\s*OPEX_REALISTISCH_EUR\s*\*\s*1\.2\s*\)\s*\}\}': str(sections.get('PAYBACK_MONTHS_PESSIMISTIC', '')),
-            r'\{\{\s*CAPEX_REALISTISCH_EUR\s*/\s*\(\s*EINSPARUNG_MONAT_EUR\s*\*\s*1\.2\s*-\s*OPEX_REALISTISCH_EUR\s*\)\s*\}\}': str(sections.get('PAYBACK_MONTHS_OPTIMISTIC', '')),
-        }
-
-        # Also replace single-brace placeholders (GPT sometimes generates these incorrectly)
-        single_brace_replacements = {
-            r'\{CAPEX_REALISTISCH_EUR\}': str(sections.get('CAPEX_REALISTISCH_EUR', '')),
-            r'\{OPEX_REALISTISCH_EUR\}': str(sections.get('OPEX_REALISTISCH_EUR', '')),
-            r'\{EINSPARUNG_MONAT_EUR\}': str(sections.get('EINSPARUNG_MONAT_EUR', '')),
-            r'\{PAYBACK_MONTHS\}': str(sections.get('PAYBACK_MONTHS', '')),
-            r'\{ROI_12M\}': str(sections.get('ROI_12M', '')),
-        }
-        expr_replacements.update(single_brace_replacements)
-
-        # Strip braces from numeric literals that GPT erroneously wrapped
-        # Pattern: {number} or {number.decimal} -> just the number
-        numeric_brace_pattern = r'\{(\d+(?:\.\d+)?)\}'
-        html = re.sub(numeric_brace_pattern, r'\1', html)
-        log.debug(f"[RENDER] Stripped braces from numeric literals")
-
-        # Replace simple variable placeholders
-        simple_replacements = {
-            r'\{\{\s*qw_hours_total\s*\}\}': str(sections.get('qw_hours_total', '')),
-            r'\{\{\s*CAPEX_REALISTISCH_EUR\s*\}\}': str(sections.get('CAPEX_REALISTISCH_EUR', '')),
-            r'\{\{\s*OPEX_REALISTISCH_EUR\s*\}\}': str(sections.get('OPEX_REALISTISCH_EUR', '')),
-            r'\{\{\s*EINSPARUNG_MONAT_EUR\s*\}\}': str(sections.get('EINSPARUNG_MONAT_EUR', '')),
-            r'\{\{\s*PAYBACK_MONTHS\s*\}\}': str(sections.get('PAYBACK_MONTHS', '')),
-            r'\{\{\s*ROI_12M\s*\}\}': str(sections.get('ROI_12M', '')),
-        }
-        expr_replacements.update(simple_replacements)
-
-        for pattern, replacement in expr_replacements.items():
-            if replacement:  # Only replace if we have a value
-                html = re.sub(pattern, replacement, html)
-
-        log.info(f"🔧 Applied {len(expr_replacements)} expression replacements for report {run_id}")
-
-    # Quick validation check - find which variables are missing
-    if "{{" in html:
-        import re
-        missing = re.findall(r'\{\{\s*([^}]+)\s*\}\}', html)
-        if missing:
-            unique_missing = list(set(m.strip() for m in missing))[:5]  # Show max 5
-            log.warning(f"⚠️ Template still contains unreplaced variables in report {run_id}: {unique_missing}")
-        else:
-            log.warning(f"⚠️ Template still contains unreplaced variables in report {run_id}")
-
-    # Embed logos as base64 for PDF service compatibility
+    # → ein Scan über das HTML (services/placeholder_engine.py) statt ~25 re.sub-Durchläufe
+    if "{" in html:
+        unresolved: set = set()
+        html = _fixup_engine(sections).apply(html, unresolved)
+        if unresolved:
+            log.warning(f"⚠️ Template still contains unreplaced variables in report {run_id}: {sorted(unresolved)[:5]}")
+
+    # Logos bleiben Referenzen (/report-assets/...); base64 erst im PDF-Client (inline_assets)
     tpl_dir_str = str(Path(tpl_path).parent)
-    html = embed_logos_in_html(html, tpl_dir_str)
-    log.info(f"[RENDER] Embedded logos in HTML for report {run_id}")
+    with trace_span("render:logos"):
+        html = reference_logos_in_html(html, tpl_dir_str)
 
     return {"html": html, "meta": meta or {}}
@@ -16,6 +16,8 @@ from typing import List, Dict, Optional, Any
 import os
 from tavily import TavilyClient
 
+from services.keyword_matcher import KeywordMatcher
+
 logger = logging.getLogger(__name__)
 
 # ============================================================================
@@ -50,6 +52,10 @@ SPAM_DOMAINS = [
 ]
 
 
+# Einmal kompiliert: ein Durchlauf je Feld für beide Kategorien (services/keyword_matcher.py)
+_CONTENT_MATCHER = KeywordMatcher({"nsfw": (NSFW_KEYWORDS, "prefix"), "spam": (SPAM_DOMAINS, "substring")})
+
+
 def _is_safe_content(result: dict) -> bool:
     """
     Prüft ob Suchergebnis sicher ist (kein NSFW/Spam).
@@ -61,25 +67,22 @@ def _is_safe_content(result: dict) -> bool:
         True wenn sicher, False wenn gefiltert werden soll
     """
     # Prüfe Title
-    title = (result.get('title', '') or '').lower()
-    for keyword in NSFW_KEYWORDS:
-        if keyword in title:
-            logger.warning(f"[FILTER] ❌ Blocked NSFW title: {title[:80]}...")
-            return False
+    title = result.get('title', '') or ''
+    if _CONTENT_MATCHER.matches(title, "nsfw"):
+        logger.warning(f"[FILTER] ❌ Blocked NSFW title: {title[:80]}...")
+        return False
     
     # Prüfe Content
-    content = (result.get('content', '') or '').lower()
-    for keyword in NSFW_KEYWORDS:
-        if keyword in content:
-            logger.warning(f"[FILTER] ❌ Blocked NSFW content: {content[:80]}...")
-            return False
+    content = result.get('content', '') or ''
+    if _CONTENT_MATCHER.matches(content, "nsfw"):
+        logger.warning(f"[FILTER] ❌ Blocked NSFW content: {content[:80]}...")
+        return False
     
     # Prüfe URL
-    url = (result.get('url', '') or '').lower()
-    for domain in SPAM_DOMAINS:
-        if domain in url:
-            logger.warning(f"[FILTER] ❌ Blocked spam domain: {url}")
-            return False
+    url = result.get('url', '') or ''
+    if _CONTENT_MATCHER.matches(url, "spam"):
+        logger.warning(f"[FILTER] ❌ Blocked spam domain: {url}")
+        return False
     
     logger.debug(f"[FILTER] ✅ Safe content: {title[:50]}")
     return True
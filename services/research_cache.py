@@ -2,178 +2,383 @@
 """
 services/research_cache.py
 --------------------------
-Simple JSON-based cache for research results.
+Einheitlicher, zweistufiger Cache für alle Research-Pfade.
 
-Usage:
+- Stufe 1: In-Process-LRU (Einträge + Bytes begrenzt) – Treffer ohne I/O.
+- Stufe 2: persistenter SQLite-Store (services/research_store.py) – geteilt über Worker/Restarts.
+- Namespaces mit eigener TTL: ``http`` (Rohseiten), ``rss``, ``links`` (geerntete Linklisten),
+  ``tavily`` (Query), ``perplexity`` (Topic), ``table`` (gerenderte Research-Blöcke),
+  ``prefetch`` (services/research_prefetch.py), ``fetcher`` (research_fetcher) und ``legacy`` (alte API unten).
+- ``get_or_fetch()``/``fetch_entry()`` sind der zentrale Einstieg; leere Ergebnisse (Provider-Fehler)
+  werden nicht gecacht.
+- Stale-while-revalidate: abgelaufene Einträge innerhalb der Max-Staleness je Namespace werden sofort
+  geliefert und im Hintergrund aufgefrischt (ein Refresh je Schlüssel); ``fetch_entry()`` liefert den
+  echten Abrufzeitpunkt mit (→ ``research_last_updated``).
+- Single-Flight: gleichzeitige Misses auf denselben normalisierten Schlüssel warten auf *einen*
+  Provider-Aufruf und teilen dessen Ergebnis (Zähler ``coalesced`` = gesparte Aufrufe); auch
+  Hintergrund-Refreshes laufen über denselben Single-Flight.
+- ``stats()`` liefert Treffer je Namespace und Stufe (→ ``/admin/research/cache``).
+
+Alte API (unverändert nutzbar, jetzt auf Namespace ``legacy``):
     from services.research_cache import cache_get, cache_set
-    
-    # Try to get cached
     cached = cache_get("tools_maschinenbau_30d")
-    if cached:
-        return cached
-    
-    # Fetch fresh data
-    results = fetch_from_api()
-    
-    # Cache for 14 days
-    cache_set("tools_maschinenbau_30d", results)
+    if cached is None:
+        cache_set("tools_maschinenbau_30d", fetch_from_api())
+
+ENV:
+  RESEARCH_TTL_<NAMESPACE>   TTL in Sekunden je Namespace (z. B. RESEARCH_TTL_TAVILY=86400)
+  RESEARCH_STALE_<NAMESPACE> Max. Staleness über die TTL hinaus (Sekunden, 0 = kein SWR)
+  RESEARCH_SWR               Stale-while-revalidate aktiv (Default 1)
+  RESEARCH_REFRESH_WORKERS   Threads für Hintergrund-Refreshes (Default 2)
+  RESEARCH_FLIGHT_WAIT_SEC   Max. Wartezeit auf einen laufenden identischen Abruf (Default 60)
+  RESEARCH_LRU_ENTRIES       Max. Einträge im Prozess-LRU (Default 512)
+  RESEARCH_LRU_MB            Max. Größe des Prozess-LRU in MB (Default 16)
+  RESEARCH_CACHE_TTL_DAYS    TTL der alten API (Default 14)
 """
 from __future__ import annotations
-import os
+
+import copy
+import hashlib
 import json
-import time
 import logging
-from typing import Any, Optional
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from .research_store import ResearchStore, get_research_store
 
 log = logging.getLogger(__name__)
 
-DEFAULT_CACHE_DIR = os.getenv("RESEARCH_CACHE_DIR", "data/cache")
+T = TypeVar("T")
+
 DEFAULT_TTL_DAYS = int(os.getenv("RESEARCH_CACHE_TTL_DAYS", "14"))
 
+_DEFAULT_TTLS: Dict[str, int] = {
+    "http": 300,
+    "rss": 300,
+    "links": 300,
+    "tavily": 24 * 3600,
+    "perplexity": 24 * 3600,
+    "table": 6 * 3600,
+    "prefetch": 6 * 3600,
+    "fetcher": int(os.getenv("RESEARCH_CACHE_TTL", str(7 * 24 * 3600))),
+    "legacy": DEFAULT_TTL_DAYS * 86400,
+}
+NAMESPACE_TTLS: Dict[str, int] = {
+    ns: int(os.getenv(f"RESEARCH_TTL_{ns.upper()}", str(ttl))) for ns, ttl in _DEFAULT_TTLS.items()
+}
+_DEFAULT_STALE: Dict[str, int] = {
+    "tavily": 3 * 24 * 3600,
+    "perplexity": 3 * 24 * 3600,
+    "table": 24 * 3600,
+    "fetcher": 7 * 24 * 3600,
+}
+NAMESPACE_STALE: Dict[str, int] = {
+    ns: int(os.getenv(f"RESEARCH_STALE_{ns.upper()}", str(_DEFAULT_STALE.get(ns, 0)))) for ns in _DEFAULT_TTLS
+}
+RESEARCH_SWR = os.getenv("RESEARCH_SWR", "1") in ("1", "true", "TRUE", "yes", "YES")
+RESEARCH_REFRESH_WORKERS = int(os.getenv("RESEARCH_REFRESH_WORKERS", "2"))
+RESEARCH_FLIGHT_WAIT_SEC = float(os.getenv("RESEARCH_FLIGHT_WAIT_SEC", "60"))
+RESEARCH_LRU_ENTRIES = int(os.getenv("RESEARCH_LRU_ENTRIES", "512"))
+RESEARCH_LRU_MB = float(os.getenv("RESEARCH_LRU_MB", "16"))
 
-def _ensure_dir(path: str) -> None:
-    """Erstellt Verzeichnis falls nicht vorhanden."""
-    os.makedirs(path, exist_ok=True)
+_WS = re.compile(r"\s+")
 
 
-def _path_for_key(key: str) -> str:
-    """Generiert Dateipfad für Cache-Key."""
-    _ensure_dir(DEFAULT_CACHE_DIR)
-    # Sanitize key für Dateisystem
-    safe = "".join(c for c in key if c.isalnum() or c in "-_.")
-    return os.path.join(DEFAULT_CACHE_DIR, f"{safe}.json")
+def make_key(*parts: Any) -> str:
+    """Normalisierter Schlüssel aus Query-Bestandteilen (Groß/Klein, Whitespace egal)."""
+    norm = [_WS.sub(" ", p.strip().lower()) if isinstance(p, str) else p for p in parts]
+    return json.dumps(norm, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
 
 
-def cache_get(key: str, max_age_days: Optional[int] = None) -> Optional[Any]:
-    """
-    Lädt gecachten Wert.
-    
-    Args:
-        key: Cache-Key
-        max_age_days: Max. Alter in Tagen (default: 14)
-        
-    Returns:
-        Gecachter Wert oder None wenn nicht gefunden/abgelaufen
-    """
-    ttl_days = DEFAULT_TTL_DAYS if max_age_days is None else max_age_days
-    path = _path_for_key(key)
-    
-    if not os.path.exists(path):
-        log.debug("Cache miss: %s", key)
-        return None
-    
+def _size(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value)
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            payload = json.load(f)
-        
-        ts = float(payload.get("_ts", 0))
-        age_seconds = time.time() - ts
-        age_days = age_seconds / 86400
-        
-        if age_days > ttl_days:
-            log.debug("Cache expired: %s (%.1f days old)", key, age_days)
+        return len(json.dumps(value, ensure_ascii=False))
+    except (TypeError, ValueError):
+        return 0
+
+
+class _Flight:
+    """Ein laufender Abruf, auf den identische Anfragen warten."""
+
+    __slots__ = ("done", "value", "ts", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.waiters = 0
+        self.value: Any = None
+        self.ts = 0.0
+        self.error: Optional[BaseException] = None
+
+
+class ResearchCache:
+    """LRU im Prozess vor dem persistenten ``ResearchStore``."""
+
+    def __init__(self, store: Optional[ResearchStore] = None, *, lru_entries: int = RESEARCH_LRU_ENTRIES,
+                 lru_bytes: int = int(RESEARCH_LRU_MB * 1024 * 1024), ttls: Optional[Dict[str, int]] = None,
+                 stale: Optional[Dict[str, int]] = None, swr: bool = RESEARCH_SWR) -> None:
+        self._store = store
+        self.lru_entries = lru_entries
+        self.lru_bytes = lru_bytes
+        self.ttls = dict(NAMESPACE_TTLS if ttls is None else ttls)
+        self.stale = dict(NAMESPACE_STALE if stale is None else stale)
+        self.swr = swr
+        self._refreshing: Dict[str, "Future[None]"] = {}
+        self._inflight: Dict[str, _Flight] = {}
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lru: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._lru_size = 0
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    @property
+    def store(self) -> ResearchStore:
+        if self._store is None:
+            self._store = get_research_store()
+        return self._store
+
+    def ttl(self, ns: str) -> int:
+        return self.ttls.get(ns, self.ttls.get("legacy", 14 * 86400))
+
+    def _count(self, ns: str, field: str) -> None:
+        with self._lock:
+            c = self.counters.setdefault(ns, {"memory_hits": 0, "store_hits": 0, "stale_hits": 0, "misses": 0,
+                                              "coalesced": 0, "stores": 0, "refreshes": 0, "refresh_errors": 0})
+            c[field] += 1
+
+    @staticmethod
+    def _full(ns: str, key: str) -> str:
+        return f"{ns}:" + hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+    def _remember(self, full: str, value: Any, ts: float) -> None:
+        size = _size(value)
+        with self._lock:
+            old = self._lru.pop(full, None)
+            if old is not None:
+                self._lru_size -= old[2]
+            if size > self.lru_bytes:
+                return
+            self._lru[full] = (value, ts, size)
+            self._lru_size += size
+            while self._lru and (len(self._lru) > self.lru_entries or self._lru_size > self.lru_bytes):
+                _, (_, _, s) = self._lru.popitem(last=False)
+                self._lru_size -= s
+
+    def lookup(self, ns: str, key: str) -> Optional[Tuple[Any, float, str]]:
+        """``(wert, zeitstempel, stufe)`` unabhängig vom Alter; Store-Treffer wandern ins LRU."""
+        full = self._full(ns, key)
+        with self._lock:
+            hit = self._lru.get(full)
+            if hit is not None:
+                self._lru.move_to_end(full)
+        if hit is not None:
+            return copy.deepcopy(hit[0]), hit[1], "memory"
+        entry = self.store.get_entry(full)
+        if entry is None:
+            return None
+        self._remember(full, entry[0], entry[1])
+        return copy.deepcopy(entry[0]), entry[1], "store"
+
+    def get(self, ns: str, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        found = self.lookup(ns, key)
+        limit = self.ttl(ns) if max_age is None else max_age
+        if found is None or time.time() - found[1] > limit:
+            self._count(ns, "misses")
             return None
-        
-        log.debug("Cache hit: %s (%.1f days old)", key, age_days)
-        return payload.get("data")
-        
-    except Exception as exc:
-        log.warning("Cache read error for %s: %s", key, exc)
-        return None
+        self._count(ns, "memory_hits" if found[2] == "memory" else "store_hits")
+        return found[0]
+
+    def set(self, ns: str, key: str, value: Any) -> None:
+        full = self._full(ns, key)
+        now = time.time()
+        self._remember(full, copy.deepcopy(value), now)
+        self.store.set(full, value, namespace=ns)
+        self._count(ns, "stores")
+
+    def fetch_entry(self, ns: str, key: str, fetch: Callable[[], T], *, max_age: Optional[float] = None,
+                    cache_if: Callable[[Any], bool] = bool) -> Tuple[T, float]:
+        """``(wert, abrufzeitpunkt)``; frisch aus dem Cache, stale mit Hintergrund-Refresh oder live."""
+        limit = self.ttl(ns) if max_age is None else max_age
+        found = self.lookup(ns, key)
+        if found is not None:
+            value, ts, tier = found
+            age = time.time() - ts
+            if age <= limit:
+                self._count(ns, "memory_hits" if tier == "memory" else "store_hits")
+                return value, ts
+            if self.swr and age <= limit + self.stale.get(ns, 0):
+                self._count(ns, "stale_hits")
+                self._refresh(ns, key, fetch, cache_if)
+                return value, ts
+        return self._fetch_once(ns, key, fetch, cache_if)
+
+    def _fetch_once(self, ns: str, key: str, fetch: Callable[[], T], cache_if: Callable[[Any], bool]) -> Tuple[T, float]:
+        full = self._full(ns, key)
+        with self._lock:
+            flight = self._inflight.get(full)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[full] = _Flight()
+            else:
+                flight.waiters += 1
+        if not leader:
+            if flight.done.wait(RESEARCH_FLIGHT_WAIT_SEC):
+                # erst hier gespart: nach Timeout ruft der Wartende selbst ab (→ misses)
+                self._count(ns, "coalesced")
+                if flight.error is not None:
+                    raise flight.error
+                return copy.deepcopy(flight.value), flight.ts
+            log.warning("⚠️ Research %s: in-flight fetch timed out, fetching separately", ns)
+            flight = _Flight()
+        self._count(ns, "misses")
+        try:
+            now = time.time()
+            value = fetch()
+            flight.value, flight.ts = copy.deepcopy(value), now
+            if cache_if(value):
+                self.set(ns, key, value)
+            return value, now
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            if leader:
+                with self._lock:
+                    self._inflight.pop(full, None)
+            flight.done.set()
+
+    def get_or_fetch(self, ns: str, key: str, fetch: Callable[[], T], *, max_age: Optional[float] = None,
+                     cache_if: Callable[[Any], bool] = bool) -> T:
+        return self.fetch_entry(ns, key, fetch, max_age=max_age, cache_if=cache_if)[0]
+
+    def _refresh(self, ns: str, key: str, fetch: Callable[[], Any], cache_if: Callable[[Any], bool]) -> None:
+        full = self._full(ns, key)
+
+        def _run() -> None:
+            # Refresh läuft als Single-Flight-Leader: gleichzeitige Misses warten auf ihn,
+            # und ein bereits laufender Vordergrund-Abruf macht den Refresh überflüssig.
+            with self._lock:
+                flight = None if full in self._inflight else _Flight()
+                if flight is not None:
+                    self._inflight[full] = flight
+            try:
+                if flight is None:
+                    return
+                now = time.time()
+                value = fetch()
+                flight.value, flight.ts = copy.deepcopy(value), now
+                if cache_if(value):
+                    self.set(ns, key, value)
+                self._count(ns, "refreshes")
+            except Exception as exc:
+                flight.error = exc
+                self._count(ns, "refresh_errors")
+                log.warning("⚠️ Research refresh %s failed: %s", ns, exc)
+            finally:
+                with self._lock:
+                    if flight is not None:
+                        self._inflight.pop(full, None)
+                    self._refreshing.pop(full, None)
+                if flight is not None:
+                    flight.done.set()
+
+        with self._lock:
+            if full in self._refreshing:
+                return
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=max(1, RESEARCH_REFRESH_WORKERS),
+                                                thread_name_prefix="research-refresh")
+            self._refreshing[full] = self._pool.submit(_run)
+
+    def wait_refreshes(self, timeout: Optional[float] = None) -> None:
+        """Wartet auf laufende Hintergrund-Refreshes (Tests, Benchmark, Shutdown)."""
+        with self._lock:
+            pending = list(self._refreshing.values())
+        if pending:
+            wait(pending, timeout=timeout)
+
+    def delete(self, ns: str, key: str) -> None:
+        full = self._full(ns, key)
+        with self._lock:
+            old = self._lru.pop(full, None)
+            if old is not None:
+                self._lru_size -= old[2]
+        self.store.delete(full)
+
+    def clear(self, ns: Optional[str] = None) -> int:
+        with self._lock:
+            if ns is None:
+                self._lru.clear()
+                self._lru_size = 0
+            else:
+                for full in [k for k in self._lru if k.startswith(ns + ":")]:
+                    self._lru_size -= self._lru.pop(full)[2]
+        return self.store.clear(ns)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            namespaces = {ns: dict(c) for ns, c in self.counters.items()}
+            lru = {"entries": len(self._lru), "bytes": self._lru_size,
+                   "max_entries": self.lru_entries, "max_bytes": self.lru_bytes}
+        for ns, c in namespaces.items():
+            hits = c["memory_hits"] + c["store_hits"] + c["stale_hits"]
+            c["hit_ratio"] = round(hits / (hits + c["misses"]), 3) if hits + c["misses"] else None
+        return {"ttls": dict(self.ttls), "stale": dict(self.stale), "swr": self.swr, "lru": lru,
+                "refreshing": len(self._refreshing), "inflight": len(self._inflight),
+                "saved_calls": sum(c["coalesced"] for c in namespaces.values()),
+                "namespaces": namespaces, "store": self.store.stats()}
+
+
+_cache: Optional[ResearchCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_research_cache() -> ResearchCache:
+    """Prozessweite Instanz."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResearchCache()
+    return _cache
+
+
+# --- Alte API (services/test_research_system.py u. a.) ---
+
+def cache_get(key: str, max_age_days: Optional[int] = None) -> Optional[Any]:
+    """Gecachter Wert oder None (nicht gefunden/abgelaufen); Default-TTL 14 Tage."""
+    return get_research_cache().get("legacy", key, None if max_age_days is None else max_age_days * 86400)
 
 
 def cache_set(key: str, data: Any) -> None:
-    """
-    Speichert Wert im Cache.
-    
-    Args:
-        key: Cache-Key
-        data: Zu cachende Daten (muss JSON-serialisierbar sein)
-    """
-    path = _path_for_key(key)
-    
-    try:
-        payload = {
-            "_ts": time.time(),
-            "data": data
-        }
-        
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, ensure_ascii=False, indent=2)
-        
-        log.debug("Cache saved: %s", key)
-        
-    except Exception as exc:
-        log.warning("Cache write error for %s: %s", key, exc)
+    """Speichert einen JSON-serialisierbaren Wert."""
+    get_research_cache().set("legacy", key, data)
 
 
 def cache_clear(key: Optional[str] = None) -> None:
-    """
-    Löscht Cache-Einträge.
-    
-    Args:
-        key: Spezifischer Key zum Löschen, oder None für alle
-    """
+    """Löscht einen Eintrag oder alle Einträge der alten API."""
     if key:
-        # Lösche spezifischen Key
-        path = _path_for_key(key)
-        try:
-            if os.path.exists(path):
-                os.remove(path)
-                log.info("Cache cleared: %s", key)
-        except Exception as exc:
-            log.warning("Cache clear error for %s: %s", key, exc)
+        get_research_cache().delete("legacy", key)
     else:
-        # Lösche alle Cache-Dateien
-        try:
-            if os.path.exists(DEFAULT_CACHE_DIR):
-                for filename in os.listdir(DEFAULT_CACHE_DIR):
-                    if filename.endswith('.json'):
-                        os.remove(os.path.join(DEFAULT_CACHE_DIR, filename))
-                log.info("All cache cleared")
-        except Exception as exc:
-            log.warning("Cache clear all error: %s", exc)
+        get_research_cache().clear("legacy")
 
 
 def cache_stats() -> dict:
-    """
-    Gibt Cache-Statistiken zurück.
-    
-    Returns:
-        Dict mit: total_files, total_size_bytes, oldest_entry_days
-    """
-    stats = {
-        "total_files": 0,
-        "total_size_bytes": 0,
-        "oldest_entry_days": 0.0
+    """Kennzahlen der alten API: total_files, total_size_bytes, oldest_entry_days."""
+    ns = (get_research_cache().store.stats().get("namespaces") or {}).get("legacy") or {}
+    oldest = ns.get("oldest_ts")
+    return {
+        "total_files": ns.get("entries", 0),
+        "total_size_bytes": ns.get("bytes", 0),
+        "oldest_entry_days": (time.time() - oldest) / 86400 if oldest else 0.0,
     }
-    
-    try:
-        if not os.path.exists(DEFAULT_CACHE_DIR):
-            return stats
-        
-        oldest_ts = time.time()
-        
-        for filename in os.listdir(DEFAULT_CACHE_DIR):
-            if not filename.endswith('.json'):
-                continue
-            
-            path = os.path.join(DEFAULT_CACHE_DIR, filename)
-            stats["total_files"] += 1
-            stats["total_size_bytes"] += os.path.getsize(path)
-            
-            # Check oldest
-            try:
-                with open(path, "r", encoding="utf-8") as f:
-                    payload = json.load(f)
-                    ts = float(payload.get("_ts", time.time()))
-                    oldest_ts = min(oldest_ts, ts)
-            except Exception:
-                pass
-        
-        stats["oldest_entry_days"] = (time.time() - oldest_ts) / 86400
-        
-    except Exception as exc:
-        log.warning("Cache stats error: %s", exc)
-    
-    return stats
+
+
+__all__ = ["NAMESPACE_STALE", "NAMESPACE_TTLS", "ResearchCache", "cache_clear", "cache_get", "cache_set", "cache_stats",
+           "get_research_cache", "make_key"]
@@ -13,24 +13,39 @@ Benötigte Pakete (requirements):
     feedparser>=6.0.11
     beautifulsoup4>=4.12.3
     lxml>=5.3.0
+    httpx[http2]>=0.27  (parallele Abrufe, services/research_fetch.py)
+
+Link-Ernte (``harvest_links``) liest Seiten gestreamt und inkrementell geparst (lxml-Target, sonst
+html.parser), stoppt bei ``limit`` Treffern bzw. ``RESEARCH_LINKS_MAX_BYTES`` und cacht nur die
+Linkliste (Namespace "links"), nicht die Rohseite.
+
+ENV:
+  RESEARCH_LINKS_MAX_BYTES   Max. gelesene Bytes je Seite bei der Link-Ernte (Default 1 MB)
 """
 from __future__ import annotations
 
 import re
-import time
+import os
 import json
-import hashlib
+import codecs
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+from html.parser import HTMLParser
+from typing import Any, Dict, List, Optional, Tuple
 from urllib.parse import urlparse
 
+import httpx
 import requests
 import feedparser
 from bs4 import BeautifulSoup
 
+from .research_cache import get_research_cache, make_key
+
 log = logging.getLogger(__name__)
 
 DEFAULT_TIMEOUT = (10, 20)  # (connect, read)
+LINKS_MAX_BYTES = int(os.getenv("RESEARCH_LINKS_MAX_BYTES", str(1024 * 1024)))
+LINKS_CHUNK = 16 * 1024
 
 USER_AGENT = (
     "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -47,63 +62,122 @@ def _headers(extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
         h.update(extra)
     return h
 
-# --- simple, file-based cache (avoids Redis dependency) ---
+# --- cache: einheitlicher Research-Cache (services/research_cache.py, Namespaces "http"/"rss") ---
+# Einträge tragen die Validatoren (ETag/Last-Modified) der Antwort; nach Ablauf der TTL wird
+# konditional nachgefragt und bei 304 der gecachte Body bzw. das gecachte Parse-Ergebnis weiterverwendet.
 
-_CACHE_PATH = "/tmp/ksj_research_cache.json"
+_cond_lock = threading.Lock()
+_cond_stats: Dict[str, int] = {"requests": 0, "conditional": 0, "not_modified": 0, "bytes_downloaded": 0,
+                               "bytes_saved": 0}
 
-def _load_cache() -> Dict[str, Any]:
-    try:
-        with open(_CACHE_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            return data if isinstance(data, dict) else {}
-    except Exception:
-        return {}
+def _count(**deltas: int) -> None:
+    with _cond_lock:
+        for k, v in deltas.items():
+            _cond_stats[k] += v
 
-def _save_cache(cache: Dict[str, Any]) -> None:
-    try:
-        with open(_CACHE_PATH, "w", encoding="utf-8") as f:
-            json.dump(cache, f, ensure_ascii=False)
-    except Exception:
-        pass
+def conditional_stats() -> Dict[str, int]:
+    """Zähler des konditionalen GET (für /admin/research/cache)."""
+    with _cond_lock:
+        return dict(_cond_stats)
 
-def _cache_get(key: str, max_age_sec: int) -> Optional[Any]:
-    cache = _load_cache()
-    item = cache.get(key)
-    if not item:
-        return None
-    ts = item.get("ts", 0)
-    if time.time() - ts > max_age_sec:
-        return None
-    return item.get("val")
+def _entry(value: Any, field: str) -> Optional[Dict[str, Any]]:
+    # Ältere Einträge (nur Body/Items ohne Validatoren) bleiben lesbar
+    if isinstance(value, dict) and field in value:
+        return value
+    if value:
+        return {field: value}
+    return None
+
+def _validators(r: requests.Response) -> Dict[str, str]:
+    out: Dict[str, str] = {}
+    for header, key in (("ETag", "etag"), ("Last-Modified", "last_modified")):
+        v = r.headers.get(header)
+        if isinstance(v, str) and v:
+            out[key] = v
+    return out
 
-def _cache_set(key: str, val: Any) -> None:
-    cache = _load_cache()
-    cache[key] = {"ts": time.time(), "val": val}
-    _save_cache(cache)
+def _conditional_headers(stale: Optional[Dict[str, Any]]) -> Dict[str, str]:
+    extra: Dict[str, str] = {}
+    if stale:
+        if stale.get("etag"):
+            extra["If-None-Match"] = stale["etag"]
+        if stale.get("last_modified"):
+            extra["If-Modified-Since"] = stale["last_modified"]
+    return extra
 
-def _cache_key(prefix: str, url: str) -> str:
-    return prefix + "_" + hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+def _usable(url: str, r: Any, ok: bool, stale: Optional[Dict[str, Any]], size: int, conditional: bool,
+            downloaded: Optional[int] = None) -> bool:
+    """Verbucht die Antwort; True = 304 mit gecachtem Eintrag oder erfolgreicher Download.
 
-# --- HTTP helpers ---
+    ``downloaded`` für gestreamte Antworten (Body noch nicht gelesen; der Aufrufer verbucht selbst).
+    """
+    _count(requests=1, conditional=1 if conditional else 0)
+    if r.status_code == 304 and stale:
+        _count(not_modified=1, bytes_saved=size)
+        return True
+    if ok:
+        _count(bytes_downloaded=len(r.content or b"") if downloaded is None else downloaded)
+        return True
+    log.warning("GET failed %s: %s", url, r.status_code)
+    return False
 
-def http_get(url: str, timeout: Optional[tuple] = None) -> str | None:
-    """GET text content with UA + timeout + basic cache (5 minutes)."""
-    if not timeout:
-        timeout = DEFAULT_TIMEOUT
-    key = _cache_key("GET", url)
-    cached = _cache_get(key, 300)  # 5 min
-    if cached:
-        return str(cached) if isinstance(cached, str) else None
+def _conditional_get(url: str, stale: Optional[Dict[str, Any]], timeout: tuple, size: int) -> Optional[requests.Response]:
+    """GET mit If-None-Match/If-Modified-Since aus ``stale``; ``None`` bei Fehler, Status 304 = unverändert."""
+    extra = _conditional_headers(stale)
     try:
-        r = requests.get(url, headers=_headers(), timeout=timeout)
-        if r.ok and r.text:
-            _cache_set(key, r.text)
-            return str(r.text)
-        log.warning("GET failed %s: %s", url, r.status_code)
+        r = requests.get(url, headers=_headers(extra), timeout=timeout)
     except Exception as exc:
         log.warning("GET exception %s: %s", url, exc)
+        return None
+    return r if _usable(url, r, r.ok, stale, size, bool(extra)) else None
+
+async def _aconditional_get(client: httpx.AsyncClient, url: str, stale: Optional[Dict[str, Any]], timeout: float,
+                            size: int) -> Optional[httpx.Response]:
+    """Async-Variante von ``_conditional_get`` auf dem gemeinsamen Client (services/research_fetch.py)."""
+    extra = _conditional_headers(stale)
+    try:
+        r = await client.get(url, headers=_headers(extra), timeout=timeout)
+    except Exception as exc:
+        log.warning("GET exception %s: %s", url, exc)
+        return None
+    return r if _usable(url, r, r.is_success, stale, size, bool(extra)) else None
+
+def _http_lookup(url: str) -> Tuple[Optional[str], Optional[Dict[str, Any]], int]:
+    """``(frischer Body, abgelaufener Eintrag, dessen Größe)``."""
+    cache = get_research_cache()
+    cached = _entry(cache.get("http", url), "body")
+    if cached:
+        return (str(cached["body"]) if isinstance(cached["body"], str) else ""), None, 0
+    found = cache.lookup("http", url)
+    stale = _entry(found[0], "body") if found else None
+    return None, stale, len(str((stale or {}).get("body", "")).encode("utf-8"))
+
+def _http_store(url: str, r: Any, stale: Optional[Dict[str, Any]]) -> str | None:
+    if r is None:
+        return None
+    if r.status_code == 304 and stale:
+        get_research_cache().set("http", url, stale)
+        return str(stale["body"])
+    if r.text:
+        get_research_cache().set("http", url, {"body": r.text, **_validators(r)})
+        return str(r.text)
     return None
 
+# --- HTTP helpers ---
+
+def http_get(url: str, timeout: Optional[tuple] = None) -> str | None:
+    """GET text content with UA + timeout + cache (namespace "http", default 5 minutes) + conditional refresh."""
+    body, stale, size = _http_lookup(url)
+    if body is not None:
+        return body or None
+    return _http_store(url, _conditional_get(url, stale, timeout or DEFAULT_TIMEOUT, size), stale)
+
+async def ahttp_get(client: httpx.AsyncClient, url: str, timeout: float) -> str | None:
+    body, stale, size = _http_lookup(url)
+    if body is not None:
+        return body or None
+    return _http_store(url, await _aconditional_get(client, url, stale, timeout, size), stale)
+
 def http_get_json(url: str, timeout: Optional[tuple] = None) -> dict[Any, Any] | None:
     raw = http_get(url, timeout=timeout)
     if not raw:
@@ -116,67 +190,263 @@ def http_get_json(url: str, timeout: Optional[tuple] = None) -> dict[Any, Any] |
 
 # --- RSS parsing ---
 
+def _feed_items(content: bytes, limit: int) -> List[Dict[str, Any]]:
+    d = feedparser.parse(content)
+    items: List[Dict[str, Any]] = []
+    for entry in d.entries[:limit]:
+        title = entry.get("title", "").strip()
+        link = entry.get("link", "").strip()
+        # Fallback to html.parser if lxml is not installed or parsing fails
+        raw_summary = entry.get("summary", "") or entry.get("description", "")
+        try:
+            summary = BeautifulSoup(raw_summary, "lxml").get_text(" ", strip=True)
+        except Exception:
+            summary = BeautifulSoup(raw_summary, "html.parser").get_text(" ", strip=True)
+        date = entry.get("published", "") or entry.get("updated", "")
+        source = urlparse(link).netloc
+        if title and link:
+            items.append({
+                "title": title,
+                "url": link,
+                "summary": summary[:280],
+                "date": date,
+                "source": source,
+            })
+    return items
+
+def _rss_lookup(url: str) -> Tuple[Optional[List[Dict[str, Any]]], Optional[Dict[str, Any]]]:
+    cache = get_research_cache()
+    cached = _entry(cache.get("rss", url), "items")
+    if cached and isinstance(cached["items"], list) and cached["items"]:
+        return list(cached["items"]), None
+    found = cache.lookup("rss", url)
+    return None, (_entry(found[0], "items") if found else None)
+
+def _rss_store(url: str, r: Any, stale: Optional[Dict[str, Any]], limit: int) -> List[Dict[str, Any]]:
+    if r is None:
+        return []
+    if r.status_code == 304 and stale:
+        get_research_cache().set("rss", url, stale)
+        return list(stale["items"])[:limit]
+    items = _feed_items(r.content, limit)
+    get_research_cache().set("rss", url, {"items": items, "size": len(r.content or b""), **_validators(r)})
+    return items
+
 def parse_rss(url: str, limit: int = 12) -> List[Dict[str, Any]]:
-    key = _cache_key("RSS", url)
-    cached = _cache_get(key, 300)  # 5 min
-    if cached and isinstance(cached, list):
-        return list(cached)
+    """Feed-Einträge (namespace "rss", 5 Minuten); danach konditionaler GET, bei 304 ohne Neu-Parsen."""
     try:
-        d = feedparser.parse(url)
-        items: List[Dict[str, Any]] = []
-        for entry in d.entries[:limit]:
-            title = entry.get("title", "").strip()
-            link = entry.get("link", "").strip()
-            # Fallback to html.parser if lxml is not installed or parsing fails
-            raw_summary = entry.get("summary", "") or entry.get("description", "")
-            try:
-                summary = BeautifulSoup(raw_summary, "lxml").get_text(" ", strip=True)
-            except Exception:
-                summary = BeautifulSoup(raw_summary, "html.parser").get_text(" ", strip=True)
-            date = entry.get("published", "") or entry.get("updated", "")
-            source = urlparse(link).netloc
-            if title and link:
-                items.append({
-                    "title": title,
-                    "url": link,
-                    "summary": summary[:280],
-                    "date": date,
-                    "source": source,
-                })
-        _cache_set(key, items)
-        return items
+        items, stale = _rss_lookup(url)
+        if items is not None:
+            return items[:limit]
+        r = _conditional_get(url, stale, DEFAULT_TIMEOUT, int((stale or {}).get("size") or 0))
+        return _rss_store(url, r, stale, limit)
+    except Exception as exc:
+        log.warning("parse_rss failed %s: %s", url, exc)
+        return []
+
+async def aparse_rss(client: httpx.AsyncClient, url: str, limit: int, timeout: float) -> List[Dict[str, Any]]:
+    try:
+        items, stale = _rss_lookup(url)
+        if items is not None:
+            return items[:limit]
+        r = await _aconditional_get(client, url, stale, timeout, int((stale or {}).get("size") or 0))
+        return _rss_store(url, r, stale, limit)
     except Exception as exc:
         log.warning("parse_rss failed %s: %s", url, exc)
         return []
 
 # --- Lightweight HTML harvesting (links on curated pages) ---
+# Gestreamt + inkrementell geparst: kein Baum, kein Rohseiten-Cache, Abbruch bei ``limit`` Treffern.
+
+class _LinkCollector:
+    """Parser-Target (lxml) bzw. Senke für html.parser: sammelt ``<a href>`` bis ``limit`` Treffer."""
+
+    def __init__(self, allow_domains: Optional[List[str]], limit: int) -> None:
+        self.allow_domains = allow_domains
+        self.limit = limit
+        self.links: List[Dict[str, str]] = []
+        self._href: Optional[str] = None
+        self._text: List[str] = []
+
+    @property
+    def done(self) -> bool:
+        return len(self.links) >= self.limit
+
+    def start(self, tag: str, attrib: Any) -> None:
+        if tag == "a":
+            self._flush()  # verschachtelte/ungeschlossene <a>
+            self._href = str(attrib.get("href") or "")
+            self._text = []
+
+    def end(self, tag: str) -> None:
+        if tag == "a":
+            self._flush()
+
+    def data(self, text: str) -> None:
+        if self._href is not None:
+            self._text.append(text)
+
+    def close(self) -> List[Dict[str, str]]:
+        self._flush()
+        return self.links
+
+    def _flush(self) -> None:
+        if self._href is None:
+            return
+        href, text = self._href.strip(), " ".join("".join(self._text).split())
+        self._href, self._text = None, []
+        if self.done or not href.startswith(("http://", "https://")):
+            return
+        dom = urlparse(href).netloc.lower()
+        if self.allow_domains and not any(dom == d or dom.endswith("." + d) for d in self.allow_domains):
+            return
+        title = text or dom
+        if title:
+            self.links.append({"title": title[:140], "url": href, "source": dom})
+
+
+class _StdlibLinkParser(HTMLParser):
+    """Fallback ohne lxml: leitet html.parser-Callbacks an den ``_LinkCollector`` weiter."""
+
+    def __init__(self, sink: _LinkCollector) -> None:
+        super().__init__(convert_charrefs=True)
+        self.sink = sink
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.sink.start(tag, dict(attrs))
+
+    def handle_endtag(self, tag: str) -> None:
+        self.sink.end(tag)
+
+    def handle_data(self, data: str) -> None:
+        self.sink.data(data)
+
+
+def _charset(content_type: Optional[str]) -> str:
+    m = re.search(r"charset=[\"']?([\w.:-]+)", content_type or "", re.I)
+    try:
+        return codecs.lookup(m.group(1)).name if m else "utf-8"
+    except LookupError:
+        return "utf-8"
+
+
+class _LinkStream:
+    """Dekodiert Chunks inkrementell und füttert den Parser, bis ``limit`` Links oder das Byte-Limit erreicht sind."""
+
+    def __init__(self, allow_domains: Optional[List[str]], limit: int, content_type: Optional[str] = None) -> None:
+        self.collector = _LinkCollector(allow_domains, limit)
+        self.bytes_read = 0
+        self._decoder = codecs.getincrementaldecoder(_charset(content_type))(errors="replace")
+        # Attempt to parse with lxml; fallback to html.parser if lxml isn't available
+        try:
+            from lxml import etree
+            self._parser: Any = etree.HTMLParser(target=self.collector)
+        except ImportError:
+            self._parser = _StdlibLinkParser(self.collector)
+
+    def _feed(self, text: str) -> None:
+        if text:
+            self._parser.feed(text)
+
+    def feed(self, chunk: bytes) -> bool:
+        """False = genug gelesen (Limit an Links oder Bytes erreicht)."""
+        chunk = chunk[: max(0, LINKS_MAX_BYTES - self.bytes_read)]
+        self.bytes_read += len(chunk)
+        self._feed(self._decoder.decode(chunk))
+        return not self.collector.done and self.bytes_read < LINKS_MAX_BYTES
+
+    def close(self) -> List[Dict[str, str]]:
+        self._feed(self._decoder.decode(b"", final=True))
+        try:
+            self._parser.close()
+        except Exception:  # abgeschnittenes Dokument
+            pass
+        return self.collector.close()
+
+
+def _links_entry(r: Any, stream: _LinkStream) -> Dict[str, Any]:
+    _count(bytes_downloaded=stream.bytes_read)
+    return {"items": stream.close(), "size": stream.bytes_read, **_validators(r)}
+
+def _stream_links(url: str, stale: Optional[Dict[str, Any]], timeout: tuple, size: int,
+                  allow_domains: Optional[List[str]], limit: int) -> Optional[Dict[str, Any]]:
+    """Gestreamter konditionaler GET; Cache-Eintrag ``{"items", "size", Validatoren}`` oder ``None``."""
+    extra = _conditional_headers(stale)
+    try:
+        with requests.get(url, headers=_headers(extra), timeout=timeout, stream=True) as r:
+            if not _usable(url, r, r.ok, stale, size, bool(extra), downloaded=0):
+                return None
+            if r.status_code == 304:
+                return stale
+            stream = _LinkStream(allow_domains, limit, r.headers.get("Content-Type"))
+            for chunk in r.iter_content(LINKS_CHUNK):
+                if not stream.feed(chunk):
+                    break
+            return _links_entry(r, stream)
+    except Exception as exc:
+        log.warning("GET exception %s: %s", url, exc)
+        return None
+
+async def _astream_links(client: httpx.AsyncClient, url: str, stale: Optional[Dict[str, Any]], timeout: float,
+                         size: int, allow_domains: Optional[List[str]], limit: int) -> Optional[Dict[str, Any]]:
+    extra = _conditional_headers(stale)
+    try:
+        async with client.stream("GET", url, headers=_headers(extra), timeout=timeout) as r:
+            if not _usable(url, r, r.is_success, stale, size, bool(extra), downloaded=0):
+                return None
+            if r.status_code == 304:
+                return stale
+            stream = _LinkStream(allow_domains, limit, r.headers.get("Content-Type"))
+            async for chunk in r.aiter_bytes(LINKS_CHUNK):
+                if not stream.feed(chunk):
+                    break
+            return _links_entry(r, stream)
+    except Exception as exc:
+        log.warning("GET exception %s: %s", url, exc)
+        return None
+
+def _links_lookup(key: str) -> Tuple[Optional[List[Dict[str, str]]], Optional[Dict[str, Any]]]:
+    cache = get_research_cache()
+    cached = _entry(cache.get("links", key), "items")
+    if cached and isinstance(cached["items"], list) and cached["items"]:
+        return list(cached["items"]), None
+    found = cache.lookup("links", key)
+    return None, (_entry(found[0], "items") if found else None)
+
+def _links_store(key: str, entry: Optional[Dict[str, Any]]) -> List[Dict[str, str]]:
+    if entry is None:
+        return []
+    get_research_cache().set("links", key, entry)
+    return list(entry["items"])
 
 def harvest_links(url: str, allow_domains: Optional[List[str]] = None, limit: int = 20) -> List[Dict[str, str]]:
     """
-    Holt alle <a>-Links von einer Seite und filtert nach Domains.
-    Nützlich z. B. für Tool-Kataloge oder Programmlisten.
+    Holt <a>-Links von einer Seite und filtert nach Domains (gestreamt, bricht bei ``limit`` ab).
+    Nützlich z. B. für Tool-Kataloge oder Programmlisten. Cache: nur die Linkliste (namespace "links").
     """
-    html = http_get(url)
+    key = make_key(url, allow_domains or [], limit)
+    links, stale = _links_lookup(key)
+    if links is not None:
+        return links
+    size = int((stale or {}).get("size") or 0)
+    return _links_store(key, _stream_links(url, stale, DEFAULT_TIMEOUT, size, allow_domains, limit))
+
+async def aharvest_links(client: httpx.AsyncClient, url: str, allow_domains: Optional[List[str]] = None,
+                         limit: int = 20, timeout: float = 20.0) -> List[Dict[str, str]]:
+    key = make_key(url, allow_domains or [], limit)
+    links, stale = _links_lookup(key)
+    if links is not None:
+        return links
+    size = int((stale or {}).get("size") or 0)
+    return _links_store(key, await _astream_links(client, url, stale, timeout, size, allow_domains, limit))
+
+def extract_links(html: Optional[str], allow_domains: Optional[List[str]] = None, limit: int = 20) -> List[Dict[str, str]]:
+    """Links aus bereits geladenem HTML (gleicher Parser wie die gestreamte Ernte)."""
     if not html:
         return []
-    # Attempt to parse with lxml; fallback to html.parser if lxml isn't available
-    try:
-        soup = BeautifulSoup(html, "lxml")
-    except Exception:
-        soup = BeautifulSoup(html, "html.parser")
-    out: List[Dict[str, str]] = []
-    for a in soup.find_all("a", href=True):
-        href_val = a.get("href", "")
-        href = str(href_val).strip() if href_val else ""
-        text = a.get_text(" ", strip=True)
-        if not href.startswith(("http://", "https://")):
-            continue
-        dom = urlparse(href).netloc.lower()
-        if allow_domains and not any(dom == d or dom.endswith("." + d) for d in allow_domains):
-            continue
-        title = text or dom
-        if title and href:
-            out.append({"title": title[:140], "url": href, "source": dom})
-        if len(out) >= limit:
+    stream = _LinkStream(allow_domains, limit)
+    for i in range(0, len(html), LINKS_CHUNK):
+        stream._feed(html[i:i + LINKS_CHUNK])
+        if stream.collector.done:
             break
-    return out
+    return stream.close()
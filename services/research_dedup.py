@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""URL-Kanonisierung und Near-Duplicate-Erkennung für Research-Treffer
+- ``canonical_url()`` macht Varianten desselben Artikels vergleichbar: ``http``/``https``, ``www.``/``m.``/
+  ``amp.``-Hosts, Default-Ports, Tracking-Parameter (``utm_*``, ``fbclid``, ``gclid`` …), AMP-Pfade,
+  abschließende Slashes, Fragmente; übrige Query-Parameter werden sortiert.
+- ``simhash()`` bildet einen 64-Bit-Fingerprint über Zeichen-Trigramme von Titel + Inhalt (robuster als
+  Wort-Shingles bei kurzen Snippets); Treffer mit Hamming-Abstand ≤ ``RESEARCH_DEDUP_DISTANCE`` gelten
+  als Duplikat (z. B. fast gleiche Tavily-/Perplexity-Zusammenfassungen unter verschiedenen URLs).
+- Near-Duplicates nur bei echtem Text (``content`` bzw. ``summary`` bei RSS): reine Titel-Treffer
+  (geerntete Links) unterscheiden sich oft nur in einem Wort („… Bayern“ / „… Berlin“) und werden
+  ausschließlich über die kanonische URL dedupliziert.
+- ``dedupe_items()`` behält jeweils den ersten Treffer (Reihenfolge = Priorität der Quellen); die
+  ausgelieferte URL bleibt unverändert, kanonisiert wird nur der Vergleichsschlüssel.
+
+ENV:
+  RESEARCH_DEDUP_DISTANCE    Max. Hamming-Abstand der SimHashes für Duplikate (Default 8, 0 = aus)
+  RESEARCH_DEDUP_MIN_TOKENS  Mindestanzahl Wörter im Inhalt, ab der per SimHash verglichen wird (Default 4)
+"""
+import hashlib
+import os
+import re
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+RESEARCH_DEDUP_DISTANCE = int(os.getenv("RESEARCH_DEDUP_DISTANCE", "8"))
+RESEARCH_DEDUP_MIN_TOKENS = int(os.getenv("RESEARCH_DEDUP_MIN_TOKENS", "4"))
+
+_TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl",
+    "ref", "ref_src", "ref_url", "referrer", "cmpid", "wt_mc", "wt_zmc", "at_medium", "at_campaign",
+    "amp", "outputtype",
+}
+_HOST_PREFIXES = ("www.", "m.", "amp.", "mobile.")
+_DEFAULT_PORTS = {":80", ":443"}
+_TOKEN_RX = re.compile(r"\w+", re.UNICODE)
+_SIMHASH_CHARS = 1000  # Titel + Anfang des Inhalts reichen für den Fingerprint
+
+
+def _is_tracking(name: str) -> bool:
+    n = name.lower()
+    return n.startswith("utm_") or n in _TRACKING_PARAMS
+
+
+def canonical_url(url: Optional[str]) -> str:
+    """Vergleichsschlüssel für eine URL (leer bei leerer Eingabe)."""
+    u = (url or "").strip()
+    if not u:
+        return ""
+    if "://" not in u:
+        u = "https://" + u.lstrip("/")
+    try:
+        parts = urlsplit(u)
+    except ValueError:
+        return u.lower()
+    host = (parts.netloc.rsplit("@", 1)[-1]).lower()
+    for port in _DEFAULT_PORTS:
+        if host.endswith(port):
+            host = host[: -len(port)]
+    for prefix in _HOST_PREFIXES:
+        if host.startswith(prefix) and host.count(".") > 1:
+            host = host[len(prefix):]
+            break
+    segments = [s for s in parts.path.split("/") if s and s.lower() not in ("amp", "index.html", "index.htm")]
+    path = "/" + "/".join(segments)
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not _is_tracking(k)))
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def simhash(text: str) -> int:
+    """64-Bit-SimHash über Zeichen-Trigramme des normalisierten Texts (0 bei leerem Text)."""
+    norm = " ".join(_TOKEN_RX.findall(text.lower()))[:_SIMHASH_CHARS]
+    grams = {norm[i:i + 3] for i in range(max(1, len(norm) - 2))} if norm else set()
+    if not grams:
+        return 0
+    # Bitweise Mehrheit über alle Feature-Hashes (Spalten der Binärdarstellung statt 64er-Schleife je Feature)
+    rows = [format(int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "big"), "064b")
+            for g in grams]
+    half = len(rows) / 2
+    return int("".join("1" if col.count("1") > half else "0" for col in zip(*rows)), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def dedupe_items(items: List[Dict[str, Any]], max_distance: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Entfernt Einträge ohne URL, URL-Varianten und inhaltliche Near-Duplicates (erster Treffer gewinnt)."""
+    distance = RESEARCH_DEDUP_DISTANCE if max_distance is None else max_distance
+    seen_urls = set()
+    hashes: List[int] = []
+    out: List[Dict[str, Any]] = []
+    for it in items:
+        key = canonical_url(it.get("url"))
+        if not key or key in seen_urls:
+            continue
+        body = it.get("content") or it.get("summary") or ""
+        fp = None
+        if distance > 0 and len(_TOKEN_RX.findall(body)) >= RESEARCH_DEDUP_MIN_TOKENS:
+            fp = simhash(f"{it.get('title') or ''} {body}")
+            if any(hamming(fp, h) <= distance for h in hashes):
+                continue
+        seen_urls.add(key)
+        if fp is not None:
+            hashes.append(fp)
+        out.append(it)
+    return out
+
+
+__all__ = ["canonical_url", "dedupe_items", "hamming", "simhash"]
@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Parallele Research-Abrufe (RSS-Feeds, Förder-/Tool-Seiten) auf einem gemeinsamen Async-Client
+- Ein prozessweiter ``httpx.AsyncClient`` (Keep-Alive, HTTP/2 falls ``h2``) auf eigenem Loop-Thread
+  (services/client_loop.py, wie der LLM-Client).
+- ``fetch_many()`` startet alle Quellen gleichzeitig: Budget je Quelle, Gesamt-Deadline je Aufruf;
+  was bis zur Deadline fertig ist, wird genommen (Teilergebnis), der Rest abgebrochen.
+- Quellen, die ihr *volles* Budget reißen, gelten für ``RESEARCH_SLOW_SKIP_SEC`` als langsam und werden in
+  Reports übersprungen (der Prefetcher holt sie weiter im Hintergrund, services/research_prefetch.py).
+  Abbrüche durch die Batch-Deadline (bzw. ein darauf gekürztes Budget) zählen nur als ``deadline_cut``.
+
+ENV:
+  RESEARCH_DEADLINE_SEC       Gesamt-Deadline für einen Batch (Default 15)
+  RESEARCH_SOURCE_BUDGET_SEC  Budget je Quelle (Default 8)
+  RESEARCH_SLOW_SKIP_SEC      Wie lange eine langsame Quelle übersprungen wird (Default 1800)
+  RESEARCH_MAX_CONNECTIONS    Max. offene Verbindungen des Research-Clients (Default 20)
+"""
+import asyncio
+import logging
+import os
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from .client_loop import HAS_H2, lazy_client_loop
+
+log = logging.getLogger(__name__)
+
+RESEARCH_DEADLINE_SEC = float(os.getenv("RESEARCH_DEADLINE_SEC", "15"))
+RESEARCH_SOURCE_BUDGET_SEC = float(os.getenv("RESEARCH_SOURCE_BUDGET_SEC", "8"))
+RESEARCH_SLOW_SKIP_SEC = float(os.getenv("RESEARCH_SLOW_SKIP_SEC", "1800"))
+RESEARCH_MAX_CONNECTIONS = int(os.getenv("RESEARCH_MAX_CONNECTIONS", "20"))
+
+# (schlüssel, url, coroutine-fabrik(client, budget_sec))
+Job = Tuple[str, str, Callable[[httpx.AsyncClient, float], Awaitable[Any]]]
+
+
+def _new_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HAS_H2,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=RESEARCH_MAX_CONNECTIONS, max_keepalive_connections=10,
+                            keepalive_expiry=60.0),
+    )
+
+
+_get_fetch_loop = lazy_client_loop("research-fetch-loop", _new_client)
+_slow_lock = threading.Lock()
+_slow_until: Dict[str, float] = {}
+_stats: Dict[str, int] = {"batches": 0, "fetched": 0, "failed": 0, "over_budget": 0, "deadline_cut": 0,
+                          "skipped_slow": 0}
+
+
+def _count(**deltas: int) -> None:
+    with _slow_lock:
+        for k, v in deltas.items():
+            _stats[k] += v
+
+
+def mark_slow(url: str, reason: str) -> None:
+    with _slow_lock:
+        _slow_until[url] = time.time() + RESEARCH_SLOW_SKIP_SEC
+    log.warning("🐢 Research source marked slow (%s) for %ds: %s", reason, RESEARCH_SLOW_SKIP_SEC, url)
+
+
+def is_slow(url: str) -> bool:
+    with _slow_lock:
+        until = _slow_until.get(url)
+        if until is not None and until <= time.time():
+            del _slow_until[url]
+            until = None
+    return until is not None
+
+
+def fetch_stats() -> Dict[str, Any]:
+    """Zähler + aktuell übersprungene Quellen (für /admin/research/sources)."""
+    now = time.time()
+    with _slow_lock:
+        slow = {u: round(t - now, 1) for u, t in _slow_until.items() if t > now}
+        return {**_stats, "slow_sources": slow}
+
+
+async def _gather(jobs: List[Job], deadline_sec: float, budget_sec: float,
+                  full_budget_sec: Optional[float] = None) -> Dict[str, Any]:
+    client = _get_fetch_loop().client
+    # Budget auf die Rest-Deadline gekürzt → ein Timeout sagt nichts über die Quelle aus
+    clamped = full_budget_sec is not None and budget_sec < full_budget_sec
+    assert client is not None
+    # Client-Timeout knapp über dem Budget, damit wait_for greift und die Quelle als langsam gilt
+    tasks = {asyncio.ensure_future(asyncio.wait_for(make(client, budget_sec + 1.0), budget_sec)): (key, url)
+             for key, url, make in jobs}
+    done, pending = await asyncio.wait(tasks, timeout=deadline_sec)
+    for t in pending:
+        t.cancel()
+    out: Dict[str, Any] = {}
+    for t, (key, url) in tasks.items():
+        out[key] = None
+        if t in pending or (clamped and isinstance(t.exception(), asyncio.TimeoutError)):
+            _count(deadline_cut=1)
+        elif isinstance(t.exception(), asyncio.TimeoutError):
+            _count(over_budget=1)
+            mark_slow(url, f"> {budget_sec:.0f}s")
+        elif t.exception() is not None:
+            _count(failed=1)
+            log.warning("⚠️ Research fetch %s failed: %s", url, t.exception())
+        else:
+            _count(fetched=1)
+            out[key] = t.result()
+    return out
+
+
+def fetch_many(jobs: List[Job], deadline_sec: Optional[float] = None,
+               budget_sec: Optional[float] = None) -> Dict[str, Any]:
+    """Führt alle Jobs parallel aus; ``None`` je Schlüssel = übersprungen, Fehler oder zu langsam."""
+    deadline = RESEARCH_DEADLINE_SEC if deadline_sec is None else max(0.1, deadline_sec)
+    full_budget = RESEARCH_SOURCE_BUDGET_SEC if budget_sec is None else budget_sec
+    budget = min(full_budget, deadline)
+    out: Dict[str, Any] = {}
+    run: List[Job] = []
+    for job in jobs:
+        if is_slow(job[1]):
+            _count(skipped_slow=1)
+            out[job[0]] = None
+        else:
+            run.append(job)
+    _count(batches=1)
+    if run:
+        fut = asyncio.run_coroutine_threadsafe(_gather(run, deadline, budget, full_budget), _get_fetch_loop().loop)
+        try:
+            out.update(fut.result(timeout=deadline + 5.0))
+        except Exception as exc:
+            fut.cancel()
+            log.error("❌ Research fetch batch failed: %s", exc)
+            out.update({key: None for key, _, _ in run})
+    return out
+
+
+__all__ = ["fetch_many", "fetch_stats", "is_slow", "mark_slow"]
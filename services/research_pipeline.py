@@ -10,7 +10,7 @@ Gibt HTML-Strings zurück, die gpt_analyze.py direkt übernimmt:
 - "FUNDING_TABLE_HTML"
 - "MARKET_INSIGHTS_HTML"  # NEW: Perplexity-basierte Markt-Insights
 - optional "NEWS_BOX_HTML"
-- "last_updated"
+- "last_updated"  (Abrufdatum der ältesten gelieferten Live-Daten, auch bei Cache-Treffern)
 
 HYBRID APPROACH (2025-11-20):
 - RSS für News (kostenlos, schnell)
@@ -22,13 +22,20 @@ from __future__ import annotations
 import os
 import html
 import logging
+import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
 
-from .research_clients import parse_rss, harvest_links
+from .keyword_matcher import matcher_for
+from .research_cache import get_research_cache, make_key
+from .research_clients import aharvest_links, aparse_rss
+from .research_dedup import dedupe_items
+from .research_fetch import RESEARCH_DEADLINE_SEC, fetch_many
 from . import provider_tavily
 from . import provider_perplexity
+from .run_trace import bind, span as trace_span
 
 log = logging.getLogger(__name__)
 
@@ -64,6 +71,53 @@ FUNDING_HINT_PAGES = [
     # "https://www.berlin.de/sen/wirtschaft/wirtschaft/foerderprogramme/",  # DISABLED: 404 Error - ersetzt durch IBB URL oben
 ]
 
+NEWS_KEYWORDS = ["ai act", "eu ai act", "künstliche intelligenz", "ki", "sme", "kmu", "förderung", "compliance",
+                 "policy", "gesetz"]
+FUNDING_KEYWORDS = ["förder", "grant", "fund", "digital", "ai", "ki", "kmu", "sme"]
+
+def funding_pages() -> List[str]:
+    """Förder-Einstiegsseiten inkl. ``FUNDING_PAGES`` (Komma-Liste)."""
+    extra = [u.strip() for u in os.getenv("FUNDING_PAGES", "").split(",") if u.strip()]
+    return FUNDING_HINT_PAGES + extra
+
+def filter_news(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [i for i in items if _match_any((i.get("title","") + " " + i.get("summary","")), NEWS_KEYWORDS)][:6]
+
+def filter_funding(items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [i for i in items if _match_any((i.get("title","") + " " + i.get("url","")), FUNDING_KEYWORDS)][:10]
+
+async def _live_rss(url: str, client: Any, timeout: float) -> List[Dict[str, Any]]:
+    return filter_news(await aparse_rss(client, url, 8, timeout))
+
+async def _live_tools(url: str, client: Any, timeout: float) -> List[Dict[str, Any]]:
+    return await aharvest_links(client, url, None, 30, timeout)
+
+async def _live_funding(url: str, client: Any, timeout: float) -> List[Dict[str, Any]]:
+    return filter_funding(await aharvest_links(client, url, None, 40, timeout))
+
+_LIVE = {"rss": _live_rss, "tools": _live_tools, "funding": _live_funding}
+
+def _source_lists(sources: List[Tuple[str, str]], deadline_at: float) -> Dict[str, List[Dict[str, Any]]]:
+    """``"art:url"`` → Einträge; vorgeholte Listen (services/research_prefetch.py) aus dem Cache, der Rest
+    parallel bis zur Research-Deadline (services/research_fetch.py). Fehlende/zu langsame Quellen → []."""
+    cache = get_research_cache()
+    out: Dict[str, List[Dict[str, Any]]] = {}
+    jobs = []
+    for kind, url in sources:
+        key = f"{kind}:{url}"
+        items = cache.get("prefetch", key)
+        if isinstance(items, list):
+            out[key] = items
+        else:
+            jobs.append((key, url, partial(_LIVE[kind], url)))
+    remaining = deadline_at - time.time()
+    if jobs and remaining <= 0:
+        log.warning("⏱️ Research deadline reached, skipping %d live sources", len(jobs))
+    elif jobs:
+        for key, items in fetch_many(jobs, deadline_sec=remaining).items():
+            out[key] = items or []
+    return {f"{k}:{u}": out.get(f"{k}:{u}", []) for k, u in sources}
+
 def _kw(answers: Dict[str, Any]) -> List[str]:
     """Bestimme einfache Schlagwörter aus Fragebogen (Branche/Use-Cases)."""
     branche = (answers.get("BRANCHE_LABEL") or answers.get("branche") or "").lower()
@@ -80,8 +134,7 @@ def _kw(answers: Dict[str, Any]) -> List[str]:
     return [k for k in kws if k]
 
 def _match_any(text: str, keywords: List[str]) -> bool:
-    t = text.lower()
-    return any(k.lower() in t for k in keywords)
+    return matcher_for(keywords).matches(text)
 
 def _tools_table(items: List[Dict[str, str]]) -> str:
     if not items:
@@ -135,7 +188,22 @@ def _market_insights_box(items: List[Dict[str, str]]) -> str:
 
 # --- TAVILY INTEGRATION ---
 
-def _tavily_funding_search(bundesland: str, branche: str, days: int = 90) -> List[Dict[str, str]]:
+def _stamp(stamps: Optional[List[float]], items: List[Dict[str, str]], ts: float) -> List[Dict[str, str]]:
+    if stamps is not None and items:
+        stamps.append(ts)
+    return items
+
+def _tavily_cached(query: str, days: int, max_results: int = 8,
+                   stamps: Optional[List[float]] = None) -> List[Dict[str, str]]:
+    """Tavily-Suche über den Research-Cache (Namespace "tavily"); leere Antworten werden nicht gecacht."""
+    items, ts = get_research_cache().fetch_entry(
+        "tavily", make_key(query, days, max_results),
+        lambda: provider_tavily.search(query, max_results=max_results, days=days),
+    )
+    return _stamp(stamps, items, ts)
+
+def _tavily_funding_search(bundesland: str, branche: str, days: int = 90,
+                           stamps: Optional[List[float]] = None) -> List[Dict[str, str]]:
     """Live-Suche nach Förderprogrammen via Tavily API."""
     if not os.getenv("TAVILY_API_KEY"):
         return []
@@ -152,14 +220,15 @@ def _tavily_funding_search(bundesland: str, branche: str, days: int = 90) -> Lis
     log.info("🔍 Tavily funding search: %s", query)
 
     try:
-        results = provider_tavily.search(query, max_results=8, days=days)
+        results = _tavily_cached(query, days, stamps=stamps)
         log.info("✅ Tavily returned %d funding results", len(results))
         return results
     except Exception as exc:
         log.warning("⚠️ Tavily funding search failed: %s", exc)
         return []
 
-def _tavily_tools_search(branche: str, use_cases: List[str], days: int = 60) -> List[Dict[str, str]]:
+def _tavily_tools_search(branche: str, use_cases: List[str], days: int = 60,
+                         stamps: Optional[List[float]] = None) -> List[Dict[str, str]]:
     """Live-Suche nach KI-Tools via Tavily API."""
     if not os.getenv("TAVILY_API_KEY"):
         return []
@@ -176,7 +245,7 @@ def _tavily_tools_search(branche: str, use_cases: List[str], days: int = 60) ->
     log.info("🔍 Tavily tools search: %s", query)
 
     try:
-        results = provider_tavily.search(query, max_results=8, days=days)
+        results = _tavily_cached(query, days, stamps=stamps)
         log.info("✅ Tavily returned %d tools results", len(results))
         return results
     except Exception as exc:
@@ -185,7 +254,17 @@ def _tavily_tools_search(branche: str, use_cases: List[str], days: int = 60) ->
 
 # --- PERPLEXITY INTEGRATION ---
 
-def _perplexity_market_insights(branche: str, hauptleistung: str, days: int = 30) -> List[Dict[str, str]]:
+def _perplexity_cached(topic: str, days: int, max_items: int,
+                       stamps: Optional[List[float]] = None) -> List[Dict[str, str]]:
+    """Perplexity-Recherche über den Research-Cache (Namespace "perplexity")."""
+    items, ts = get_research_cache().fetch_entry(
+        "perplexity", make_key(topic, days, max_items),
+        lambda: provider_perplexity.search(topic, days=days, max_items=max_items),
+    )
+    return _stamp(stamps, items, ts)
+
+def _perplexity_market_insights(branche: str, hauptleistung: str, days: int = 30,
+                                stamps: Optional[List[float]] = None) -> List[Dict[str, str]]:
     """Markt- und Wettbewerbs-Insights via Perplexity API."""
     if not os.getenv("PERPLEXITY_API_KEY"):
         return []
@@ -202,14 +281,15 @@ def _perplexity_market_insights(branche: str, hauptleistung: str, days: int = 30
     log.info("🔍 Perplexity market insights: %s", topic)
 
     try:
-        results = provider_perplexity.search(topic, days=days, max_items=6)
+        results = _perplexity_cached(topic, days, 6, stamps=stamps)
         log.info("✅ Perplexity returned %d market insights", len(results))
         return results
     except Exception as exc:
         log.warning("⚠️ Perplexity market insights failed: %s", exc)
         return []
 
-def _perplexity_competitor_analysis(branche: str, days: int = 30) -> List[Dict[str, str]]:
+def _perplexity_competitor_analysis(branche: str, days: int = 30,
+                                   stamps: Optional[List[float]] = None) -> List[Dict[str, str]]:
     """Wettbewerber-Analyse via Perplexity API."""
     if not os.getenv("PERPLEXITY_API_KEY"):
         return []
@@ -218,7 +298,7 @@ def _perplexity_competitor_analysis(branche: str, days: int = 30) -> List[Dict[s
     log.info("🔍 Perplexity competitor analysis: %s", topic)
 
     try:
-        results = provider_perplexity.search(topic, days=days, max_items=5)
+        results = _perplexity_cached(topic, days, 5, stamps=stamps)
         log.info("✅ Perplexity returned %d competitor insights", len(results))
         return results
     except Exception as exc:
@@ -239,7 +319,34 @@ def run_research(answers: Dict[str, Any]) -> Dict[str, Any]:
       }
     """
     provider = os.getenv("RESEARCH_PROVIDER", "hybrid").strip().lower()
-    # offline-only short-circuit
+    if provider == "offline":
+        return _collect_research(answers, provider)[0]
+
+    # Gerenderte Blöcke je Profil (Namespace "table", stale-while-revalidate);
+    # nur Ergebnisse mit Live-Daten werden gecacht
+    branche = answers.get("BRANCHE_LABEL") or answers.get("branche") or ""
+    bundesland = answers.get("BUNDESLAND_LABEL") or answers.get("bundesland") or ""
+    use_cases = answers.get("anwendungsfaelle", []) or []
+    table_key = make_key(provider, branche, bundesland, answers.get("hauptleistung") or "",
+                         sorted(str(u) for u in use_cases), os.getenv("FUNDING_PAGES", ""))
+    degraded: Dict[str, bool] = {}
+
+    def _fetch() -> Dict[str, Any]:
+        data, degraded["value"] = _collect_research(answers, provider)
+        return data
+
+    t0 = time.time()
+    data, fetched_at = get_research_cache().fetch_entry(
+        "table", table_key, _fetch, cache_if=lambda _d: not degraded.get("value", True)
+    )
+    if fetched_at < t0:
+        log.info("💾 Research tables from cache (%s / %s, Stand %s)", branche or "-", bundesland or "-",
+                 data.get("last_updated", "?"))
+    return data
+
+
+def _collect_research(answers: Dict[str, Any], provider: str) -> Tuple[Dict[str, Any], bool]:
+    """Live-Recherche; liefert ``(blöcke, degradiert)`` – degradiert = statischer Fallback genutzt."""
     offline_only = provider == "offline"
 
     # Extract context from answers
@@ -247,6 +354,10 @@ def run_research(answers: Dict[str, Any]) -> Dict[str, Any]:
     bundesland = answers.get("BUNDESLAND_LABEL") or answers.get("bundesland") or ""
     hauptleistung = answers.get("hauptleistung") or ""
     use_cases = answers.get("anwendungsfaelle", []) or []
+    degraded = offline_only
+    started = time.time()
+    deadline_at = started + RESEARCH_DEADLINE_SEC
+    stamps: List[float] = []
 
     kws = _kw(answers)
     tools: List[Dict[str, str]] = []
@@ -261,28 +372,34 @@ def run_research(answers: Dict[str, Any]) -> Dict[str, Any]:
         with ThreadPoolExecutor(max_workers=5) as executor:
             futures = {}
 
+            # 0. News-Feeds parallel zu den Provider-Calls (vorgeholt oder live mit Deadline)
+            futures["rss_news"] = executor.submit(
+                bind("research:rss_news", _source_lists), [("rss", u) for u in AI_ACT_NEWS_RSS + DEFAULT_NEWS_RSS],
+                deadline_at,
+            )
+
             # 1. Tavily for Tools
             if os.getenv("TAVILY_API_KEY"):
                 futures["tavily_tools"] = executor.submit(
-                    _tavily_tools_search, branche, use_cases
+                    bind("research:tavily_tools", _tavily_tools_search), branche, use_cases, stamps=stamps
                 )
 
             # 2. Tavily for Funding
             if os.getenv("TAVILY_API_KEY"):
                 futures["tavily_funding"] = executor.submit(
-                    _tavily_funding_search, bundesland, branche
+                    bind("research:tavily_funding", _tavily_funding_search), bundesland, branche, stamps=stamps
                 )
 
             # 3. Perplexity for Market Insights
             if os.getenv("PERPLEXITY_API_KEY"):
                 futures["pplx_market"] = executor.submit(
-                    _perplexity_market_insights, branche, hauptleistung
+                    bind("research:pplx_market", _perplexity_market_insights), branche, hauptleistung, stamps=stamps
                 )
 
             # 4. Perplexity for Competitor Analysis
             if os.getenv("PERPLEXITY_API_KEY"):
                 futures["pplx_competitor"] = executor.submit(
-                    _perplexity_competitor_analysis, branche
+                    bind("research:pplx_competitor", _perplexity_competitor_analysis), branche, stamps=stamps
                 )
 
             # Collect results
@@ -295,44 +412,42 @@ def run_research(answers: Dict[str, Any]) -> Dict[str, Any]:
                         funding.extend(result)
                     elif key in ("pplx_market", "pplx_competitor"):
                         market_insights.extend(result)
+                    elif key == "rss_news":
+                        for items in result.values():
+                            news.extend(items)
                 except Exception as exc:
                     log.warning("⚠️ %s failed: %s", key, exc)
 
-    # --- FALLBACK: Traditional web scraping if Tavily returned nothing ---
-    if not tools and not offline_only:
-        log.info("📡 Tavily returned no tools, falling back to web scraping...")
+    # --- FALLBACK: Tool-/Förderseiten, falls Tavily nichts lieferte (ein paralleler Batch) ---
+    fallback_sources = [("tools", u) for u in (TOOLS_PAGES if not tools else [])]
+    fallback_sources += [("funding", u) for u in (funding_pages() if not funding else [])]
+    if fallback_sources and not offline_only:
+        log.info("📡 Tavily returned no %s, falling back to web scraping...",
+                 " / ".join(sorted({k for k, _ in fallback_sources})))
         try:
-            for url in TOOLS_PAGES:
-                items = harvest_links(url, allow_domains=None, limit=30)
-                sel = [i for i in items if _match_any((i.get("title","") + " " + i.get("url","")), kws)]
-                tools.extend(sel[:10])
+            with trace_span("research:fallback_pages"):
+                pages = _source_lists(fallback_sources, deadline_at)
+            for key, items in pages.items():
+                if key.startswith("tools:"):
+                    sel = [i for i in items if _match_any((i.get("title","") + " " + i.get("url","")), kws)]
+                    tools.extend(sel[:10])
+                else:
+                    funding.extend(items)
         except Exception as exc:
-            log.warning("TOOLS harvest failed: %s", exc)
+            log.warning("Fallback harvest failed: %s", exc)
 
     if not tools:
         # Static fallback
+        degraded = True
         tools = [
             {"title": "OpenAI GPT‑4o", "url": "https://openai.com/", "source": "openai.com"},
             {"title": "Azure OpenAI Service", "url": "https://azure.microsoft.com/services/cognitive-services/openai-service/", "source": "azure.microsoft.com"},
             {"title": "Hugging Face Models", "url": "https://huggingface.co/models", "source": "huggingface.co"},
         ]
 
-    # --- FUNDING FALLBACK ---
-    if not funding and not offline_only:
-        log.info("📡 Tavily returned no funding, falling back to web scraping...")
-        extra_funding_pages = [u.strip() for u in os.getenv("FUNDING_PAGES", "").split(",") if u.strip()]
-        pages = FUNDING_HINT_PAGES + extra_funding_pages
-
-        try:
-            for url in pages:
-                items = harvest_links(url, allow_domains=None, limit=40)
-                sel = [i for i in items if _match_any((i.get("title","") + " " + i.get("url","")), ["förder", "grant", "fund", "digital", "ai", "ki", "kmu", "sme"])]
-                funding.extend(sel[:10])
-        except Exception as exc:
-            log.warning("FUNDING harvest failed: %s", exc)
-
     # Static JSON fallback
     if not funding:
+        degraded = True
         try:
             import json
             path = os.getenv("FUNDING_FALLBACK_PATH", "data/funding_programs.json")
@@ -348,31 +463,11 @@ def run_research(answers: Dict[str, Any]) -> Dict[str, Any]:
         except Exception as exc:
             log.warning("FUNDING fallback failed: %s", exc)
 
-    # --- NEWS via RSS (always use RSS - it's fast and free) ---
-    if not offline_only:
-        try:
-            for url in (AI_ACT_NEWS_RSS + DEFAULT_NEWS_RSS):
-                items = parse_rss(url, limit=8)
-                sel = [i for i in items if _match_any((i.get("title","") + " " + i.get("summary","")), ["ai act","eu ai act","künstliche intelligenz","ki","sme","kmu","förderung","compliance","policy","gesetz"])]
-                news.extend(sel[:6])
-        except Exception as exc:
-            log.warning("NEWS parse failed: %s", exc)
-
-    # Deduplicate by URL
-    def _uniq(lst: List[Dict[str, str]]) -> List[Dict[str, str]]:
-        seen, out = set(), []
-        for it in lst:
-            u = it.get("url","")
-            if not u or u in seen:
-                continue
-            seen.add(u)
-            out.append(it)
-        return out
-
-    tools = _uniq(tools)[:12]
-    funding = _uniq(funding)[:12]
-    news = _uniq(news)[:12]
-    market_insights = _uniq(market_insights)[:10]
+    # Deduplicate: kanonische URL (Tracking-Parameter, http/https, AMP …) + Near-Duplicates (SimHash)
+    tools = dedupe_items(tools)[:12]
+    funding = dedupe_items(funding)[:12]
+    news = dedupe_items(news)[:12]
+    market_insights = dedupe_items(market_insights)[:10]
 
     # Log summary
     log.info("📊 Research complete: %d tools, %d funding, %d news, %d market insights",
@@ -383,6 +478,6 @@ def run_research(answers: Dict[str, Any]) -> Dict[str, Any]:
         "FUNDING_TABLE_HTML": _funding_table(funding),
         "MARKET_INSIGHTS_HTML": _market_insights_box(market_insights),  # NEW
         "NEWS_BOX_HTML": _news_box(news),
-        "last_updated": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        "last_updated": datetime.fromtimestamp(min(stamps + [started]), timezone.utc).strftime("%Y-%m-%d"),
     }
-    return data
+    return data, degraded
@@ -0,0 +1,176 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Hintergrund-Prefetcher für RSS-Feeds und Förder-/Tool-Seiten
+- Ein Daemon-Thread (Start im Prozess mit dem Worker-Pool: Lifespan von ``main.py`` bei
+  ``ANALYSIS_WORKERS>0``, sonst ``scripts/analysis_worker.py``) aktualisiert alle konfigurierten Quellen
+  (``AI_ACT_NEWS_RSS + DEFAULT_NEWS_RSS``, ``FUNDING_HINT_PAGES`` + ``FUNDING_PAGES``, ``TOOLS_PAGES``)
+  im Intervall mit Jitter.
+- Ergebnisse liegen vorgefiltert im Research-Cache (Namespace ``prefetch``): News/Förderseiten nach
+  festen Schlagworten, Tool-Seiten roh (der Profil-Filter im Report ist billig).
+- ``run_research`` liest nur noch diese Listen; fehlt eine Quelle (Kaltstart, zu alt), wird live geholt.
+- Fehlgeschlagene Abrufe überschreiben keine guten Daten; Status je Quelle (Frische, Fehler,
+  Fehlerserie) für ``/admin/research/sources`` und ``scripts/rss_healthcheck.py --research``.
+
+ENV:
+  RESEARCH_PREFETCH               Prefetcher im Worker-Prozess starten (Default 1)
+  RESEARCH_PREFETCH_INTERVAL_SEC  Intervall zwischen zwei Läufen (Default 900)
+  RESEARCH_PREFETCH_JITTER        Zufälliger Anteil am Intervall, ± (Default 0.2)
+  RESEARCH_TTL_PREFETCH           Max. Alter vorgeholter Listen für Reports (Default 6 h)
+"""
+import logging
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import research_pipeline as rp
+from .research_cache import get_research_cache
+from .research_clients import harvest_links, parse_rss
+
+log = logging.getLogger(__name__)
+
+NAMESPACE = "prefetch"
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except Exception:
+        return default
+
+
+def prefetch_key(kind: str, url: str) -> str:
+    return f"{kind}:{url}"
+
+
+def sources() -> List[Tuple[str, str]]:
+    """Alle aktuell konfigurierten Quellen als ``(art, url)``."""
+    out = [("rss", u) for u in rp.AI_ACT_NEWS_RSS + rp.DEFAULT_NEWS_RSS]
+    out += [("funding", u) for u in rp.funding_pages()]
+    out += [("tools", u) for u in rp.TOOLS_PAGES]
+    return out
+
+
+def _fetch_source(kind: str, url: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """``(roh, gespeichert)`` – ``roh`` leer = Abruf fehlgeschlagen oder Quelle leer."""
+    if kind == "rss":
+        raw = parse_rss(url, limit=8)
+        return raw, rp.filter_news(raw)
+    if kind == "funding":
+        raw = harvest_links(url, allow_domains=None, limit=40)
+        return raw, rp.filter_funding(raw)
+    raw = harvest_links(url, allow_domains=None, limit=30)
+    return raw, raw
+
+
+class ResearchPrefetcher:
+    """Aktualisiert alle Quellen periodisch und hält den Status je Quelle."""
+
+    def __init__(self, interval_sec: Optional[float] = None, jitter: Optional[float] = None,
+                 fetch: Callable[[str, str], Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = _fetch_source) -> None:
+        self.interval_sec = interval_sec if interval_sec is not None else _env_float("RESEARCH_PREFETCH_INTERVAL_SEC", 900)
+        self.jitter = jitter if jitter is not None else _env_float("RESEARCH_PREFETCH_JITTER", 0.2)
+        self.fetch = fetch
+        self.status: Dict[str, Dict[str, Any]] = {}
+        self.cycles = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, Dict[str, Any]]:
+        """Ein kompletter Durchlauf über alle Quellen (sequentiell, läuft im Hintergrund)."""
+        cache = get_research_cache()
+        for kind, url in sources():
+            if self._stop.is_set():
+                break
+            t0 = time.time()
+            try:
+                raw, items = self.fetch(kind, url)
+                error = None if raw else "no items"
+            except Exception as exc:
+                raw, items, error = [], [], repr(exc)
+            elapsed_ms = int((time.time() - t0) * 1000)
+            if raw:
+                cache.set(NAMESPACE, prefetch_key(kind, url), items)
+            with self._lock:
+                st = self.status.setdefault(url, {"url": url, "kind": kind, "last_success": None,
+                                                  "consecutive_failures": 0})
+                st.update({"ok": error is None, "last_attempt": t0, "elapsed_ms": elapsed_ms, "error": error})
+                if error is None:
+                    st.update({"last_success": t0, "items": len(items), "consecutive_failures": 0})
+                else:
+                    st["consecutive_failures"] += 1
+                    log.warning("⚠️ Prefetch %s failed (%dx): %s", url, st["consecutive_failures"], error)
+        self.cycles += 1
+        return self.snapshot()
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            out = {u: dict(st) for u, st in self.status.items()}
+        for st in out.values():
+            st["age_sec"] = round(now - st["last_success"], 1) if st["last_success"] else None
+        return out
+
+    def _next_delay(self) -> float:
+        return max(1.0, self.interval_sec * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def _loop(self) -> None:
+        # Kurz versetzt starten, damit der Boot nicht mit dem ersten Durchlauf konkurriert
+        if self._stop.wait(random.uniform(1.0, 5.0)):
+            return
+        while not self._stop.is_set():
+            t0 = time.time()
+            try:
+                self.run_once()
+                log.info("🔄 Research prefetch: %d sources in %.1fs", len(self.status), time.time() - t0)
+            except Exception as exc:
+                log.error("❌ Research prefetch cycle failed: %s", exc)
+            self._stop.wait(self._next_delay())
+
+    def start(self) -> "ResearchPrefetcher":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="research-prefetch", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+
+_prefetcher: Optional[ResearchPrefetcher] = None
+
+
+def get_prefetcher() -> Optional[ResearchPrefetcher]:
+    return _prefetcher
+
+
+def start_prefetcher() -> Optional[ResearchPrefetcher]:
+    """Startet den prozessweiten Prefetcher (idempotent); aus bei ``RESEARCH_PREFETCH=0`` oder offline."""
+    global _prefetcher
+    if os.getenv("RESEARCH_PREFETCH", "1") not in ("1", "true", "TRUE", "yes", "YES"):
+        log.info("ℹ️  RESEARCH_PREFETCH=0 – research sources are fetched per report")
+        return None
+    if os.getenv("RESEARCH_PROVIDER", "hybrid").strip().lower() == "offline":
+        return None
+    if _prefetcher is None:
+        _prefetcher = ResearchPrefetcher()
+    return _prefetcher.start()
+
+
+def stop_prefetcher(timeout: float = 5.0) -> None:
+    if _prefetcher is not None:
+        _prefetcher.stop(timeout=timeout)
+
+
+__all__ = ["NAMESPACE", "ResearchPrefetcher", "get_prefetcher", "prefetch_key", "sources", "start_prefetcher",
+           "stop_prefetcher"]
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Indizierter Key-Value-Store für Research-Daten (SQLite, WAL)
+- Ersetzt den Whole-File-JSON-Cache (``/tmp/ksj_research_cache.json``): jeder Lookup ist ein
+  Primärschlüssel-Zugriff, jedes Schreiben ersetzt nur den betroffenen Datensatz.
+- Sicher unter dem Thread-Fan-out von ``run_research`` (Lock je Prozess) und über mehrere
+  Uvicorn-Worker hinweg (SQLite-WAL + Busy-Timeout).
+- Eviction nach Alter (``RESEARCH_STORE_MAX_AGE_SEC``) und Gesamtgröße (älteste Einträge zuerst),
+  amortisiert alle ``evict_every`` Schreibvorgänge.
+- Werte werden als JSON gespeichert; ``namespace`` gruppiert Einträge (z. B. ``http``, ``rss``).
+- Fehler im Store führen nie zu Research-Fehlern (Lookup liefert dann ``None``).
+
+ENV:
+  RESEARCH_STORE_PATH         SQLite-Datei (Default /tmp/ksj_research_cache.sqlite3)
+  RESEARCH_STORE_MAX_MB       Max. Gesamtgröße der Werte in MB (Default 64)
+  RESEARCH_STORE_MAX_AGE_SEC  Einträge älter als das werden gelöscht (Default 14 Tage, ≥ längste Namespace-TTL)
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from .sqlite_store import SqliteStore
+
+log = logging.getLogger(__name__)
+
+RESEARCH_STORE_PATH = os.getenv("RESEARCH_STORE_PATH", "/tmp/ksj_research_cache.sqlite3")
+RESEARCH_STORE_MAX_MB = float(os.getenv("RESEARCH_STORE_MAX_MB", "64"))
+RESEARCH_STORE_MAX_AGE_SEC = int(os.getenv("RESEARCH_STORE_MAX_AGE_SEC", str(14 * 24 * 3600)))
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS research_store (
+    key TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL DEFAULT '',
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    ts REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_research_store_ts ON research_store(ts);
+"""
+
+
+class ResearchStore(SqliteStore):
+    """Thread-sicherer SQLite-Store (eine Verbindung je Prozess, WAL, Lock; services/sqlite_store.py)."""
+
+    table = "research_store"
+    ddl = _DDL
+    label = "Research store"
+    age_column = "ts"
+    order_column = "ts"
+
+    def __init__(self, path: str = RESEARCH_STORE_PATH, *, max_bytes: int = int(RESEARCH_STORE_MAX_MB * 1024 * 1024),
+                 max_age_sec: int = RESEARCH_STORE_MAX_AGE_SEC, evict_every: int = 64) -> None:
+        super().__init__(path, max_age_sec=max_age_sec, max_bytes=max_bytes,
+                         counters=("hits", "misses", "expired", "stores", "evictions", "errors"))
+        self.evict_every = max(1, evict_every)
+        self._writes = 0
+
+    def get_entry(self, key: str) -> Optional[Tuple[Any, float]]:
+        """``(wert, zeitstempel)`` oder ``None`` – ohne Altersprüfung."""
+        try:
+            with self._lock:
+                row = self._db().execute("SELECT value, ts FROM research_store WHERE key=?", (key,)).fetchone()
+        except sqlite3.Error as exc:
+            self._error("read", exc)
+            return None
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0]), float(row[1])
+        except ValueError:
+            self.counters["errors"] += 1
+            return None
+
+    def get(self, key: str, max_age_sec: float) -> Optional[Any]:
+        entry = self.get_entry(key)
+        if entry is None:
+            self.counters["misses"] += 1
+            return None
+        if time.time() - entry[1] > max_age_sec:
+            self.counters["expired"] += 1
+            return None
+        self.counters["hits"] += 1
+        return entry[0]
+
+    def set(self, key: str, value: Any, namespace: str = "") -> None:
+        try:
+            raw = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        except (TypeError, ValueError) as exc:
+            log.warning("Research store: value for %s not serialisable: %s", key, exc)
+            return
+        now = time.time()
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(
+                    "INSERT OR REPLACE INTO research_store(key, namespace, value, size, ts) VALUES(?,?,?,?,?)",
+                    (key, namespace, raw, len(raw.encode("utf-8")), now),
+                )
+                self.counters["stores"] += 1
+                self._writes += 1
+                if self._writes % self.evict_every == 0:
+                    self._evict(db, now)
+                db.commit()
+        except sqlite3.Error as exc:
+            self._error("write", exc)
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        if namespace is None:
+            return super().clear()
+        return self._clear("DELETE FROM research_store WHERE namespace=?", (namespace,))
+
+    def stats(self) -> Dict[str, Any]:
+        out = self._base_stats(self.counters["hits"] + self.counters["misses"] + self.counters["expired"])
+        out["max_age_sec"] = self.max_age_sec
+        try:
+            with self._lock:
+                rows = self._db().execute(
+                    "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0), MIN(ts) FROM research_store GROUP BY namespace"
+                ).fetchall()
+            out["namespaces"] = {ns or "-": {"entries": n, "bytes": b, "oldest_ts": t} for ns, n, b, t in rows}
+            out["entries"] = sum(r[1] for r in rows)
+            out["bytes"] = sum(r[2] for r in rows)
+        except sqlite3.Error as exc:
+            out["error"] = str(exc)
+        return out
+
+
+_store: Optional[ResearchStore] = None
+_store_lock = threading.Lock()
+
+
+def get_research_store() -> ResearchStore:
+    """Prozessweite Instanz."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ResearchStore()
+    return _store
+
+
+__all__ = ["ResearchStore", "get_research_store"]
@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Per-Run-Tracing: Stage-Timings und LLM-Accounting je Report
+- ``RunTrace`` sammelt Spans (Start/Dauer relativ zum Run-Start) und pro LLM-Label
+  Calls, Wall-Zeit, Queue-Wartezeit (Governor), Retries, Prompt/Completion-Tokens, Cache-Treffer –
+  sowie eingesparte Calls (``llm_skipped``: Ergebnis wäre überschrieben worden oder Eingabe leer).
+- Der aktive Trace hängt an einer ContextVar; Event-Loop-Tasks, ``asyncio.to_thread`` und
+  ``run_sync`` erben ihn. Für ThreadPools: ``bind()`` beim Submit benutzen.
+- Ohne aktiven Trace sind alle Helfer No-ops (Skripte, Tests).
+- ``to_dict()`` landet in ``Analysis.meta["timings"]``; ``summarize()`` aggregiert viele Runs
+  (p50/p95 je Span und LLM-Label) für das Admin-Dashboard.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+_LLM_FIELDS = ("calls", "wall_ms", "queue_ms", "retries", "prompt_tokens", "completion_tokens", "cached", "errors")
+
+
+class RunTrace:
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.t0 = time.perf_counter()
+        self.spans: List[Dict[str, Any]] = []
+        self.llm: Dict[str, Dict[str, float]] = {}
+        self.fallbacks: Dict[str, int] = {}
+        self.llm_skips: Dict[str, int] = {}
+        self._stage: Optional[tuple[str, float]] = None
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.t0) * 1000.0
+
+    # ---------------------------------------------------------------- spans
+    def add_span(self, name: str, start_ms: float, end_ms: float, **attrs: Any) -> None:
+        span = {"name": name, "start_ms": round(start_ms, 1), "ms": round(max(0.0, end_ms - start_ms), 1)}
+        span.update({k: v for k, v in attrs.items() if v is not None})
+        with self._lock:
+            self.spans.append(span)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+        """Misst einen Block; ``attrs`` kann im Block ergänzt werden (z. B. ``bytes``)."""
+        start = self.elapsed_ms()
+        try:
+            yield attrs
+        except BaseException as exc:
+            attrs["error"] = type(exc).__name__
+            raise
+        finally:
+            self.add_span(name, start, self.elapsed_ms(), **attrs)
+
+    def stage(self, name: Optional[str]) -> None:
+        """Sequenzielle Stages: schließt die laufende Stage und startet ``name`` (None = nur schließen)."""
+        now = self.elapsed_ms()
+        if self._stage is not None:
+            self.add_span(self._stage[0], self._stage[1], now)
+        self._stage = (name, now) if name else None
+
+    def add_dag(self, dag: Any, offset_ms: float, prefix: str = "dag:") -> None:
+        """Übernimmt ``DagExecutor.timings`` (Sekunden relativ zu ``run()``) als Spans."""
+        for node, (start, end) in dag.timings.items():
+            self.add_span(prefix + node, offset_ms + start * 1000.0, offset_ms + end * 1000.0,
+                          error=dag.errors.get(node))
+
+    # ------------------------------------------------------------ accounting
+    def llm_call(self, label: Optional[str], *, wall_ms: float = 0.0, queue_ms: float = 0.0, retries: int = 0,
+                 prompt_tokens: int = 0, completion_tokens: int = 0, cached: bool = False, ok: bool = True) -> None:
+        key = label or "-"
+        with self._lock:
+            agg = self.llm.setdefault(key, {f: 0 for f in _LLM_FIELDS})
+            agg["calls"] += 1
+            agg["wall_ms"] += wall_ms
+            agg["queue_ms"] += queue_ms
+            agg["retries"] += retries
+            agg["prompt_tokens"] += prompt_tokens
+            agg["completion_tokens"] += completion_tokens
+            agg["cached"] += int(cached)
+            agg["errors"] += int(not ok)
+
+    def llm_skipped(self, label: Optional[str]) -> None:
+        key = label or "-"
+        with self._lock:
+            self.llm_skips[key] = self.llm_skips.get(key, 0) + 1
+
+    def fallback(self, section: str) -> None:
+        with self._lock:
+            self.fallbacks[section] = self.fallbacks.get(section, 0) + 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            llm = {k: {f: (round(v, 1) if isinstance(v, float) else v) for f, v in agg.items()}
+                   for k, agg in sorted(self.llm.items())}
+            totals = {f: 0 for f in _LLM_FIELDS}
+            for agg in self.llm.values():
+                for f in _LLM_FIELDS:
+                    totals[f] += agg[f]
+            return {
+                "run_id": self.run_id,
+                "total_ms": round(self.elapsed_ms(), 1),
+                "spans": sorted(self.spans, key=lambda s: s["start_ms"]),
+                "llm": {"by_label": llm, "totals": {f: round(v, 1) for f, v in totals.items()},
+                        "skipped": dict(sorted(self.llm_skips.items()))},
+                "fallbacks": dict(self.fallbacks),
+            }
+
+
+_current: contextvars.ContextVar[Optional[RunTrace]] = contextvars.ContextVar("run_trace", default=None)
+
+
+def current_trace() -> Optional[RunTrace]:
+    return _current.get()
+
+
+@contextmanager
+def use_trace(trace: RunTrace) -> Iterator[RunTrace]:
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Dict[str, Any]]:
+    """Span im aktiven Trace; ohne Trace ein No-op."""
+    trace = _current.get()
+    if trace is None:
+        yield attrs
+        return
+    with trace.span(name, **attrs) as a:
+        yield a
+
+
+def bind(name: str, fn: Callable[..., T]) -> Callable[..., T]:
+    """Wrappt ``fn`` für ThreadPools: misst als Span im *jetzt* aktiven Trace."""
+    trace = _current.get()
+    if trace is None:
+        return fn
+
+    def _run(*args: Any, **kwargs: Any) -> T:
+        with use_trace(trace), trace.span(name):
+            return fn(*args, **kwargs)
+    return _run
+
+
+def _pct(values: List[float], q: float) -> float:
+    vals = sorted(values)
+    idx = min(len(vals) - 1, max(0, int(round(q * (len(vals) - 1)))))
+    return round(vals[idx], 1)
+
+
+def summarize(timings: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregiert ``meta["timings"]`` mehrerer Runs: Spans und LLM-Labels nach p95 absteigend."""
+    spans: Dict[str, List[float]] = {}
+    llm: Dict[str, Dict[str, Any]] = {}
+    fallbacks: Dict[str, int] = {}
+    skipped: Dict[str, int] = {}
+    totals: List[float] = []
+    for t in timings:
+        if not isinstance(t, dict):
+            continue
+        if t.get("total_ms") is not None:
+            totals.append(float(t["total_ms"]))
+        for sp in t.get("spans") or []:
+            spans.setdefault(sp.get("name", "?"), []).append(float(sp.get("ms") or 0.0))
+        for label, agg in ((t.get("llm") or {}).get("by_label") or {}).items():
+            row = llm.setdefault(label, {"wall_ms": [], "calls": 0, "cached": 0, "retries": 0, "errors": 0,
+                                         "prompt_tokens": 0, "completion_tokens": 0})
+            row["wall_ms"].append(float(agg.get("wall_ms") or 0.0))
+            for f in ("calls", "cached", "retries", "errors", "prompt_tokens", "completion_tokens"):
+                row[f] += agg.get(f) or 0
+        for label, n in ((t.get("llm") or {}).get("skipped") or {}).items():
+            skipped[label] = skipped.get(label, 0) + int(n)
+        for sec, n in (t.get("fallbacks") or {}).items():
+            fallbacks[sec] = fallbacks.get(sec, 0) + int(n)
+
+    span_rows = [{"name": n, "count": len(v), "p50_ms": _pct(v, 0.5), "p95_ms": _pct(v, 0.95), "max_ms": round(max(v), 1)}
+                 for n, v in spans.items()]
+    llm_rows = []
+    for label, row in llm.items():
+        w = row.pop("wall_ms")
+        llm_rows.append({"label": label, "runs": len(w), "p50_ms": _pct(w, 0.5), "p95_ms": _pct(w, 0.95), **row})
+    return {
+        "runs": len(totals),
+        "total_ms": {"p50": _pct(totals, 0.5), "p95": _pct(totals, 0.95)} if totals else None,
+        "spans": sorted(span_rows, key=lambda r: r["p95_ms"], reverse=True),
+        "llm": sorted(llm_rows, key=lambda r: r["p95_ms"], reverse=True),
+        "fallbacks": dict(sorted(fallbacks.items(), key=lambda kv: kv[1], reverse=True)),
+        "llm_skipped": dict(sorted(skipped.items(), key=lambda kv: kv[1], reverse=True)),
+    }
+
+
+__all__ = ["RunTrace", "bind", "current_trace", "span", "summarize", "use_trace"]
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+"""Gemeinsame Basis für persistente SQLite-Caches und -Stores
+- ``SqliteStore``: eine Verbindung je Instanz (WAL, ``synchronous=NORMAL``, Busy-Timeout), Lock, Zähler,
+  Eviction nach Alter plus Eintragszahl/Gesamtgröße (älteste ``order_column`` zuerst), ``clear()``,
+  Summen für ``stats()``.
+- ``SqliteCache``: Key-Value-Cache mit TTL ab ``created_at``, LRU über ``last_access`` und Trefferzähler je
+  Eintrag (z. B. ``services/llm_cache.py``).
+- Unterklassen legen nur Tabelle/DDL und Spaltennamen fest.
+- SQLite-Fehler werden gezählt und geloggt, nie an den Aufrufer durchgereicht (Cache wird umgangen;
+  ``clear()`` liefert dann 0).
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+
+class SqliteStore:
+    """Thread-sicherer SQLite-Store (eine Verbindung, WAL, Lock) mit Alters- und Größen-Eviction."""
+
+    table = ""
+    ddl = ""
+    label = "SQLite store"  # für Log-Meldungen
+    age_column = "created_at"
+    order_column = "last_access"
+
+    def __init__(self, path: str, *, max_age_sec: float, max_bytes: int, max_entries: Optional[int] = None,
+                 counters: Iterable[str] = ("hits", "misses", "stores", "evictions", "errors")) -> None:
+        self.path = path
+        self.max_age_sec = max_age_sec
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.counters: Dict[str, int] = {name: 0 for name in counters}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            d = os.path.dirname(self.path)
+            if d:
+                os.makedirs(d, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.ddl)
+            self._conn = conn
+        return self._conn
+
+    def _error(self, action: str, exc: Exception) -> None:
+        self.counters["errors"] += 1
+        log.warning("%s %s failed: %s", self.label, action, exc)
+
+    def _totals(self, db: sqlite3.Connection) -> Tuple[int, int]:
+        n, total = db.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}").fetchone()
+        return n, total
+
+    def _evict(self, db: sqlite3.Connection, now: float) -> None:
+        t, age, order = self.table, self.age_column, self.order_column
+        evicted = db.execute(f"DELETE FROM {t} WHERE {age} < ?", (now - self.max_age_sec,)).rowcount or 0
+        n, total = self._totals(db)
+        max_entries = n if self.max_entries is None else self.max_entries
+        if n > max_entries or total > self.max_bytes:
+            # Älteste zuerst, bis beide Grenzen eingehalten sind
+            drop, freed = 0, 0
+            for size, in db.execute(f"SELECT size FROM {t} ORDER BY {order} ASC"):
+                if n - drop <= max_entries and total - freed <= self.max_bytes:
+                    break
+                drop += 1
+                freed += size
+            if drop:
+                db.execute(f"DELETE FROM {t} WHERE key IN (SELECT key FROM {t} ORDER BY {order} ASC LIMIT ?)", (drop,))
+                evicted += drop
+        self.counters["evictions"] += evicted
+
+    def evict(self) -> None:
+        try:
+            with self._lock:
+                db = self._db()
+                self._evict(db, time.time())
+                db.commit()
+        except sqlite3.Error as exc:
+            self._error("evict", exc)
+
+    def delete(self, key: str) -> None:
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(f"DELETE FROM {self.table} WHERE key=?", (key,))
+                db.commit()
+        except sqlite3.Error as exc:
+            self._error("delete", exc)
+
+    def clear(self) -> int:
+        return self._clear(f"DELETE FROM {self.table}")
+
+    def _clear(self, sql: str, params: Tuple[Any, ...] = ()) -> int:
+        try:
+            with self._lock:
+                db = self._db()
+                n = db.execute(sql, params).rowcount or 0
+                db.commit()
+                return n
+        except sqlite3.Error as exc:
+            self._error("clear", exc)
+            return 0
+
+    def _base_stats(self, lookups: int) -> Dict[str, Any]:
+        out: Dict[str, Any] = {"path": self.path, "max_bytes": self.max_bytes, **self.counters}
+        out["hit_ratio"] = round(self.counters["hits"] / lookups, 3) if lookups else None
+        return out
+
+
+class SqliteCache(SqliteStore):
+    """Key-Value-Cache: TTL ab ``created_at``, LRU über ``last_access``, ``hits`` je Eintrag."""
+
+    value_column = "value"
+    tag_column = ""  # optionale Zusatzspalte (z. B. Sektion, Template-Version)
+
+    @property
+    def ttl_sec(self) -> float:
+        return self.max_age_sec
+
+    @ttl_sec.setter
+    def ttl_sec(self, value: float) -> None:
+        self.max_age_sec = value
+
+    def _get(self, key: str) -> Optional[Any]:
+        """Gespeicherter Wert oder ``None`` (fehlt, abgelaufen oder Fehler); Treffer frischen ``last_access`` auf."""
+        now = time.time()
+        t = self.table
+        try:
+            with self._lock:
+                db = self._db()
+                row = db.execute(f"SELECT {self.value_column}, created_at FROM {t} WHERE key=?", (key,)).fetchone()
+                if row is None or now - row[1] > self.max_age_sec:
+                    if row is not None:
+                        db.execute(f"DELETE FROM {t} WHERE key=?", (key,))
+                        db.commit()
+                    self.counters["misses"] += 1
+                    return None
+                db.execute(f"UPDATE {t} SET last_access=?, hits=hits+1 WHERE key=?", (now, key))
+                db.commit()
+                self.counters["hits"] += 1
+                return row[0]
+        except sqlite3.Error as exc:
+            self._error("read", exc)
+            return None
+
+    def _put(self, key: str, value: Any, size: int, tag: Optional[str] = None) -> None:
+        now = time.time()
+        cols = f"key, {self.value_column}, size, {self.tag_column + ', ' if self.tag_column else ''}" \
+               "created_at, last_access, hits"
+        params: Tuple[Any, ...] = (key, value, size, *((tag,) if self.tag_column else ()), now, now)
+        try:
+            with self._lock:
+                db = self._db()
+                db.execute(f"INSERT OR REPLACE INTO {self.table}({cols}) VALUES({'?,' * len(params)}0)", params)
+                self.counters["stores"] += 1
+                self._evict(db, now)
+                db.commit()
+        except sqlite3.Error as exc:
+            self._error("write", exc)
+
+    def _base_stats(self, lookups: Optional[int] = None) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"] if lookups is None else lookups
+        out = super()._base_stats(lookups)
+        out.update(ttl_sec=self.max_age_sec, max_entries=self.max_entries)
+        try:
+            with self._lock:
+                n, total = self._totals(self._db())
+            out.update(entries=n, bytes=total)
+        except sqlite3.Error as exc:
+            out["error"] = str(exc)
+        return out
+
+
+__all__ = ["SqliteCache", "SqliteStore"]
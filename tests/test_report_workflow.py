@@ -164,9 +164,9 @@ class TestReportWorkflow:
 
     @patch("gpt_analyze.run_async")
     def test_03_analyze_trigger_mocked(self, mock_run_async, client, auth_headers):
-        """Test 3: Analyze-Trigger mit gemocktem LLM"""
+        """Test 3: Analyze-Trigger reiht nur einen Job ein (kein LLM im Request)"""
         # Create a real briefing in the test database first
-        from models import Briefing
+        from models import AnalysisJob, Briefing
         from routes._bootstrap import get_db
 
         # Get the test database session
@@ -185,14 +185,19 @@ class TestReportWorkflow:
             db.refresh(briefing)
             briefing_id = briefing.id
 
-            # Now test the analyze endpoint with mocked run_async
+            # Now test the analyze endpoint – it must only enqueue
             response = client.post(
                 "/api/analyze/run",
                 json={"briefing_id": briefing_id, "email_override": "test@example.com"}
             )
 
             assert response.status_code == 202
-            assert mock_run_async.called
+            assert not mock_run_async.called
+            job = db.get(AnalysisJob, response.json()["job_id"])
+            assert job is not None
+            assert job.briefing_id == briefing_id
+            assert job.status == "queued"
+            assert job.email == "test@example.com"
         finally:
             db.close()
 
@@ -253,13 +258,14 @@ class TestReportWorkflow:
 class TestReportGeneration:
     """Test-Suite für Report-Generierung mit gemocktem OpenAI"""
 
+    @patch("gpt_analyze._acall_openai", new_callable=AsyncMock)
     @patch("gpt_analyze._call_openai")
-    def test_report_generation_mocked(self, mock_openai):
+    def test_report_generation_mocked(self, mock_openai, mock_openai_async):
         """Test: Report-Generierung mit gemockten LLM-Antworten"""
         from gpt_analyze import analyze_briefing
         from unittest.mock import MagicMock
 
-        # Mock OpenAI responses
+        # Mock OpenAI responses (sync shim + async fan-out)
         mock_openai.return_value = """
         {
             "executive_summary": "Test-Zusammenfassung",
@@ -267,6 +273,7 @@ class TestReportGeneration:
             "roadmap_90": ["Schritt 1", "Schritt 2"]
         }
         """
+        mock_openai_async.return_value = mock_openai.return_value
 
         # Mock DB Session
         mock_db = MagicMock()
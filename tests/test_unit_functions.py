@@ -12,6 +12,7 @@ from unittest.mock import patch
 os.environ["DATABASE_URL"] = "sqlite:///:memory:"
 os.environ["JWT_SECRET"] = "test-secret-key-for-testing-only"
 os.environ["OPENAI_API_KEY"] = "test-api-key"
+os.environ["PDF_CACHE_ENABLED"] = "0"  # kein persistenter PDF-Cache zwischen Testläufen
 
 
 class TestMainHelpers:
@@ -304,5 +305,1290 @@ class TestJinjaRendering:
         assert result == plain_text
 
 
+class TestLLMClient:
+    """Tests fuer den gepoolten LLM-Client (services/llm_client.py)"""
+
+    URL = "https://llm.test/v1/chat/completions"
+
+    def _kw(self):
+        return dict(temperature=0.1, max_tokens=10, model="gpt-test", api_key="k", api_base="https://llm.test")
+
+    def test_call_llm_sync_returns_content(self):
+        """Test Sync-Shim liefert den Message-Content"""
+        import respx
+        import httpx
+        from services.llm_client import call_llm_sync
+
+        with respx.mock(assert_all_called=True) as mock:
+            route = mock.post(self.URL).mock(return_value=httpx.Response(
+                200, json={"choices": [{"message": {"content": "<p>ok</p>"}}]}
+            ))
+            assert call_llm_sync("hi", "sys", **self._kw()) == "<p>ok</p>"
+            assert route.calls.last.request.headers["authorization"] == "Bearer k"
+
+    def test_call_llm_gather_and_errors(self):
+        """Test async Fan-out via gather; HTTP-Fehler -> None"""
+        import asyncio
+        import respx
+        import httpx
+        from services.llm_client import call_llm
+
+        with respx.mock() as mock:
+            mock.post(self.URL).mock(side_effect=[
+                httpx.Response(200, json={"choices": [{"message": {"content": "a"}}]}),
+                httpx.Response(500, json={"error": "boom"}),
+            ])
+
+            async def _run():
+                return await asyncio.gather(
+                    call_llm("1", "sys", **self._kw()), call_llm("2", "sys", **self._kw())
+                )
+
+            assert set(asyncio.run(_run())) == {"a", None}
+
+    def test_rate_limit_honours_retry_after(self):
+        """Test HTTP 429 mit Retry-After -> Governor pausiert, Call wird wiederholt"""
+        import respx
+        import httpx
+        from services.llm_client import call_llm_sync, governor_stats
+
+        before = governor_stats()["rate_limited"]
+        with respx.mock() as mock:
+            route = mock.post(self.URL).mock(side_effect=[
+                httpx.Response(429, headers={"retry-after-ms": "50"}, json={"error": "rate"}),
+                httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}],
+                                          "usage": {"total_tokens": 12}}),
+            ])
+            assert call_llm_sync("hi", "sys", **self._kw()) == "ok"
+            assert route.call_count == 2
+        assert governor_stats()["rate_limited"] == before + 1
+
+
+class TestLLMGovernor:
+    """Tests fuer den LLM-Rate-Governor (services/llm_governor.py)"""
+
+    def test_estimate_and_retry_after(self):
+        """Test Token-Schaetzung und Retry-After-Parsing"""
+        from services.llm_governor import estimate_tokens, parse_retry_after
+
+        assert estimate_tokens("a" * 400) == 104
+        assert parse_retry_after({"retry-after": "3"}) == 3.0
+        assert parse_retry_after({"retry-after-ms": "250"}) == 0.25
+        assert parse_retry_after({"retry-after": "Wed, 21 Oct"}) is None
+
+    def test_fair_round_robin_across_runs(self):
+        """Test ein grosser Run blockiert einen kleinen Run nicht (Round-Robin)"""
+        import asyncio
+        from services.llm_governor import LLMGovernor
+
+        gov = LLMGovernor(rpm=6000, tpm=0, burst_sec=0.01, shared=False)  # 1 Slot, 100/s
+        order = []
+
+        async def _call(run):
+            await gov.acquire(run, 10)
+            order.append(run)
+
+        async def _run():
+            big = [asyncio.create_task(_call("big")) for _ in range(5)]
+            await asyncio.sleep(0)
+            small = asyncio.create_task(_call("small"))
+            await asyncio.gather(*big, small)
+
+        asyncio.run(_run())
+        assert len(order) == 6
+        assert order.index("small") <= 2
+        assert gov.snapshot()["granted"] == 6
+
+    def test_tpm_bucket_throttles(self):
+        """Test TPM-Bucket verzoegert Calls, sobald das Kontingent verbraucht ist"""
+        import asyncio
+        import time
+        from services.llm_governor import LLMGovernor
+
+        gov = LLMGovernor(rpm=0, tpm=60000, burst_sec=0.1, shared=False)  # 1000 tok/s, Bucket 100
+
+        async def _run():
+            t0 = time.perf_counter()
+            for _ in range(3):
+                await gov.acquire("r", 100)
+            return time.perf_counter() - t0
+
+        assert asyncio.run(_run()) >= 0.15
+
+
+class TestDagExecutor:
+    """Tests fuer den DAG-Executor (services/dag.py)"""
+
+    def test_node_starts_when_inputs_ready(self):
+        """Test Knoten startet sofort nach seiner Quelle, nicht nach der langsamsten Sektion"""
+        import asyncio
+        from services.dag import DagExecutor
+
+        async def _sleep(v, sec):
+            await asyncio.sleep(sec)
+            return v
+
+        dag = DagExecutor()
+        dag.add("fast", lambda: _sleep("f", 0.01))
+        dag.add("slow", lambda: _sleep("s", 0.2))
+        dag.add("lead_fast", lambda src: src + "!", deps=["fast"])
+        dag.add("blocking", lambda: "b", blocking=True)
+        res = asyncio.run(dag.run())
+
+        assert res == {"fast": "f", "slow": "s", "lead_fast": "f!", "blocking": "b"}
+        assert dag.timings["lead_fast"][1] < dag.timings["slow"][1]
+        assert dag.critical_path()[0] == ["slow"]
+
+    def test_failure_uses_default(self):
+        """Test Fehler eines Knotens -> Default, Abhaengige laufen weiter"""
+        import asyncio
+        from services.dag import DagExecutor
+
+        def _boom():
+            raise RuntimeError("boom")
+
+        dag = DagExecutor()
+        dag.add("a", _boom, default="fallback")
+        dag.add("b", lambda a: a.upper(), deps=["a"])
+        res = asyncio.run(dag.run())
+        assert res["b"] == "FALLBACK"
+        assert "a" in dag.errors
+
+    def test_cycle_and_unknown_dep_rejected(self):
+        """Test Zyklen und unbekannte Abhaengigkeiten werden erkannt"""
+        import asyncio
+        from services.dag import DagExecutor
+
+        dag = DagExecutor()
+        dag.add("a", lambda b: b, deps=["b"])
+        dag.add("b", lambda a: a, deps=["a"])
+        with pytest.raises(ValueError):
+            asyncio.run(dag.run())
+
+        dag = DagExecutor()
+        dag.add("a", lambda x: x, deps=["missing"])
+        with pytest.raises(ValueError):
+            asyncio.run(dag.run())
+
+
+@pytest.fixture
+def job_db():
+    """Eigene In-Memory-DB fuer Queue-Tests"""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from core.db import Base
+    import models  # noqa: F401
+
+    engine = create_engine(
+        "sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False, future=True)
+    db = Session()
+    try:
+        yield db
+    finally:
+        db.close()
+        engine.dispose()
+
+
+class TestAnalysisJobQueue:
+    """Tests fuer services/job_queue.py (Lease, Retry, Crash-Recovery)"""
+
+    def _briefing(self, db):
+        from models import Briefing
+        br = Briefing(lang="de", answers={"branche": "IT"})
+        db.add(br)
+        db.commit()
+        return br.id
+
+    def test_enqueue_and_claim(self, job_db):
+        """Test Job wird eingereiht, genau einmal geclaimt und abgeschlossen"""
+        from services import job_queue
+
+        job = job_queue.enqueue_analysis(job_db, self._briefing(job_db), "a@example.com")
+        assert job.status == "queued"
+
+        claimed = job_queue.claim_next(job_db, "w1")
+        assert claimed is not None and claimed.id == job.id
+        assert claimed.status == "running" and claimed.attempts == 1
+        assert job_queue.claim_next(job_db, "w2") is None
+
+        assert job_queue.heartbeat(job_db, job.id, "w1") is True
+        assert job_queue.heartbeat(job_db, job.id, "w2") is False
+        job_queue.complete(job_db, job.id, "w1")
+        assert job_queue.queue_stats(job_db)["done"] == 1
+
+    def test_fail_retries_with_backoff_then_fails(self, job_db):
+        """Test Fehlversuche -> Backoff, nach max_attempts -> failed"""
+        from datetime import datetime
+        from services import job_queue
+
+        job = job_queue.enqueue_analysis(job_db, self._briefing(job_db), max_attempts=2)
+        job_queue.claim_next(job_db, "w1")
+        assert job_queue.fail(job_db, job.id, "w1", "boom") == "queued"
+        job_db.refresh(job)
+        assert job.run_after.replace(tzinfo=None) > datetime.utcnow()
+        # Backoff noch nicht abgelaufen -> nicht claimbar
+        assert job_queue.claim_next(job_db, "w1") is None
+
+        job.run_after = datetime.utcnow()
+        job_db.commit()
+        job_queue.claim_next(job_db, "w1")
+        assert job_queue.fail(job_db, job.id, "w1", "boom again") == "failed"
+
+    def test_expired_lease_is_reclaimed(self, job_db):
+        """Test Crash-Recovery: abgelaufene Lease wird von anderem Worker uebernommen"""
+        from datetime import datetime, timedelta
+        from services import job_queue
+
+        job = job_queue.enqueue_analysis(job_db, self._briefing(job_db))
+        job_queue.claim_next(job_db, "crashed")
+        job_db.refresh(job)
+        job.lease_until = datetime.utcnow() - timedelta(seconds=1)
+        job_db.commit()
+
+        claimed = job_queue.claim_next(job_db, "w2")
+        assert claimed is not None and claimed.lease_owner == "w2"
+        assert claimed.attempts == 2
+
+    def test_worker_run_once(self, job_db):
+        """Test Worker fuehrt den Runner aus und markiert den Job als done"""
+        import threading
+        from services import job_queue
+
+        calls = []
+        job = job_queue.enqueue_analysis(job_db, self._briefing(job_db), "a@example.com")
+        session_factory = lambda: type(job_db)(bind=job_db.get_bind())  # noqa: E731
+        with patch("core.db.SessionLocal", session_factory):
+            worker = job_queue.AnalysisWorker(
+                threading.Event(), runner=lambda bid, email: calls.append((bid, email)), name="w1"
+            )
+            assert worker.run_once() is True
+            assert worker.run_once() is False
+        job_db.refresh(job)
+        assert calls == [(job.briefing_id, "a@example.com")]
+        assert job.status == "done"
+
+
+class TestLLMCache:
+    """Tests fuer den LLM-Antwort-Cache (services/llm_cache.py)"""
+
+    def test_sqlite_errors_never_reach_the_caller(self, tmp_path):
+        """Test SQLite-Fehler in get/put/clear/evict werden gezaehlt statt geworfen"""
+        from services.llm_cache import LLMCache
+
+        cache = LLMCache(str(tmp_path / "c.sqlite3"))
+        cache.put("k", "v")
+        cache._conn.close()
+        cache.put("k2", "v2")
+        cache.evict()
+        assert cache.get("k") is None and cache.clear() == 0
+        assert cache.stats()["errors"] == 4
+
+    def test_hit_miss_ttl_and_lru_eviction(self, tmp_path):
+        """Test Treffer/Fehlschlag, TTL-Ablauf und LRU-Eviction nach Eintragszahl"""
+        import time
+        from services.llm_cache import LLMCache, cache_key
+
+        cache = LLMCache(str(tmp_path / "c.sqlite3"), ttl_sec=3600, max_entries=2, max_bytes=10**6)
+        k1, k2, k3 = (cache_key("m", "sys", p, 0.2, 100) for p in ("a", "b", "c"))
+        assert k1 != cache_key("m", "sys", "a", 0.3, 100)
+        assert cache.get(k1) is None
+        cache.put(k1, "<p>a</p>")
+        cache.put(k2, "<p>b</p>")
+        time.sleep(0.01)
+        assert cache.get(k1) == "<p>a</p>"  # k1 jetzt zuletzt benutzt
+        cache.put(k3, "<p>c</p>")            # verdrängt k2
+        assert cache.get(k2) is None
+        assert cache.get(k3) == "<p>c</p>"
+        stats = cache.stats()
+        assert stats["entries"] == 2 and stats["hits"] == 2 and stats["evictions"] == 1
+
+        cache.ttl_sec = 0
+        time.sleep(0.01)
+        assert cache.get(k1) is None
+
+    def test_call_openai_uses_cache_and_section_opt_out(self, tmp_path):
+        """Test identischer Call kostet keinen API-Call; Gamechanger umgeht den Cache"""
+        import gpt_analyze
+        from services.llm_cache import LLMCache
+
+        cache = LLMCache(str(tmp_path / "c.sqlite3"), skip_sections={"gamechanger"})
+        with patch("gpt_analyze.get_llm_cache", return_value=cache), \
+             patch("gpt_analyze.call_llm_sync", return_value="<p>x</p>") as llm:
+            assert gpt_analyze._call_openai("p", "s", 0.2, 50, section="risks") == "<p>x</p>"
+            assert gpt_analyze._call_openai("p", "s", 0.2, 50, section="risks") == "<p>x</p>"
+            assert llm.call_count == 1
+            gpt_analyze._call_openai("p", "s", 0.4, 50, section="gamechanger")
+            gpt_analyze._call_openai("p", "s", 0.4, 50, section="gamechanger")
+            assert llm.call_count == 3
+        assert cache.stats()["bypass"] == 2
+
+    def test_async_call_does_cache_io_off_the_event_loop(self, tmp_path):
+        """Test _acall_openai liest/schreibt den SQLite-Cache im Worker-Thread, nicht im Loop-Thread"""
+        import asyncio
+        import threading
+        import gpt_analyze
+        from services.llm_cache import LLMCache
+
+        cache = LLMCache(str(tmp_path / "c.sqlite3"))
+        threads = []
+        orig_get, orig_put = cache.get, cache.put
+        cache.get = lambda *a: (threads.append(threading.current_thread()), orig_get(*a))[1]
+        cache.put = lambda *a: (threads.append(threading.current_thread()), orig_put(*a))[1]
+
+        async def fake_llm(*a, **kw):
+            return "<p>x</p>"
+
+        async def run():
+            loop_thread = threading.current_thread()
+            out = [await gpt_analyze._acall_openai("p", "s", 0.2, 50, section="risks") for _ in range(2)]
+            return loop_thread, out
+
+        with patch("gpt_analyze.get_llm_cache", return_value=cache), patch("gpt_analyze.call_llm", fake_llm):
+            loop_thread, out = asyncio.run(run())
+        assert out == ["<p>x</p>", "<p>x</p>"]
+        assert len(threads) == 3 and loop_thread not in threads
+
+
+class TestOneLinerBatch:
+    """Tests fuer den gebuendelten One-liner-Call (gpt_analyze)"""
+
+    def test_parse_validates_keys(self):
+        """Test nur erwartete, nicht-leere Keys werden uebernommen"""
+        import json
+        from gpt_analyze import _parse_one_liner_map
+
+        payload = {"LEAD_A": " Kern; Folge → Schritt\nzweite Zeile", "LEAD_B": "", "LEAD_X": "fremd"}
+        text = "```json\n" + json.dumps(payload, ensure_ascii=False) + "\n```"
+        assert _parse_one_liner_map(text, ["LEAD_A", "LEAD_B"]) == {"LEAD_A": "Kern; Folge → Schritt"}
+        assert _parse_one_liner_map("kein json", ["LEAD_A"]) == {}
+
+    def test_batch_falls_back_per_missing_key(self):
+        """Test ein Batch-Call, Einzel-Call nur fuer fehlende Keys"""
+        import asyncio
+        from unittest.mock import AsyncMock
+        import gpt_analyze
+
+        items = [("LEAD_A", "A", "<p>a</p>"), ("LEAD_B", "B", "<p>b</p>"), ("LEAD_C", "C", "")]
+        llm = AsyncMock(side_effect=['{"LEAD_A": "eins", "LEAD_C": "drei"}', "zwei"])
+        with patch("gpt_analyze._acall_openai", llm):
+            leads = asyncio.run(gpt_analyze._aone_liners_batch(items, {}, {}))
+        assert leads == {"LEAD_A": "eins", "LEAD_B": "zwei", "LEAD_C": "drei"}
+        assert llm.await_count == 2
+
+    def test_fallback_calls_respect_parallel_limit(self):
+        """Test Einzel-Fallbacks belegen je einen Semaphor-Slot statt gemeinsam einen"""
+        import asyncio
+        import gpt_analyze
+
+        items = [(f"LEAD_{i}", str(i), f"<p>{i}</p>") for i in range(6)]
+        state = {"active": 0, "peak": 0}
+
+        async def fake_llm(*a, **kw):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+            return "{}" if kw.get("section") == "one_liner_batch" else "x"
+
+        async def run():
+            sem = asyncio.Semaphore(2)
+            slots = []
+
+            async def bound(coro):
+                async with sem:
+                    slots.append(1)
+                    return await coro
+            return await gpt_analyze._aone_liners_batch(items, {}, {}, bound=bound), slots
+
+        with patch("gpt_analyze._acall_openai", fake_llm):
+            leads, slots = asyncio.run(run())
+        assert len(leads) == 6 and len(slots) == 7 and state["peak"] == 2
+
+
+class TestHtmlRepair:
+    """Tests fuer die lokale HTML-Reparatur (services/html_repair.py)"""
+
+    def test_markdown_to_whitelist_html(self):
+        """Test Listen, Betonung, Tabellen, Absaetze und Escaping"""
+        from services.html_repair import repair_html_local
+
+        text = ("## Quick Wins\n1. **Chatbot** – spart *Zeit*\n2. Protokolle & <b>Checks</b>\n"
+                "- Punkt <script>alert(1)</script>\n\n| Kennzahl | Wert |\n|---|---|\n| ROI | 120 % |\n\nText.")
+        out = repair_html_local(text)
+        assert out.startswith("<h4>Quick Wins</h4>")
+        assert "<ol>\n<li><strong>Chatbot</strong> – spart <em>Zeit</em></li>" in out
+        assert "Protokolle &amp; <strong>Checks</strong>" in out
+        assert "<li>Punkt</li>" in out and "alert" not in out
+        assert "<thead><tr><th>Kennzahl</th><th>Wert</th></tr></thead><tbody><tr><td>ROI</td>" in out
+        assert out.endswith("<p>Text.</p>")
+
+    def test_repair_does_not_call_llm(self):
+        """Test _repair_html kommt ohne LLM-Call aus"""
+        import gpt_analyze
+
+        with patch("gpt_analyze._acall_openai") as llm:
+            out = gpt_analyze._repair_html("quick_wins", "- Eins\n- Zwei")
+        assert out == "<ul>\n<li>Eins</li>\n<li>Zwei</li>\n</ul>"
+        assert not llm.called
+
+    def test_block_lines_escape_text_and_apply_markdown(self):
+        """Test Text in durchgereichten Block-Zeilen wird escaped, Markdown darin umgesetzt"""
+        from services.html_repair import repair_html_local
+
+        out = repair_html_local("<p>Preis < 5 & mehr</p>\n<ul><li>**x** &amp; <b>y</b></li></ul>")
+        assert out == "<p>Preis &lt; 5 &amp; mehr</p>\n<ul><li><strong>x</strong> &amp; <strong>y</strong></li></ul>"
+
+    def test_simple_markdown_keeps_paragraph_per_line(self):
+        """Test _md_to_simple_html: ein <p> je Zeile wie bisher, ### bleibt <h3>"""
+        import gpt_analyze
+
+        out = gpt_analyze._md_to_simple_html("### Begriffe\nErste Zeile\nZweite Zeile\n- Punkt")
+        assert out == "<h3>Begriffe</h3>\n<p>Erste Zeile</p>\n<p>Zweite Zeile</p>\n<ul>\n<li>Punkt</li>\n</ul>"
+
+
+class TestRunTrace:
+    """Tests fuer Per-Run-Timings (services/run_trace.py)"""
+
+    def test_stages_spans_and_summary(self):
+        """Test Stages, verschachtelte Spans, DAG-Uebernahme und Aggregation"""
+        import asyncio
+        from services.dag import DagExecutor
+        from services.run_trace import RunTrace, span, summarize, use_trace
+
+        trace = RunTrace("run-x")
+        with use_trace(trace):
+            trace.stage("normalize")
+            trace.stage("dag")
+            dag = DagExecutor()
+            dag.add("a", lambda: 1)
+            asyncio.run(dag.run())
+            trace.add_dag(dag, trace.elapsed_ms())
+            with span("pdf_service") as sp:
+                sp["bytes"] = 10
+            trace.stage(None)
+            trace.llm_call("risks", wall_ms=120.0, queue_ms=5.0, prompt_tokens=100, completion_tokens=50)
+            trace.llm_call("risks", cached=True)
+            trace.fallback("quick_wins")
+        data = trace.to_dict()
+        names = [s["name"] for s in data["spans"]]
+        assert {"normalize", "dag", "dag:a", "pdf_service"} <= set(names)
+        assert next(s for s in data["spans"] if s["name"] == "pdf_service")["bytes"] == 10
+        assert data["llm"]["by_label"]["risks"]["calls"] == 2
+        assert data["llm"]["totals"]["prompt_tokens"] == 100
+        assert data["fallbacks"] == {"quick_wins": 1}
+
+        summary = summarize([data, data])
+        assert summary["runs"] == 2
+        assert summary["llm"][0]["label"] == "risks" and summary["llm"][0]["calls"] == 4
+        assert summary["fallbacks"] == {"quick_wins": 2}
+
+    def test_llm_call_accounting(self):
+        """Test LLM-Client verbucht Tokens, Retries und Label im aktiven Trace"""
+        import respx
+        import httpx
+        from services.llm_client import call_llm_sync
+        from services.run_trace import RunTrace, use_trace
+
+        trace = RunTrace("run-y")
+        with respx.mock() as mock, use_trace(trace):
+            mock.post("https://llm.test/v1/chat/completions").mock(side_effect=[
+                httpx.Response(429, headers={"retry-after-ms": "10"}, json={}),
+                httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}],
+                                          "usage": {"prompt_tokens": 7, "completion_tokens": 3, "total_tokens": 10}}),
+            ])
+            call_llm_sync("hi", "sys", temperature=0.1, max_tokens=10, model="m", api_key="k",
+                          api_base="https://llm.test", label="risks")
+        agg = trace.to_dict()["llm"]["by_label"]["risks"]
+        assert agg["calls"] == 1 and agg["retries"] == 1
+        assert agg["prompt_tokens"] == 7 and agg["completion_tokens"] == 3 and agg["errors"] == 0
+
+
+
+class TestLLMCallPruning:
+    """Tests fuer eingesparte LLM-Calls (Sektions-Registry in gpt_analyze)"""
+
+    def _run(self, dag):
+        import asyncio
+        from services.run_trace import RunTrace, use_trace
+
+        trace = RunTrace("run-p")
+        with use_trace(trace):
+            results = asyncio.run(dag.run())
+        return results, trace
+
+    def test_overwritten_and_empty_inputs_skipped(self):
+        """Test AI-Act-Summary aus statischem Block, One-liner ohne Eingabe entfallen"""
+        from unittest.mock import AsyncMock
+        import gpt_analyze
+        from services.dag import DagExecutor
+
+        dag = DagExecutor()
+        dag.add("ai_act", lambda: {"AI_ACT_SUMMARY_HTML": "<p>statisch</p>"})
+        dag.add("research", lambda: {"TOOLS_TABLE_HTML": "<table><tr><td>Tool</td></tr></table>", "FUNDING_TABLE_HTML": ""})
+        section = AsyncMock(return_value="<p>Sektion</p>")
+        batch = AsyncMock(return_value={})
+        with patch("gpt_analyze._agenerate_content_section", section), \
+                patch("gpt_analyze._aone_liners_batch", batch), \
+                patch("gpt_analyze._anext_actions", AsyncMock(return_value="<ol><li>Schritt</li></ol>")), \
+                patch("gpt_analyze.ONE_LINER_BATCH", True):
+            gpt_analyze._add_content_nodes(dag, {}, {"overall": 40})
+            results, trace = self._run(dag)
+        assert results["sec:AI_ACT_SUMMARY_HTML"] == "<p>statisch</p>"
+        assert "ai_act_summary" not in [c.args[0] for c in section.call_args_list]
+        keys = [k for k, _, _ in batch.call_args.args[0]]
+        assert "LEAD_TOOLS" in keys and "LEAD_KPI" in keys and "LEAD_FUNDING" not in keys
+        assert trace.to_dict()["llm"]["skipped"] == {"ai_act_summary": 1}
+
+    def test_single_mode_counts_saved_calls(self):
+        """Test ohne Research-Knoten keine Einzel-Calls fuer Tools/Foerderung"""
+        from unittest.mock import AsyncMock
+        import gpt_analyze
+        from services.dag import DagExecutor
+
+        dag = DagExecutor()
+        section = AsyncMock(return_value="<p>Sektion</p>")
+        one = AsyncMock(return_value="Kern; Folge → Schritt")
+        with patch("gpt_analyze._agenerate_content_section", section), \
+                patch("gpt_analyze._aone_liner", one), \
+                patch("gpt_analyze._anext_actions", AsyncMock(return_value="<ol><li>Schritt</li></ol>")), \
+                patch("gpt_analyze.ONE_LINER_BATCH", False):
+            gpt_analyze._add_content_nodes(dag, {}, {"overall": 40})
+            results, trace = self._run(dag)
+        titles = [c.args[0] for c in one.call_args_list]
+        assert results["lead:LEAD_TOOLS"] == "" and results["lead:LEAD_FUNDING"] == ""
+        assert len(titles) == len(gpt_analyze._ONE_LINERS) - 2
+        assert "ai_act_summary" in [c.args[0] for c in section.call_args_list]
+        assert trace.to_dict()["llm"]["skipped"] == {"one_liner": 2}
+
+    def test_reifegrad_uses_own_prompt(self):
+        """Test reifegrad_sowhat nutzt nicht den Executive-Summary-Prompt"""
+        from unittest.mock import AsyncMock, MagicMock
+        import asyncio
+        import gpt_analyze
+
+        enhancer = MagicMock()
+        llm = AsyncMock(return_value="<ul><li>" + "Reifegrad konkret " * 5 + "</li></ul>")
+        with patch("gpt_analyze._prompt_enhancer", enhancer), patch("gpt_analyze.USE_PROMPT_SYSTEM", True), \
+                patch("gpt_analyze._acall_openai", llm):
+            asyncio.run(gpt_analyze._agenerate_content_section("reifegrad_sowhat", {}, {"overall": 40}))
+        assert not enhancer.enhance_prompt.called
+        assert "Was heißt der Reifegrad konkret" in llm.call_args.kwargs["prompt"]
+
+
+class TestResearchStore:
+    """Tests fuer den indizierten Research-Store (services/research_store.py)"""
+
+    def test_get_set_expiry_and_size_eviction(self, tmp_path):
+        """Test Lookup mit Max-Alter, Eviction der aeltesten Eintraege nach Groesse"""
+        import time
+        from services.research_store import ResearchStore
+
+        store = ResearchStore(str(tmp_path / "rs.sqlite3"), max_bytes=250, evict_every=1)
+        store.set("RSS_a", [{"title": "x" * 100}], namespace="rss")
+        assert store.get("RSS_a", 60) == [{"title": "x" * 100}]
+        assert store.get("RSS_a", -1) is None and store.get("RSS_missing", 60) is None
+        time.sleep(0.01)
+        store.set("GET_b", "y" * 100, namespace="get")
+        store.set("GET_c", "z" * 100, namespace="get")
+        assert store.get("RSS_a", 60) is None
+        assert store.get("GET_c", 60) == "z" * 100
+        stats = store.stats()
+        assert stats["evictions"] >= 1 and stats["namespaces"]["get"]["entries"] == 2
+
+    def test_parallel_writers_keep_all_entries(self, tmp_path):
+        """Test kein Eintrag geht unter parallelen Research-Threads verloren"""
+        from concurrent.futures import ThreadPoolExecutor
+        from services.research_store import ResearchStore
+
+        store = ResearchStore(str(tmp_path / "rs.sqlite3"))
+        with ThreadPoolExecutor(max_workers=5) as ex:
+            list(ex.map(lambda i: store.set(f"GET_{i}", f"body {i}"), range(100)))
+        assert all(store.get(f"GET_{i}", 60) == f"body {i}" for i in range(100))
+
+    def test_http_get_uses_store(self, tmp_path):
+        """Test http_get liest den zweiten Aufruf aus dem Store"""
+        from unittest.mock import MagicMock
+        from services import research_clients
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        resp = MagicMock(ok=True, text="<html>ok</html>")
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")))
+        with patch("services.research_clients.get_research_cache", return_value=cache), \
+                patch("services.research_clients.requests.get", return_value=resp) as get:
+            assert research_clients.http_get("https://example.org/a") == "<html>ok</html>"
+            assert research_clients.http_get("https://example.org/a") == "<html>ok</html>"
+        assert get.call_count == 1
+
+
+class TestResearchCache:
+    """Tests fuer den einheitlichen Research-Cache (services/research_cache.py)"""
+
+    def test_memory_tier_and_namespace_ttl(self, tmp_path):
+        """Test LRU-Treffer ohne Store-Zugriff, Store-Treffer nach LRU-Verdraengung, TTL je Namespace"""
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")), lru_entries=1,
+                              ttls={"rss": 60, "http": -1})
+        cache.set("rss", "https://a.example/feed", [{"title": "A"}])
+        with patch.object(cache.store, "get_entry") as store_read:
+            assert cache.get("rss", "https://a.example/feed") == [{"title": "A"}]
+        assert not store_read.called
+        cache.set("http", "https://b.example/", "<html>b</html>")
+        assert cache.get("http", "https://b.example/") is None  # TTL -1: immer abgelaufen
+        assert cache.get("rss", "https://a.example/feed") == [{"title": "A"}]  # aus dem Store
+        ns = cache.stats()["namespaces"]
+        assert ns["rss"]["memory_hits"] == 1 and ns["rss"]["store_hits"] == 1 and ns["http"]["misses"] == 1
+
+    def test_get_or_fetch_skips_empty_results(self, tmp_path):
+        """Test leere Provider-Antworten werden nicht gecacht, Treffer liefern Kopien"""
+        from services.research_cache import ResearchCache, make_key
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")))
+        calls = []
+        assert cache.get_or_fetch("tavily", "q", lambda: calls.append(1) or []) == []
+        assert cache.get_or_fetch("tavily", "q", lambda: calls.append(1) or [{"url": "u"}]) == [{"url": "u"}]
+        hit = cache.get_or_fetch("tavily", "q", lambda: calls.append(1) or [])
+        hit[0]["url"] = "changed"
+        assert len(calls) == 2 and cache.get("tavily", "q") == [{"url": "u"}]
+        assert make_key(" KI  Tools ", 60) == make_key("ki tools", 60)
+
+    def test_pipeline_provider_searches_are_cached(self, tmp_path, monkeypatch):
+        """Test Tavily/Perplexity werden je normalisierter Query nur einmal aufgerufen"""
+        from services import research_pipeline
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        monkeypatch.setenv("TAVILY_API_KEY", "x")
+        monkeypatch.setenv("PERPLEXITY_API_KEY", "x")
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")))
+        with patch("services.research_pipeline.get_research_cache", return_value=cache), \
+                patch("services.provider_tavily.search", return_value=[{"url": "https://f.example"}]) as tav, \
+                patch("services.provider_perplexity.search", return_value=[{"url": "https://m.example"}]) as ppl:
+            for _ in range(2):
+                assert research_pipeline._tavily_funding_search("Bayern", "IT") == [{"url": "https://f.example"}]
+                assert research_pipeline._perplexity_market_insights("IT", "Beratung")
+        assert tav.call_count == 1 and ppl.call_count == 1
+
+    def test_stale_while_revalidate(self, tmp_path):
+        """Test abgelaufene Eintraege werden sofort geliefert und einmal im Hintergrund aufgefrischt"""
+        import threading
+        import time
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")), ttls={"tavily": 0, "http": 0},
+                              stale={"tavily": 60, "http": 0}, swr=True)
+        cache.set("tavily", "q", ["alt"])
+        cache.set("http", "u", "alt")
+        time.sleep(0.01)
+        gate, calls = threading.Event(), []
+
+        def slow_fetch():
+            calls.append(1)
+            gate.wait(5)
+            return ["neu"]
+
+        value, fetched_at = cache.fetch_entry("tavily", "q", slow_fetch)
+        assert value == ["alt"] and fetched_at < time.time() - 0.005
+        assert cache.fetch_entry("tavily", "q", slow_fetch)[0] == ["alt"]
+        gate.set()
+        cache.wait_refreshes(timeout=5)
+        assert len(calls) == 1 and cache.get("tavily", "q", max_age=60) == ["neu"]
+        assert cache.get_or_fetch("http", "u", lambda: "neu") == "neu"  # ohne Staleness: synchron
+        ns = cache.stats()["namespaces"]
+        assert ns["tavily"]["stale_hits"] == 2 and ns["tavily"]["refreshes"] == 1 and ns["http"]["misses"] == 1
+
+    def test_research_last_updated_reflects_fetch_time(self, tmp_path, monkeypatch):
+        """Test last_updated zeigt den Abrufzeitpunkt der gelieferten Provider-Daten"""
+        from services import research_pipeline
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")))
+        stamps = []
+        with patch("services.research_pipeline.get_research_cache", return_value=cache), \
+                patch.object(cache, "fetch_entry", return_value=([{"url": "u"}], 1_600_000_000.0)):
+            research_pipeline._tavily_cached("KI Tools", 60, stamps=stamps)
+        assert stamps == [1_600_000_000.0]
+        monkeypatch.setenv("RESEARCH_PROVIDER", "hybrid")
+        with patch("services.research_pipeline.get_research_cache", return_value=cache), \
+                patch("services.research_pipeline._collect_research",
+                      return_value=({"last_updated": "2020-09-13"}, False)) as collect:
+            assert research_pipeline.run_research({"branche": "IT"})["last_updated"] == "2020-09-13"
+            assert research_pipeline.run_research({"branche": "it "})["last_updated"] == "2020-09-13"
+        assert collect.call_count == 1
+
+    def test_single_flight_coalesces_identical_queries(self, tmp_path):
+        """Test gleichzeitige identische Abfragen teilen einen Provider-Aufruf (auch Fehler)"""
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from services.research_cache import ResearchCache, make_key
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")))
+        gate, calls = threading.Event(), []
+
+        def slow_fetch():
+            calls.append(1)
+            gate.wait(5)
+            return [{"url": "https://f.example"}]
+
+        with ThreadPoolExecutor(max_workers=5) as ex:
+            futs = [ex.submit(cache.get_or_fetch, "tavily", make_key(q, 90), slow_fetch)
+                    for q in ("KI Förderung Bayern", "ki förderung  bayern ") * 2 + ("KI Förderung Bayern",)]
+            while sum(f.waiters for f in list(cache._inflight.values())) < 4:
+                threading.Event().wait(0.01)
+            gate.set()
+            assert all(f.result(timeout=5) == [{"url": "https://f.example"}] for f in futs)
+        assert len(calls) == 1 and cache.stats()["saved_calls"] == 4
+
+        def failing():
+            gate.clear()
+            gate.wait(0.2)
+            raise RuntimeError("provider down")
+
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            futs = [ex.submit(cache.get_or_fetch, "perplexity", "t", failing) for _ in range(2)]
+            errors = [f.exception(timeout=5) for f in futs]
+        assert all(isinstance(e, RuntimeError) for e in errors)
+
+    def test_flight_timeout_and_refresh_share_single_flight(self, tmp_path, monkeypatch):
+        """Test Timeout-Wartende zaehlen nicht als coalesced; Refresh und Miss teilen einen Abruf"""
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from services import research_cache
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        monkeypatch.setattr(research_cache, "RESEARCH_FLIGHT_WAIT_SEC", 0.05)
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")), ttls={"tavily": 0},
+                              stale={"tavily": 60}, swr=True)
+        gate, calls = threading.Event(), []
+
+        def slow_fetch():
+            calls.append(1)
+            gate.wait(5)
+            return ["neu"]
+
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            leader = ex.submit(cache.get_or_fetch, "tavily", "q", slow_fetch)
+            while not cache._inflight:
+                time.sleep(0.01)
+            assert cache.get_or_fetch("tavily", "q", lambda: ["eigen"]) == ["eigen"]
+            gate.set()
+            assert leader.result(timeout=5) == ["neu"]
+        ns = cache.stats()["namespaces"]["tavily"]
+        assert ns.get("coalesced", 0) == 0 and ns["misses"] == 2
+
+        monkeypatch.setattr(research_cache, "RESEARCH_FLIGHT_WAIT_SEC", 5.0)
+        cache.clear()
+        cache.set("tavily", "r", ["alt"])
+        time.sleep(0.01)
+        gate.clear()
+        calls.clear()
+        assert cache.get_or_fetch("tavily", "r", slow_fetch) == ["alt"]  # stale → Refresh im Hintergrund
+        while not cache._inflight:
+            time.sleep(0.01)
+        cache.clear()  # Eintrag weg: der naechste Aufruf ist ein Miss und wartet auf den Refresh
+        with ThreadPoolExecutor(max_workers=1) as ex:
+            waiter = ex.submit(cache.get_or_fetch, "tavily", "r", slow_fetch)
+            while sum(f.waiters for f in list(cache._inflight.values())) < 1:
+                time.sleep(0.01)
+            gate.set()
+            assert waiter.result(timeout=5) == ["neu"]
+        cache.wait_refreshes(timeout=5)
+        assert len(calls) == 1 and cache.stats()["namespaces"]["tavily"]["refreshes"] == 1
+
+class TestResearchPrefetch:
+    """Tests fuer den Research-Prefetcher (services/research_prefetch.py)"""
+
+    def test_run_once_stores_items_and_tracks_failures(self, tmp_path):
+        """Test Prefetch speichert Listen, Fehler ueberschreiben keine guten Daten, Status je Quelle"""
+        import time
+        from services import research_pipeline, research_prefetch
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")))
+        feed = "https://feed.example/rss"
+        answers = [([{"title": "KI Gesetz", "url": "https://n.example/1"}],) * 2, RuntimeError("timeout")]
+
+        def fake_fetch(kind, url):
+            if url != feed:
+                return [], []
+            res = answers.pop(0)
+            if isinstance(res, Exception):
+                raise res
+            return res
+
+        pf = research_prefetch.ResearchPrefetcher(interval_sec=60, fetch=fake_fetch)
+        with patch("services.research_prefetch.get_research_cache", return_value=cache), \
+                patch("services.research_pipeline.get_research_cache", return_value=cache), \
+                patch.object(research_pipeline, "AI_ACT_NEWS_RSS", [feed]), \
+                patch.object(research_pipeline, "DEFAULT_NEWS_RSS", []), \
+                patch.object(research_pipeline, "FUNDING_HINT_PAGES", ["https://f.example/"]), \
+                patch.object(research_pipeline, "TOOLS_PAGES", []):
+            first = pf.run_once()
+            second = pf.run_once()
+            with patch("services.research_pipeline.fetch_many") as live:
+                news = research_pipeline._source_lists([("rss", feed)], time.time() + 5)[f"rss:{feed}"]
+        assert first[feed]["ok"] and first[feed]["items"] == 1
+        assert not second[feed]["ok"] and second[feed]["consecutive_failures"] == 1
+        assert second[feed]["last_success"] == first[feed]["last_success"] and second[feed]["age_sec"] is not None
+        assert second["https://f.example/"]["consecutive_failures"] == 2
+        assert news == [{"title": "KI Gesetz", "url": "https://n.example/1"}] and not live.called
+
+    def test_start_prefetcher_respects_env(self):
+        """Test RESEARCH_PREFETCH=0 startet keinen Thread"""
+        from services import research_prefetch
+
+        with patch.dict(os.environ, {"RESEARCH_PREFETCH": "0"}):
+            assert research_prefetch.start_prefetcher() is None
+
+    def test_analysis_worker_process_runs_prefetcher(self):
+        """Test der externe Analyse-Worker startet und stoppt den Prefetcher mit dem Pool"""
+        from scripts import analysis_worker
+
+        with patch("services.job_queue.ensure_jobs_table"), \
+                patch("services.job_queue.WorkerPool") as pool_cls, \
+                patch("services.research_prefetch.start_prefetcher") as start, \
+                patch("services.research_prefetch.stop_prefetcher") as stop, \
+                patch("scripts.analysis_worker.signal"), \
+                patch("scripts.analysis_worker.threading"):
+            assert analysis_worker.main() == 0
+        start.assert_called_once_with()
+        stop.assert_called_once_with()
+        pool_cls.return_value.start.return_value.stop.assert_called_once()
+
+class TestConditionalGet:
+    """Tests fuer konditionale GETs (ETag/Last-Modified) in services/research_clients.py"""
+
+    def test_http_get_and_rss_revalidate_with_304(self, tmp_path):
+        """Test nach Ablauf der TTL wird mit Validatoren gefragt; 304 nutzt Body bzw. Parse weiter"""
+        from unittest.mock import MagicMock
+        from services import research_clients
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")), ttls={"http": -1, "rss": -1})
+        feed = (b'<?xml version="1.0"?><rss version="2.0"><channel><title>F</title>'
+                b"<item><title>KI News</title><link>https://n.example/1</link></item></channel></rss>")
+        ok_page = MagicMock(ok=True, status_code=200, text="<html>x</html>", content=b"<html>x</html>",
+                            headers={"ETag": '"p1"'})
+        ok_feed = MagicMock(ok=True, status_code=200, content=feed,
+                            headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        not_modified = MagicMock(ok=False, status_code=304, content=b"", headers={})
+        before = research_clients.conditional_stats()
+        with patch("services.research_clients.get_research_cache", return_value=cache), \
+                patch("services.research_clients.requests.get",
+                      side_effect=[ok_page, not_modified, ok_feed, not_modified]) as get, \
+                patch("services.research_clients.feedparser.parse", wraps=research_clients.feedparser.parse) as parse:
+            assert research_clients.http_get("https://p.example/") == "<html>x</html>"
+            assert research_clients.http_get("https://p.example/") == "<html>x</html>"
+            first = research_clients.parse_rss("https://f.example/rss")
+            assert research_clients.parse_rss("https://f.example/rss") == first
+        assert first[0]["title"] == "KI News" and parse.call_count == 1
+        assert get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"p1"'
+        assert get.call_args_list[3].kwargs["headers"]["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+        after = research_clients.conditional_stats()
+        assert after["not_modified"] - before["not_modified"] == 2
+        assert after["bytes_saved"] - before["bytes_saved"] == len("<html>x</html>") + len(feed)
+
+class TestResearchFetch:
+    """Tests fuer parallele Research-Abrufe mit Deadline (services/research_fetch.py)"""
+
+    def test_fetch_many_partial_results_and_slow_skipping(self):
+        """Test Quellen laufen parallel, zu langsame werden abgebrochen, markiert und danach uebersprungen"""
+        import asyncio
+        import time
+        from services import research_fetch
+
+        async def fast(client, timeout):
+            await asyncio.sleep(0.05)
+            return ["ok"]
+
+        async def slow(client, timeout):
+            await asyncio.sleep(5)
+            return ["zu spaet"]
+
+        jobs = [("rss:a", "https://a.example", fast), ("rss:b", "https://b.example", fast),
+                ("rss:slow", "https://slow.example", slow)]
+        with patch.dict(research_fetch._slow_until, clear=True):
+            t0 = time.perf_counter()
+            out = research_fetch.fetch_many(jobs, deadline_sec=2.0, budget_sec=0.3)
+            elapsed = time.perf_counter() - t0
+            assert out == {"rss:a": ["ok"], "rss:b": ["ok"], "rss:slow": None}
+            assert elapsed < 1.0
+            assert research_fetch.is_slow("https://slow.example")
+            assert "https://slow.example" in research_fetch.fetch_stats()["slow_sources"]
+            skipped_before = research_fetch.fetch_stats()["skipped_slow"]
+            out = research_fetch.fetch_many(jobs, deadline_sec=2.0, budget_sec=0.3)
+            assert out["rss:slow"] is None and research_fetch.fetch_stats()["skipped_slow"] == skipped_before + 1
+
+    def test_deadline_cut_does_not_mark_source_slow(self):
+        """Test Abbruch durch die Batch-Deadline (gekuerztes Budget) markiert die Quelle nicht als langsam"""
+        import asyncio
+        from services import research_fetch
+
+        async def half_second(client, timeout):
+            await asyncio.sleep(0.5)
+            return ["ok"]
+
+        jobs = [("rss:h", "https://healthy.example", half_second)]
+        with patch.dict(research_fetch._slow_until, clear=True):
+            cut_before = research_fetch.fetch_stats()["deadline_cut"]
+            assert research_fetch.fetch_many(jobs, deadline_sec=0.3, budget_sec=1.0) == {"rss:h": None}
+            assert not research_fetch.is_slow("https://healthy.example")
+            assert research_fetch.fetch_stats()["deadline_cut"] == cut_before + 1
+            assert research_fetch.fetch_many(jobs, deadline_sec=2.0, budget_sec=1.0) == {"rss:h": ["ok"]}
+
+class TestKeywordMatcher:
+    """Tests fuer den vorkompilierten Schlagwort-Matcher"""
+
+    def test_scan_finds_all_categories_in_one_pass(self):
+        """Test dass ein Text mehrere Kategorien gleichzeitig trifft (auch kuerzere Praefixe)"""
+        from services.keyword_matcher import KeywordMatcher
+        m = KeywordMatcher({"nsfw": (["porn", "sex"], "prefix"), "spam": (["pornhub", "torrent"], "substring")})
+        assert m.scan("Visit PORNHUB.com") == {"nsfw", "spam"}
+        assert m.scan("free-torrent site") == {"spam"}
+        assert m.scan("Clean article") == set()
+        assert m.matches("pornhub", "spam") and not m.matches("torrents", "nsfw")
+
+    def test_modes(self):
+        """Test prefix/word-Modus gegen Teilwort-Fehlalarme, substring wie ``in``"""
+        from services.keyword_matcher import KeywordMatcher
+        m = KeywordMatcher({"p": (["dating"], "prefix"), "w": (["ki"], "word"), "s": (["förder"], "substring")})
+        assert m.scan("updating the app") == set()
+        assert m.scan("Dating-Apps") == {"p"}
+        assert m.scan("KI im Mittelstand") == {"w"}
+        assert m.scan("Kiosk") == set()
+        assert m.scan("Bundesförderung") == {"s"}
+
+    def test_matcher_for_is_cached(self):
+        """Test dass matcher_for je Schlagwortliste dieselbe Instanz liefert"""
+        from services.keyword_matcher import matcher_for
+        assert matcher_for(["KI", "förder"]) is matcher_for(["förder", "ki"])
+        assert matcher_for(["förder"]).matches("KI-Förderprogramm")
+
+    def test_content_filter_uses_word_starts(self):
+        """Test dass der Research-Filter 'Essex' nicht mehr als NSFW wertet"""
+        from services.research import _is_safe_content
+        assert _is_safe_content({"url": "https://example.com/news", "title": "Essex business news", "content": ""})
+        assert not _is_safe_content({"url": "https://www.pornhub.com/x", "title": "Title", "content": ""})
+
+    def test_overlapping_matches_across_categories(self):
+        """Test Schlagworte, die innerhalb eines anderen Treffers beginnen, werden gefunden"""
+        import gpt_analyze
+        from services.keyword_matcher import KeywordMatcher
+        from services.research import _is_safe_content
+        m = KeywordMatcher({"nsfw": (["sex"], "prefix"), "spam": (["xvideos"], "substring")})
+        assert m.scan("www.sexvideos-free.com") == {"nsfw", "spam"}
+        assert m.matches("sexvideos", "spam")
+        assert not _is_safe_content({"title": "x", "content": "y", "url": "https://www.sexvideos-free.com/"})
+        with patch.object(gpt_analyze, "ENABLE_NSFW_FILTER", True):
+            assert gpt_analyze._is_nsfw_content("https://sexvideos.com/x", "", "")
+
+class TestResearchDedup:
+    """Tests fuer URL-Kanonisierung und Near-Duplicate-Erkennung (services/research_dedup.py)"""
+
+    def test_canonical_url_variants(self):
+        """Test dass Tracking-, Schema-, Host- und AMP-Varianten denselben Schluessel ergeben"""
+        from services.research_dedup import canonical_url
+        base = canonical_url("https://example.com/news/artikel?id=7")
+        assert canonical_url("http://www.Example.com/news/artikel/?utm_source=x&id=7&fbclid=abc#top") == base
+        assert canonical_url("https://amp.example.com:443/news/artikel/amp?id=7") == base
+        assert canonical_url("https://example.com/news/artikel?id=8") != base
+        assert canonical_url("") == ""
+
+    def test_dedupe_items_urls_and_near_duplicates(self):
+        """Test dass URL-Varianten und fast gleiche Zusammenfassungen nur einmal erscheinen"""
+        from services.research_dedup import dedupe_items
+        items = [
+            {"title": "Digital Jetzt", "url": "https://www.bmwk.de/digital-jetzt?utm_medium=rss",
+             "content": "Das BMWK foerdert Investitionen in digitale Technologien und Qualifizierung in KMU."},
+            {"title": "Digital Jetzt", "url": "http://bmwk.de/digital-jetzt/", "content": "anderer Text"},
+            {"title": "Digital Jetzt", "url": "https://foerderdatenbank.de/digital-jetzt",
+             "content": "Das BMWK foerdert Investitionen in digitale Technologien und die Qualifizierung in KMU."},
+            {"title": "go-digital", "url": "https://www.bmwk.de/go-digital",
+             "content": "Beratungsleistungen fuer IT-Sicherheit und Online-Marketing in kleinen Unternehmen."},
+            {"title": "ohne URL", "url": ""},
+        ]
+        out = dedupe_items(items)
+        assert [it["url"] for it in out] == ["https://www.bmwk.de/digital-jetzt?utm_medium=rss",
+                                             "https://www.bmwk.de/go-digital"]
+        assert len(dedupe_items(items, max_distance=0)) == 3
+
+    def test_title_only_items_dedupe_by_url_only(self):
+        """Test Titel-Treffer ohne Inhalt (geerntete Links) werden nicht per SimHash zusammengelegt"""
+        from services.research_dedup import dedupe_items
+        items = [
+            {"title": "Förderprogramm Digitalisierung von Geschäftsprozessen im Mittelstand, Land Bayern",
+             "url": "https://a.example/by"},
+            {"title": "Förderprogramm Digitalisierung von Geschäftsprozessen im Mittelstand, Land Berlin",
+             "url": "https://a.example/be"},
+            {"title": "Förderprogramm Bayern", "url": "https://www.a.example/by/"},
+        ]
+        assert [it["url"] for it in dedupe_items(items)] == ["https://a.example/by", "https://a.example/be"]
+        rss = [{"title": "KI-Verordnung tritt in Kraft", "url": f"https://n{i}.example/x",
+                "summary": "Die EU-KI-Verordnung ist heute in Kraft getreten und gilt schrittweise."} for i in (1, 2)]
+        assert len(dedupe_items(rss)) == 1
+
+class TestHarvestLinks:
+    """Tests fuer die gestreamte Link-Ernte (services/research_clients.py)"""
+
+    def test_stream_stops_at_limit_and_caches_only_links(self, tmp_path):
+        """Test Abbruch nach ``limit`` Treffern, Cache enthaelt nur die Linkliste, 304 nutzt sie weiter"""
+        from unittest.mock import MagicMock
+        from services import research_clients
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")), ttls={"links": -1})
+        chunks = [f"<p><a href='https://t{i}.example/'>Tool <b>{i}</b></a><a href='/rel'>x</a></p>".encode()
+                  for i in range(100)]
+        page = MagicMock(ok=True, status_code=200, headers={"ETag": '"l1"', "Content-Type": "text/html"})
+        page.iter_content.return_value = iter(chunks)
+        page.__enter__.return_value = page
+        not_modified = MagicMock(ok=False, status_code=304, headers={})
+        not_modified.__enter__.return_value = not_modified
+        with patch("services.research_clients.get_research_cache", return_value=cache), \
+                patch("services.research_clients.requests.get", side_effect=[page, not_modified]) as get:
+            links = research_clients.harvest_links("https://cat.example/", limit=3)
+            assert research_clients.harvest_links("https://cat.example/", limit=3) == links
+        assert [it["title"] for it in links] == ["Tool 0", "Tool 1", "Tool 2"]
+        assert get.call_args_list[0].kwargs["stream"] is True
+        assert get.call_args_list[1].kwargs["headers"]["If-None-Match"] == '"l1"'
+        entry = cache.lookup("links", research_clients.make_key("https://cat.example/", [], 3))[0]
+        assert entry["items"] == links and entry["size"] == sum(len(c) for c in chunks[:3])
+        assert "body" not in entry
+
+    def test_async_harvest_with_domain_filter(self, tmp_path):
+        """Test async Variante ueber httpx-Stream inkl. Domain-Filter und Charset aus dem Header"""
+        import asyncio
+        import httpx
+        import respx
+        from services import research_clients
+        from services.research_cache import ResearchCache
+        from services.research_store import ResearchStore
+
+        cache = ResearchCache(ResearchStore(str(tmp_path / "rs.sqlite3")))
+        body = ("<a href='https://foerder.de/a'>Förderung A</a><a href='https://other.com/'>O</a>"
+                "<a href='https://www.foerder.de/b'></a>").encode("latin-1")
+
+        async def run():
+            async with httpx.AsyncClient() as client:
+                return await research_clients.aharvest_links(client, "https://list.example/", ["foerder.de"], 10, 5.0)
+
+        with respx.mock() as mock, patch("services.research_clients.get_research_cache", return_value=cache):
+            mock.get("https://list.example/").mock(return_value=httpx.Response(
+                200, content=body, headers={"Content-Type": "text/html; charset=ISO-8859-1"}))
+            links = asyncio.run(run())
+        assert links == [{"title": "Förderung A", "url": "https://foerder.de/a", "source": "foerder.de"},
+                         {"title": "www.foerder.de", "url": "https://www.foerder.de/b", "source": "www.foerder.de"}]
+
+class TestReportRenderer:
+    """Tests fuer den prozessweiten Template-Cache (services/report_renderer.py)"""
+
+    def test_compiles_once_recompiles_on_change_and_reload(self, tmp_path, monkeypatch):
+        """Test Template wird einmal kompiliert, nach Dateiaenderung/Reload neu; Bytecode-Cache wird befuellt"""
+        import os
+        from services.report_renderer import ReportRenderer
+
+        tpl = tmp_path / "report.html"
+        tpl.write_text("<p>{{ NAME }}</p>", encoding="utf-8")
+        monkeypatch.setenv("REPORT_TEMPLATE_DIR", str(tmp_path))
+        monkeypatch.setenv("REPORT_TEMPLATE_PATH", str(tpl))
+        renderer = ReportRenderer(bytecode_dir=str(tmp_path / "bcc"))
+        assert renderer.validate() == ["report.html"]
+        first = renderer.template("report.html")
+        assert renderer.template("report.html") is first and renderer.compiles == 1
+        assert first.render(NAME="A") == "<p>A</p>"
+        assert list((tmp_path / "bcc").iterdir())
+
+        tpl.write_text("<b>{{ NAME }}</b>", encoding="utf-8")
+        st = os.stat(tpl)
+        os.utime(tpl, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+        assert renderer.template("report.html").render(NAME="B") == "<b>B</b>" and renderer.compiles == 2
+
+        out = renderer.reload()
+        assert out["reloaded"] == ["report.html"] and renderer.compiles == 3
+        tpl.write_text("{% if %}", encoding="utf-8")
+        with pytest.raises(Exception):
+            renderer.reload()
+
+class TestLogoAssets:
+    """Tests fuer die Logo-Registry (utils/logo_embedder.py)"""
+
+    def test_render_keeps_references_pdf_client_inlines(self):
+        """Test gespeichertes HTML enthaelt nur Referenzen; base64 erst beim Versand an den PDF-Service"""
+        from unittest.mock import MagicMock
+        from services import pdf_client
+        from services.report_renderer import render
+        from utils.logo_embedder import ASSET_URL_PREFIX, get_asset_registry
+
+        registry = get_asset_registry("templates")
+        logo = registry.assets["ki-sicherheit-logo.webp"]
+        html = render(None, "run-assets", {"report_id": "r1"})["html"]
+        assert f'src="{ASSET_URL_PREFIX}ki-sicherheit-logo.webp?v={logo.sha}"' in html
+        assert "base64," not in html
+
+        ok = MagicMock(ok=True, headers={"content-type": "application/pdf"}, content=b"%PDF")
+        with patch.object(pdf_client, "PDF_SERVICE_URL", "http://pdf.example"), \
+                patch("services.pdf_client.requests.post", return_value=ok) as post:
+            assert pdf_client.render_pdf_from_html(html, {"run_id": "run-assets"})["pdf_bytes"] == b"%PDF"
+        sent = post.call_args.kwargs["data"]
+        assert logo.data_uri in sent and ASSET_URL_PREFIX not in sent
+
+    def test_legacy_src_and_asset_route(self):
+        """Test alte src="logo.webp"-Templates werden referenziert; die Route liefert die Bytes mit Hash-ETag"""
+        from main import serve_report_asset
+        from utils.logo_embedder import embed_logos_in_html, get_asset_registry
+
+        registry = get_asset_registry("templates")
+        ref = registry.reference("<img src='dsgvo.svg'><img src=\"ki-ready-2025\"><img src=\"x.png\">")
+        assert ref.count("/report-assets/") == 2 and 'src="x.png"' in ref
+        assert embed_logos_in_html("<img src='dsgvo.svg'>").startswith('<img src="data:image/svg+xml;base64,')
+        resp = serve_report_asset("dsgvo.svg")
+        assert resp.body == registry.assets["dsgvo.svg"].data and resp.headers["etag"].strip('"') == registry.assets["dsgvo.svg"].sha
+        assert serve_report_asset("missing.svg").status_code == 404
+
+class TestPlaceholderEngine:
+    """Tests fuer die Single-Pass-Platzhalter-Ersetzung (services/placeholder_engine.py)"""
+
+    def test_all_brace_forms_in_one_pass(self):
+        """Test {X}, {{X}}, {{ X }} und normalisierte Ausdruecke; Unbekanntes bleibt und wird gemeldet"""
+        from services.placeholder_engine import PlaceholderEngine
+        engine = PlaceholderEngine({"ROI_12M": "250.0", "ROI_12M * 0.8": "200.0", "TOOLS_HTML": ""})
+        unresolved = set()
+        out = engine.apply("{ROI_12M} {{ROI_12M}} {{ ROI_12M }} {{ROI_12M*0.8}} {{TOOLS_HTML}} "
+                           "{{ FOO * 2 }} {bar} .c{color:red}", unresolved)
+        assert out == "250.0 250.0 250.0 200.0  {{ FOO * 2 }} {bar} .c{color:red}"
+        assert unresolved == {"FOO * 2"}
+
+    def test_render_mode_skips_empty_and_strips_numbers(self):
+        """Test leere Werte werden nicht eingesetzt, {42} wird zu 42"""
+        from services.placeholder_engine import PlaceholderEngine
+        engine = PlaceholderEngine({"PAYBACK_MONTHS": "", "ROI_12M": "2.5"}, strip_numeric=True, skip_empty=True)
+        assert engine.apply("{{ PAYBACK_MONTHS }} {42} {3.5} {ROI_12M}") == "{{ PAYBACK_MONTHS }} 42 3.5 2.5"
+
+    def test_apply_all_counts_changed_sections(self):
+        """Test apply_all ersetzt nur String-Sections und zaehlt Aenderungen"""
+        from services.placeholder_engine import PlaceholderEngine
+        sections = {"A_HTML": "<p>{report_date}</p>", "B_HTML": "<p>ohne</p>", "N": 5}
+        assert PlaceholderEngine({"report_date": "2025-01-01"}).apply_all(sections) == 1
+        assert sections == {"A_HTML": "<p>2025-01-01</p>", "B_HTML": "<p>ohne</p>", "N": 5}
+
+    def test_products_and_fallback(self):
+        """Test ``X * k`` wird ausgerechnet, eigene Eintraege haben Vorrang, Rest geht an den Fallback"""
+        from services.placeholder_engine import PlaceholderEngine
+        engine = PlaceholderEngine({"CAPEX": "6000", "ROI": "0.5", "ROI * 0.8": "40 %", "NAME": "x"},
+                                   fallback=lambda expr: "R" if expr == "ROI | round(2)" else None)
+        unresolved = set()
+        out = engine.apply("{{ CAPEX * 1.2 }} {{1.2*ROI}} {{ ROI * 0.8 }} {{ ROI | round(2) }} {{ NAME * 2 }}",
+                           unresolved)
+        assert out == "7200 0.6 40 % R {{ NAME * 2 }}"
+        assert unresolved == {"NAME * 2"}
+
+    def test_ksj_sections_evaluate_jinja_expressions(self):
+        """Test ksj_fix_placeholders_in_sections rechnet Ausdruecke und Filter wie frueher per Jinja"""
+        import gpt_analyze
+        calc = {"CAPEX_REALISTISCH_EUR": 6000, "OPEX_REALISTISCH_EUR": 120, "EINSPARUNG_MONAT_EUR": 4500,
+                "PAYBACK_MONTHS": 1.4, "ROI_12M": 7.5678}
+        sections = {"A_HTML": "<p>{{ CAPEX_REALISTISCH_EUR * 1.2 }} € · ROI {{ ROI_12M | round(2) }}</p>"}
+        with patch.object(gpt_analyze, "calc_business_case", return_value=calc):
+            out = gpt_analyze.ksj_fix_placeholders_in_sections(sections, {}, {})
+        assert out["A_HTML"] == "<p>7200 € · ROI 7.57</p>"
+
+class TestHtmlSanitizer:
+    """Tests fuer den Single-Pass-Sanitizer (services/html_sanitizer.py)"""
+
+    def test_policy_matches_regex_cascade(self):
+        """Test Wrapper, gefaehrliche Bloecke, Events, javascript:-URIs und Whitespace wie bisher"""
+        from services.html_sanitizer import sanitize_section_html
+        raw = ("<!DOCTYPE html><html><head><title>x</title></head><body onload='x()'>"
+               "<p  class='a' onClick=\"steal()\">Fragebögen</p>   \n\n\n\n<SCRIPT>alert(1)</script>"
+               "<a href=' javascript:void(0)'>x</a><iframe src='y'></iframe><meta charset='utf-8'></body></html>")
+        assert sanitize_section_html(raw) == "<p class='a'>Fragebögen</p>\n\n<a href='#'>x</a>"
+        assert sanitize_section_html("FragebÃ¶gen") == "Fragebögen"
+        assert sanitize_section_html("<ul>\n<li>a</li>\n</ul>") == "<ul>\n<li>a</li>\n</ul>"
+
+    def test_nested_and_unclosed_tags(self):
+        """Test neu zusammengesetzte Script-Tags werden erneut entfernt; ungeschlossenes <head> bleibt Text"""
+        from services.html_sanitizer import sanitize_section_html
+        assert sanitize_section_html("<p>a</p><scr<script>x</script>ipt>alert(1)</script>") == "<p>a</p>"
+        text = "KEIN <html>, <head> oder <body>. " + "<p>x</p>" * 200
+        assert sanitize_section_html(text) == "KEIN , <head> oder . " + "<p>x</p>" * 200
+
+    def test_sections_dict_skips_plain_keys_and_memoizes(self):
+        """Test Klartext-Keys ohne Tag-Scan, grosse Abschnitte aus dem Cache"""
+        from services import html_sanitizer as hs
+        hs.clear_sanitizer_cache()
+        big = "<p>Abschnitt</p><script>x</script>" + "<p>Text</p>" * 40
+        sections = {"ROI_HTML": big, "LEAD_EXEC": "Umsatz <b>+5%</b>  jetzt", "report_date": "17.10.2026", "N": 3}
+        before = hs.sanitizer_stats()["cache_hits"]
+        out = hs.sanitize_sections_dict(sections)
+        assert out["ROI_HTML"] == "<p>Abschnitt</p>" + "<p>Text</p>" * 40
+        assert out["LEAD_EXEC"] == "Umsatz <b>+5%</b> jetzt"
+        assert out["report_date"] == "17.10.2026" and out["N"] == 3
+        assert hs.sanitize_sections_dict(sections) == out
+        assert hs.sanitizer_stats()["cache_hits"] == before + 1
+        assert hs.is_plain_text_key("BRANCHE_LABEL") and not hs.is_plain_text_key("QUICK_WINS_HTML_LEFT")
+
+class TestPdfCache:
+    """Tests fuer den PDF-Ergebnis-Cache (services/pdf_cache.py)"""
+
+    def test_key_and_lru_eviction_by_size(self, tmp_path):
+        """Test Schluessel haengt an HTML + Template-Version; LRU raeumt nach Groesse"""
+        from services.pdf_cache import PdfCache, pdf_cache_key
+        assert pdf_cache_key("<p>x</p>", "v1") == pdf_cache_key("<p>x</p>", "v1")
+        assert pdf_cache_key("<p>x</p>", "v1") != pdf_cache_key("<p>x</p>", "v2")
+        cache = PdfCache(str(tmp_path / "pdf.sqlite3"), max_entries=10, max_bytes=250)
+        cache.put("a", b"A" * 100)
+        cache.put("b", b"B" * 100)
+        assert cache.get("a") == b"A" * 100  # a zuletzt benutzt → b faellt zuerst raus
+        cache.put("c", b"C" * 100)
+        assert cache.get("b") is None and cache.get("a") and cache.get("c")
+        assert cache.stats()["evictions"] == 1
+
+    def test_render_reuses_cached_pdf(self, tmp_path):
+        """Test byte-identisches HTML wird nur einmal an den PDF-Service geschickt"""
+        from unittest.mock import MagicMock
+        from services import pdf_client
+        from services.pdf_cache import PdfCache
+
+        cache = PdfCache(str(tmp_path / "pdf.sqlite3"))
+        ok = MagicMock(ok=True, headers={"content-type": "application/pdf"}, content=b"%PDF-1.7")
+        with patch.object(pdf_client, "PDF_SERVICE_URL", "http://pdf.example"), \
+                patch.object(pdf_client, "get_pdf_cache", return_value=cache), \
+                patch("services.pdf_client.requests.post", return_value=ok) as post:
+            first = pdf_client.render_pdf_from_html("<p>Report</p>", {"run_id": "r1"})
+            second = pdf_client.render_pdf_from_html("<p>Report</p>", {"run_id": "r2"})
+            third = pdf_client.render_pdf_from_html("<p>Anderer Report</p>", {"run_id": "r3"})
+        assert post.call_count == 2
+        assert second == {"pdf_bytes": b"%PDF-1.7", "pdf_url": None, "cached": True, "cache_key": first["cache_key"]}
+        assert not first.get("cached") and third["cache_key"] != first["cache_key"]
+
+    def test_url_download_is_cached(self, tmp_path):
+        """Test _fetch_pdf_if_needed legt geladene URL-PDFs ab und liefert sie beim Resend aus dem Cache"""
+        from unittest.mock import MagicMock
+        import gpt_analyze
+        from services.pdf_cache import PdfCache
+
+        cache = PdfCache(str(tmp_path / "pdf.sqlite3"))
+        resp = MagicMock(ok=True, content=b"%PDF-url")
+        with patch.object(gpt_analyze, "get_pdf_cache", return_value=cache), \
+                patch("gpt_analyze.requests.get", return_value=resp) as get:
+            assert gpt_analyze._fetch_pdf_if_needed("https://pdf.example.com/r.pdf", None, "k1") == b"%PDF-url"
+            assert gpt_analyze._fetch_pdf_if_needed(None, None, "k1") == b"%PDF-url"
+        assert get.call_count == 1
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v", "--tb=short"])
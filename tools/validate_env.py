@@ -31,10 +31,10 @@ def warn_cors():
         print("INFO: CORS_ALLOW_CREDENTIALS=1 — Access-Control-Allow-Credentials wird gesendet.")
 
 def warn_redis():
-    if os.getenv("ENABLE_LLM_CACHE","0") == "1" and not os.getenv("REDIS_URL"):
-        print("WARN: ENABLE_LLM_CACHE=1 aber REDIS_URL fehlt.")
-    if os.getenv("ENABLE_LLM_CACHE","0") == "0":
-        print("INFO: LLM-Cache deaktiviert (Redis optional).")
+    if os.getenv("LLM_GOVERNOR_SHARED","0") == "1" and not os.getenv("REDIS_URL"):
+        print("WARN: LLM_GOVERNOR_SHARED=1 aber REDIS_URL fehlt.")
+    if os.getenv("LLM_CACHE_ENABLED", os.getenv("ENABLE_LLM_CACHE","1")) == "0":
+        print("INFO: LLM-Cache deaktiviert (SQLite, LLM_CACHE_PATH).")
 
 def main():
     missing = require(REQUIRED)
@@ -4,15 +4,25 @@ Logo Embedder for PDF Generation.
 
 Embeds logo images as base64 data URIs in HTML to ensure they render
 correctly when the HTML is sent to an external PDF service.
+
+Asset registry (built once at startup, ``get_asset_registry()``):
+- Logos are read and base64-encoded once and keyed by content hash.
+- Templates reference them via ``{{ asset("ki-sicherheit-logo.webp") }}`` →
+  ``/report-assets/ki-sicherheit-logo.webp?v=<hash>`` (served by ``main.py``), so the stored
+  ``Analysis.html`` and the admin view stay small.
+- ``inline_assets()`` swaps these references for data URIs in a single pass, only on the way
+  to the PDF service (``services/pdf_client.py``) and into exports.
 """
 from __future__ import annotations
 
 import base64
+import hashlib
 import logging
 import os
 import re
+import threading
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List, NamedTuple, Optional
 
 log = logging.getLogger(__name__)
 
@@ -25,6 +35,110 @@ DEFAULT_LOGOS = [
     "eu-ai.svg",
 ]
 
+ASSET_URL_PREFIX = "/report-assets/"
+
+_MIME_TYPES = {
+    ".webp": "image/webp",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".svg": "image/svg+xml",
+}
+
+# src="/report-assets/<name>?v=<hash>" (auch mit einfachen Anführungszeichen)
+_REF_RX = re.compile(r"""src=(["'])""" + re.escape(ASSET_URL_PREFIX) + r"""([\w.-]+)\?v=[0-9a-f]+\1""")
+
+
+class LogoAsset(NamedTuple):
+    name: str
+    mime: str
+    sha: str
+    data: bytes
+    data_uri: str
+
+
+class AssetRegistry:
+    """Logos eines Template-Verzeichnisses, einmal gelesen und kodiert."""
+
+    def __init__(self, template_dir: str = "templates", names: Optional[List[str]] = None) -> None:
+        self.template_dir = template_dir
+        self.assets: Dict[str, LogoAsset] = {}
+        template_path = Path(template_dir)
+        for logo_name in names or DEFAULT_LOGOS:
+            logo_path = template_path / logo_name
+            if not logo_path.exists():
+                # Try assets subdirectory
+                logo_path = template_path / "assets" / logo_name
+            if not logo_path.exists():
+                log.warning(f"[LOGO-EMBED] Logo not found: {logo_name}")
+                continue
+            try:
+                data = logo_path.read_bytes()
+            except Exception as e:
+                log.warning(f"[LOGO-EMBED] Failed to load {logo_name}: {e}")
+                continue
+            mime_type = _MIME_TYPES.get(logo_path.suffix.lower(), "image/webp")
+            b64 = base64.b64encode(data).decode("utf-8")
+            self.assets[logo_name] = LogoAsset(logo_name, mime_type, hashlib.sha256(data).hexdigest()[:12], data,
+                                               f"data:{mime_type};base64,{b64}")
+        # Alte Templates mit src="logo.webp" (bzw. ohne .webp) → Referenz, ein Durchlauf
+        variants = sorted({v for n in self.assets for v in (n, n.replace(".webp", ""))}, key=len, reverse=True)
+        self._bare_rx = re.compile(r"""src=(["'])(""" + "|".join(map(re.escape, variants)) + r""")\1""") \
+            if variants else None
+        log.info(f"[LOGO-EMBED] Loaded {len(self.assets)} logos for embedding")
+
+    def url(self, name: str) -> str:
+        """Leichte Referenz (für Templates: ``{{ asset("…") }}``); unbekannte Namen bleiben unverändert."""
+        asset = self.assets.get(name)
+        return f"{ASSET_URL_PREFIX}{name}?v={asset.sha}" if asset else name
+
+    def reference(self, html: str) -> str:
+        """``src="logo.webp"`` → ``src="/report-assets/logo.webp?v=…"`` (für Templates ohne ``asset()``)."""
+        if self._bare_rx is None:
+            return html
+
+        def _ref(m: "re.Match[str]") -> str:
+            name = m.group(2) if m.group(2) in self.assets else m.group(2) + ".webp"
+            return f'src="{self.url(name)}"'
+
+        return self._bare_rx.sub(_ref, html)
+
+    def inline(self, html: str) -> str:
+        """Referenzen → base64 data URIs, ein Durchlauf über das HTML."""
+        if ASSET_URL_PREFIX not in html:
+            return html
+
+        def _uri(m: "re.Match[str]") -> str:
+            asset = self.assets.get(m.group(2))
+            return f'src="{asset.data_uri}"' if asset else m.group(0)
+
+        return _REF_RX.sub(_uri, html)
+
+
+_registries: Dict[str, AssetRegistry] = {}
+_registry_lock = threading.Lock()
+
+
+def _default_dir() -> str:
+    return str(Path(os.getenv("REPORT_TEMPLATE_PATH", "templates/pdf_template.html")).parent)
+
+
+def get_asset_registry(template_dir: Optional[str] = None, reload: bool = False) -> AssetRegistry:
+    """Prozessweite Registry je Template-Verzeichnis (``reload=True`` liest die Dateien neu)."""
+    key = template_dir or _default_dir()
+    with _registry_lock:
+        if reload or key not in _registries:
+            _registries[key] = AssetRegistry(key)
+        return _registries[key]
+
+
+def inline_assets(html: str, template_dir: Optional[str] = None) -> str:
+    """Data URIs für den Versand an den PDF-Service bzw. für Offline-Exporte."""
+    if not html or ASSET_URL_PREFIX not in html:
+        return html
+    return get_asset_registry(template_dir).inline(html)
+
+
 def get_logo_base64_map(template_dir: str = "templates") -> Dict[str, str]:
     """
     Load logo files and convert to base64 data URIs.
@@ -35,41 +149,21 @@ def get_logo_base64_map(template_dir: str = "templates") -> Dict[str, str]:
     Returns:
         Dictionary mapping filename to base64 data URI
     """
-    logo_map: Dict[str, str] = {}
-    template_path = Path(template_dir)
+    return {name: a.data_uri for name, a in get_asset_registry(template_dir).assets.items()}
 
-    for logo_name in DEFAULT_LOGOS:
-        logo_path = template_path / logo_name
-        if not logo_path.exists():
-            # Try assets subdirectory
-            logo_path = template_path / "assets" / logo_name
 
-        if logo_path.exists():
-            try:
-                with open(logo_path, "rb") as f:
-                    data = f.read()
-                    b64 = base64.b64encode(data).decode("utf-8")
-
-                    # Determine MIME type
-                    ext = logo_path.suffix.lower()
-                    mime_type = {
-                        ".webp": "image/webp",
-                        ".png": "image/png",
-                        ".jpg": "image/jpeg",
-                        ".jpeg": "image/jpeg",
-                        ".svg": "image/svg+xml",
-                    }.get(ext, "image/webp")
+def reference_logos_in_html(html: str, template_dir: str = "templates") -> str:
+    """
+    Replace bare logo src attributes with lightweight asset references.
 
-                    data_uri = f"data:{mime_type};base64,{b64}"
-                    logo_map[logo_name] = data_uri
-                    log.debug(f"[LOGO-EMBED] Loaded {logo_name}: {len(b64)} chars base64")
-            except Exception as e:
-                log.warning(f"[LOGO-EMBED] Failed to load {logo_name}: {e}")
-        else:
-            log.warning(f"[LOGO-EMBED] Logo not found: {logo_name}")
+    Args:
+        html: HTML string with relative logo paths
+        template_dir: Directory containing logo files
 
-    log.info(f"[LOGO-EMBED] Loaded {len(logo_map)} logos for embedding")
-    return logo_map
+    Returns:
+        HTML referencing ``/report-assets/...`` (inline with ``inline_assets()``)
+    """
+    return get_asset_registry(template_dir).reference(html)
 
 
 def embed_logos_in_html(html: str, template_dir: str = "templates") -> str:
@@ -77,38 +171,17 @@ def embed_logos_in_html(html: str, template_dir: str = "templates") -> str:
     Replace logo src attributes with base64 data URIs.
 
     Args:
-        html: HTML string with relative logo paths
+        html: HTML string with relative logo paths or asset references
         template_dir: Directory containing logo files
 
     Returns:
         HTML with embedded base64 logos
     """
-    logo_map = get_logo_base64_map(template_dir)
-
-    if not logo_map:
+    registry = get_asset_registry(template_dir)
+    if not registry.assets:
         log.warning("[LOGO-EMBED] No logos loaded, HTML unchanged")
         return html
-
-    modified_html = html
-    replacements = 0
-
-    for filename, data_uri in logo_map.items():
-        # Match various src patterns
-        patterns = [
-            f'src="{filename}"',
-            f"src='{filename}'",
-            f'src="{filename.replace(".webp", "")}"',  # Without extension
-        ]
-
-        for pattern in patterns:
-            if pattern in modified_html:
-                replacement = f'src="{data_uri}"'
-                modified_html = modified_html.replace(pattern, replacement)
-                replacements += 1
-                log.debug(f"[LOGO-EMBED] Replaced: {pattern[:50]}...")
-
-    log.info(f"[LOGO-EMBED] Made {replacements} logo replacements in HTML")
-    return modified_html
+    return registry.inline(registry.reference(html))
 
 
 def embed_all_images_in_html(html: str, template_dir: str = "templates") -> str: